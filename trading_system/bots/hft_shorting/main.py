@@ -4,13 +4,13 @@ HFT Trading System - Pure Live Data Paper Trading
 NO simulated data - everything must come from OKX live feeds
 """
 
+import os
 import sys
 import time
 import json
 import logging
 import argparse
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Dict, List
 
 # Set up logging first
@@ -33,6 +33,8 @@ try:
     import config
     import signal_engine
     import confidence_scoring
+    from tick_scheduler import TickScheduler
+    from shard_supervisor import ShardSupervisor
     
     # Force paper trading mode regardless of config
     if config.MODE == "paper" or not hasattr(config, 'LIVE_TRADING') or not config.LIVE_TRADING:
@@ -46,12 +48,19 @@ except ImportError as e:
     sys.exit(1)
 
 class LiveDataPaperTradingSystem:
-    def __init__(self, mode="paper"):
+    def __init__(self, mode="paper", symbols: List[str] = None, worker_id: int = 0, risk_book=None):
         self.mode = mode
+        self.symbols = list(symbols or config.ASSETS)
+        self.worker_id = worker_id
+        self.risk_book = risk_book
+        self.reserved = {}
+        self.signal_bus = None
+        self.state_file = "/tmp/paper_trading_state.json" if risk_book is None else f"/tmp/paper_trading_state.shard{worker_id}.json"
         self.running = True
         self.iteration = 0
-        self.executor = ThreadPoolExecutor(max_workers=2)  # Reduced workers
+        self.scheduler = None
         self.last_display = time.time()
+        self.last_progress = time.time()
         self.market_data_ready = False
         self.last_signal_time = 0
         
@@ -69,7 +78,7 @@ class LiveDataPaperTradingSystem:
         # Signal modules
         self.signal_modules = [('live_data', signal_engine.generate_signal)]
         
-        logging.info(f"🚀 LIVE DATA PAPER TRADING SYSTEM STARTED")
+        logging.info(f"🚀 LIVE DATA PAPER TRADING SYSTEM STARTED - {', '.join(self.symbols)}")
         logging.info(f"📄 Virtual balance: ${config.PAPER_INITIAL_BALANCE:,.0f}")
         logging.info("⚠️  NO SIMULATED DATA - 100% live OKX market data only")
     
@@ -77,7 +86,7 @@ class LiveDataPaperTradingSystem:
         """Wait for OKX live data to be available - NO FALLBACKS"""
         try:
             from okx_market_data import get_okx_engine
-            feed = get_okx_engine()
+            feed = get_okx_engine(self.symbols)
             
             max_wait_iterations = 60  # 2 minutes max wait
             wait_count = 0
@@ -89,14 +98,15 @@ class LiveDataPaperTradingSystem:
                 if status == 'LIVE':
                     # Double-check we have actual price data
                     try:
-                        btc_price = feed.get_live_price("BTC")
-                        if btc_price and btc_price.get('price', 0) > 0:
+                        live_price = feed.get_live_price(self.symbols[0])
+                        if live_price and live_price.get('price', 0) > 0:
                             logging.info("🔥 LIVE MARKET DATA CONFIRMED - Trading ready")
                             return True
                     except:
                         pass
                 
                 wait_count += 1
+                self.heartbeat()
                 if wait_count % 10 == 0:
                     logging.info(f"⏳ Waiting for live data... Status: {status} ({wait_count}/60)")
                 
@@ -107,14 +117,14 @@ class LiveDataPaperTradingSystem:
         except Exception as e:
             raise RuntimeError(f"LIVE DATA ERROR: {e}")
     
-    def check_market_data_quality(self):
+    def check_market_data_quality(self, assets: List[str]):
         """Verify live data quality before signal generation"""
         try:
             from okx_market_data import get_okx_engine
             feed = get_okx_engine()
             
-            # Check all required assets have live data
-            for asset in ["BTC", "ETH", "SOL"]:
+            # Check the assets being evaluated have live data
+            for asset in assets:
                 price_data = feed.get_live_price(asset)
                 if not price_data or price_data.get('price', 0) <= 0:
                     return False
@@ -156,29 +166,50 @@ class LiveDataPaperTradingSystem:
             logging.warning(f"Signal generation: {e}")
             return None
     
-    def generate_live_signals(self, shared_data):
-        """Generate signals from live data only"""
+    def generate_live_signals(self, shared_data, assets: List[str]):
+        """Generate signals from live data only, for the assets that ticked"""
+        assets = [asset for asset in assets if asset in self.symbols]
+        
         # Verify data quality first
-        if not self.check_market_data_quality():
+        if not assets or not self.check_market_data_quality(assets):
             return []
         
-        futures = []
-        for module_name, func in self.signal_modules:
-            future = self.executor.submit(self.run_signal_module, module_name, func, shared_data)
-            futures.append(future)
-        
         signals = []
-        for future in as_completed(futures, timeout=8.0):
-            try:
-                signal = future.result()
+        for asset in assets:
+            for module_name, func in self.signal_modules:
+                signal = self.run_signal_module(module_name, func, {**shared_data, "asset": asset})
                 if signal and signal.get("confidence", 0) > 0.5:  # Only high-quality signals
                     signals.append(signal)
-            except Exception as e:
-                logging.debug(f"Signal future failed: {e}")
-                continue
         
         return signals
     
+    def process_ticks(self, assets: List[str]):
+        """Signal, merge and risk evaluation for the assets whose data changed"""
+        self.iteration += 1
+        shared_data = {
+            "timestamp": time.time(),
+            "mode": self.mode,
+            "iteration": self.iteration
+        }
+        
+        # Generate signals from live data
+        signals = self.generate_live_signals(shared_data, assets)
+        
+        if signals:
+            try:
+                # Merge and process signals
+                merged = confidence_scoring.merge_signals(signals)
+                
+                # Handle paper trading
+                self.handle_paper_trading(merged)
+                self.last_signal_time = time.time()
+                
+            except Exception as e:
+                logging.error(f"Signal processing error: {e}")
+        
+        # Update positions with live prices
+        self.update_paper_positions(assets)
+    
     def handle_paper_trading(self, signal_data: Dict):
         """Execute paper trades based on live signals"""
         global paper_engine
@@ -191,16 +222,26 @@ class LiveDataPaperTradingSystem:
             confidence = signal_data.get("confidence", 0)
             
             if confidence >= config.SIGNAL_CONFIDENCE_THRESHOLD:
-                result = paper_engine.open_position(signal_data)
+                asset = signal_data.get('signal_data', {}).get("asset")
+                notional = self.position_notional()
+                if not self.reserve_risk(notional):
+                    logging.debug(f"Portfolio limits reached across shards, skipping {asset}")
+                    return
+                
+                result = paper_engine.open_position(signal_data, notional=notional)
                 
                 if result:
+                    self.hold_risk(result["position_id"], notional)
                     signal_info = signal_data.get('signal_data', {})
                     logging.info(f"📄 LIVE DATA TRADE: {result['asset']} {result['side']} @ ${result['entry_price']:.2f} | RSI:{signal_info.get('rsi', 0):.1f} | Conf:{confidence:.3f}")
                     
-                    # Write signal for monitoring
-                    with open("/tmp/signal.json", "w") as f:
-                        json.dump(signal_data, f, indent=2)
+                    # Hand the signal to the executor over the shared-memory ring
+                    from signal_bus import SignalRecord
+                    record = SignalRecord.from_signal(signal_data)
+                    record.quantity = result.get("quantity", 0.0)
+                    self.get_signal_bus().publish(record)
                 else:
+                    self.return_risk(notional)
                     logging.debug("Paper trade not executed (position limits or constraints)")
             else:
                 logging.debug(f"Signal below threshold: {confidence:.3f}")
@@ -208,7 +249,77 @@ class LiveDataPaperTradingSystem:
         except Exception as e:
             logging.error(f"Paper trading execution error: {e}")
     
-    def update_paper_positions(self):
+    def position_notional(self) -> float:
+        """Size from the shared portfolio when sharded: every worker's engine starts with the full balance"""
+        if self.risk_book is None:
+            return paper_engine.balance * config.POSITION_SIZE_PERCENT
+        return self.risk_book.capital(config.PAPER_INITIAL_BALANCE) * config.POSITION_SIZE_PERCENT
+    
+    def reserve_risk(self, notional: float) -> bool:
+        """Claim room under the portfolio-wide limits shared by all shard workers"""
+        if self.risk_book is None:
+            return True
+        max_loss = config.PAPER_INITIAL_BALANCE * config.MAX_DRAWDOWN_PERCENT / 100
+        # All shards together never deploy more than the one portfolio's capital
+        capital = self.risk_book.capital(config.PAPER_INITIAL_BALANCE)
+        return self.risk_book.try_open(notional, config.MAX_OPEN_POSITIONS, max_exposure=capital, max_loss=max_loss,
+                                       worker_id=self.worker_id)
+    
+    def return_risk(self, notional: float):
+        """Give back a reservation whose position never opened"""
+        if self.risk_book is not None:
+            self.risk_book.release(notional, worker_id=self.worker_id)
+    
+    def hold_risk(self, position_id: str, notional: float):
+        if self.risk_book is not None:
+            self.reserved[position_id] = (notional, paper_engine.positions[position_id])
+    
+    def release_risk(self, position_id: str):
+        """Release a reservation once its position has fully closed, with the P&L of every leg"""
+        if position_id not in self.reserved or position_id in paper_engine.positions:
+            return
+        notional, position = self.reserved.pop(position_id)
+        self.risk_book.release(notional, position.realized_pnl, self.worker_id)
+    
+    def heartbeat(self):
+        if self.risk_book is not None:
+            self.risk_book.heartbeat(self.worker_id, self.scheduler.metrics["ticks"] if self.scheduler else 0)
+    
+    def get_signal_bus(self):
+        if self.signal_bus is None:
+            from signal_bus import SignalBus, get_signal_bus, shard_ring_paths, SIGNAL_RING_PATH
+            if self.risk_book is None:
+                self.signal_bus = get_signal_bus()
+            else:
+                # One ring pair per shard keeps every ring single-producer; all shards ring the main doorbell
+                signal_path, fill_path = shard_ring_paths(self.worker_id)
+                self.signal_bus = SignalBus(signal_path, fill_path, doorbell_path=SIGNAL_RING_PATH)
+        return self.signal_bus
+    
+    def drain_fills(self):
+        """Collect executor fills every pass so the fill ring never backs up"""
+        if self.signal_bus is None:
+            return
+        from signal_bus import FILL_REJECTED
+        from trade_store import get_trade_store
+        while True:
+            fills = self.signal_bus.poll_fills()
+            if not fills:
+                return
+            for fill in fills:
+                side = "sell" if fill.side < 0 else "buy"
+                if fill.status == FILL_REJECTED:
+                    logging.warning(f"❌ Executor rejected {fill.asset} signal #{fill.signal_seq}")
+                    continue
+                logging.info(f"⚡ EXECUTOR FILL: {fill.asset} {side} {fill.quantity:.6f} @ ${fill.price:.2f} "
+                             f"in {fill.execution_time_us / 1000:.1f}ms | order {fill.order_id}")
+                # The paper engine already books this signal's entry under hft_shorting: keep the
+                # executor's own fill apart so per-strategy counts and fees are not doubled
+                get_trade_store().record("entry", fill.asset, fill.price, fill.quantity, fill.fee, -fill.fee,
+                                         source="executor", strategy="hft_executor", side=side,
+                                         position_id=fill.order_id, timestamp=fill.timestamp_ns / 1e9)
+    
+    def update_paper_positions(self, assets: List[str] = None):
         """Update positions with live market prices"""
         global paper_engine
         
@@ -221,7 +332,7 @@ class LiveDataPaperTradingSystem:
             
             # Get live prices for all assets
             market_prices = {}
-            for asset in config.ASSETS:
+            for asset in assets or self.symbols:
                 try:
                     price_data = feed.get_live_price(asset)
                     if price_data and price_data.get('price', 0) > 0:
@@ -230,7 +341,10 @@ class LiveDataPaperTradingSystem:
                     continue
             
             if market_prices:
+                trades_before = len(paper_engine.trade_history)
                 paper_engine.update_positions(market_prices)
+                for trade in paper_engine.trade_history[trades_before:]:
+                    self.release_risk(trade.position_id)
                 logging.debug(f"Updated positions with live prices: {market_prices}")
             else:
                 logging.warning("No live prices available for position updates")
@@ -278,7 +392,7 @@ class LiveDataPaperTradingSystem:
             print("="*70)
             
             self.last_display = time.time()
-            paper_engine.save_state()
+            paper_engine.save_state(self.state_file)
             
         except Exception as e:
             logging.error(f"Error displaying portfolio: {e}")
@@ -296,48 +410,27 @@ class LiveDataPaperTradingSystem:
         
         logging.info("✅ LIVE DATA CONFIRMED - Starting trading loop")
         
+        from okx_market_data import get_okx_engine
+        self.scheduler = TickScheduler(get_okx_engine(self.symbols), self.process_ticks)
+        
         while self.running:
             try:
-                self.iteration += 1
-                loop_start = time.time()
-                
-                shared_data = {
-                    "timestamp": time.time(),
-                    "mode": self.mode,
-                    "iteration": self.iteration
-                }
-                
-                # Generate signals from live data
-                signals = self.generate_live_signals(shared_data)
-                
-                if signals:
-                    try:
-                        # Merge and process signals
-                        merged = confidence_scoring.merge_signals(signals)
-                        confidence = merged.get("confidence", 0)
-                        
-                        # Handle paper trading
-                        self.handle_paper_trading(merged)
-                        self.last_signal_time = time.time()
-                        
-                    except Exception as e:
-                        logging.error(f"Signal processing error: {e}")
-                        continue
-                
-                # Update positions with live prices
-                self.update_paper_positions()
+                # Wakes on new ticks; only assets that changed are evaluated
+                self.scheduler.run_once()
+                self.drain_fills()
+                self.heartbeat()
                 
                 # Display portfolio status
                 self.display_portfolio_status()
                 
                 # Progress indicator
-                if self.iteration % 30 == 0:
-                    logging.info(f"🔄 System running - Iteration {self.iteration} | Last signal: {int(time.time() - self.last_signal_time)}s ago")
-                
-                # Maintain 2-second cycle
-                cycle_time = time.time() - loop_start
-                sleep_time = max(0, 2.0 - cycle_time)
-                time.sleep(sleep_time)
+                if time.time() - self.last_progress >= 60:
+                    metrics = self.scheduler.get_metrics()
+                    logging.info(f"🔄 System running - {metrics['wakeups']} wakeups, {metrics['ticks']} ticks "
+                                 f"({metrics['coalesced']} coalesced) | cycle avg {metrics['avg_cycle_ms']:.1f}ms "
+                                 f"max {metrics['max_cycle_ms']:.1f}ms, {metrics['overruns']} overruns | "
+                                 f"Last signal: {int(time.time() - self.last_signal_time)}s ago")
+                    self.last_progress = time.time()
                 
             except KeyboardInterrupt:
                 logging.info("Shutting down live data paper trading system...")
@@ -346,9 +439,7 @@ class LiveDataPaperTradingSystem:
                 logging.error(f"System error: {e}")
                 time.sleep(2)  # Brief pause before continuing
         
-        # Cleanup and final summary
-        self.executor.shutdown(wait=True)
-        
+        # Final summary
         try:
             global paper_engine
             if paper_engine:
@@ -367,10 +458,22 @@ class LiveDataPaperTradingSystem:
         except Exception as e:
             logging.error(f"Error displaying final summary: {e}")
 
+def run_shard_worker(worker_id: int, symbols: List[str], risk_book):
+    """Shard process entry: its own feed subscription and indicator state, portfolio limits shared"""
+    system = LiveDataPaperTradingSystem(mode="paper", symbols=symbols, worker_id=worker_id, risk_book=risk_book)
+    try:
+        system.run()
+    except KeyboardInterrupt:
+        pass
+
 def main():
     parser = argparse.ArgumentParser(description='Live Data Paper Trading System')
     parser.add_argument('--mode', choices=['paper', 'live'], default='paper',
                        help='Trading mode: paper (default) or live')
+    parser.add_argument('--workers', type=int, default=int(os.getenv("HFT_WORKERS", "1")),
+                       help='Shard the instrument universe across this many processes')
+    parser.add_argument('--symbols', default=os.getenv("HFT_SYMBOLS", ",".join(config.ASSETS)),
+                       help='Comma-separated instrument universe')
     args = parser.parse_args()
     
     if args.mode == "live":
@@ -378,7 +481,16 @@ def main():
         print("   This system is for LIVE DATA PAPER TRADING only")
         sys.exit(1)
     
-    system = LiveDataPaperTradingSystem(mode="paper")
+    symbols = [symbol.strip().upper() for symbol in args.symbols.split(",") if symbol.strip()]
+    if args.workers > 1:
+        supervisor = ShardSupervisor(symbols, args.workers, run_shard_worker)
+        try:
+            supervisor.run()
+        except KeyboardInterrupt:
+            print("\n👋 System stopped by user")
+        return
+    
+    system = LiveDataPaperTradingSystem(mode="paper", symbols=symbols)
     try:
         system.run()
     except KeyboardInterrupt:
@@ -388,4 +500,4 @@ def main():
         sys.exit(1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
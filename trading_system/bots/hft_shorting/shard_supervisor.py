@@ -0,0 +1,204 @@
+import os
+import time
+import logging
+import multiprocessing
+from typing import Callable, Dict, List, Optional
+
+SHARD_HEARTBEAT_TIMEOUT = float(os.getenv("SHARD_HEARTBEAT_TIMEOUT", "30"))
+SHARD_STARTUP_GRACE = float(os.getenv("SHARD_STARTUP_GRACE", "180"))
+SHARD_MAX_BACKOFF = float(os.getenv("SHARD_MAX_BACKOFF", "60"))
+SHARD_LOCK_TIMEOUT = float(os.getenv("SHARD_LOCK_TIMEOUT", "5"))
+
+# Shared array layout: portfolio totals, then (heartbeat, ticks, open positions, exposure) per worker
+_REALIZED_PNL, _TRADES = range(2)
+_WORKER_BASE = 2
+_HEARTBEAT, _TICKS, _OPEN_POSITIONS, _EXPOSURE = range(4)
+_WORKER_FIELDS = 4
+
+def partition_symbols(symbols: List[str], shards: int) -> List[List[str]]:
+    """Round-robin over the sorted universe: stable across restarts, sizes differ by at most one"""
+    shards = max(1, min(shards, len(symbols)))
+    partitions = [[] for _ in range(shards)]
+    for i, symbol in enumerate(sorted(set(symbols))):
+        partitions[i % shards].append(symbol)
+    return partitions
+
+class SharedRiskBook:
+    """Portfolio-wide risk and capital view shared by every shard worker through shared memory"""
+
+    def __init__(self, workers: int, context=None):
+        context = context or multiprocessing.get_context()
+        self.workers = workers
+        self.lock = context.Lock()
+        self.values = context.RawArray("d", _WORKER_BASE + _WORKER_FIELDS * workers)
+
+    def _slot(self, worker_id: int) -> int:
+        return _WORKER_BASE + _WORKER_FIELDS * worker_id
+
+    def _totals(self):
+        # Open positions and exposure live per worker so a reaped worker's reservations can be dropped
+        values = self.values
+        slots = range(_WORKER_BASE, len(values), _WORKER_FIELDS)
+        return sum(values[i + _OPEN_POSITIONS] for i in slots), sum(values[i + _EXPOSURE] for i in slots)
+
+    def try_open(self, notional: float, max_positions: int, max_exposure: Optional[float] = None,
+                 max_loss: Optional[float] = None, worker_id: int = 0) -> bool:
+        """Reserve room for a new position against the portfolio-wide limits; atomic across workers"""
+        # Never wait on a lock a hung worker may hold: skip the trade and keep heartbeating
+        if not self.lock.acquire(timeout=SHARD_LOCK_TIMEOUT):
+            logging.warning(f"Shard {worker_id} timed out on the risk book lock")
+            return False
+        try:
+            values = self.values
+            open_positions, exposure = self._totals()
+            if open_positions >= max_positions:
+                return False
+            if max_exposure is not None and exposure + notional > max_exposure:
+                return False
+            if max_loss is not None and values[_REALIZED_PNL] <= -max_loss:
+                return False
+            slot = self._slot(worker_id)
+            values[slot + _OPEN_POSITIONS] += 1
+            values[slot + _EXPOSURE] += notional
+            values[_TRADES] += 1
+            return True
+        finally:
+            self.lock.release()
+
+    def capital(self, initial: float) -> float:
+        """Portfolio capital: the starting balance plus realized P&L from every worker"""
+        # A single aligned double: readable without the lock
+        return initial + self.values[_REALIZED_PNL]
+
+    def release(self, notional: float, pnl: float = 0.0, worker_id: int = 0):
+        """Return a reservation: the position closed, or was never opened"""
+        with self.lock:
+            slot = self._slot(worker_id)
+            self.values[slot + _OPEN_POSITIONS] = max(0.0, self.values[slot + _OPEN_POSITIONS] - 1)
+            self.values[slot + _EXPOSURE] = max(0.0, self.values[slot + _EXPOSURE] - notional)
+            self.values[_REALIZED_PNL] += pnl
+
+    def reap(self, worker_id: int):
+        """Drop a dead worker's reservations: its replacement starts with a fresh engine and holds nothing"""
+        if not self.lock.acquire(timeout=SHARD_LOCK_TIMEOUT):
+            # Only a killed worker can hold it this long; take it over so the other shards resume
+            logging.warning(f"Recovering the risk book lock from shard {worker_id}")
+        try:
+            slot = self._slot(worker_id)
+            self.values[slot + _OPEN_POSITIONS] = 0.0
+            self.values[slot + _EXPOSURE] = 0.0
+        finally:
+            self.lock.release()
+
+    def heartbeat(self, worker_id: int, ticks: int = 0):
+        # Single writer per slot: no lock needed
+        self.values[self._slot(worker_id) + _HEARTBEAT] = time.time()
+        self.values[self._slot(worker_id) + _TICKS] = ticks
+
+    def last_heartbeat(self, worker_id: int) -> float:
+        return self.values[self._slot(worker_id) + _HEARTBEAT]
+
+    def snapshot(self) -> Dict:
+        # Lock-free: the supervisor must keep running even while a hung worker holds the lock
+        values = list(self.values)
+        open_positions, exposure = self._totals()
+        return {
+            "exposure": exposure,
+            "open_positions": int(open_positions),
+            "realized_pnl": values[_REALIZED_PNL],
+            "trades": int(values[_TRADES]),
+            "worker_ticks": [int(values[self._slot(i) + _TICKS]) for i in range(self.workers)]
+        }
+
+class ShardSupervisor:
+    """Runs one worker process per instrument shard; restarts workers that exit or stop heartbeating"""
+
+    def __init__(self, symbols: List[str], workers: int, target: Callable, heartbeat_timeout: float = SHARD_HEARTBEAT_TIMEOUT,
+                 startup_grace: float = SHARD_STARTUP_GRACE, start_method: str = "fork"):
+        self.context = multiprocessing.get_context(start_method)
+        self.shards = partition_symbols(symbols, workers)
+        self.target = target
+        self.heartbeat_timeout = heartbeat_timeout
+        self.startup_grace = startup_grace
+        self.risk_book = SharedRiskBook(len(self.shards), self.context)
+
+        self.processes: List[Optional[multiprocessing.Process]] = [None] * len(self.shards)
+        self.started_at = [0.0] * len(self.shards)
+        self.restart_at = [0.0] * len(self.shards)
+        self.failures = [0] * len(self.shards)
+        self.restarts = 0
+        self.running = False
+
+    def start(self):
+        self.running = True
+        for worker_id in range(len(self.shards)):
+            self._spawn(worker_id)
+        logging.info(f"🧩 Started {len(self.shards)} shard workers: "
+                     + " | ".join(",".join(shard) for shard in self.shards))
+
+    def _spawn(self, worker_id: int):
+        self.risk_book.heartbeat(worker_id)
+        process = self.context.Process(target=self.target, args=(worker_id, self.shards[worker_id], self.risk_book),
+                                       name=f"shard-{worker_id}", daemon=True)
+        process.start()
+        self.processes[worker_id] = process
+        self.started_at[worker_id] = time.time()
+
+    def check(self):
+        """One health pass: reap dead or hung workers and respawn them with backoff"""
+        now = time.time()
+        for worker_id, process in enumerate(self.processes):
+            if process is None:
+                if now >= self.restart_at[worker_id]:
+                    self._spawn(worker_id)
+                    self.restarts += 1
+                continue
+
+            if process.is_alive():
+                # A worker is still connecting until its first heartbeat after spawn
+                started = self.risk_book.last_heartbeat(worker_id) > self.started_at[worker_id]
+                timeout = self.heartbeat_timeout if started else self.startup_grace
+                if now - self.risk_book.last_heartbeat(worker_id) <= timeout:
+                    if started and now - self.started_at[worker_id] > SHARD_MAX_BACKOFF:
+                        self.failures[worker_id] = 0
+                    continue
+                logging.error(f"❌ Shard {worker_id} stopped heartbeating, restarting")
+                process.terminate()
+                process.join(timeout=5)
+                if process.is_alive():
+                    process.kill()
+                    process.join()
+            else:
+                logging.error(f"❌ Shard {worker_id} exited with code {process.exitcode}, restarting")
+
+            self.risk_book.reap(worker_id)
+            backoff = min(SHARD_MAX_BACKOFF, 2 ** self.failures[worker_id] - 1)
+            self.failures[worker_id] += 1
+            self.processes[worker_id] = None
+            self.restart_at[worker_id] = now + backoff
+
+    def run(self, interval: float = 1.0, status_interval: float = 60.0):
+        self.start()
+        last_status = time.time()
+        try:
+            while self.running:
+                self.check()
+                if time.time() - last_status >= status_interval:
+                    book = self.risk_book.snapshot()
+                    logging.info(f"🧩 Shards: {book['open_positions']} open | exposure ${book['exposure']:,.0f} | "
+                                 f"realized ${book['realized_pnl']:+.2f} | ticks {book['worker_ticks']} | "
+                                 f"{self.restarts} restarts")
+                    last_status = time.time()
+                time.sleep(interval)
+        finally:
+            self.stop()
+
+    def stop(self, timeout: float = 10.0):
+        self.running = False
+        for process in self.processes:
+            if process is not None and process.is_alive():
+                process.terminate()
+        deadline = time.time() + timeout
+        for process in self.processes:
+            if process is not None:
+                process.join(timeout=max(0.0, deadline - time.time()))
@@ -0,0 +1,106 @@
+import re
+import json
+import string
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Comments and string / hex / unicode literals; replaced by their newlines so line numbers survive
+_COMMENTS_AND_STRINGS = re.compile(
+    r'//[^\n]*|/\*.*?\*/|"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\'',
+    re.DOTALL
+)
+
+# ASCII-only lowercasing: str.lower() can change the length of some non-ASCII text and shift every offset after it
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+def ascii_lower(text: str) -> str:
+    return text.lower() if text.isascii() else text.translate(_ASCII_LOWER)
+
+@dataclass(frozen=True)
+class PatternHit:
+    pattern: str
+    case_sensitive: bool
+    line: int
+
+@dataclass(frozen=True)
+class ScanResult:
+    source_hash: str
+    hits: Tuple[PatternHit, ...]
+
+    def first_hit(self, patterns: Iterable[str], case_sensitive: bool = False) -> Optional[PatternHit]:
+        wanted = set(patterns)
+        for hit in self.hits:
+            if hit.case_sensitive == case_sensitive and hit.pattern in wanted:
+                return hit
+        return None
+
+    def is_clean(self, patterns: Iterable[str], case_sensitive: bool = False) -> bool:
+        return self.first_hit(patterns, case_sensitive) is None
+
+def flatten_source(source: str) -> str:
+    """Etherscan returns multi-file contracts as standard-JSON input, usually wrapped in an extra pair of braces"""
+    if not source.startswith("{"):
+        return source
+    try:
+        data = json.loads(source[1:-1] if source.startswith("{{") else source)
+        files = data.get("sources", data)
+        return "\n".join(f.get("content", "") for f in files.values() if isinstance(f, dict))
+    except (ValueError, AttributeError):
+        return source
+
+def strip_comments_and_strings(source: str) -> str:
+    return _COMMENTS_AND_STRINGS.sub(lambda m: "\n" * m.group().count("\n") or " ", source)
+
+class ContractScanner:
+    """One precompiled pass over Solidity source for every pattern; results memoized by source hash"""
+
+    def __init__(self, patterns: Iterable[str] = (), case_sensitive: Iterable[str] = (), cache_size: int = 1024):
+        self.entries: List[Tuple[str, bool]] = sorted(
+            {(p, False) for p in patterns if p} | {(p, True) for p in case_sensitive if p}
+        )
+        keys = sorted({ascii_lower(p) for p, _ in self.entries}, key=len, reverse=True)
+
+        # Zero-width lookahead reports overlapping hits; the longest key wins at each position
+        # and every shorter pattern that is its prefix is resolved from this table. Matching
+        # runs on an ASCII-lowercased copy, which is far faster than re.IGNORECASE
+        self.regex = re.compile("(?=(" + "|".join(re.escape(k) for k in keys) + "))")
+        self.prefixes: Dict[str, List[Tuple[str, bool]]] = {
+            key: [(p, cs) for p, cs in self.entries if key.startswith(ascii_lower(p))] for key in keys
+        }
+
+        self.cache_size = cache_size
+        self.cache: OrderedDict = OrderedDict()
+        self.stats = {"scans": 0, "hits": 0}
+
+    def scan(self, source: str) -> ScanResult:
+        source_hash = hashlib.sha256(source.encode("utf-8", errors="surrogatepass")).hexdigest()
+        cached = self.cache.get(source_hash)
+        if cached is not None:
+            self.cache.move_to_end(source_hash)
+            self.stats["hits"] += 1
+            return cached
+
+        self.stats["scans"] += 1
+        result = ScanResult(source_hash, tuple(self._scan(source)))
+        self.cache[source_hash] = result
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return result
+
+    def _scan(self, source: str) -> List[PatternHit]:
+        if not self.entries:
+            return []
+        code = strip_comments_and_strings(flatten_source(source))
+        hits = []
+        line, last = 1, 0
+        for match in self.regex.finditer(ascii_lower(code)):
+            start = match.start()
+            line += code.count("\n", last, start)
+            last = start
+            for pattern, case_sensitive in self.prefixes[match.group(1)]:
+                if case_sensitive and not code.startswith(pattern, start):
+                    continue
+                hits.append(PatternHit(pattern, case_sensitive, line))
+        return hits
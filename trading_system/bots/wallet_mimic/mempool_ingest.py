@@ -0,0 +1,243 @@
+import json
+import time
+import asyncio
+import logging
+from collections import deque
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+import aiohttp
+
+@dataclass
+class PendingTx:
+    tx_hash: str
+    from_address: str
+    to_address: Optional[str]
+    value: int
+    gas: int
+    gas_price: int
+    input: str
+    nonce: int
+    seen_at: float
+
+    @classmethod
+    def from_rpc(cls, tx: Dict) -> "PendingTx":
+        to_address = tx.get("to")
+        gas_price = tx.get("gasPrice") or tx.get("maxFeePerGas") or "0x0"
+        return cls(
+            tx_hash=tx["hash"],
+            from_address=tx["from"].lower(),
+            to_address=to_address.lower() if to_address else None,
+            value=int(tx.get("value", "0x0"), 16),
+            gas=int(tx.get("gas", "0x0"), 16),
+            gas_price=int(gas_price, 16),
+            input=tx.get("input") or tx.get("data") or "0x",
+            nonce=int(tx.get("nonce", "0x0"), 16),
+            seen_at=time.time()
+        )
+
+class MempoolIngestor:
+    """Pending-tx pipeline: full-body subscription, sender filter first, batched lookups only as fallback"""
+
+    SENDER_KEY = '"from":"'
+
+    def __init__(self, ws_url: str, rpc_url: str, watched_senders: Set[str],
+                 callback: Callable[[PendingTx], Awaitable], mode: str = "auto",
+                 workers: int = 8, queue_size: int = 20000,
+                 batch_size: int = 100, batch_window: float = 0.005):
+        self.ws_url = ws_url
+        self.rpc_url = rpc_url
+        # Shared by reference so alpha wallet reloads take effect immediately
+        self.watched_senders = watched_senders
+        self.callback = callback
+        self.mode = mode if mode != "auto" else ("alchemy" if "alchemy" in (ws_url or "") else "full")
+
+        self.workers = workers
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.lookup_queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.websocket: Optional[aiohttp.ClientWebSocketResponse] = None
+        # Server-side sender filter as last sent; alchemy only
+        self.subscribed_senders: Optional[frozenset] = None
+        self.resubscribe = False
+        self.close_task: Optional[asyncio.Task] = None
+        self.running = False
+        self.callback_tasks: Set[asyncio.Task] = set()
+        self.recent_hashes = deque(maxlen=4096)
+        self.recent_hash_set: Set[str] = set()
+        self.request_id = 0
+
+        self.stats = {
+            "received": 0,
+            "filtered": 0,
+            "matched": 0,
+            "lookups": 0,
+            "lookup_batches": 0,
+            "dropped": 0,
+            "errors": 0
+        }
+
+    def subscription_params(self) -> List:
+        if self.mode == "alchemy":
+            self.subscribed_senders = frozenset(self.watched_senders)
+            return ["alchemy_pendingTransactions",
+                    {"fromAddress": sorted(self.subscribed_senders), "hashesOnly": False}]
+        if self.mode == "full":
+            return ["newPendingTransactions", True]
+        return ["newPendingTransactions"]
+
+    async def run(self):
+        """Subscribe, ingest and reconnect until stopped"""
+        self.running = True
+        connector = aiohttp.TCPConnector(limit=self.workers, keepalive_timeout=60)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            self.session = session
+            workers = [asyncio.create_task(self._lookup_worker()) for _ in range(self.workers)]
+            try:
+                while self.running:
+                    try:
+                        await self._consume_subscription()
+                    except Exception as e:
+                        self.stats["errors"] += 1
+                        logging.error(f"Mempool subscription error: {e}")
+                    if self.running and not self.resubscribe:
+                        await asyncio.sleep(5)
+                    self.resubscribe = False
+            finally:
+                for worker in workers:
+                    worker.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+                self.session = None
+
+    def stop(self):
+        self.running = False
+
+    def refresh_subscription(self):
+        """Call after the watched set changes: the alchemy fromAddress filter is fixed at subscribe time,
+        so reconnect at once with the new one. Other modes filter locally and need nothing."""
+        if self.mode != "alchemy" or self.websocket is None:
+            return
+        if self.subscribed_senders == frozenset(self.watched_senders):
+            return
+        self.resubscribe = True
+        self.close_task = asyncio.create_task(self.websocket.close())
+
+    async def _consume_subscription(self):
+        async with self.session.ws_connect(self.ws_url, heartbeat=30, max_msg_size=0) as websocket:
+            self.websocket = websocket
+            try:
+                while True:
+                    await websocket.send_str(json.dumps({
+                        "jsonrpc": "2.0", "id": 1, "method": "eth_subscribe", "params": self.subscription_params()
+                    }))
+
+                    reply = json.loads((await websocket.receive()).data)
+                    if "error" not in reply:
+                        break
+                    if self.mode == "hashes":
+                        raise RuntimeError(f"eth_subscribe rejected: {reply['error']}")
+
+                    # Node cannot stream full bodies: fall back to hashes plus batched lookups
+                    logging.warning(f"{self.mode} pending-tx subscription unsupported, falling back to hashes")
+                    self.mode = "hashes"
+
+                logging.info(f"Mempool subscription active ({self.mode}) for {len(self.watched_senders)} wallets")
+
+                async for message in websocket:
+                    if message.type == aiohttp.WSMsgType.TEXT:
+                        self.handle_message(message.data)
+                    elif message.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                        break
+
+                    if not self.running:
+                        break
+            finally:
+                self.websocket = None
+
+    def handle_message(self, raw: str):
+        """Hot path: reject unwatched senders with a substring scan before parsing JSON"""
+        self.stats["received"] += 1
+
+        index = raw.find(self.SENDER_KEY)
+        if index >= 0:
+            start = index + len(self.SENDER_KEY)
+            if raw[start:start + 42].lower() not in self.watched_senders:
+                self.stats["filtered"] += 1
+                return
+
+        try:
+            result = json.loads(raw)["params"]["result"]
+        except (ValueError, KeyError, TypeError):
+            return
+
+        if isinstance(result, str):
+            self._enqueue_lookup(result)
+        elif isinstance(result, dict):
+            self._accept(result)
+
+    def _enqueue_lookup(self, tx_hash: str):
+        try:
+            self.lookup_queue.put_nowait(tx_hash)
+        except asyncio.QueueFull:
+            # Stale hashes are worth less than fresh ones: drop the oldest
+            self.lookup_queue.get_nowait()
+            self.lookup_queue.put_nowait(tx_hash)
+            self.stats["dropped"] += 1
+
+    def _accept(self, tx: Dict):
+        sender = tx.get("from")
+        if not sender or sender.lower() not in self.watched_senders:
+            self.stats["filtered"] += 1
+            return
+
+        tx_hash = tx.get("hash")
+        if tx_hash in self.recent_hash_set:
+            return
+        if len(self.recent_hashes) == self.recent_hashes.maxlen:
+            self.recent_hash_set.discard(self.recent_hashes[0])
+        self.recent_hashes.append(tx_hash)
+        self.recent_hash_set.add(tx_hash)
+
+        self.stats["matched"] += 1
+        task = asyncio.create_task(self._dispatch(PendingTx.from_rpc(tx)))
+        self.callback_tasks.add(task)
+        task.add_done_callback(self.callback_tasks.discard)
+
+    async def _dispatch(self, tx: PendingTx):
+        try:
+            await self.callback(tx)
+        except Exception as e:
+            self.stats["errors"] += 1
+            logging.error(f"Pending tx callback error {tx.tx_hash}: {e}")
+
+    async def _lookup_worker(self):
+        while True:
+            batch = [await self.lookup_queue.get()]
+            if self.lookup_queue.qsize() < self.batch_size:
+                await asyncio.sleep(self.batch_window)
+            while len(batch) < self.batch_size and not self.lookup_queue.empty():
+                batch.append(self.lookup_queue.get_nowait())
+
+            try:
+                for tx in await self.fetch_transactions(batch):
+                    self._accept(tx)
+            except Exception as e:
+                self.stats["errors"] += 1
+                logging.debug(f"Pending tx lookup batch failed: {e}")
+
+    async def fetch_transactions(self, tx_hashes: List[str]) -> List[Dict]:
+        """One JSON-RPC batch of eth_getTransactionByHash; unknown / already-mined hashes are skipped"""
+        payload = []
+        for tx_hash in tx_hashes:
+            self.request_id += 1
+            payload.append({"jsonrpc": "2.0", "id": self.request_id,
+                            "method": "eth_getTransactionByHash", "params": [tx_hash]})
+
+        async with self.session.post(self.rpc_url, json=payload) as response:
+            replies = await response.json(content_type=None)
+
+        self.stats["lookups"] += len(tx_hashes)
+        self.stats["lookup_batches"] += 1
+        return [reply["result"] for reply in replies if isinstance(reply, dict) and reply.get("result")]
@@ -0,0 +1,225 @@
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+WETH_ADDRESS = "0xc02aaa39b223fe8d0a0e5c4f27ead9083c756cc2"
+
+# Universal Router amount sentinel: "use the router's whole balance" (e.g. after WRAP_ETH)
+CONTRACT_BALANCE = 1 << 255
+
+UNIVERSAL_ROUTER_COMMAND_MASK = 0x3f
+V3_SWAP_EXACT_IN = 0x00
+V3_SWAP_EXACT_OUT = 0x01
+V2_SWAP_EXACT_IN = 0x08
+V2_SWAP_EXACT_OUT = 0x09
+
+@dataclass(frozen=True)
+class SwapCall:
+    """One decoded swap; for exact-output swaps amount_in is the maximum spent"""
+    protocol: str
+    method: str
+    token_in: str
+    token_out: str
+    amount_in: int
+    amount_out: int
+    exact_input: bool
+    path: Tuple[str, ...]
+    recipient: str
+    fees: Tuple[int, ...] = ()
+
+    @property
+    def is_buy(self) -> bool:
+        """ETH / WETH in, token out"""
+        return self.token_in == WETH_ADDRESS and self.token_out != WETH_ADDRESS
+
+# Fixed-offset ABI readers over a memoryview of the arguments (selector stripped)
+
+def _uint(data: memoryview, offset: int) -> int:
+    if offset + 32 > len(data):
+        raise ValueError("calldata truncated")
+    return int.from_bytes(data[offset:offset + 32], "big")
+
+def _address(data: memoryview, offset: int) -> str:
+    if offset + 32 > len(data):
+        raise ValueError("calldata truncated")
+    return "0x" + data[offset + 12:offset + 32].hex()
+
+def _address_array(data: memoryview, base: int, head: int) -> Tuple[str, ...]:
+    start = base + _uint(data, base + head)
+    count = _uint(data, start)
+    if start + 32 + 32 * count > len(data):
+        raise ValueError("address[] out of bounds")
+    return tuple(_address(data, start + 32 + 32 * i) for i in range(count))
+
+def _bytes(data: memoryview, base: int, head: int) -> memoryview:
+    start = base + _uint(data, base + head)
+    length = _uint(data, start)
+    if start + 32 + length > len(data):
+        raise ValueError("bytes out of bounds")
+    return data[start + 32:start + 32 + length]
+
+def _bytes_array(data: memoryview, base: int, head: int) -> List[memoryview]:
+    start = base + _uint(data, base + head)
+    count = _uint(data, start)
+    if start + 32 + 32 * count > len(data):
+        raise ValueError("bytes[] out of bounds")
+    return [_bytes(data, start + 32, 32 * i) for i in range(count)]
+
+def _v3_path(path: memoryview, reverse: bool) -> Tuple[Tuple[str, ...], Tuple[int, ...]]:
+    """Packed token(20) | fee(3) | token(20) ...; exact-output paths are encoded tokenOut first"""
+    if len(path) < 43 or (len(path) - 20) % 23:
+        raise ValueError("invalid V3 path")
+    tokens = tuple("0x" + path[i:i + 20].hex() for i in range(0, len(path), 23))
+    fees = tuple(int.from_bytes(path[i + 20:i + 23], "big") for i in range(0, len(path) - 20, 23))
+    if reverse:
+        return tokens[::-1], fees[::-1]
+    return tokens, fees
+
+def _swap(protocol: str, method: str, exact_input: bool, path: Tuple[str, ...],
+          amount_in: int, amount_out: int, recipient: str, fees: Tuple[int, ...] = ()) -> SwapCall:
+    if len(path) < 2:
+        raise ValueError("swap path too short")
+    return SwapCall(protocol, method, path[0], path[-1], amount_in, amount_out,
+                    exact_input, path, recipient, fees)
+
+Decoder = Callable[[memoryview, int], List[SwapCall]]
+
+def _v2_decoder(method: str, exact_input: bool, eth_in: bool) -> Decoder:
+    """Uniswap V2 / Sushiswap router: (amountA, [amountB,] address[] path, address to[, deadline])"""
+    path_head = 32 if eth_in else 64
+
+    def decode(data: memoryview, value: int) -> List[SwapCall]:
+        first = _uint(data, 0)
+        # ETH-in swaps spend msg.value; exact-output swaps list amountOut first
+        if eth_in:
+            amount_in, amount_out = value, first
+        elif exact_input:
+            amount_in, amount_out = first, _uint(data, 32)
+        else:
+            amount_in, amount_out = _uint(data, 32), first
+        path = _address_array(data, 0, path_head)
+        return [_swap("uniswap_v2", method, exact_input, path, amount_in, amount_out,
+                      _address(data, path_head + 32))]
+
+    return decode
+
+def _v3_single_decoder(method: str, exact_input: bool, has_deadline: bool) -> Decoder:
+    """Static ExactInputSingle / ExactOutputSingle params tuple, inlined in the arguments"""
+    amount_offset = 160 if has_deadline else 128
+
+    def decode(data: memoryview, value: int) -> List[SwapCall]:
+        specified, limit = _uint(data, amount_offset), _uint(data, amount_offset + 32)
+        amount_in, amount_out = (specified, limit) if exact_input else (limit, specified)
+        path = (_address(data, 0), _address(data, 32))
+        return [_swap("uniswap_v3", method, exact_input, path, amount_in, amount_out,
+                      _address(data, 96), (_uint(data, 64),))]
+
+    return decode
+
+def _v3_path_decoder(method: str, exact_input: bool, has_deadline: bool) -> Decoder:
+    """Dynamic ExactInput / ExactOutput params tuple: (bytes path, recipient, [deadline,] amount, limit)"""
+    amount_offset = 96 if has_deadline else 64
+
+    def decode(data: memoryview, value: int) -> List[SwapCall]:
+        base = _uint(data, 0)
+        specified, limit = _uint(data, base + amount_offset), _uint(data, base + amount_offset + 32)
+        amount_in, amount_out = (specified, limit) if exact_input else (limit, specified)
+        path, fees = _v3_path(_bytes(data, base, 0), reverse=not exact_input)
+        return [_swap("uniswap_v3", method, exact_input, path, amount_in, amount_out,
+                      _address(data, base + 32), fees)]
+
+    return decode
+
+def _multicall_decoder(calls_head: int) -> Decoder:
+    """SwapRouter / SwapRouter02 multicall: decode every inner call through the registry"""
+
+    def decode(data: memoryview, value: int) -> List[SwapCall]:
+        swaps = []
+        for call in _bytes_array(data, 0, calls_head):
+            swaps.extend(_dispatch(call, value))
+        return swaps
+
+    return decode
+
+def _universal_router_execute(data: memoryview, value: int) -> List[SwapCall]:
+    """Universal Router execute(bytes commands, bytes[] inputs[, deadline]); non-swap commands are skipped"""
+    commands = _bytes(data, 0, 0)
+    inputs = _bytes_array(data, 0, 32)
+    swaps = []
+    for command, params in zip(commands, inputs):
+        command &= UNIVERSAL_ROUTER_COMMAND_MASK
+        if command not in (V3_SWAP_EXACT_IN, V3_SWAP_EXACT_OUT, V2_SWAP_EXACT_IN, V2_SWAP_EXACT_OUT):
+            continue
+
+        exact_input = command in (V3_SWAP_EXACT_IN, V2_SWAP_EXACT_IN)
+        specified, limit = _uint(params, 32), _uint(params, 64)
+        amount_in, amount_out = (specified, limit) if exact_input else (limit, specified)
+        if amount_in == CONTRACT_BALANCE:
+            amount_in = value
+
+        if command in (V3_SWAP_EXACT_IN, V3_SWAP_EXACT_OUT):
+            path, fees = _v3_path(_bytes(params, 0, 96), reverse=not exact_input)
+            protocol, method = "uniswap_v3", "V3_SWAP_EXACT_IN" if exact_input else "V3_SWAP_EXACT_OUT"
+        else:
+            path, fees = _address_array(params, 0, 96), ()
+            protocol, method = "uniswap_v2", "V2_SWAP_EXACT_IN" if exact_input else "V2_SWAP_EXACT_OUT"
+
+        swaps.append(_swap(protocol, method, exact_input, path, amount_in, amount_out,
+                           _address(params, 0), fees))
+    return swaps
+
+SWAP_METHODS: Dict[bytes, Tuple[str, Decoder]] = {
+    # Uniswap V2 Router02 / Sushiswap
+    bytes.fromhex("7ff36ab5"): ("swapExactETHForTokens", _v2_decoder("swapExactETHForTokens", True, True)),
+    bytes.fromhex("b6f9de95"): ("swapExactETHForTokensSupportingFeeOnTransferTokens",
+                                _v2_decoder("swapExactETHForTokensSupportingFeeOnTransferTokens", True, True)),
+    bytes.fromhex("fb3bdb41"): ("swapETHForExactTokens", _v2_decoder("swapETHForExactTokens", False, True)),
+    bytes.fromhex("38ed1739"): ("swapExactTokensForTokens", _v2_decoder("swapExactTokensForTokens", True, False)),
+    bytes.fromhex("5c11d795"): ("swapExactTokensForTokensSupportingFeeOnTransferTokens",
+                                _v2_decoder("swapExactTokensForTokensSupportingFeeOnTransferTokens", True, False)),
+    bytes.fromhex("8803dbee"): ("swapTokensForExactTokens", _v2_decoder("swapTokensForExactTokens", False, False)),
+    bytes.fromhex("18cbafe5"): ("swapExactTokensForETH", _v2_decoder("swapExactTokensForETH", True, False)),
+    bytes.fromhex("791ac947"): ("swapExactTokensForETHSupportingFeeOnTransferTokens",
+                                _v2_decoder("swapExactTokensForETHSupportingFeeOnTransferTokens", True, False)),
+    bytes.fromhex("4a25d94a"): ("swapTokensForExactETH", _v2_decoder("swapTokensForExactETH", False, False)),
+    # SwapRouter02 V2 entry points (no deadline)
+    bytes.fromhex("472b43f3"): ("swapExactTokensForTokens", _v2_decoder("swapExactTokensForTokens", True, False)),
+    bytes.fromhex("42712a67"): ("swapTokensForExactTokens", _v2_decoder("swapTokensForExactTokens", False, False)),
+    # Uniswap V3 SwapRouter
+    bytes.fromhex("414bf389"): ("exactInputSingle", _v3_single_decoder("exactInputSingle", True, True)),
+    bytes.fromhex("db3e2198"): ("exactOutputSingle", _v3_single_decoder("exactOutputSingle", False, True)),
+    bytes.fromhex("c04b8d59"): ("exactInput", _v3_path_decoder("exactInput", True, True)),
+    bytes.fromhex("f28c0498"): ("exactOutput", _v3_path_decoder("exactOutput", False, True)),
+    # Uniswap V3 SwapRouter02
+    bytes.fromhex("04e45aaf"): ("exactInputSingle", _v3_single_decoder("exactInputSingle", True, False)),
+    bytes.fromhex("5023b4df"): ("exactOutputSingle", _v3_single_decoder("exactOutputSingle", False, False)),
+    bytes.fromhex("b858183f"): ("exactInput", _v3_path_decoder("exactInput", True, False)),
+    bytes.fromhex("09b81346"): ("exactOutput", _v3_path_decoder("exactOutput", False, False)),
+    # Multicall wrappers
+    bytes.fromhex("ac9650d8"): ("multicall", _multicall_decoder(0)),
+    bytes.fromhex("5ae401dc"): ("multicall", _multicall_decoder(32)),
+    bytes.fromhex("1f0464d1"): ("multicall", _multicall_decoder(32)),
+    # Universal Router
+    bytes.fromhex("3593564c"): ("execute", _universal_router_execute),
+    bytes.fromhex("24856bc3"): ("execute", _universal_router_execute),
+}
+
+SWAP_SELECTORS = frozenset(SWAP_METHODS)
+
+def _dispatch(calldata: memoryview, value: int) -> List[SwapCall]:
+    # A read-only memoryview hashes like bytes, so the selector lookup copies nothing
+    entry = SWAP_METHODS.get(calldata[:4])
+    if entry is None:
+        return []
+    return entry[1](calldata[4:], value)
+
+def decode_swaps(calldata: bytes, value: int = 0) -> List[SwapCall]:
+    """Every swap in router calldata (multicall / Universal Router can hold several); [] if not a swap"""
+    try:
+        return _dispatch(memoryview(calldata), value)
+    except (ValueError, IndexError):
+        return []
+
+def decode_swap(calldata: bytes, value: int = 0) -> Optional[SwapCall]:
+    """First swap in router calldata, or None"""
+    swaps = decode_swaps(calldata, value)
+    return swaps[0] if swaps else None
@@ -0,0 +1,125 @@
+import os
+import time
+import asyncio
+import hashlib
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+VALIDATION_POSITIVE_TTL = float(os.getenv("VALIDATION_POSITIVE_TTL", "120"))
+VALIDATION_NEGATIVE_TTL = float(os.getenv("VALIDATION_NEGATIVE_TTL", "20"))
+VALIDATION_CACHE_SIZE = int(os.getenv("VALIDATION_CACHE_SIZE", "10000"))
+
+_MISSING = object()
+
+class TokenValidationCache:
+    """Per-token verdicts with separate TTLs for passes and rejections; concurrent validations of one token share a task"""
+
+    def __init__(self, is_positive: Callable[[Any], bool] = bool,
+                 positive_ttl: float = VALIDATION_POSITIVE_TTL,
+                 negative_ttl: float = VALIDATION_NEGATIVE_TTL,
+                 max_entries: int = VALIDATION_CACHE_SIZE):
+        self.is_positive = is_positive
+        self.positive_ttl = positive_ttl
+        # Rejections expire sooner: new tokens gain liquidity and get verified within minutes
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+
+        self.entries: OrderedDict = OrderedDict()  # token -> (expires_at, verdict)
+        self.inflight: Dict[str, asyncio.Task] = {}
+        self.stats = {"hits": 0, "misses": 0, "coalesced": 0, "errors": 0}
+
+    def get_cached(self, token_address: str, default: Any = None) -> Any:
+        key = token_address.lower()
+        entry = self.entries.get(key)
+        if entry is None:
+            return default
+        if entry[0] <= time.monotonic():
+            del self.entries[key]
+            return default
+        return entry[1]
+
+    def put(self, token_address: str, verdict: Any):
+        key = token_address.lower()
+        ttl = self.positive_ttl if self.is_positive(verdict) else self.negative_ttl
+        self.entries[key] = (time.monotonic() + ttl, verdict)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def invalidate(self, token_address: str):
+        self.entries.pop(token_address.lower(), None)
+
+    async def validate(self, token_address: str, validator: Callable[[str], Awaitable[Any]]) -> Any:
+        """Cached verdict, or run validator once no matter how many callers ask at the same time"""
+        verdict = self.get_cached(token_address, _MISSING)
+        if verdict is not _MISSING:
+            self.stats["hits"] += 1
+            return verdict
+
+        key = token_address.lower()
+        task = self.inflight.get(key)
+        if task is None:
+            self.stats["misses"] += 1
+            task = asyncio.ensure_future(self._run(key, token_address, validator))
+            self.inflight[key] = task
+        else:
+            self.stats["coalesced"] += 1
+
+        # A cancelled caller must not cancel the validation other callers are waiting on
+        return await asyncio.shield(task)
+
+    async def _run(self, key: str, token_address: str, validator: Callable[[str], Awaitable[Any]]) -> Any:
+        try:
+            verdict = await validator(token_address)
+        except Exception:
+            # Errors are transient: nothing is cached
+            self.stats["errors"] += 1
+            raise
+        else:
+            self.put(key, verdict)
+            return verdict
+        finally:
+            self.inflight.pop(key, None)
+
+class ContractSourceCache:
+    """Source-scan results keyed by runtime bytecode hash; identical bytecode has identical source, so entries never expire"""
+
+    def __init__(self, rpc, fetch_source: Callable[[str], Awaitable[Optional[str]]],
+                 analyze: Callable[[Optional[str]], Any], max_entries: int = VALIDATION_CACHE_SIZE):
+        self.rpc = rpc
+        self.fetch_source = fetch_source
+        self.analyze = analyze
+        self.max_entries = max_entries
+
+        self.code_hashes: Dict[str, str] = {}  # address -> bytecode hash
+        self.verdicts: Dict[str, Any] = {}     # bytecode hash -> analyze(source)
+        self.stats = {"hits": 0, "fetches": 0}
+
+    @staticmethod
+    def _bounded_put(cache: Dict, key: str, value: Any, max_entries: int):
+        if len(cache) >= max_entries:
+            del cache[next(iter(cache))]
+        cache[key] = value
+
+    async def check(self, token_address: str) -> Any:
+        key = token_address.lower()
+        code_hash = self.code_hashes.get(key)
+        if code_hash is None:
+            code = await self.rpc.get_code(token_address)
+            if not code or code == "0x":
+                return self.analyze(None)
+            code_hash = hashlib.sha256(code.lower().encode()).hexdigest()
+            self._bounded_put(self.code_hashes, key, code_hash, self.max_entries)
+
+        verdict = self.verdicts.get(code_hash, _MISSING)
+        if verdict is not _MISSING:
+            self.stats["hits"] += 1
+            return verdict
+
+        self.stats["fetches"] += 1
+        source = await self.fetch_source(token_address)
+        verdict = self.analyze(source)
+        # Only verified source is final; unverified contracts and failed lookups are retried next time
+        if source:
+            self._bounded_put(self.verdicts, code_hash, verdict, self.max_entries)
+        return verdict
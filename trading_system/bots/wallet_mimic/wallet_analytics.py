@@ -0,0 +1,489 @@
+import os
+import json
+import math
+import time
+import asyncio
+import logging
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+import aiohttp
+import numpy as np
+
+ETHERSCAN_API_URL = os.getenv("ETHERSCAN_API_URL", "https://api.etherscan.io/api")
+ETHERSCAN_RPS = float(os.getenv("ETHERSCAN_RPS", "5"))
+ETHERSCAN_PAGE_SIZE = int(os.getenv("ETHERSCAN_PAGE_SIZE", "1000"))
+
+WALLET_TRADES_PATH = os.getenv("WALLET_TRADES_PATH", "data/state/wallet_trades.npz")
+CANDIDATE_WALLETS_PATH = os.getenv("CANDIDATE_WALLETS_PATH", "data/state/candidate_wallets.txt")
+ALPHA_WALLETS_PATH = os.getenv("ALPHA_WALLETS_PATH", "alpha_wallets.json")
+WALLET_RERANK_INTERVAL = float(os.getenv("WALLET_RERANK_INTERVAL", "900"))
+ALPHA_WALLET_COUNT = int(os.getenv("ALPHA_WALLET_COUNT", "200"))
+METRICS_WINDOW_DAYS = float(os.getenv("METRICS_WINDOW_DAYS", "30"))
+
+WETH_ADDRESS = "0xc02aaa39b223fe8d0a0e5c4f27ead9083c756cc2"
+
+@dataclass(frozen=True)
+class WalletTrade:
+    timestamp: int
+    block: int
+    token: str
+    side: int  # +1 buy, -1 sell
+    eth_amount: float
+    token_amount: float
+
+def extract_trades(wallet: str, txs: List[Dict], internal_txs: List[Dict], token_transfers: List[Dict]) -> List[WalletTrade]:
+    """ETH <-> token swaps sent by the wallet, from net per-transaction flows; works for any router or aggregator"""
+    wallet = wallet.lower()
+    sent = {tx["hash"]: tx for tx in txs if tx.get("from", "").lower() == wallet and tx.get("isError") != "1"}
+
+    eth_in = defaultdict(float)
+    for tx in internal_txs:
+        if tx.get("hash") in sent and tx.get("to", "").lower() == wallet and tx.get("isError") != "1":
+            eth_in[tx["hash"]] += int(tx.get("value", 0)) / 1e18
+
+    token_flows: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+    for transfer in token_transfers:
+        tx_hash = transfer.get("hash")
+        if tx_hash not in sent:
+            continue
+        amount = int(transfer.get("value", 0)) / 10 ** int(transfer.get("tokenDecimal") or 18)
+        token = transfer.get("contractAddress", "").lower()
+        if transfer.get("to", "").lower() == wallet:
+            token_flows[tx_hash][token] += amount
+        if transfer.get("from", "").lower() == wallet:
+            token_flows[tx_hash][token] -= amount
+
+    trades = []
+    for tx_hash, tx in sent.items():
+        flows = token_flows.get(tx_hash, {})
+        # Gas is not part of the trade; WETH counts as ETH
+        eth_net = eth_in[tx_hash] - int(tx.get("value", 0)) / 1e18 + flows.get(WETH_ADDRESS, 0.0)
+        tokens = [(token, amount) for token, amount in flows.items() if token != WETH_ADDRESS and amount]
+        if len(tokens) != 1 or not eth_net:
+            continue
+
+        token, amount = tokens[0]
+        if amount > 0 > eth_net:
+            side = 1
+        elif amount < 0 < eth_net:
+            side = -1
+        else:
+            continue
+        trades.append(WalletTrade(int(tx["timeStamp"]), int(tx["blockNumber"]), token, side, abs(eth_net), abs(amount)))
+
+    trades.sort(key=lambda t: (t.block, t.timestamp))
+    return trades
+
+class WalletStats:
+    """Rolling round-trip performance for one wallet, updated one trade at a time"""
+
+    def __init__(self, address: str, window: float = METRICS_WINDOW_DAYS * 86400):
+        self.address = address
+        self.window = window
+        # token -> [tokens held, ETH cost basis, first buy time]
+        self.positions: Dict[str, List[float]] = {}
+        # Closed round trips: (closed at, multiplier, hold time)
+        self.round_trips: Deque[Tuple[float, float, float]] = deque()
+        self.trade_times: Deque[float] = deque()
+        self.first_touch_timestamp = 0
+        self.last_trade_timestamp = 0
+
+        self.wins = 0
+        self.sum_multiplier = 0.0
+        self.sum_log_multiplier = 0.0
+        self.sum_hold_time = 0.0
+
+    def apply(self, timestamp: int, token: str, side: int, eth_amount: float, token_amount: float):
+        if not self.first_touch_timestamp:
+            self.first_touch_timestamp = timestamp
+        self.last_trade_timestamp = max(self.last_trade_timestamp, timestamp)
+        self.trade_times.append(timestamp)
+
+        position = self.positions.get(token)
+        if side > 0:
+            if position is None:
+                self.positions[token] = [token_amount, eth_amount, timestamp]
+            else:
+                position[0] += token_amount
+                position[1] += eth_amount
+            return
+
+        if position is None or position[0] <= 0:
+            return  # bought before the ingested history: no cost basis
+
+        fraction = min(1.0, token_amount / position[0])
+        cost = position[1] * fraction
+        if cost > 0:
+            self._close(timestamp, eth_amount / cost, timestamp - position[2])
+        position[0] -= position[0] * fraction
+        position[1] -= cost
+        if fraction >= 1.0 or position[0] <= 0:
+            del self.positions[token]
+
+    def _close(self, timestamp: float, multiplier: float, hold_time: float):
+        self.round_trips.append((timestamp, multiplier, hold_time))
+        self.wins += multiplier > 1.0
+        self.sum_multiplier += multiplier
+        self.sum_log_multiplier += math.log(max(multiplier, 1e-9))
+        self.sum_hold_time += hold_time
+
+    def expire(self, now: float):
+        """Drop round trips and trades that left the rolling window"""
+        cutoff = now - self.window
+        while self.round_trips and self.round_trips[0][0] < cutoff:
+            _, multiplier, hold_time = self.round_trips.popleft()
+            self.wins -= multiplier > 1.0
+            self.sum_multiplier -= multiplier
+            self.sum_log_multiplier -= math.log(max(multiplier, 1e-9))
+            self.sum_hold_time -= hold_time
+        while self.trade_times and self.trade_times[0] < cutoff:
+            self.trade_times.popleft()
+
+    @property
+    def round_trip_count(self) -> int:
+        return len(self.round_trips)
+
+    @property
+    def success_rate(self) -> float:
+        return self.wins / len(self.round_trips) if self.round_trips else 0.0
+
+    @property
+    def avg_multiplier(self) -> float:
+        return self.sum_multiplier / len(self.round_trips) if self.round_trips else 0.0
+
+    @property
+    def avg_hold_time(self) -> int:
+        return int(self.sum_hold_time / len(self.round_trips)) if self.round_trips else 0
+
+    def trades_per_day(self, now: float) -> float:
+        span = min(self.window, max(now - self.first_touch_timestamp, 86400))
+        return len(self.trade_times) / (span / 86400)
+
+    def score(self, min_round_trips: int = 5) -> float:
+        """Mean log return per round trip, shrunk towards zero for short track records"""
+        return self.sum_log_multiplier / (len(self.round_trips) + min_round_trips)
+
+    def to_dict(self, now: float, min_round_trips: int = 5) -> Dict:
+        """alpha_wallets.json record"""
+        return {
+            "address": self.address,
+            "avg_multiplier": round(self.avg_multiplier, 4),
+            "avg_hold_time": self.avg_hold_time,
+            "first_touch_timestamp": self.first_touch_timestamp,
+            "trades_per_day": round(self.trades_per_day(now), 4),
+            "success_rate": round(self.success_rate, 4),
+            "round_trips": self.round_trip_count,
+            "score": round(self.score(min_round_trips), 6)
+        }
+
+class WalletTradeStore:
+    """Append-only columnar trade history for every ingested wallet, persisted as one .npz file"""
+
+    COLUMNS = {
+        "wallet": np.int32,
+        "token": np.int32,
+        "timestamp": np.int64,
+        "block": np.int64,
+        "side": np.int8,
+        "eth_amount": np.float64,
+        "token_amount": np.float64
+    }
+
+    def __init__(self, capacity: int = 1 << 16):
+        self.size = 0
+        self.data = {name: np.zeros(capacity, dtype=dtype) for name, dtype in self.COLUMNS.items()}
+        self.wallets: List[str] = []
+        self.tokens: List[str] = []
+        self.wallet_ids: Dict[str, int] = {}
+        self.token_ids: Dict[str, int] = {}
+        # Last block fully ingested per wallet id
+        self.cursors: List[int] = []
+
+    def __len__(self) -> int:
+        return self.size
+
+    def wallet_id(self, wallet: str) -> int:
+        wallet = wallet.lower()
+        wallet_id = self.wallet_ids.get(wallet)
+        if wallet_id is None:
+            wallet_id = self.wallet_ids[wallet] = len(self.wallets)
+            self.wallets.append(wallet)
+            self.cursors.append(0)
+        return wallet_id
+
+    def token_id(self, token: str) -> int:
+        token_id = self.token_ids.get(token)
+        if token_id is None:
+            token_id = self.token_ids[token] = len(self.tokens)
+            self.tokens.append(token)
+        return token_id
+
+    def append(self, wallet: str, trades: List[WalletTrade]):
+        if not trades:
+            return
+        end = self.size + len(trades)
+        capacity = len(self.data["timestamp"])
+        if end > capacity:
+            # Amortised growth: double until the batch fits
+            while capacity < end:
+                capacity *= 2
+            for name, column in self.data.items():
+                grown = np.zeros(capacity, dtype=column.dtype)
+                grown[:self.size] = column[:self.size]
+                self.data[name] = grown
+
+        rows = slice(self.size, end)
+        self.data["wallet"][rows] = self.wallet_id(wallet)
+        self.data["token"][rows] = [self.token_id(t.token) for t in trades]
+        self.data["timestamp"][rows] = [t.timestamp for t in trades]
+        self.data["block"][rows] = [t.block for t in trades]
+        self.data["side"][rows] = [t.side for t in trades]
+        self.data["eth_amount"][rows] = [t.eth_amount for t in trades]
+        self.data["token_amount"][rows] = [t.token_amount for t in trades]
+        self.size = end
+
+    def column(self, name: str) -> np.ndarray:
+        return self.data[name][:self.size]
+
+    def iter_trades(self) -> Iterable[Tuple[str, int, str, int, float, float]]:
+        """(wallet, timestamp, token, side, eth, tokens) ordered by wallet, then block"""
+        order = np.lexsort((self.column("block"), self.column("wallet")))
+        columns = [self.column(name)[order].tolist() for name in
+                   ("wallet", "timestamp", "token", "side", "eth_amount", "token_amount")]
+        for wallet, timestamp, token, side, eth_amount, token_amount in zip(*columns):
+            yield self.wallets[wallet], timestamp, self.tokens[token], side, eth_amount, token_amount
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp.npz"
+        np.savez(tmp_path, wallets=np.array(self.wallets, dtype="U42"), tokens=np.array(self.tokens, dtype="U42"),
+                 cursors=np.array(self.cursors, dtype=np.int64),
+                 **{name: self.column(name) for name in self.COLUMNS})
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "WalletTradeStore":
+        with np.load(path) as data:
+            size = len(data["timestamp"])
+            store = cls(capacity=max(size, 1 << 16))
+            for name in cls.COLUMNS:
+                store.data[name][:size] = data[name]
+            store.size = size
+            store.wallets = data["wallets"].tolist()
+            store.tokens = data["tokens"].tolist()
+            store.cursors = data["cursors"].tolist()
+        store.wallet_ids = {wallet: i for i, wallet in enumerate(store.wallets)}
+        store.token_ids = {token: i for i, token in enumerate(store.tokens)}
+        return store
+
+class RequestPacer:
+    """Spaces requests to at most `rate` per second across all workers"""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.next_slot = 0.0
+
+    async def wait(self):
+        now = asyncio.get_running_loop().time()
+        slot = max(now, self.next_slot)
+        self.next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+class WalletAnalytics:
+    """Concurrent history ingestion, incremental per-wallet metrics and periodic re-ranking of the followed set"""
+
+    def __init__(self, api_key: Optional[str] = None, store_path: str = WALLET_TRADES_PATH,
+                 alpha_wallets_path: Optional[str] = ALPHA_WALLETS_PATH, workers: int = 16,
+                 rate: float = ETHERSCAN_RPS, window_days: float = METRICS_WINDOW_DAYS,
+                 top_n: int = ALPHA_WALLET_COUNT, min_round_trips: int = 5, min_success_rate: float = 0.60):
+        self.api_key = api_key if api_key is not None else os.getenv("ETHERSCAN_API_KEY")
+        self.store_path = store_path
+        self.alpha_wallets_path = alpha_wallets_path
+        self.workers = workers
+        self.pacer = RequestPacer(rate)
+        self.window = window_days * 86400
+        self.top_n = top_n
+        self.min_round_trips = min_round_trips
+        self.min_success_rate = min_success_rate
+
+        self.store = self._load_store()
+        self.stats: Dict[str, WalletStats] = {}
+        for wallet, timestamp, token, side, eth_amount, token_amount in self.store.iter_trades():
+            self._wallet_stats(wallet).apply(timestamp, token, side, eth_amount, token_amount)
+
+        self.candidates: Set[str] = set(self.store.wallets)
+        self.followed: Dict[str, Dict] = {}
+        self.listeners: List[Callable[[List[Dict]], None]] = []
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.running = False
+        self.counters = {"wallets_refreshed": 0, "requests": 0, "errors": 0, "reranks": 0}
+
+    def _load_store(self) -> WalletTradeStore:
+        if self.store_path and os.path.exists(self.store_path):
+            try:
+                store = WalletTradeStore.load(self.store_path)
+                logging.info(f"📚 Loaded {len(store):,} trades for {len(store.wallets):,} wallets")
+                return store
+            except Exception as e:
+                logging.error(f"Wallet trade store unreadable, starting empty: {e}")
+        return WalletTradeStore()
+
+    def _wallet_stats(self, wallet: str) -> WalletStats:
+        stats = self.stats.get(wallet)
+        if stats is None:
+            stats = self.stats[wallet] = WalletStats(wallet, self.window)
+        return stats
+
+    def add_candidates(self, addresses: Iterable[str]):
+        self.candidates.update(a.lower() for a in addresses)
+
+    def load_candidates(self, path: str = CANDIDATE_WALLETS_PATH) -> int:
+        """One address per line"""
+        try:
+            with open(path, "r") as f:
+                addresses = [line.strip() for line in f if line.strip().startswith("0x")]
+        except FileNotFoundError:
+            return 0
+        self.add_candidates(addresses)
+        return len(addresses)
+
+    def on_rerank(self, listener: Callable[[List[Dict]], None]):
+        self.listeners.append(listener)
+
+    def ingest(self, wallet: str, trades: List[WalletTrade], cursor: Optional[int] = None):
+        """Append a wallet's new trades (in block order) and fold them into its metrics"""
+        wallet = wallet.lower()
+        self.store.append(wallet, trades)
+        stats = self._wallet_stats(wallet)
+        for trade in trades:
+            stats.apply(trade.timestamp, trade.token, trade.side, trade.eth_amount, trade.token_amount)
+        if cursor is not None:
+            self.store.cursors[self.store.wallet_id(wallet)] = cursor
+
+    async def refresh(self, wallets: Optional[Iterable[str]] = None):
+        """Fetch new history for every candidate with a bounded worker pool"""
+        queue: asyncio.Queue = asyncio.Queue()
+        for wallet in (wallets if wallets is not None else self.candidates):
+            queue.put_nowait(wallet.lower())
+
+        own_session = self.session is None
+        if own_session:
+            self.session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=30))
+        try:
+            workers = [asyncio.create_task(self._refresh_worker(queue)) for _ in range(min(self.workers, queue.qsize()))]
+            await asyncio.gather(*workers)
+        finally:
+            if own_session:
+                await self.session.close()
+                self.session = None
+
+    async def _refresh_worker(self, queue: asyncio.Queue):
+        while not queue.empty():
+            wallet = queue.get_nowait()
+            try:
+                await self.refresh_wallet(wallet)
+            except Exception as e:
+                self.counters["errors"] += 1
+                logging.warning(f"Wallet history fetch failed for {wallet[:10]}...: {e}")
+
+    async def refresh_wallet(self, wallet: str):
+        start_block = self.store.cursors[self.store.wallet_id(wallet)] + 1
+        txs, internal_txs, token_transfers = await asyncio.gather(
+            self._etherscan("txlist", wallet, start_block),
+            self._etherscan("txlistinternal", wallet, start_block),
+            self._etherscan("tokentx", wallet, start_block)
+        )
+
+        # A full page may stop mid-block: only keep blocks every endpoint returned completely
+        pages = [txs, internal_txs, token_transfers]
+        blocks = [int(row["blockNumber"]) for page in pages for row in page]
+        truncated = [int(page[-1]["blockNumber"]) - 1 for page in pages if len(page) >= ETHERSCAN_PAGE_SIZE]
+        cursor = min(truncated) if truncated else max(blocks, default=start_block - 1)
+
+        trades = [t for t in extract_trades(wallet, txs, internal_txs, token_transfers) if t.block <= cursor]
+        self.ingest(wallet, trades, cursor)
+        self.counters["wallets_refreshed"] += 1
+
+    async def _etherscan(self, action: str, address: str, start_block: int) -> List[Dict]:
+        await self.pacer.wait()
+        self.counters["requests"] += 1
+        params = {
+            "module": "account",
+            "action": action,
+            "address": address,
+            "startblock": start_block,
+            "endblock": 99999999,
+            "page": 1,
+            "offset": ETHERSCAN_PAGE_SIZE,
+            "sort": "asc",
+            "apikey": self.api_key
+        }
+        async with self.session.get(ETHERSCAN_API_URL, params=params) as response:
+            data = await response.json(content_type=None)
+        if data.get("status") == "1":
+            return data.get("result", [])
+        if "No transactions found" in str(data.get("message")):
+            return []
+        raise RuntimeError(f"Etherscan {action} error: {data.get('result') or data.get('message')}")
+
+    def rank(self, now: Optional[float] = None) -> List[Dict]:
+        """Best wallets by score among those with enough recent round trips and a winning record"""
+        now = now if now is not None else time.time()
+        eligible = []
+        for stats in self.stats.values():
+            stats.expire(now)
+            if stats.round_trip_count >= self.min_round_trips and stats.success_rate > self.min_success_rate:
+                eligible.append(stats)
+        eligible.sort(key=lambda s: s.score(self.min_round_trips), reverse=True)
+        return [s.to_dict(now, self.min_round_trips) for s in eligible[:self.top_n]]
+
+    def publish(self, ranked: List[Dict]):
+        """Swap in the new followed set, write it for other processes and notify listeners"""
+        self.followed = {w["address"]: w for w in ranked}
+        self.counters["reranks"] += 1
+
+        if self.alpha_wallets_path:
+            tmp_path = self.alpha_wallets_path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"wallets": ranked, "updated_at": time.time()}, f, indent=2)
+            os.replace(tmp_path, self.alpha_wallets_path)
+
+        for listener in self.listeners:
+            try:
+                listener(ranked)
+            except Exception as e:
+                logging.error(f"Alpha wallet listener error: {e}")
+        logging.info(f"🏆 Re-ranked {len(self.stats):,} wallets, following {len(ranked)}")
+
+    async def run(self, interval: float = WALLET_RERANK_INTERVAL):
+        """Refresh, re-rank and persist on a schedule until stopped"""
+        self.running = True
+        self.load_candidates()
+        while self.running:
+            start_time = time.time()
+            try:
+                await self.refresh()
+                ranked = self.rank()
+                if ranked:
+                    self.publish(ranked)
+                if self.store_path:
+                    self.store.save(self.store_path)
+            except Exception as e:
+                self.counters["errors"] += 1
+                logging.error(f"Wallet analytics cycle error: {e}")
+            await asyncio.sleep(max(0.0, interval - (time.time() - start_time)))
+
+    def stop(self):
+        self.running = False
+
+    def get_stats(self) -> Dict:
+        return {
+            "candidates": len(self.candidates),
+            "wallets": len(self.stats),
+            "trades": len(self.store),
+            "followed": len(self.followed),
+            **self.counters
+        }
@@ -21,6 +21,41 @@ import aiohttp
 import discord
 from discord import Webhook, RequestsWebhookAdapter
 
+from mempool_ingest import MempoolIngestor, PendingTx
+from async_rpc import AsyncRPCClient
+from swap_decoder import SWAP_METHODS, decode_swap
+from token_validation import ContractSourceCache, TokenValidationCache
+from contract_scanner import ContractScanner
+from blacklist_manager import get_blacklist_manager
+import config
+from risk_gate import PreTradeRiskGate, RiskLimits, RiskRejection
+from trade_store import get_trade_store
+from pool_state import WETH_ADDRESS, get_pool_state
+from wallet_analytics import WalletAnalytics
+from notification_service import get_notification_service
+
+DANGEROUS_CONTRACT_PATTERNS = [
+    "cooldown", "blacklist", "rebase", "antiSell", "setFees",
+    "onlyOwner", "_transfer", "addLiquidity", "removeLiquidity",
+    "mint(", "burn(", "pause", "blacklistAddress", "setTaxes"
+]
+
+SUSPICIOUS_CONTRACT_PATTERNS = [
+    "onlyOwner", "blacklist", "pause", "mint", "rebase",
+    "setTaxFee", "setLiquidityFee", "antiBot", "cooldown"
+]
+
+# One pass over the source serves both the monitor and the risk manager checks
+CONTRACT_SCANNER = ContractScanner(DANGEROUS_CONTRACT_PATTERNS, case_sensitive=SUSPICIOUS_CONTRACT_PATTERNS)
+
+NON_SWAP_METHODS = {
+    bytes.fromhex("a9059cbb"): "transfer",
+    bytes.fromhex("23b872dd"): "transferFrom",
+    bytes.fromhex("095ea7b3"): "approve",
+    bytes.fromhex("02751cec"): "removeLiquidity",
+    bytes.fromhex("e8e33700"): "addLiquidity"
+}
+
 @dataclass
 class AlphaWallet:
     address: str
@@ -145,6 +180,7 @@ class EthereumMonitor:
         if not self.is_connected:
             raise RuntimeError("Failed to connect to Ethereum network")
         
+        self.rpc = AsyncRPCClient(provider_url)
         self.contract_cache = {}
         self.deploy_fingerprints = self._load_deploy_fingerprints()
         
@@ -183,59 +219,43 @@ class EthereumMonitor:
         if not source_code:
             return False
             
-        dangerous_patterns = [
-            "cooldown", "blacklist", "rebase", "antiSell", "setFees",
-            "onlyOwner", "_transfer", "addLiquidity", "removeLiquidity",
-            "mint(", "burn(", "pause", "blacklistAddress", "setTaxes"
-        ]
-        
-        source_lower = source_code.lower()
-        for pattern in dangerous_patterns:
-            if pattern.lower() in source_lower:
-                return False
-        return True
+        return CONTRACT_SCANNER.scan(source_code).is_clean(DANGEROUS_CONTRACT_PATTERNS)
     
-    def get_transaction_details(self, tx_hash: str) -> Optional[Dict]:
+    async def get_transaction_details(self, tx_hash: str) -> Optional[Dict]:
         try:
-            tx = self.w3.eth.get_transaction(tx_hash)
-            receipt = self.w3.eth.get_transaction_receipt(tx_hash)
+            # Both lookups go out in one JSON-RPC batch
+            tx, receipt = await asyncio.gather(
+                self.rpc.get_transaction(tx_hash),
+                self.rpc.get_transaction_receipt(tx_hash)
+            )
+            if not tx or not receipt:
+                return None
             
             return {
                 "from": tx["from"],
                 "to": tx["to"],
-                "value": tx["value"],
-                "gas": tx["gas"],
-                "gasPrice": tx["gasPrice"],
-                "input": tx["input"].hex(),
-                "status": receipt["status"],
-                "gasUsed": receipt["gasUsed"],
-                "logs": [log for log in receipt["logs"]]
+                "value": int(tx["value"], 16),
+                "gas": int(tx["gas"], 16),
+                "gasPrice": int(tx.get("gasPrice") or "0x0", 16),
+                "input": tx["input"],
+                "status": int(receipt["status"], 16),
+                "gasUsed": int(receipt["gasUsed"], 16),
+                "logs": receipt["logs"]
             }
         except Exception:
             return None
     
-    def decode_transaction_calldata(self, calldata: str) -> Dict[str, any]:
-        if len(calldata) < 10:
+    def decode_transaction_calldata(self, calldata: bytes, value: int = 0) -> Dict[str, any]:
+        if len(calldata) < 4:
             return {"type": "unknown", "data": {}}
         
-        method_id = calldata[:10]
-        
-        known_methods = {
-            "0xa9059cbb": "transfer",
-            "0x23b872dd": "transferFrom",
-            "0x095ea7b3": "approve",
-            "0x7ff36ab5": "swapExactETHForTokens",
-            "0x38ed1739": "swapExactTokensForTokens",
-            "0x02751cec": "removeLiquidity",
-            "0xe8e33700": "addLiquidity"
-        }
-        
-        method_name = known_methods.get(method_id, "unknown")
+        selector = calldata[:4]
+        swap_method = SWAP_METHODS.get(selector)
         
         return {
-            "type": method_name,
-            "method_id": method_id,
-            "raw_data": calldata[10:] if len(calldata) > 10 else ""
+            "type": swap_method[0] if swap_method else NON_SWAP_METHODS.get(selector, "unknown"),
+            "method_id": "0x" + selector.hex(),
+            "swap": decode_swap(calldata, value) if swap_method else None
         }
     
     def create_contract_fingerprint(self, bytecode: str) -> str:
@@ -251,63 +271,49 @@ class CapitalManager:
         self.max_daily_trades = 50
         self.max_position_size_pct = 0.33
         self.gas_reserve = 0.1
-        
-    def can_execute_trade(self, required_capital: float, gas_estimate: float) -> bool:
-        total_required = required_capital + gas_estimate
-        if total_required > self.available_capital:
-            return False
-        if required_capital > (self.total_capital * self.max_position_size_pct):
-            return False
-        if self.trades_today >= self.max_daily_trades:
-            return False
-        return True
+        self.risk_gate = PreTradeRiskGate(initial_capital, RiskLimits(
+            max_order_pct=self.max_position_size_pct,
+            max_exposure_pct=1.0,
+            max_daily_trades=self.max_daily_trades,
+            cooldown_seconds=config.COOLDOWN_MINUTES * 60
+        ))
+        
+    def check_trade(self, token_address: str, required_capital: float, gas_estimate: float) -> Optional[RiskRejection]:
+        return self.risk_gate.check(token_address, required_capital, fee=gas_estimate)
     
-    def allocate_capital(self, amount: float) -> bool:
+    def allocate_capital(self, amount: float, token_address: str) -> bool:
         if amount <= self.available_capital:
             self.available_capital -= amount
             self.deployed_capital += amount
             self.trades_today += 1
+            self.risk_gate.on_open(token_address, amount)
             return True
         return False
     
-    def release_capital(self, amount: float, pnl: float):
+    def release_capital(self, amount: float, pnl: float, token_address: str):
         self.available_capital += (amount + pnl)
         self.deployed_capital -= amount
         self.daily_pnl += pnl
         self.total_capital += pnl
+        self.risk_gate.on_close(token_address, amount, pnl)
 
 class RiskManager:
     def __init__(self):
-        self.blacklisted_tokens = self._load_blacklist()
-        self.rugdex_blacklist = self._load_rugdex_blacklist()
+        # Compact wallet / token indexes, hot-reloaded when the blacklist files change
+        self.blacklists = get_blacklist_manager()
+        self.pool_state = get_pool_state()
         self.max_slippage = 0.10
         self.min_liquidity = 50000.0
-        
-    def _load_blacklist(self) -> Set[str]:
-        try:
-            with open("wallet_blacklist.json", "r") as f:
-                data = json.load(f)
-                return set(data.get("blacklisted_addresses", []))
-        except FileNotFoundError:
-            return set()
-    
-    def _load_rugdex_blacklist(self) -> Set[str]:
-        try:
-            with open("rugdex_blacklist.csv", "r") as f:
-                reader = csv.reader(f)
-                return set(row[0] for row in reader if row)
-        except FileNotFoundError:
-            return set()
     
     def validate_wallet(self, wallet_address: str) -> bool:
-        return wallet_address.lower() not in self.blacklisted_tokens
+        return not self.blacklists.is_wallet_blacklisted(wallet_address)
     
-    def validate_token(self, token_address: str, liquidity: float, source_code: str) -> bool:
-        if token_address.lower() in self.rugdex_blacklist:
+    def validate_token(self, token_address: str, liquidity: float, contract_safe: bool) -> bool:
+        if self.blacklists.is_token_blacklisted(token_address):
             return False
         if liquidity < self.min_liquidity:
             return False
-        if not self._analyze_token_contract(source_code):
+        if not contract_safe:
             return False
         return True
     
@@ -315,17 +321,14 @@ class RiskManager:
         if not source_code:
             return False
             
-        suspicious_patterns = [
-            "onlyOwner", "blacklist", "pause", "mint", "rebase",
-            "setTaxFee", "setLiquidityFee", "antiBot", "cooldown"
-        ]
-        
-        for pattern in suspicious_patterns:
-            if pattern in source_code:
-                return False
-        return True
+        return CONTRACT_SCANNER.scan(source_code).is_clean(SUSPICIOUS_CONTRACT_PATTERNS, case_sensitive=True)
     
     def estimate_slippage(self, token_address: str, trade_size_eth: float, liquidity: float) -> float:
+        # Exact quote against the mirrored pool state when the token's pools are tracked
+        quote = self.pool_state.quote_swap(WETH_ADDRESS, token_address, trade_size_eth)
+        if quote is not None:
+            return quote.slippage
+        
         if liquidity == 0:
             return 1.0
         
@@ -336,7 +339,7 @@ class RiskManager:
 class AlertSystem:
     def __init__(self):
         self.discord_webhook_url = os.getenv("DISCORD_WEBHOOK_URL")
-        self.discord_user_id = os.getenv("DISCORD_USER_ID")
+        self.notifications = get_notification_service()
         
     async def send_trade_alert(self, trade_data: TradeExecution, wallet_followed: str):
         if not self.discord_webhook_url:
@@ -357,28 +360,18 @@ class AlertSystem:
             "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime(trade_data.timestamp))
         }
         
-        payload = {
-            "embeds": [embed],
-            "username": "Wallet Mimic Bot"
-        }
-        
-        if self.discord_user_id:
-            payload["content"] = f"<@{self.discord_user_id}> New mimic trade executed!"
-        
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(self.discord_webhook_url, json=payload) as response:
-                    if response.status != 204:
-                        logging.error(f"Discord webhook failed: {response.status}")
-        except Exception as e:
-            logging.error(f"Alert system error: {e}")
+        # Enqueue only: delivery happens on the notification worker, off the trade path
+        self.notifications.notify("discord", "New mimic trade executed!", embed=embed, mention=True)
     
     def send_error_alert(self, error_message: str):
         logging.error(f"SYSTEM ERROR: {error_message}")
+        self.notifications.notify("discord", f"⚠️ SYSTEM ERROR: {error_message}", key=f"error:{error_message[:100]}")
 
 class WalletMimicSystem:
     def __init__(self):
         self.alpha_wallets = self._load_alpha_wallets()
+        # Shared by reference with the mempool ingestor; re-ranking updates both in place
+        self.watched_wallets = set(self.alpha_wallets.keys())
         self.okx_connector = OKXDEXConnector(
             os.getenv("OKX_API_KEY"),
             os.getenv("OKX_SECRET_KEY"),
@@ -393,36 +386,86 @@ class WalletMimicSystem:
         self.trade_log = []
         self.running = False
         self.executor = ThreadPoolExecutor(max_workers=4)
+        self.mempool_ingestor = None
+        
+        self.pool_state = get_pool_state()
+        self.pool_task = None
+        self.wallet_analytics = WalletAnalytics()
+        self.wallet_analytics.add_candidates(self.alpha_wallets.keys())
+        self.wallet_analytics.on_rerank(self._update_alpha_wallets)
+        self.analytics_task = None
+        self.source_cache = ContractSourceCache(self.eth_monitor.rpc, self._fetch_contract_source, self._analyze_contract_source)
+        self.validation_cache = TokenValidationCache(
+            is_positive=lambda v: v.is_verified and not v.has_malicious_functions and not v.is_blacklisted
+        )
         
     def _load_alpha_wallets(self) -> Dict[str, AlphaWallet]:
         try:
             with open("alpha_wallets.json", "r") as f:
                 data = json.load(f)
-                wallets = {}
-                for wallet_data in data.get("wallets", []):
-                    if wallet_data.get("success_rate", 0) > 0.60:
-                        wallet = AlphaWallet(
-                            address=wallet_data["address"],
-                            avg_multiplier=wallet_data.get("avg_multiplier", 1.0),
-                            avg_hold_time=wallet_data.get("avg_hold_time", 3600),
-                            first_touch_timestamp=wallet_data.get("first_touch_timestamp", 0),
-                            trades_per_day=wallet_data.get("trades_per_day", 0),
-                            success_rate=wallet_data.get("success_rate", 0)
-                        )
-                        wallets[wallet_data["address"].lower()] = wallet
-                return wallets
+                return self._parse_alpha_wallets(data.get("wallets", []))
         except FileNotFoundError:
             logging.error("alpha_wallets.json not found")
             return {}
     
-    def _validate_token_comprehensive(self, token_address: str) -> TokenValidation:
+    def _parse_alpha_wallets(self, records: List[Dict]) -> Dict[str, AlphaWallet]:
+        wallets = {}
+        for wallet_data in records:
+            if wallet_data.get("success_rate", 0) > 0.60:
+                wallet = AlphaWallet(
+                    address=wallet_data["address"],
+                    avg_multiplier=wallet_data.get("avg_multiplier", 1.0),
+                    avg_hold_time=wallet_data.get("avg_hold_time", 3600),
+                    first_touch_timestamp=wallet_data.get("first_touch_timestamp", 0),
+                    trades_per_day=wallet_data.get("trades_per_day", 0),
+                    success_rate=wallet_data.get("success_rate", 0)
+                )
+                wallets[wallet_data["address"].lower()] = wallet
+        return wallets
+    
+    def _update_alpha_wallets(self, ranked: List[Dict]):
+        # Mutate in place so the running mempool filter sees the new set without a restart
+        wallets = self._parse_alpha_wallets(ranked)
+        self.alpha_wallets.clear()
+        self.alpha_wallets.update(wallets)
+        self.watched_wallets.intersection_update(wallets)
+        self.watched_wallets.update(wallets)
+        if self.mempool_ingestor:
+            self.mempool_ingestor.refresh_subscription()
+        logging.info(f"Following {len(wallets)} alpha wallets after re-rank")
+    
+    async def _fetch_contract_source(self, token_address: str) -> Optional[str]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.eth_monitor.get_contract_source, token_address)
+    
+    def _analyze_contract_source(self, source_code: Optional[str]) -> Tuple[bool, bool, bool]:
+        is_verified = source_code is not None and len(source_code) > 0
+        has_malicious = not self.eth_monitor.analyze_contract_safety(source_code)
+        contract_safe = self.risk_manager._analyze_token_contract(source_code)
+        return is_verified, has_malicious, contract_safe
+    
+    async def _get_liquidity(self, token_address: str) -> float:
+        # Local pool mirror first; OKX only for tokens without a Uniswap WETH pool
+        await self.pool_state.track_token(token_address)
+        liquidity = self.pool_state.liquidity_usd(token_address)
+        if liquidity is not None:
+            return liquidity
+        
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.okx_connector.get_liquidity_depth, token_address)
+    
+    async def _validate_token(self, token_address: str) -> TokenValidation:
+        # Several alpha wallets buying the same token share one validation
+        return await self.validation_cache.validate(token_address, self._validate_token_comprehensive)
+    
+    async def _validate_token_comprehensive(self, token_address: str) -> TokenValidation:
         try:
-            source_code = self.eth_monitor.get_contract_source(token_address)
-            is_verified = source_code is not None and len(source_code) > 0
-            has_malicious = not self.eth_monitor.analyze_contract_safety(source_code)
-            
-            liquidity = self.okx_connector.get_liquidity_depth(token_address)
-            is_blacklisted = not self.risk_manager.validate_token(token_address, liquidity, source_code)
+            # Source scan (cached per bytecode) and liquidity are independent
+            (is_verified, has_malicious, contract_safe), liquidity = await asyncio.gather(
+                self.source_cache.check(token_address),
+                self._get_liquidity(token_address)
+            )
+            is_blacklisted = not self.risk_manager.validate_token(token_address, liquidity, contract_safe)
             
             slippage = self.risk_manager.estimate_slippage(token_address, 1.0, liquidity)
             
@@ -453,7 +496,7 @@ class WalletMimicSystem:
     
     async def _execute_mimic_trade(self, wallet_address: str, token_address: str, detected_tx: Dict) -> Optional[TradeExecution]:
         try:
-            token_validation = self._validate_token_comprehensive(token_address)
+            token_validation = await self._validate_token(token_address)
             
             if not token_validation.is_verified:
                 logging.warning(f"Token {token_address} not verified on Etherscan")
@@ -484,8 +527,9 @@ class WalletMimicSystem:
                 gas_estimate
             )
             
-            if not self.capital_manager.can_execute_trade(position_size_eth, gas_estimate):
-                logging.warning("Insufficient capital or trade limits reached")
+            rejection = self.capital_manager.check_trade(token_address, position_size_eth, gas_estimate)
+            if rejection is not None:
+                logging.warning(f"Trade blocked by risk gate: {rejection}")
                 return None
             
             trade_result = self.okx_connector.execute_dex_trade(
@@ -498,7 +542,7 @@ class WalletMimicSystem:
                 logging.error("OKX DEX trade execution failed")
                 return None
             
-            self.capital_manager.allocate_capital(position_size_eth)
+            self.capital_manager.allocate_capital(position_size_eth, token_address)
             
             execution = TradeExecution(
                 token_address=token_address,
@@ -542,6 +586,10 @@ class WalletMimicSystem:
             logging.error(f"Failed to log trade: {e}")
         
         self.trade_log.append(log_entry)
+        get_trade_store().record("entry", execution.token_address, execution.entry_price,
+                                 execution.amount_out_tokens, source="wallet_mimic", strategy="wallet_mimic",
+                                 side="buy", reason="mimic", signal=wallet_followed, position_id=execution.tx_hash,
+                                 quote_ccy="ETH", timestamp=execution.timestamp)
         
         try:
             import capital_manager
@@ -552,53 +600,39 @@ class WalletMimicSystem:
             pass
     
     async def _monitor_pending_transactions(self):
-        try:
-            uri = self.ws_url
-            async with websockets.connect(uri) as websocket:
-                subscribe_msg = {
-                    "id": 1,
-                    "method": "eth_subscribe",
-                    "params": ["pendingTransactions"]
-                }
-                await websocket.send(json.dumps(subscribe_msg))
-                
-                async for message in websocket:
-                    try:
-                        data = json.loads(message)
-                        if "params" in data and "result" in data["params"]:
-                            tx_hash = data["params"]["result"]
-                            await self._process_pending_transaction(tx_hash)
-                    except Exception as e:
-                        logging.error(f"WebSocket message processing error: {e}")
-                        
-        except Exception as e:
-            logging.error(f"WebSocket connection error: {e}")
-            await asyncio.sleep(5)
-            if self.running:
-                await self._monitor_pending_transactions()
+        self.mempool_ingestor = MempoolIngestor(
+            self.ws_url,
+            os.getenv("ETHEREUM_RPC_URL"),
+            self.watched_wallets,
+            self._process_pending_transaction
+        )
+        await self.mempool_ingestor.run()
     
-    async def _process_pending_transaction(self, tx_hash: str):
+    async def _process_pending_transaction(self, tx: PendingTx):
         try:
-            tx_details = self.eth_monitor.get_transaction_details(tx_hash)
-            if not tx_details:
-                return
-            
-            from_address = tx_details["from"].lower()
-            if from_address not in self.alpha_wallets:
-                return
+            # Sender already matched an alpha wallet in the ingest pipeline; a
+            # pending tx has no receipt, so everything comes from the tx body
+            from_address = tx.from_address
             
             if not self.risk_manager.validate_wallet(from_address):
                 return
             
-            calldata_info = self.eth_monitor.decode_transaction_calldata(tx_details["input"])
+            tx_details = {
+                "from": tx.from_address,
+                "to": tx.to_address,
+                "value": tx.value,
+                "gas": tx.gas,
+                "gasPrice": tx.gas_price,
+                "input": tx.input
+            }
             
-            if calldata_info["type"] in ["swapExactETHForTokens", "swapExactTokensForTokens"]:
-                to_address = tx_details.get("to", "").lower()
-                
-                if "0x" in to_address and len(to_address) == 42:
-                    execution = await self._execute_mimic_trade(from_address, to_address, tx_details)
-                    if execution:
-                        logging.info(f"Successfully mimicked trade from {from_address[:10]}...")
+            calldata_info = self.eth_monitor.decode_transaction_calldata(bytes.fromhex(tx.input[2:]), tx.value)
+            swap = calldata_info.get("swap")
+            
+            if swap is not None and swap.is_buy:
+                execution = await self._execute_mimic_trade(from_address, swap.token_out, tx_details)
+                if execution:
+                    logging.info(f"Successfully mimicked trade from {from_address[:10]}...")
             
             elif calldata_info["type"] == "unknown" and tx_details["to"] is None:
                 bytecode = tx_details["input"]
@@ -616,6 +650,14 @@ class WalletMimicSystem:
         logging.info(f"Monitoring {len(self.alpha_wallets)} alpha wallets")
         logging.info(f"Initial capital: ${self.capital_manager.total_capital}")
         
+        # The runtime reruns this after a failure: background tasks from the last run are still going
+        if self.ws_url and (self.pool_task is None or self.pool_task.done()):
+            # Keeps tracked pools current from Sync / Swap logs
+            self.pool_task = asyncio.create_task(self.pool_state.run(self.ws_url))
+        
+        if self.wallet_analytics.api_key and (self.analytics_task is None or self.analytics_task.done()):
+            self.analytics_task = asyncio.create_task(self.wallet_analytics.run())
+        
         try:
             while self.running:
                 await self._monitor_pending_transactions()
@@ -628,7 +670,12 @@ class WalletMimicSystem:
     
     def stop_monitoring(self):
         self.running = False
-        self.executor.shutdown(wait=True)
+        if self.mempool_ingestor:
+            self.mempool_ingestor.stop()
+        self.pool_state.stop()
+        self.wallet_analytics.stop()
+        # Called on the event loop: never block it waiting for in-flight lookups
+        self.executor.shutdown(wait=False)
         
         final_capital = self.capital_manager.total_capital
         total_return = ((final_capital - 1000.0) / 1000.0) * 100
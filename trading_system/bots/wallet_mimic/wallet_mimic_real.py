@@ -17,9 +17,26 @@ import csv
 import os
 from decimal import Decimal
 import aiohttp
-from eth_abi import decode_abi
 import re
 
+from mempool_ingest import MempoolIngestor, PendingTx
+from async_rpc import AsyncRPCClient
+from swap_decoder import SWAP_SELECTORS, decode_swap
+from token_validation import ContractSourceCache, TokenValidationCache
+from contract_scanner import ContractScanner
+from blacklist_manager import get_blacklist_manager
+import config
+from risk_gate import PreTradeRiskGate, RiskLimits, RiskRejection
+from trade_store import get_trade_store
+
+DANGEROUS_CONTRACT_PATTERNS = [
+    "blacklist", "pause", "setFees", "cooldown", 
+    "antiSell", "rebase", "mint(", "burn(",
+    "onlyOwner", "_transfer"
+]
+
+CONTRACT_SCANNER = ContractScanner(DANGEROUS_CONTRACT_PATTERNS)
+
 @dataclass
 class AlphaWallet:
     address: str
@@ -39,6 +56,13 @@ class TokenTrade:
     timestamp: float
     confidence_score: float
 
+@dataclass
+class TokenCheck:
+    token_address: str
+    tradeable: bool
+    liquidity: float
+    is_valid: bool
+
 class EthereumMonitor:
     def __init__(self):
         self.rpc_url = os.getenv("ETHEREUM_RPC_URL", "https://eth-mainnet.alchemyapi.io/v2/YOUR_KEY")
@@ -53,137 +77,79 @@ class EthereumMonitor:
         if not self.w3.is_connected():
             raise RuntimeError("Failed to connect to Ethereum network")
         
+        # Async keep-alive client with JSON-RPC batching for every read after startup
+        self.rpc = AsyncRPCClient(self.rpc_url)
+        
         self.uniswap_v2_router = "0x7a250d5630B4cF539739dF2C5dAcb4c659F2488D"
         self.uniswap_v3_router = "0xE592427A0AEce92De3Edee1F18E0157C05861564"
         self.sushiswap_router = "0xd9e1cE17f2641f24aE83637ab66a2cca9C378B9F"
+        self.uniswap_swap_router02 = "0x68b3465833fb72A70ecDF485E0e4C7bD8665Fc45"
+        self.universal_router = "0x3fC91A3afd70395Cd496C647d5a6CC9D4B2b7FAD"
         
         self.dex_routers = {
             self.uniswap_v2_router.lower(),
             self.uniswap_v3_router.lower(),
-            self.sushiswap_router.lower()
+            self.sushiswap_router.lower(),
+            self.uniswap_swap_router02.lower(),
+            self.universal_router.lower()
         }
         
-        self.swap_method_ids = {
-            "0x7ff36ab5",  # swapExactETHForTokens
-            "0x18cbafe5",  # swapExactETHForTokensSupportingFeeOnTransferTokens
-            "0x38ed1739",  # swapExactTokensForTokens
-            "0xb6f9de95",  # swapExactETHForTokensOut
-            "0x414bf389",  # exactInputSingle (Uniswap V3)
-        }
+        # 4-byte selectors with a precompiled decoder (V2, V3, multicall, Universal Router)
+        self.swap_method_ids = SWAP_SELECTORS
         
         logging.info("Ethereum monitor initialized")
     
     async def monitor_pending_transactions(self, alpha_wallets: Set[str], callback):
-        while True:
-            try:
-                async with websockets.connect(self.ws_url) as websocket:
-                    subscribe_msg = {
-                        "id": 1,
-                        "method": "eth_subscribe",
-                        "params": ["pendingTransactions"]
-                    }
-                    await websocket.send(json.dumps(subscribe_msg))
-                    logging.info("WebSocket connected - monitoring pending transactions")
-                    
-                    async for message in websocket:
-                        try:
-                            data = json.loads(message)
-                            if "params" in data and "result" in data["params"]:
-                                tx_hash = data["params"]["result"]
-                                await self._process_pending_tx(tx_hash, alpha_wallets, callback)
-                        except Exception as e:
-                            logging.error(f"Transaction processing error: {e}")
-                            
-            except Exception as e:
-                logging.error(f"WebSocket error: {e}")
-                await asyncio.sleep(5)
+        async def on_pending_tx(tx: PendingTx):
+            await self._process_pending_tx(tx, callback)
+        
+        ingestor = MempoolIngestor(self.ws_url, self.rpc_url, alpha_wallets, on_pending_tx)
+        logging.info("Monitoring pending transactions")
+        await ingestor.run()
     
-    async def _process_pending_tx(self, tx_hash: str, alpha_wallets: Set[str], callback):
+    async def _process_pending_tx(self, tx: PendingTx, callback):
         try:
-            tx = self.w3.eth.get_transaction(tx_hash)
-            from_address = tx["from"].lower()
-            
-            if from_address not in alpha_wallets:
+            # Sender already matched an alpha wallet in the ingest pipeline
+            if not tx.to_address or tx.to_address not in self.dex_routers:
                 return
             
-            to_address = tx.get("to")
-            if not to_address:
-                return
-            
-            to_address = to_address.lower()
-            
-            if to_address not in self.dex_routers:
-                return
-            
-            input_data = tx["input"].hex()
-            method_id = input_data[:10]
+            # Hex-decoded once; everything below works on the raw bytes
+            calldata = bytes.fromhex(tx.input[2:])
             
-            if method_id not in self.swap_method_ids:
+            if calldata[:4] not in self.swap_method_ids:
                 return
             
-            token_info = self._decode_swap_transaction(input_data, method_id)
+            token_info = self._decode_swap_transaction(calldata, tx.value)
             if token_info:
-                token_info["wallet_address"] = from_address
-                token_info["tx_hash"] = tx_hash
+                token_info["wallet_address"] = tx.from_address
+                token_info["tx_hash"] = tx.tx_hash
                 token_info["timestamp"] = time.time()
                 await callback(token_info)
                 
         except Exception as e:
-            logging.debug(f"TX processing error {tx_hash}: {e}")
+            logging.debug(f"TX processing error {tx.tx_hash}: {e}")
     
-    def _decode_swap_transaction(self, input_data: str, method_id: str) -> Optional[Dict]:
-        try:
-            if method_id == "0x7ff36ab5":  # swapExactETHForTokens
-                decoded = decode_abi(
-                    ['uint256', 'address[]', 'address', 'uint256'],
-                    bytes.fromhex(input_data[10:])
-                )
-                amount_out_min, path, to, deadline = decoded
-                if len(path) >= 2:
-                    return {
-                        "token_address": path[-1],
-                        "eth_amount": 0.0,  # Will get from tx value
-                        "method": "swapExactETHForTokens"
-                    }
-            
-            elif method_id == "0x38ed1739":  # swapExactTokensForTokens
-                decoded = decode_abi(
-                    ['uint256', 'uint256', 'address[]', 'address', 'uint256'],
-                    bytes.fromhex(input_data[10:])
-                )
-                amount_in, amount_out_min, path, to, deadline = decoded
-                if len(path) >= 2 and path[0].lower() == "0xc02aaa39b223fe8d0a0e5c4f27ead9083c756cc2":  # WETH
-                    return {
-                        "token_address": path[-1],
-                        "eth_amount": amount_in / 10**18,
-                        "method": "swapExactTokensForTokens"
-                    }
-        except Exception:
-            pass
+    def _decode_swap_transaction(self, calldata: bytes, value: int) -> Optional[Dict]:
+        swap = decode_swap(calldata, value)
+        if swap is None or not swap.is_buy:
+            return None
         
-        return None
+        return {
+            "token_address": swap.token_out,
+            "eth_amount": swap.amount_in / 10**18,
+            "method": swap.method
+        }
     
-    def get_token_info(self, token_address: str) -> Dict:
+    async def get_token_info(self, token_address: str) -> Dict:
         try:
             token_address = Web3.to_checksum_address(token_address)
             
-            # Basic ERC20 ABI
-            erc20_abi = [
-                {"constant": True, "inputs": [], "name": "name", "outputs": [{"name": "", "type": "string"}], "type": "function"},
-                {"constant": True, "inputs": [], "name": "symbol", "outputs": [{"name": "", "type": "string"}], "type": "function"},
-                {"constant": True, "inputs": [], "name": "decimals", "outputs": [{"name": "", "type": "uint8"}], "type": "function"},
-                {"constant": True, "inputs": [], "name": "totalSupply", "outputs": [{"name": "", "type": "uint256"}], "type": "function"}
-            ]
-            
-            contract = self.w3.eth.contract(address=token_address, abi=erc20_abi)
+            # name, symbol, decimals and totalSupply in one Multicall3 round trip
+            info = await self.rpc.get_token_info(token_address)
+            if info["decimals"] is None:
+                raise RuntimeError("not an ERC20 token")
             
-            return {
-                "address": token_address,
-                "name": contract.functions.name().call(),
-                "symbol": contract.functions.symbol().call(),
-                "decimals": contract.functions.decimals().call(),
-                "total_supply": contract.functions.totalSupply().call()
-            }
+            return info
         except Exception as e:
             logging.error(f"Token info error for {token_address}: {e}")
             return {}
@@ -229,7 +195,9 @@ class OKXDEXConnector:
         headers = self._get_headers("GET", request_path)
         
         try:
-            response = self.session.get(f"{self.base_url}{request_path}", headers=headers, timeout=5)
+            response = await asyncio.to_thread(
+                self.session.get, f"{self.base_url}{request_path}", headers=headers, timeout=5
+            )
             if response.status_code == 200:
                 data = response.json()
                 if data.get("code") == "0":
@@ -248,7 +216,8 @@ class OKXDEXConnector:
         headers = self._get_headers("GET", request_path)
         
         try:
-            response = self.session.get(
+            response = await asyncio.to_thread(
+                self.session.get,
                 f"{self.base_url}{request_path}", 
                 headers=headers, 
                 params=params, 
@@ -299,22 +268,15 @@ class OKXDEXConnector:
         return None
 
 class TokenValidator:
-    def __init__(self):
+    def __init__(self, rpc: AsyncRPCClient):
         self.etherscan_api_key = os.getenv("ETHERSCAN_API_KEY")
         self.min_liquidity = 50000.0
         self.max_slippage = 0.10
-        self.blacklisted_tokens = self._load_blacklist()
+        self.blacklists = get_blacklist_manager()
+        self.source_cache = ContractSourceCache(rpc, self._fetch_contract_source, self._scan_contract_source)
         
-    def _load_blacklist(self) -> Set[str]:
-        try:
-            with open("rugdex_blacklist.csv", "r") as f:
-                reader = csv.reader(f)
-                return set(row[0].lower() for row in reader if row)
-        except FileNotFoundError:
-            return set()
-    
-    async def validate_token(self, token_address: str, liquidity: float) -> bool:
-        if token_address.lower() in self.blacklisted_tokens:
+    async def validate_token(self, token_address: str, liquidity: float, source_verified: Optional[bool] = None) -> bool:
+        if self.blacklists.is_token_blacklisted(token_address):
             logging.warning(f"Token {token_address} is blacklisted")
             return False
         
@@ -322,16 +284,22 @@ class TokenValidator:
             logging.warning(f"Token {token_address} liquidity too low: ${liquidity}")
             return False
         
-        if not await self._verify_contract_source(token_address):
+        if source_verified is None:
+            source_verified = await self.verify_contract_source(token_address)
+        if not source_verified:
             logging.warning(f"Token {token_address} failed source verification")
             return False
         
         return True
     
-    async def _verify_contract_source(self, token_address: str) -> bool:
+    async def verify_contract_source(self, token_address: str) -> bool:
         if not self.etherscan_api_key:
             return True  # Skip if no API key
         
+        # Clones share bytecode, so a verified source is scanned once per bytecode hash
+        return await self.source_cache.check(token_address)
+    
+    async def _fetch_contract_source(self, token_address: str) -> Optional[str]:
         url = "https://api.etherscan.io/api"
         params = {
             "module": "contract",
@@ -341,34 +309,28 @@ class TokenValidator:
         }
         
         try:
-            response = requests.get(url, params=params, timeout=10)
+            response = await asyncio.to_thread(requests.get, url, params=params, timeout=10)
             if response.status_code == 200:
                 data = response.json()
                 if data.get("status") == "1":
                     result = data.get("result", [{}])[0]
-                    source_code = result.get("SourceCode", "")
-                    
-                    if not source_code:
-                        return False
-                    
-                    # Check for dangerous patterns
-                    dangerous_patterns = [
-                        "blacklist", "pause", "setFees", "cooldown", 
-                        "antiSell", "rebase", "mint(", "burn(",
-                        "onlyOwner", "_transfer"
-                    ]
-                    
-                    source_lower = source_code.lower()
-                    for pattern in dangerous_patterns:
-                        if pattern.lower() in source_lower:
-                            logging.warning(f"Token {token_address} contains dangerous pattern: {pattern}")
-                            return False
-                    
-                    return True
+                    return result.get("SourceCode", "")
         except Exception as e:
             logging.error(f"Source verification error: {e}")
         
-        return False
+        return None
+    
+    def _scan_contract_source(self, source_code: Optional[str]) -> bool:
+        if not source_code:
+            return False
+        
+        # Single pass over the source with comments and string literals stripped
+        hit = CONTRACT_SCANNER.scan(source_code).first_hit(DANGEROUS_CONTRACT_PATTERNS)
+        if hit:
+            logging.warning(f"Contract source contains dangerous pattern: {hit.pattern} (line {hit.line})")
+            return False
+        
+        return True
 
 class CapitalManager:
     def __init__(self, initial_capital: float = 1000.0):
@@ -377,6 +339,12 @@ class CapitalManager:
         self.deployed_capital = 0.0
         self.max_position_pct = 0.33
         self.positions = {}
+        self.risk_gate = PreTradeRiskGate(initial_capital, RiskLimits(
+            max_order_pct=self.max_position_pct,
+            max_exposure_pct=1.0,
+            max_daily_trades=50,
+            cooldown_seconds=config.COOLDOWN_MINUTES * 60
+        ))
         
     def calculate_position_size(self, wallet_alpha_score: float, confidence: float) -> float:
         base_size = self.available_capital * 0.1  # 10% base
@@ -388,28 +356,42 @@ class CapitalManager:
         
         return min(position_size, max_position, self.available_capital * 0.9)
     
-    def allocate_capital(self, amount: float, trade_id: str) -> bool:
+    def check_trade(self, token_address: str, amount: float) -> Optional[RiskRejection]:
+        return self.risk_gate.check(token_address, amount)
+    
+    def allocate_capital(self, amount: float, trade_id: str, token_address: str) -> bool:
         if amount > self.available_capital:
             return False
         
         self.available_capital -= amount
         self.deployed_capital += amount
-        self.positions[trade_id] = amount
+        self.positions[trade_id] = (amount, token_address)
+        self.risk_gate.on_open(token_address, amount)
         return True
     
     def release_capital(self, trade_id: str, pnl: float):
         if trade_id in self.positions:
-            original_amount = self.positions.pop(trade_id)
+            original_amount, token_address = self.positions.pop(trade_id)
             self.deployed_capital -= original_amount
             self.available_capital += (original_amount + pnl)
             self.total_capital += pnl
+            self.risk_gate.on_close(token_address, original_amount, pnl)
+
+    def cancel_allocation(self, trade_id: str):
+        """Undo an allocation whose buy never executed: no pnl, no cooldown, no daily trade"""
+        if trade_id in self.positions:
+            amount, token_address = self.positions.pop(trade_id)
+            self.deployed_capital -= amount
+            self.available_capital += amount
+            self.risk_gate.on_cancel(token_address, amount)
 
 class WalletMimicSystem:
     def __init__(self):
         self.alpha_wallets = self._load_alpha_wallets()
         self.eth_monitor = EthereumMonitor()
         self.okx_connector = OKXDEXConnector()
-        self.token_validator = TokenValidator()
+        self.token_validator = TokenValidator(self.eth_monitor.rpc)
+        self.validation_cache = TokenValidationCache(is_positive=lambda check: check.tradeable and check.is_valid)
         self.capital_manager = CapitalManager()
         
         self.trade_log = []
@@ -453,20 +435,17 @@ class WalletMimicSystem:
             # Update wallet activity
             wallet.last_activity = time.time()
             
-            # Check if token is tradeable on OKX
-            is_tradeable = await self.okx_connector.check_token_tradeable(token_address)
-            if not is_tradeable:
+            # Tradeability, liquidity and source checks; cached and shared across wallets
+            check = await self.validation_cache.validate(token_address, self._check_token)
+            if not check.tradeable:
                 logging.info(f"Token {token_address} not tradeable on OKX")
                 return
             
-            # Get liquidity depth
-            liquidity = await self.okx_connector.get_liquidity_depth(token_address)
-            
-            # Validate token
-            is_valid = await self.token_validator.validate_token(token_address, liquidity)
-            if not is_valid:
+            if not check.is_valid:
                 return
             
+            liquidity = check.liquidity
+            
             # Calculate confidence score
             confidence = self._calculate_confidence(wallet, liquidity)
             if confidence < 0.75:
@@ -489,6 +468,17 @@ class WalletMimicSystem:
         except Exception as e:
             logging.error(f"Transaction processing error: {e}")
     
+    async def _check_token(self, token_address: str) -> TokenCheck:
+        # Independent network checks run concurrently
+        is_tradeable, liquidity, source_verified = await asyncio.gather(
+            self.okx_connector.check_token_tradeable(token_address),
+            self.okx_connector.get_liquidity_depth(token_address),
+            self.token_validator.verify_contract_source(token_address)
+        )
+        
+        is_valid = is_tradeable and await self.token_validator.validate_token(token_address, liquidity, source_verified)
+        return TokenCheck(token_address, is_tradeable, liquidity, is_valid)
+    
     def _calculate_confidence(self, wallet: AlphaWallet, liquidity: float) -> float:
         base_confidence = wallet.success_rate
         multiplier_bonus = min(wallet.avg_multiplier / 20.0, 0.2)
@@ -501,8 +491,13 @@ class WalletMimicSystem:
         try:
             trade_id = f"{token_address}_{int(time.time())}"
             
+            rejection = self.capital_manager.check_trade(token_address, eth_amount)
+            if rejection is not None:
+                logging.warning(f"Trade blocked by risk gate: {rejection}")
+                return
+            
             # Allocate capital
-            if not self.capital_manager.allocate_capital(eth_amount, trade_id):
+            if not self.capital_manager.allocate_capital(eth_amount, trade_id, token_address):
                 logging.warning("Insufficient capital for trade")
                 return
             
@@ -511,7 +506,7 @@ class WalletMimicSystem:
             
             if not result:
                 # Rollback capital allocation
-                self.capital_manager.release_capital(trade_id, 0)
+                self.capital_manager.cancel_allocation(trade_id)
                 logging.error("Trade execution failed")
                 return
             
@@ -568,6 +563,11 @@ class WalletMimicSystem:
             logging.error(f"Failed to log trade: {e}")
         
         self.trade_log.append(log_entry)
+        entry_price = trade.amount_eth / trade.token_amount if trade.token_amount > 0 else 0.0
+        get_trade_store().record("entry", trade.token_address, entry_price, trade.token_amount,
+                                 source="wallet_mimic_real", strategy="wallet_mimic", side="buy", reason="mimic",
+                                 signal=trade.wallet_address, position_id=trade.tx_hash, quote_ccy="ETH",
+                                 timestamp=trade.timestamp)
     
     async def start_monitoring(self):
         self.running = True
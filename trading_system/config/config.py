@@ -13,13 +13,24 @@ ASSETS = ["BTC", "ETH", "SOL"]
 # Paper Trading Configuration
 PAPER_INITIAL_BALANCE = float(os.getenv("PAPER_INITIAL_BALANCE", "10000.0"))
 PAPER_COMMISSION_RATE = float(os.getenv("PAPER_COMMISSION_RATE", "0.001"))
+PAPER_FILL_MODEL = os.getenv("PAPER_FILL_MODEL", "book")  # "book" walks the order book, "instant" fills at the signal price
+PAPER_FEE_TIER = os.getenv("PAPER_FEE_TIER", "regular")
+PAPER_ORDER_LATENCY_MS = float(os.getenv("PAPER_ORDER_LATENCY_MS", "25"))
+PAPER_SPREAD_BPS = float(os.getenv("PAPER_SPREAD_BPS", "2.0"))  # synthetic spread when only tickers are available
 
 # Signal and Risk Configuration
 SIGNAL_CONFIDENCE_THRESHOLD = float(os.getenv("SIGNAL_CONFIDENCE_THRESHOLD", "0.75"))
 POSITION_SIZE_PERCENT = float(os.getenv("POSITION_SIZE_PERCENT", "0.02"))
 MAX_OPEN_POSITIONS = int(os.getenv("MAX_OPEN_POSITIONS", "3"))
 MAX_DRAWDOWN_PERCENT = float(os.getenv("MAX_DRAWDOWN_PERCENT", "5.0"))
+KILL_DRAWDOWN_PERCENT = float(os.getenv("KILL_DRAWDOWN_PERCENT", "8.0"))  # marked drawdown that flattens every position
 COOLDOWN_MINUTES = int(os.getenv("COOLDOWN_MINUTES", "5"))
+MAX_DAILY_TRADES = int(os.getenv("MAX_DAILY_TRADES", "10"))
+MAX_POSITIONS_PER_ASSET = int(os.getenv("MAX_POSITIONS_PER_ASSET", "1"))  # the live executor holds one per asset
+
+# Exit Management: (fraction of position, distance from entry) per take-profit leg
+TAKE_PROFIT_LADDER = [(0.5, 0.015), (0.3, 0.025), (0.2, 0.04)]
+TRAILING_STOP_PERCENT = float(os.getenv("TRAILING_STOP_PERCENT", "0.01"))
 
 # API Configuration
 OKX_API_KEY = os.getenv("OKX_API_KEY", "")
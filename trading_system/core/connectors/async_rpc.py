@@ -0,0 +1,235 @@
+import os
+import time
+import asyncio
+import logging
+from collections import defaultdict, deque
+from typing import Any, Dict, List, Optional, Tuple
+
+import aiohttp
+import numpy as np
+
+try:
+    from eth_abi import encode, decode
+except ImportError:
+    # eth_abi < 4
+    from eth_abi import encode_abi as encode, decode_abi as decode
+from eth_abi.exceptions import DecodingError
+
+MULTICALL3_ADDRESS = os.getenv("MULTICALL3_ADDRESS", "0xcA11bde05977b3631167028862bE2a173976CA11")
+MULTICALL_RETRY_SECONDS = float(os.getenv("MULTICALL_RETRY_SECONDS", "60"))
+
+AGGREGATE3_SELECTOR = bytes.fromhex("82ad56cb")
+ERC20_METADATA_CALLS = [
+    ("name", bytes.fromhex("06fdde03")),
+    ("symbol", bytes.fromhex("95d89b41")),
+    ("decimals", bytes.fromhex("313ce567")),
+    ("total_supply", bytes.fromhex("18160ddd"))
+]
+
+class RPCError(RuntimeError):
+    def __init__(self, method: str, error: Dict):
+        self.method = method
+        self.code = error.get("code")
+        super().__init__(f"{method} failed: {error.get('message', error)}")
+
+def _multicall_missing(error: RPCError) -> bool:
+    """No contract at the Multicall3 address, or the call reverted: retrying will not help"""
+    return error.method == "aggregate3" or error.code == 3 or "revert" in str(error).lower()
+
+def _decode_erc20_field(field: str, data: bytes):
+    if field in ("decimals", "total_supply"):
+        return int.from_bytes(data[:32], "big")
+    try:
+        return decode(["string"], data)[0]
+    except Exception:
+        # Older tokens (MKR, SAI) return bytes32 instead of string
+        return data[:32].rstrip(b"\x00").decode("utf-8", errors="ignore")
+
+class AsyncRPCClient:
+    """Keep-alive JSON-RPC client that coalesces concurrent calls into batched HTTP requests"""
+
+    def __init__(self, rpc_url: str, batch_window: float = 0.002, max_batch_size: int = 100,
+                 max_connections: int = 8, timeout: float = 10.0):
+        self.rpc_url = rpc_url
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        self.max_connections = max_connections
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.pending: List[Tuple[Dict, asyncio.Future, float]] = []
+        self.flush_handle: Optional[asyncio.TimerHandle] = None
+        self.inflight: set = set()
+        self.request_id = 0
+        self.multicall_available = True
+        self.multicall_retry_at = 0.0  # after a transient aggregate3 failure
+
+        self.latencies = defaultdict(lambda: deque(maxlen=1000))
+        self.call_counts = defaultdict(int)
+        self.errors = defaultdict(int)
+        self.http_requests = 0
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def start(self):
+        if self.session is None:
+            connector = aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=60)
+            self.session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+
+    async def close(self):
+        self._flush()
+        if self.inflight:
+            await asyncio.gather(*self.inflight, return_exceptions=True)
+        if self.session:
+            await self.session.close()
+            self.session = None
+
+    async def call(self, method: str, params: List = None) -> Any:
+        """Queue one call; it is sent with whatever else arrives inside the batch window"""
+        if self.session is None:
+            await self.start()
+
+        loop = asyncio.get_running_loop()
+        self.request_id += 1
+        future = loop.create_future()
+        payload = {"jsonrpc": "2.0", "id": self.request_id, "method": method, "params": params or []}
+        self.pending.append((payload, future, time.perf_counter()))
+
+        if len(self.pending) >= self.max_batch_size:
+            self._flush()
+        elif self.flush_handle is None:
+            self.flush_handle = loop.call_later(self.batch_window, self._flush)
+
+        return await future
+
+    async def batch(self, calls: List[Tuple[str, List]]) -> List[Any]:
+        """Issue several calls together; results in call order, exceptions returned in place"""
+        return await asyncio.gather(*(self.call(method, params) for method, params in calls), return_exceptions=True)
+
+    def _flush(self):
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+        if not self.pending:
+            return
+
+        batch, self.pending = self.pending, []
+        task = asyncio.get_running_loop().create_task(self._send(batch))
+        self.inflight.add(task)
+        task.add_done_callback(self.inflight.discard)
+
+    async def _send(self, batch: List[Tuple[Dict, asyncio.Future, float]]):
+        by_id = {payload["id"]: (payload["method"], future, started) for payload, future, started in batch}
+        body = [payload for payload, _, _ in batch] if len(batch) > 1 else batch[0][0]
+
+        try:
+            async with self.session.post(self.rpc_url, json=body) as response:
+                replies = await response.json(content_type=None)
+            self.http_requests += 1
+        except Exception as e:
+            for method, future, _ in by_id.values():
+                self.errors[method] += 1
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        if isinstance(replies, dict):
+            replies = [replies]
+
+        now = time.perf_counter()
+        for reply in replies:
+            entry = by_id.pop(reply.get("id"), None)
+            if entry is None:
+                continue
+            method, future, started = entry
+            self.call_counts[method] += 1
+            self.latencies[method].append((now - started) * 1000)
+            if future.done():
+                continue
+            if "error" in reply:
+                self.errors[method] += 1
+                future.set_exception(RPCError(method, reply["error"]))
+            else:
+                future.set_result(reply.get("result"))
+
+        for method, future, _ in by_id.values():
+            self.errors[method] += 1
+            if not future.done():
+                future.set_exception(RPCError(method, {"message": "missing response in batch"}))
+
+    async def get_transaction(self, tx_hash: str) -> Optional[Dict]:
+        return await self.call("eth_getTransactionByHash", [tx_hash])
+
+    async def get_transaction_receipt(self, tx_hash: str) -> Optional[Dict]:
+        return await self.call("eth_getTransactionReceipt", [tx_hash])
+
+    async def get_code(self, address: str, block: str = "latest") -> str:
+        return await self.call("eth_getCode", [address, block])
+
+    async def eth_call(self, to: str, data: bytes, block: str = "latest") -> bytes:
+        result = await self.call("eth_call", [{"to": to, "data": "0x" + data.hex()}, block])
+        return bytes.fromhex(result[2:]) if result else b""
+
+    async def aggregate3(self, calls: List[Tuple[str, bytes]], allow_failure: bool = True) -> List[Tuple[bool, bytes]]:
+        """Run many eth_calls as one Multicall3 aggregate3 call"""
+        encoded = encode(["(address,bool,bytes)[]"], [[(target, allow_failure, data) for target, data in calls]])
+        result = await self.eth_call(MULTICALL3_ADDRESS, AGGREGATE3_SELECTOR + encoded)
+        if not result:
+            raise RPCError("aggregate3", {"message": f"no Multicall3 contract at {MULTICALL3_ADDRESS}"})
+        return [(bool(success), bytes(data)) for success, data in decode(["(bool,bytes)[]"], result)[0]]
+
+    async def get_token_infos(self, token_addresses: List[str]) -> Dict[str, Dict]:
+        """ERC-20 name / symbol / decimals / totalSupply for many tokens in one round trip"""
+        calls = [(token, selector) for token in token_addresses for _, selector in ERC20_METADATA_CALLS]
+
+        results = None
+        if self.multicall_available and time.monotonic() >= self.multicall_retry_at:
+            try:
+                results = await self.aggregate3(calls)
+            except RPCError as e:
+                if _multicall_missing(e):
+                    logging.warning(f"Multicall3 unavailable, falling back to batched eth_call: {e}")
+                    self.multicall_available = False
+                else:
+                    logging.warning(f"Multicall3 failed, batched eth_call for {MULTICALL_RETRY_SECONDS:.0f}s: {e}")
+                    self.multicall_retry_at = time.monotonic() + MULTICALL_RETRY_SECONDS
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError, DecodingError) as e:
+                # Transport failure or a malformed reply: nothing says Multicall3 is missing
+                logging.warning(f"Multicall3 failed, batched eth_call for {MULTICALL_RETRY_SECONDS:.0f}s: {e!r}")
+                self.multicall_retry_at = time.monotonic() + MULTICALL_RETRY_SECONDS
+
+        if results is None:
+            # Still a single HTTP request thanks to JSON-RPC batching
+            raw = await asyncio.gather(*(self.eth_call(token, data) for token, data in calls), return_exceptions=True)
+            results = [(not isinstance(r, Exception) and len(r) > 0, r if isinstance(r, bytes) else b"") for r in raw]
+
+        token_infos = {}
+        fields_per_token = len(ERC20_METADATA_CALLS)
+        for i, token in enumerate(token_addresses):
+            info = {"address": token}
+            for (field, _), (success, data) in zip(ERC20_METADATA_CALLS, results[i * fields_per_token:(i + 1) * fields_per_token]):
+                info[field] = _decode_erc20_field(field, data) if success and data else None
+            token_infos[token] = info
+
+        return token_infos
+
+    async def get_token_info(self, token_address: str) -> Dict:
+        return (await self.get_token_infos([token_address]))[token_address]
+
+    def get_latency_stats(self) -> Dict[str, Dict]:
+        """Per-method call count, error count and latency percentiles in milliseconds"""
+        stats = {}
+        for method in set(self.call_counts) | set(self.errors):
+            samples = np.array(self.latencies[method]) if self.latencies[method] else None
+            stats[method] = {
+                "calls": self.call_counts[method],
+                "errors": self.errors[method],
+                "p50_ms": float(np.percentile(samples, 50)) if samples is not None else None,
+                "p99_ms": float(np.percentile(samples, 99)) if samples is not None else None
+            }
+        return stats
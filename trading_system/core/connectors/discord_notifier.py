@@ -1,10 +1,11 @@
 import logging
 import os
-import requests
 import json
 from typing import Dict
 import time
 
+from notification_service import get_notification_service
+
 class ProductionNotifier:
     def __init__(self):
         self.webhook_url = os.getenv("DISCORD_WEBHOOK_URL")
@@ -12,6 +13,8 @@ class ProductionNotifier:
         
         if not self.webhook_url:
             raise RuntimeError("DISCORD_WEBHOOK_URL required for production")
+        
+        self.notifications = get_notification_service()
     
     def send_signal_alert(self, signal_data: Dict):
         if not signal_data.get("production_validated"):
@@ -46,17 +49,11 @@ class ProductionNotifier:
             "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime())
         }
         
-        payload = {
-            "content": f"<@{self.user_id}> 🚨 PRODUCTION TRADE SIGNAL" if self.user_id else None,
-            "embeds": [embed],
-            "username": "HFT Production System"
-        }
-        
-        response = requests.post(self.webhook_url, json=payload, timeout=5)
-        if response.status_code != 204:
-            raise RuntimeError(f"Discord notification failed: {response.status_code}")
+        # Queued for the background sender; repeats for one asset within the window are merged
+        self.notifications.notify("discord", "🚨 PRODUCTION TRADE SIGNAL", embed=embed,
+                                  key=f"signal:{asset}", mention=True)
         
-        logging.info(f"🔴 Production alert sent: {asset} @ {confidence:.1%}")
+        logging.info(f"🔴 Production alert queued: {asset} @ {confidence:.1%}")
 
 production_notifier = ProductionNotifier()
 
@@ -0,0 +1,274 @@
+import os
+import time
+import asyncio
+import logging
+import itertools
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import aiohttp
+
+NOTIFY_QUEUE_SIZE = int(os.getenv("NOTIFY_QUEUE_SIZE", "500"))
+NOTIFY_COALESCE_WINDOW = float(os.getenv("NOTIFY_COALESCE_WINDOW", "0.5"))
+
+@dataclass
+class Notification:
+    text: str
+    embed: Optional[Dict] = None
+    mention: bool = False
+    count: int = 1
+
+class DiscordSink:
+    """Webhook sink: up to 10 embeds and 2000 characters of content per message"""
+    name = "discord"
+    min_interval = 0.4  # webhooks allow 5 requests per 2 seconds
+    max_embeds = 10
+    max_chars = 2000
+
+    def __init__(self, webhook_url: str, user_id: Optional[str] = None, username: str = "HFT Production System"):
+        self.webhook_url = webhook_url
+        self.user_id = user_id
+        self.username = username
+
+    def take_batch(self, pending: List[Notification]) -> int:
+        """How many of the oldest pending notifications fit in one message"""
+        embeds, chars = 0, 0
+        for i, notification in enumerate(pending):
+            embeds += notification.embed is not None
+            chars += len(notification.text) + 1
+            if i and (embeds > self.max_embeds or chars > self.max_chars):
+                return i
+        return len(pending)
+
+    def build_payload(self, batch: List[Notification]) -> Dict:
+        lines = [_render(n) for n in batch if n.embed is None or n.text]
+        if self.user_id and any(n.mention for n in batch):
+            lines.insert(0, f"<@{self.user_id}>")
+        payload = {"username": self.username, "embeds": [n.embed for n in batch if n.embed is not None]}
+        if lines:
+            payload["content"] = "\n".join(lines)[:self.max_chars]
+        return payload
+
+    async def send(self, session: aiohttp.ClientSession, payload: Dict) -> Optional[float]:
+        """Returns a retry delay when rate limited"""
+        async with session.post(self.webhook_url, json=payload) as response:
+            if response.status == 429:
+                data = await response.json(content_type=None)
+                return float(data.get("retry_after", 1.0))
+            if response.status not in (200, 204):
+                raise RuntimeError(f"Discord webhook failed: {response.status}")
+        return None
+
+class TelegramSink:
+    """Bot API sink: 4096 characters per message, about one message per second per chat"""
+    name = "telegram"
+    min_interval = 1.0
+    max_chars = 4096
+
+    def __init__(self, bot_token: str, chat_id: str):
+        self.url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
+        self.chat_id = chat_id
+
+    def take_batch(self, pending: List[Notification]) -> int:
+        chars = 0
+        for i, notification in enumerate(pending):
+            chars += len(notification.text) + 2
+            if i and chars > self.max_chars:
+                return i
+        return len(pending)
+
+    def build_payload(self, batch: List[Notification]) -> Dict:
+        return {"chat_id": self.chat_id, "text": "\n\n".join(_render(n) for n in batch)[:self.max_chars],
+                "disable_web_page_preview": True}
+
+    async def send(self, session: aiohttp.ClientSession, payload: Dict) -> Optional[float]:
+        async with session.post(self.url, json=payload) as response:
+            if response.status == 429:
+                data = await response.json(content_type=None)
+                return float(data.get("parameters", {}).get("retry_after", 1.0))
+            if response.status != 200:
+                raise RuntimeError(f"Telegram sendMessage failed: {response.status}")
+        return None
+
+def _render(notification: Notification) -> str:
+    return notification.text if notification.count == 1 else f"{notification.text} (x{notification.count})"
+
+class SinkQueue:
+    """Pending notifications for one sink; same-key notifications merge into one entry"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.pending: "OrderedDict[object, Notification]" = OrderedDict()
+        self.dropped = 0
+
+    def push(self, key: object, notification: Notification) -> str:
+        existing = self.pending.get(key)
+        if existing is not None:
+            notification.count += existing.count
+            notification.mention = notification.mention or existing.mention
+            self.pending[key] = notification
+            return "merged"
+        if len(self.pending) >= self.max_size:
+            # Oldest alert is least useful: drop it and report the gap in the next message
+            self.pending.popitem(last=False)
+            self.dropped += 1
+            result = "dropped"
+        else:
+            result = "queued"
+        self.pending[key] = notification
+        return result
+
+    def pop_batch(self, take_batch) -> Tuple[List[Tuple[object, Notification]], int]:
+        items = list(self.pending.items())
+        n = take_batch([notification for _, notification in items])
+        for key, _ in items[:n]:
+            del self.pending[key]
+        dropped, self.dropped = self.dropped, 0
+        return items[:n], dropped
+
+    def requeue(self, items: List[Tuple[object, Notification]], dropped: int):
+        for key, notification in reversed(items):
+            if key not in self.pending:
+                self.pending[key] = notification
+                self.pending.move_to_end(key, last=False)
+        self.dropped += dropped
+
+class NotificationService:
+    """Alert pipeline: O(1) non-blocking enqueue from any thread, one background worker and pooled session per sink"""
+
+    def __init__(self, sinks: List, max_queue: int = NOTIFY_QUEUE_SIZE, coalesce_window: float = NOTIFY_COALESCE_WINDOW):
+        self.sinks = {sink.name: sink for sink in sinks}
+        self.queues = {name: SinkQueue(max_queue) for name in self.sinks}
+        self.coalesce_window = coalesce_window
+        self.lock = threading.Lock()
+        self.ids = itertools.count()
+
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.thread: Optional[threading.Thread] = None
+        self.wakeups: Dict[str, asyncio.Event] = {}
+        self.running = False
+        self.stats = {"queued": 0, "merged": 0, "dropped": 0, "messages": 0, "notifications_sent": 0,
+                      "rate_limited": 0, "errors": 0}
+
+    def notify(self, sink: str, text: str, embed: Optional[Dict] = None, key: Optional[str] = None,
+               mention: bool = False) -> bool:
+        """Enqueue and return immediately; notifications sharing a key within the window are merged"""
+        queue = self.queues.get(sink)
+        if queue is None:
+            return False
+        if not self.running:
+            self.start()
+
+        with self.lock:
+            was_empty = not queue.pending
+            result = queue.push(key if key is not None else next(self.ids), Notification(text, embed, mention))
+            self.stats[result] += 1
+
+        if was_empty:
+            # Only the first alert of a burst pays for a cross-thread wakeup
+            self.loop.call_soon_threadsafe(self.wakeups[sink].set)
+        return True
+
+    def start(self):
+        with self.lock:
+            if self.running:
+                return
+            self.loop = asyncio.new_event_loop()
+            self.wakeups = {name: asyncio.Event() for name in self.sinks}
+            ready = threading.Event()
+            self.thread = threading.Thread(target=self._run_loop, args=(ready,), name="notification-service", daemon=True)
+            self.thread.start()
+            ready.wait()
+            self.running = True
+
+    def _run_loop(self, ready: threading.Event):
+        asyncio.set_event_loop(self.loop)
+        workers = [self.loop.create_task(self._sink_worker(name)) for name in self.sinks]
+        self.loop.call_soon(ready.set)
+        self.loop.run_until_complete(asyncio.gather(*workers, return_exceptions=True))
+        self.loop.close()
+
+    async def _sink_worker(self, name: str):
+        sink, queue, wakeup = self.sinks[name], self.queues[name], self.wakeups[name]
+        next_send = 0.0
+        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10)) as session:
+            while True:
+                await wakeup.wait()
+                wakeup.clear()
+                stopping = not self.running
+                if not stopping:
+                    # Let the rest of the burst arrive, then respect the sink's rate limit
+                    await asyncio.sleep(max(self.coalesce_window, next_send - time.monotonic()))
+
+                while True:
+                    with self.lock:
+                        items, dropped = queue.pop_batch(sink.take_batch)
+                    if not items:
+                        break
+
+                    batch = [notification for _, notification in items]
+                    if dropped:
+                        batch.append(Notification(f"⚠️ {dropped} alerts dropped (queue full)"))
+                    retry_after = await self._send(sink, session, batch)
+                    next_send = time.monotonic() + max(sink.min_interval, retry_after or 0.0)
+
+                    if retry_after is not None:
+                        with self.lock:
+                            queue.requeue(items, dropped)
+                        if stopping:
+                            break
+                        await asyncio.sleep(retry_after)
+                    elif not stopping:
+                        await asyncio.sleep(sink.min_interval)
+
+                if stopping:
+                    return
+
+    async def _send(self, sink, session: aiohttp.ClientSession, batch: List[Notification]) -> Optional[float]:
+        try:
+            retry_after = await sink.send(session, sink.build_payload(batch))
+        except Exception as e:
+            self.stats["errors"] += 1
+            logging.error(f"{sink.name} notification failed: {e}")
+            return None
+        if retry_after is not None:
+            self.stats["rate_limited"] += 1
+            return retry_after
+        self.stats["messages"] += 1
+        self.stats["notifications_sent"] += sum(n.count for n in batch)
+        return None
+
+    def stop(self, timeout: float = 5.0):
+        """Flush what is pending and stop the worker thread"""
+        with self.lock:
+            if not self.running:
+                return
+            self.running = False
+        for wakeup in self.wakeups.values():
+            self.loop.call_soon_threadsafe(wakeup.set)
+        self.thread.join(timeout=timeout)
+
+    def get_stats(self) -> Dict:
+        with self.lock:
+            pending = {name: len(queue.pending) for name, queue in self.queues.items()}
+        return {"pending": pending, **self.stats}
+
+def sinks_from_env() -> List:
+    sinks = []
+    if os.getenv("DISCORD_WEBHOOK_URL"):
+        sinks.append(DiscordSink(os.getenv("DISCORD_WEBHOOK_URL"), os.getenv("DISCORD_USER_ID")))
+    if os.getenv("TELEGRAM_BOT_TOKEN") and os.getenv("TELEGRAM_CHAT_ID"):
+        sinks.append(TelegramSink(os.getenv("TELEGRAM_BOT_TOKEN"), os.getenv("TELEGRAM_CHAT_ID")))
+    return sinks
+
+# Global notification service instance
+notification_service = None
+
+def get_notification_service() -> NotificationService:
+    """Get global notification service for the configured sinks"""
+    global notification_service
+    if notification_service is None:
+        notification_service = NotificationService(sinks_from_env())
+    return notification_service
@@ -8,17 +8,23 @@ from collections import deque
 from typing import Dict, List, Optional
 import ssl
 
+DEFAULT_SYMBOLS = ["BTC", "ETH", "SOL"]
+
 class OKXMarketData:
     """OKX-only market data engine for both paper and live trading"""
     
-    def __init__(self):
-        self.prices = {"BTC": deque(maxlen=100), "ETH": deque(maxlen=100), "SOL": deque(maxlen=100)}
-        self.volumes = {"BTC": deque(maxlen=100), "ETH": deque(maxlen=100), "SOL": deque(maxlen=100)}
+    def __init__(self, symbols: Optional[List[str]] = None):
+        self.symbols = list(symbols or DEFAULT_SYMBOLS)
+        self.asset_map = {f"{symbol}-USDT": symbol for symbol in self.symbols}
+        self.prices = {symbol: deque(maxlen=100) for symbol in self.symbols}
+        self.volumes = {symbol: deque(maxlen=100) for symbol in self.symbols}
         self.current_prices = {}
         self.current_volumes = {}
         self.running = True
         self.data_lock = threading.Lock()
+        self.tick_condition = threading.Condition(self.data_lock)
         self.last_update = {}
+        self.sequence = {}
         self.connection_status = "connecting"
         
         # OKX WebSocket URL
@@ -53,18 +59,14 @@ class OKXMarketData:
             logging.info("✅ OKX WebSocket connected")
             self.connection_status = "connected"
             
-            # Subscribe to ticker data for BTC, ETH, SOL
+            # Subscribe to ticker data for this engine's symbols
             subscribe_message = {
                 "op": "subscribe",
-                "args": [
-                    {"channel": "tickers", "instId": "BTC-USDT"},
-                    {"channel": "tickers", "instId": "ETH-USDT"},
-                    {"channel": "tickers", "instId": "SOL-USDT"}
-                ]
+                "args": [{"channel": "tickers", "instId": inst_id} for inst_id in self.asset_map]
             }
             
             ws.send(json.dumps(subscribe_message))
-            logging.info("📡 Subscribed to OKX tickers: BTC, ETH, SOL")
+            logging.info(f"📡 Subscribed to OKX tickers: {', '.join(self.symbols)}")
         
         def run_websocket():
             while self.running:
@@ -102,14 +104,8 @@ class OKXMarketData:
                 inst_id = item.get("instId", "")
                 
                 # Map OKX instrument IDs to our asset names
-                asset_map = {
-                    "BTC-USDT": "BTC",
-                    "ETH-USDT": "ETH", 
-                    "SOL-USDT": "SOL"
-                }
-                
-                if inst_id in asset_map:
-                    asset = asset_map[inst_id]
+                if inst_id in self.asset_map:
+                    asset = self.asset_map[inst_id]
                     
                     # Extract price and volume data
                     last_price = float(item.get("last", 0))
@@ -122,6 +118,8 @@ class OKXMarketData:
                             self.current_prices[asset] = last_price
                             self.current_volumes[asset] = volume_24h
                             self.last_update[asset] = time.time()
+                            self.sequence[asset] = self.sequence.get(asset, 0) + 1
+                            self.tick_condition.notify_all()
                             
                             if self.connection_status != "live":
                                 self.connection_status = "live"
@@ -130,6 +128,17 @@ class OKXMarketData:
         except Exception as e:
             logging.error(f"Error processing OKX message: {e}")
     
+    def wait_for_ticks(self, seen: Dict[str, int], timeout: float) -> Dict[str, int]:
+        """Block until an instrument has ticks newer than `seen`; returns the latest sequence of each changed one"""
+        deadline = time.monotonic() + timeout
+        with self.tick_condition:
+            while True:
+                changed = {asset: seq for asset, seq in self.sequence.items() if seq != seen.get(asset, 0)}
+                remaining = deadline - time.monotonic()
+                if changed or remaining <= 0 or not self.running:
+                    return changed
+                self.tick_condition.wait(remaining)
+    
     def get_recent_data(self, symbol: str, length: int = 50) -> Dict:
         """Get recent price data for signal generation"""
         with self.data_lock:
@@ -174,7 +183,7 @@ class OKXMarketData:
             health_data = {}
             
             # Check each asset
-            for asset in ['BTC', 'ETH', 'SOL']:
+            for asset in self.symbols:
                 last_update = self.last_update.get(asset, 0)
                 age = current_time - last_update
                 has_data = len(self.prices[asset]) > 0
@@ -351,9 +360,12 @@ class OKXMarketData:
             self.ws.close()
         logging.info("🛑 OKX market data engine stopped")
 
-# Global instance
-okx_market_data = OKXMarketData()
+# Global instance, created on first use so each shard process subscribes to its own symbols
+okx_market_data = None
 
-def get_okx_engine():
+def get_okx_engine(symbols: Optional[List[str]] = None):
     """Get the global OKX market data engine"""
+    global okx_market_data
+    if okx_market_data is None:
+        okx_market_data = OKXMarketData(symbols)
     return okx_market_data
\ No newline at end of file
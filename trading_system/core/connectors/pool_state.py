@@ -0,0 +1,471 @@
+import os
+import json
+import bisect
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+import aiohttp
+
+from async_rpc import AsyncRPCClient
+
+WETH_ADDRESS = "0xc02aaa39b223fe8d0a0e5c4f27ead9083c756cc2"
+USDC_ADDRESS = "0xa0b86991c6218b36c1d19d4a2e9eb0ce3606eb48"
+
+UNISWAP_V2_FACTORY = os.getenv("UNISWAP_V2_FACTORY", "0x5C69bEe701ef814a2B6a3EDD4B1652CB9cc5aA6f")
+UNISWAP_V3_FACTORY = os.getenv("UNISWAP_V3_FACTORY", "0x1F98431c8aD98523631AE4a59f267346ea31F984")
+V3_FEE_TIERS = (100, 500, 3000, 10000)
+
+# Event topics
+SYNC_TOPIC = "0x1c411e9a96e071241c2f21f7726b17ae89e3cab4c78be50e062b03a9fffbbad1"
+V3_SWAP_TOPIC = "0xc42079f94a6350d7e6235f29174924f928cc2ac818eb64fed8004e115fbcca67"
+V3_MINT_TOPIC = "0x7a53080ba414158be7ec69b987b5fb7d07dee101fe85488f0853ae16239d0bde"
+V3_BURN_TOPIC = "0x0c396cd989a39f4459b5fa1aed6a9a8dcdbc45908acfd67e028cd568da98982c"
+
+# Function selectors
+GET_PAIR = bytes.fromhex("e6a43905")
+GET_POOL = bytes.fromhex("1698ee82")
+GET_RESERVES = bytes.fromhex("0902f1ac")
+SLOT0 = bytes.fromhex("3850c7bd")
+LIQUIDITY = bytes.fromhex("1a686502")
+TOKEN0 = bytes.fromhex("0dfe1681")
+TOKEN1 = bytes.fromhex("d21220a7")
+TICK_SPACING = bytes.fromhex("d0c93a7c")
+TICK_BITMAP = bytes.fromhex("5339c296")
+TICKS = bytes.fromhex("f30dba93")
+DECIMALS = bytes.fromhex("313ce567")
+
+Q96 = float(1 << 96)
+
+def _word(value: int) -> bytes:
+    """ABI word for a (possibly negative) integer"""
+    return (value % (1 << 256)).to_bytes(32, "big")
+
+def _address_word(address: str) -> bytes:
+    return bytes(12) + bytes.fromhex(address[2:])
+
+def _read_uint(data: bytes, index: int) -> int:
+    return int.from_bytes(data[index * 32:(index + 1) * 32], "big")
+
+def _read_int(data: bytes, index: int) -> int:
+    return int.from_bytes(data[index * 32:(index + 1) * 32], "big", signed=True)
+
+def _read_address(data: bytes, index: int) -> str:
+    return "0x" + data[index * 32 + 12:(index + 1) * 32].hex()
+
+def _log_position(log: Dict) -> Tuple[int, int]:
+    return int(log.get("blockNumber") or "0x0", 16), int(log.get("logIndex") or "0x0", 16)
+
+@dataclass
+class V2Pool:
+    """Constant-product pair, mirrored from Sync events"""
+    address: str
+    token0: str
+    token1: str
+    reserve0: int
+    reserve1: int
+    decimals0: int = 18
+    decimals1: int = 18
+    last_log: Tuple[int, int] = (0, 0)
+
+    def price0(self) -> float:
+        """Raw token1 per raw token0"""
+        return self.reserve1 / self.reserve0 if self.reserve0 else 0.0
+
+    def depth(self, token: str) -> float:
+        return float(self.reserve0 if token == self.token0 else self.reserve1)
+
+    def quote(self, zero_for_one: bool, amount_in: int) -> int:
+        """Exact getAmountOut, 0.3% fee included"""
+        reserve_in, reserve_out = (self.reserve0, self.reserve1) if zero_for_one else (self.reserve1, self.reserve0)
+        if amount_in <= 0 or reserve_in == 0 or reserve_out == 0:
+            return 0
+        amount_in_with_fee = amount_in * 997
+        return amount_in_with_fee * reserve_out // (reserve_in * 1000 + amount_in_with_fee)
+
+@dataclass
+class V3Pool:
+    """Concentrated-liquidity pool: price, active liquidity and liquidityNet per initialized tick"""
+    address: str
+    token0: str
+    token1: str
+    fee: int
+    tick_spacing: int
+    sqrt_price_x96: int
+    liquidity: int
+    tick: int
+    decimals0: int = 18
+    decimals1: int = 18
+    ticks: Dict[int, int] = field(default_factory=dict)
+    last_log: Tuple[int, int] = (0, 0)
+
+    def __post_init__(self):
+        self.sorted_ticks = sorted(self.ticks)
+
+    def set_ticks(self, ticks: Dict[int, int]):
+        self.ticks = ticks
+        self.sorted_ticks = sorted(ticks)
+
+    def update_position(self, tick_lower: int, tick_upper: int, delta: int):
+        """Apply a Mint (delta > 0) or Burn (delta < 0) of liquidity over [tick_lower, tick_upper)"""
+        for tick, net in ((tick_lower, delta), (tick_upper, -delta)):
+            value = self.ticks.get(tick, 0) + net
+            if value:
+                if tick not in self.ticks:
+                    bisect.insort(self.sorted_ticks, tick)
+                self.ticks[tick] = value
+            elif tick in self.ticks:
+                del self.ticks[tick]
+                self.sorted_ticks.remove(tick)
+        if tick_lower <= self.tick < tick_upper:
+            self.liquidity += delta
+
+    def price0(self) -> float:
+        sqrt_price = self.sqrt_price_x96 / Q96
+        return sqrt_price * sqrt_price
+
+    def depth(self, token: str) -> float:
+        """Virtual reserve of token at the current price"""
+        sqrt_price = self.sqrt_price_x96 / Q96
+        if not sqrt_price:
+            return 0.0
+        return self.liquidity / sqrt_price if token == self.token0 else self.liquidity * sqrt_price
+
+    def quote(self, zero_for_one: bool, amount_in: int) -> int:
+        """Walk initialized ticks from the current price; past the last known tick the
+        active liquidity is assumed to extend indefinitely"""
+        remaining = amount_in * (1 - self.fee / 1e6)
+        sqrt_price = self.sqrt_price_x96 / Q96
+        liquidity = float(self.liquidity)
+        ticks = self.sorted_ticks
+        i = bisect.bisect_right(ticks, self.tick) - 1 if zero_for_one else bisect.bisect_right(ticks, self.tick)
+        amount_out = 0.0
+
+        while remaining > 0:
+            next_tick = ticks[i] if 0 <= i < len(ticks) else None
+            if next_tick is None:
+                sqrt_target = 0.0 if zero_for_one else float("inf")
+            else:
+                sqrt_target = 1.0001 ** (next_tick / 2)
+
+            if liquidity > 0:
+                if zero_for_one:
+                    max_in = liquidity * (1 / sqrt_target - 1 / sqrt_price) if sqrt_target > 0 else float("inf")
+                    if remaining < max_in:
+                        new_sqrt_price = 1 / (1 / sqrt_price + remaining / liquidity)
+                        amount_out += liquidity * (sqrt_price - new_sqrt_price)
+                        break
+                    amount_out += liquidity * (sqrt_price - sqrt_target)
+                else:
+                    max_in = liquidity * (sqrt_target - sqrt_price)
+                    if remaining < max_in:
+                        new_sqrt_price = sqrt_price + remaining / liquidity
+                        amount_out += liquidity * (1 / sqrt_price - 1 / new_sqrt_price)
+                        break
+                    amount_out += liquidity * (1 / sqrt_price - 1 / sqrt_target)
+                remaining -= max_in
+
+            if next_tick is None:
+                break  # out of liquidity: the rest of the input is not filled
+
+            sqrt_price = sqrt_target
+            liquidity += -self.ticks[next_tick] if zero_for_one else self.ticks[next_tick]
+            i += -1 if zero_for_one else 1
+
+        return int(amount_out)
+
+Pool = Union[V2Pool, V3Pool]
+
+@dataclass(frozen=True)
+class SwapQuote:
+    pool: str
+    amount_in: float
+    amount_out: float
+    mid_price: float
+    execution_price: float
+    slippage: float
+
+class PoolStateCache:
+    """Local mirror of Uniswap V2 reserves and V3 price / tick liquidity, kept current from pool logs"""
+
+    def __init__(self, rpc: Optional[AsyncRPCClient] = None, tick_words: int = 2):
+        self.rpc = rpc
+        self.tick_words = tick_words
+        self.pools: Dict[str, Pool] = {}
+        self.pairs: Dict[Tuple[str, str], List[str]] = {}
+        self.decimals: Dict[str, int] = {WETH_ADDRESS: 18, USDC_ADDRESS: 6}
+        self.tracked_tokens: Dict[Tuple[str, str], asyncio.Task] = {}
+
+        self.running = False
+        self.subscribed: Set[str] = set()
+        self.pools_changed = asyncio.Event()
+        self.stats = {"logs": 0, "stale": 0, "refreshes": 0, "errors": 0}
+
+    def add_pool(self, pool: Pool):
+        pool.address = pool.address.lower()
+        pool.token0, pool.token1 = pool.token0.lower(), pool.token1.lower()
+        self.pools[pool.address] = pool
+        pair = self.pairs.setdefault(tuple(sorted((pool.token0, pool.token1))), [])
+        if pool.address not in pair:
+            pair.append(pool.address)
+        self.pools_changed.set()
+
+    def apply_log(self, log: Dict) -> bool:
+        """Update pool state from a Sync / Swap / Mint / Burn log; returns True if state changed"""
+        pool = self.pools.get((log.get("address") or "").lower())
+        topics = log.get("topics") or []
+        if pool is None or not topics:
+            return False
+
+        topic = topics[0].lower()
+        data = bytes.fromhex(log.get("data", "0x")[2:])
+        position = _log_position(log)
+
+        if log.get("removed"):
+            # Reorged out: liquidity changes are reversible, price updates are superseded by the next event
+            if isinstance(pool, V3Pool) and topic in (V3_MINT_TOPIC, V3_BURN_TOPIC):
+                self._apply_position_log(pool, topic, topics, data, reverse=True)
+                return True
+            return False
+
+        if position <= pool.last_log:
+            self.stats["stale"] += 1
+            return False
+
+        if isinstance(pool, V2Pool) and topic == SYNC_TOPIC:
+            pool.reserve0, pool.reserve1 = _read_uint(data, 0), _read_uint(data, 1)
+        elif isinstance(pool, V3Pool) and topic == V3_SWAP_TOPIC:
+            pool.sqrt_price_x96 = _read_uint(data, 2)
+            pool.liquidity = _read_uint(data, 3)
+            pool.tick = _read_int(data, 4)
+        elif isinstance(pool, V3Pool) and topic in (V3_MINT_TOPIC, V3_BURN_TOPIC):
+            self._apply_position_log(pool, topic, topics, data)
+        else:
+            return False
+
+        pool.last_log = position
+        self.stats["logs"] += 1
+        return True
+
+    @staticmethod
+    def _apply_position_log(pool: V3Pool, topic: str, topics: List[str], data: bytes, reverse: bool = False):
+        tick_lower = int.from_bytes(bytes.fromhex(topics[2][2:]), "big", signed=True)
+        tick_upper = int.from_bytes(bytes.fromhex(topics[3][2:]), "big", signed=True)
+        # Mint carries the sender before the amount; Burn starts with it
+        amount = _read_uint(data, 1) if topic == V3_MINT_TOPIC else _read_uint(data, 0)
+        delta = amount if topic == V3_MINT_TOPIC else -amount
+        pool.update_position(tick_lower, tick_upper, -delta if reverse else delta)
+
+    def pools_for(self, token_a: str, token_b: str) -> List[Pool]:
+        key = tuple(sorted((token_a.lower(), token_b.lower())))
+        return [self.pools[address] for address in self.pairs.get(key, [])]
+
+    def best_pool(self, token: str, quote: str = WETH_ADDRESS) -> Optional[Pool]:
+        """The pool with the most quote-token depth at the current price"""
+        quote = quote.lower()
+        pools = [p for p in self.pools_for(token, quote) if p.depth(quote) > 0]
+        return max(pools, key=lambda p: p.depth(quote)) if pools else None
+
+    def get_price(self, token: str, quote: str = WETH_ADDRESS) -> Optional[float]:
+        """Mid price of token in quote-token units"""
+        token = token.lower()
+        pool = self.best_pool(token, quote)
+        return self._mid_price(pool, token) if pool is not None else None
+
+    @staticmethod
+    def _mid_price(pool: Pool, token: str) -> Optional[float]:
+        price0 = pool.price0() * 10 ** (pool.decimals0 - pool.decimals1)
+        if not price0:
+            return None
+        return price0 if token == pool.token0 else 1 / price0
+
+    def quote_swap(self, token_in: str, token_out: str, amount_in: float) -> Optional[SwapQuote]:
+        """Exact output, execution price and slippage (LP fee included) for a swap of amount_in"""
+        token_in, token_out = token_in.lower(), token_out.lower()
+        pool = self.best_pool(token_out, token_in)
+        mid_price = self._mid_price(pool, token_in) if pool is not None else None
+        if not mid_price or amount_in <= 0:
+            return None
+
+        zero_for_one = token_in == pool.token0
+        decimals_in, decimals_out = (pool.decimals0, pool.decimals1) if zero_for_one else (pool.decimals1, pool.decimals0)
+        amount_out = pool.quote(zero_for_one, int(amount_in * 10 ** decimals_in)) / 10 ** decimals_out
+        execution_price = amount_out / amount_in
+        return SwapQuote(pool.address, amount_in, amount_out, mid_price, execution_price,
+                         max(0.0, 1 - execution_price / mid_price))
+
+    def liquidity_usd(self, token: str) -> Optional[float]:
+        """Two-sided USD depth of the token's deepest WETH pool"""
+        pool = self.best_pool(token, WETH_ADDRESS)
+        eth_usd = self.get_price(WETH_ADDRESS, USDC_ADDRESS)
+        if pool is None or eth_usd is None:
+            return None
+        return 2 * pool.depth(WETH_ADDRESS) / 1e18 * eth_usd
+
+    async def track_token(self, token: str, quote: str = WETH_ADDRESS) -> List[str]:
+        """Discover and load the token's V2 / V3 pools against quote; concurrent calls share one load"""
+        if self.rpc is None:
+            return []
+        key = (token.lower(), quote.lower())
+        task = self.tracked_tokens.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._track(*key))
+            self.tracked_tokens[key] = task
+        try:
+            return await asyncio.shield(task)
+        except Exception as e:
+            # Let the next caller retry discovery
+            self.tracked_tokens.pop(key, None)
+            self.stats["errors"] += 1
+            logging.warning(f"Pool discovery failed for {token}: {e}")
+            return []
+
+    async def _track(self, token: str, quote: str) -> List[str]:
+        lookups = [(UNISWAP_V2_FACTORY, GET_PAIR + _address_word(token) + _address_word(quote), None)]
+        lookups += [(UNISWAP_V3_FACTORY, GET_POOL + _address_word(token) + _address_word(quote) + _word(fee), fee)
+                    for fee in V3_FEE_TIERS]
+        if quote == WETH_ADDRESS and token != USDC_ADDRESS:
+            # ETH/USD reference for USD liquidity
+            lookups.append((UNISWAP_V3_FACTORY, GET_POOL + _address_word(USDC_ADDRESS) + _address_word(WETH_ADDRESS) + _word(500), 500))
+
+        # One JSON-RPC batch
+        results = await asyncio.gather(*(self.rpc.eth_call(to, data) for to, data, _ in lookups))
+        found = []
+        for (_, _, fee), result in zip(lookups, results):
+            address = _read_address(result, 0) if len(result) >= 32 else None
+            if address and int(address, 16) and address not in self.pools:
+                found.append((address, fee))
+
+        await asyncio.gather(*(self.refresh_pool(address, fee) for address, fee in found))
+        if found:
+            logging.info(f"🏊 Tracking {len(found)} pools for {token}")
+        return [address for address, _ in found]
+
+    async def refresh_pool(self, address: str, fee: Optional[int] = None):
+        """(Re)load a pool from chain state; fee=None means a V2 pair"""
+        address = address.lower()
+        known = self.pools.get(address)
+        if known is not None:
+            fee = known.fee if isinstance(known, V3Pool) else None
+
+        state_calls = [TOKEN0, TOKEN1] + ([GET_RESERVES] if fee is None else [SLOT0, LIQUIDITY, TICK_SPACING])
+        block_number, *results = await asyncio.gather(
+            self.rpc.call("eth_blockNumber"), *(self.rpc.eth_call(address, data) for data in state_calls)
+        )
+        token0, token1 = _read_address(results[0], 0), _read_address(results[1], 0)
+        decimals0, decimals1 = await asyncio.gather(self._get_decimals(token0), self._get_decimals(token1))
+        # Logs from the block the state was read at are already reflected in it
+        last_log = (int(block_number, 16), 1 << 32)
+
+        if fee is None:
+            pool = V2Pool(address, token0, token1, _read_uint(results[2], 0), _read_uint(results[2], 1),
+                          decimals0, decimals1, last_log)
+        else:
+            pool = V3Pool(address, token0, token1, fee, _read_int(results[4], 0), _read_uint(results[2], 0),
+                          _read_uint(results[3], 0), _read_int(results[2], 1), decimals0, decimals1, last_log=last_log)
+            pool.set_ticks(await self._load_ticks(pool))
+
+        self.add_pool(pool)
+        self.stats["refreshes"] += 1
+
+    async def _get_decimals(self, token: str) -> int:
+        if token not in self.decimals:
+            result = await self.rpc.eth_call(token, DECIMALS)
+            self.decimals[token] = _read_uint(result, 0) if len(result) >= 32 else 18
+        return self.decimals[token]
+
+    async def _load_ticks(self, pool: V3Pool) -> Dict[int, int]:
+        """liquidityNet for initialized ticks in tick_words bitmap words either side of the price"""
+        center = (pool.tick // pool.tick_spacing) >> 8
+        words = range(center - self.tick_words, center + self.tick_words + 1)
+        bitmaps = await asyncio.gather(*(self.rpc.eth_call(pool.address, TICK_BITMAP + _word(w)) for w in words))
+
+        ticks = []
+        for word, bitmap in zip(words, bitmaps):
+            bits = _read_uint(bitmap, 0)
+            ticks += [(word * 256 + bit) * pool.tick_spacing for bit in range(256) if bits >> bit & 1]
+
+        infos = await asyncio.gather(*(self.rpc.eth_call(pool.address, TICKS + _word(t)) for t in ticks))
+        return {tick: _read_int(info, 1) for tick, info in zip(ticks, infos) if _read_int(info, 1)}
+
+    def log_filter(self, addresses: List[str]) -> Dict:
+        return {"address": addresses, "topics": [[SYNC_TOPIC, V3_SWAP_TOPIC, V3_MINT_TOPIC, V3_BURN_TOPIC]]}
+
+    async def run(self, ws_url: str):
+        """Stream pool logs, subscribing to newly tracked pools as they are added, and reconnect until stopped"""
+        if self.running:
+            return  # already streaming for another owner of the shared instance
+        self.running = True
+        async with aiohttp.ClientSession() as session:
+            while self.running:
+                try:
+                    await self._consume_logs(session, ws_url)
+                except Exception as e:
+                    self.stats["errors"] += 1
+                    logging.error(f"Pool log subscription error: {e}")
+                if self.running:
+                    await asyncio.sleep(5)
+
+    def stop(self):
+        self.running = False
+        self.pools_changed.set()
+
+    async def _consume_logs(self, session: aiohttp.ClientSession, ws_url: str):
+        async with session.ws_connect(ws_url, heartbeat=30, max_msg_size=0) as websocket:
+            self.subscribed = set()
+            if self.pools:
+                # Logs missed while disconnected: reload current state
+                await asyncio.gather(*(self.refresh_pool(address) for address in list(self.pools)),
+                                     return_exceptions=True)
+            self.pools_changed.set()
+            subscriber = asyncio.create_task(self._subscribe_new_pools(websocket))
+            try:
+                async for message in websocket:
+                    if message.type == aiohttp.WSMsgType.TEXT:
+                        self.handle_message(message.data)
+                    elif message.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                        break
+                    if not self.running:
+                        break
+            finally:
+                subscriber.cancel()
+                await asyncio.gather(subscriber, return_exceptions=True)
+
+    async def _subscribe_new_pools(self, websocket):
+        request_id = 0
+        while self.running:
+            await self.pools_changed.wait()
+            self.pools_changed.clear()
+            addresses = sorted(set(self.pools) - self.subscribed)
+            if not addresses:
+                continue
+            request_id += 1
+            # Overlapping subscriptions are harmless: duplicate logs fail the ordering check
+            await websocket.send_str(json.dumps({
+                "jsonrpc": "2.0", "id": request_id, "method": "eth_subscribe",
+                "params": ["logs", self.log_filter(addresses)]
+            }))
+            self.subscribed.update(addresses)
+
+    def handle_message(self, raw: str):
+        try:
+            log = json.loads(raw)["params"]["result"]
+        except (ValueError, KeyError, TypeError):
+            return
+        if isinstance(log, dict):
+            self.apply_log(log)
+
+    def get_stats(self) -> Dict:
+        return {"pools": len(self.pools), "tokens": len(self.tracked_tokens), **self.stats}
+
+# Global pool state instance
+pool_state = None
+
+def get_pool_state() -> PoolStateCache:
+    """Get global pool state mirror"""
+    global pool_state
+    if pool_state is None:
+        rpc_url = os.getenv("ETHEREUM_RPC_URL")
+        pool_state = PoolStateCache(AsyncRPCClient(rpc_url) if rpc_url else None)
+    return pool_state
@@ -0,0 +1,352 @@
+import os
+import time
+import mmap
+import fcntl
+import ctypes
+import struct
+import logging
+import platform
+import tempfile
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+# Ring file layout, little-endian; shared with the Rust executor (signal_listener.rs):
+#   0    magic u32 "HFTR", version u32, record_size u32, capacity u32
+#   64   head u64: records published, written only by the producer
+#   128  tail u64: records consumed, written only by the consumer
+#   192  doorbell u32 bumped by the producer after each publish, waiting u32 set by a parked consumer
+#   256  capacity * record_size slots; record n lives in slot n % capacity and starts with its u64 seq
+RING_MAGIC = 0x52544648
+RING_VERSION = 1
+HEADER_SIZE = 256
+HEAD_OFFSET = 64
+TAIL_OFFSET = 128
+DOORBELL_OFFSET = 192
+WAITING_OFFSET = 196
+_HEADER = struct.Struct("<IIII")
+
+_SHM_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+SIGNAL_RING_PATH = os.getenv("SIGNAL_RING_PATH", os.path.join(_SHM_DIR, "hft_signals.ring"))
+FILL_RING_PATH = os.getenv("FILL_RING_PATH", os.path.join(_SHM_DIR, "hft_fills.ring"))
+RING_CAPACITY = int(os.getenv("SIGNAL_RING_CAPACITY", "1024"))
+
+# Shared (non-private) futex ops: the doorbell word lives in a file mapping used by two processes
+FUTEX_WAIT = 0
+FUTEX_WAKE = 1
+_SYS_FUTEX = {"x86_64": 202, "aarch64": 98}.get(platform.machine())
+
+try:
+    _syscall = ctypes.CDLL(None, use_errno=True).syscall if _SYS_FUTEX else None
+except (OSError, AttributeError):
+    _syscall = None
+
+class _Timespec(ctypes.Structure):
+    _fields_ = [("tv_sec", ctypes.c_long), ("tv_nsec", ctypes.c_long)]
+
+class ShmRing:
+    """Single-producer single-consumer ring of fixed-size records in a shared memory mapping"""
+
+    def __init__(self, path: str, record_size: int, capacity: int = RING_CAPACITY, spin: int = 200,
+                 bell: Optional["ShmRing"] = None):
+        if capacity & (capacity - 1):
+            raise ValueError(f"ring capacity must be a power of two: {capacity}")
+        self.path = path
+        self.record_size = record_size
+        self.spin = spin
+        # Ring whose doorbell a publish rings: another ring's, when one consumer parks for several producers
+        self.bell = bell if bell is not None else self
+        # Rings whose records this ring's doorbell also announces
+        self.watched: List["ShmRing"] = [self]
+
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            # Both ends may attach at once: only one initialises the file
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            header = os.pread(fd, _HEADER.size, 0)
+            magic, version, existing_size, existing = _HEADER.unpack(header) if len(header) == _HEADER.size else (0,) * 4
+            fresh = ((magic, version, existing_size) != (RING_MAGIC, RING_VERSION, record_size)
+                     or not existing or existing & (existing - 1))
+            if not fresh and existing != capacity:
+                # The other end sized this ring and may have it mapped: attach as is, never shrink it under them
+                logging.warning(f"Ring {path} has capacity {existing}, attaching with it instead of {capacity}")
+                capacity = existing
+            size = HEADER_SIZE + capacity * record_size
+            expected = (RING_MAGIC, RING_VERSION, record_size, capacity)
+            if fresh:
+                os.ftruncate(fd, 0)
+                os.ftruncate(fd, size)
+            self.mm = mmap.mmap(fd, size)
+            if fresh:
+                _HEADER.pack_into(self.mm, 0, *expected)
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
+        self.capacity = capacity
+        self.mask = capacity - 1
+
+        # Aligned native-width loads and stores, so the other process never sees a torn counter
+        self.head = ctypes.c_uint64.from_buffer(self.mm, HEAD_OFFSET)
+        self.tail = ctypes.c_uint64.from_buffer(self.mm, TAIL_OFFSET)
+        self.doorbell = ctypes.c_uint32.from_buffer(self.mm, DOORBELL_OFFSET)
+        self.waiting = ctypes.c_uint32.from_buffer(self.mm, WAITING_OFFSET)
+
+    def __len__(self) -> int:
+        return self.head.value - self.tail.value
+
+    def try_write(self, record: bytes) -> Optional[int]:
+        """Publish one record; returns its sequence number, or None if the ring is full"""
+        head = self.head.value
+        if head - self.tail.value >= self.capacity:
+            return None
+        offset = HEADER_SIZE + (head & self.mask) * self.record_size
+        self.mm[offset:offset + self.record_size] = record
+        struct.pack_into("<Q", self.mm, offset, head)
+        # Record bytes land before the head moves; the consumer reads head first
+        self.head.value = head + 1
+        bell = self.bell
+        bell.doorbell.value = (bell.doorbell.value + 1) & 0xFFFFFFFF
+        if bell.waiting.value:
+            bell._futex(FUTEX_WAKE, 1)
+        return head
+
+    def has_data(self) -> bool:
+        return any(ring.head.value != ring.tail.value for ring in self.watched)
+
+    def read_available(self, max_records: int = 256) -> List[bytes]:
+        tail = self.tail.value
+        count = min(self.head.value - tail, max_records)
+        records = []
+        for seq in range(tail, tail + count):
+            offset = HEADER_SIZE + (seq & self.mask) * self.record_size
+            records.append(self.mm[offset:offset + self.record_size])
+        if count:
+            self.tail.value = tail + count
+        return records
+
+    def wait(self, timeout: float) -> bool:
+        """Block until a watched ring has a record: spin briefly, then park on the doorbell"""
+        if self.has_data():
+            return True
+        for _ in range(self.spin):
+            if self.has_data():
+                return True
+
+        deadline = time.monotonic() + timeout
+        self.waiting.value = 1
+        try:
+            while True:
+                bell = self.doorbell.value
+                if self.has_data():
+                    return True
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                if _syscall is not None:
+                    # Returns at once if the doorbell moved after it was read
+                    self._futex(FUTEX_WAIT, bell, remaining)
+                else:
+                    time.sleep(min(remaining, 0.0005))
+        finally:
+            self.waiting.value = 0
+
+    def _futex(self, op: int, value: int, timeout: Optional[float] = None):
+        if _syscall is None:
+            return
+        timespec = None
+        if timeout is not None:
+            timespec = ctypes.byref(_Timespec(int(timeout), int((timeout % 1) * 1e9)))
+        _syscall(_SYS_FUTEX, ctypes.c_void_p(ctypes.addressof(self.doorbell)), op,
+                 ctypes.c_uint32(value), timespec, None, 0)
+
+    def close(self):
+        # ctypes views pin the mapping and must go first
+        del self.head, self.tail, self.doorbell, self.waiting
+        self.bell = self.watched = None
+        self.mm.close()
+
+SIDE_LONG = 1
+SIDE_SHORT = -1
+
+FILL_FILLED = 0
+FILL_PARTIAL = 1
+FILL_REJECTED = 2
+
+_SIGNAL = struct.Struct("<QQQ16sbB6x8d16x")
+_FILL = struct.Struct("<QQQ16sbB6x3dQ32s16x")
+SIGNAL_RECORD_SIZE = _SIGNAL.size
+FILL_RECORD_SIZE = _FILL.size
+
+def _encode_text(text: str, size: int) -> bytes:
+    return text.encode("utf-8")[:size]
+
+def _decode_text(raw: bytes) -> str:
+    return raw.rstrip(b"\x00").decode("utf-8", errors="replace")
+
+@dataclass
+class SignalRecord:
+    asset: str
+    side: int
+    confidence: float
+    entry_price: float
+    stop_loss: float = 0.0
+    take_profit: float = 0.0
+    quantity: float = 0.0
+    rsi: float = 0.0
+    vwap: float = 0.0
+    volume_ratio: float = 0.0
+    production_validated: bool = False
+    timestamp_ns: int = 0
+    published_ns: int = 0
+    seq: int = 0
+    shard: Optional[int] = None  # set by the consumer for records read from a shard ring; not on the wire
+
+    def pack(self) -> bytes:
+        return _SIGNAL.pack(self.seq, self.timestamp_ns, self.published_ns, _encode_text(self.asset, 16),
+                            self.side, int(self.production_validated), self.confidence, self.entry_price,
+                            self.stop_loss, self.take_profit, self.quantity, self.rsi, self.vwap, self.volume_ratio)
+
+    @classmethod
+    def unpack(cls, data: bytes) -> "SignalRecord":
+        (seq, timestamp_ns, published_ns, asset, side, flags, confidence, entry_price, stop_loss, take_profit,
+         quantity, rsi, vwap, volume_ratio) = _SIGNAL.unpack(data)
+        return cls(_decode_text(asset), side, confidence, entry_price, stop_loss, take_profit, quantity, rsi,
+                   vwap, volume_ratio, bool(flags & 1), timestamp_ns, published_ns, seq)
+
+    @classmethod
+    def from_signal(cls, signal_data: Dict) -> "SignalRecord":
+        """From a merged signal dict as produced by confidence_scoring.softmax_weighted_scoring"""
+        best = signal_data.get("best_signal") or signal_data.get("signal_data") or {}
+        return cls(
+            asset=best.get("asset", ""),
+            side=SIDE_SHORT if best.get("signal_type") == "SHORT" else SIDE_LONG,
+            confidence=float(signal_data.get("confidence", 0.0)),
+            entry_price=float(best.get("entry_price", 0.0)),
+            stop_loss=float(best.get("stop_loss", 0.0)),
+            take_profit=float(best.get("take_profit_1", 0.0)),
+            quantity=float(signal_data.get("quantity", 0.0)),
+            rsi=float(best.get("rsi", 0.0)),
+            vwap=float(best.get("vwap", 0.0)),
+            volume_ratio=float(best.get("volume_ratio", 1.0)),
+            production_validated=bool(signal_data.get("production_validated")),
+            timestamp_ns=round(float(signal_data.get("timestamp") or time.time()) * 1e6) * 1000
+        )
+
+@dataclass
+class FillRecord:
+    asset: str
+    side: int
+    status: int
+    price: float
+    quantity: float
+    fee: float = 0.0
+    execution_time_us: int = 0
+    order_id: str = ""
+    signal_seq: int = 0
+    timestamp_ns: int = 0
+    seq: int = 0
+
+    def pack(self) -> bytes:
+        return _FILL.pack(self.seq, self.timestamp_ns, self.signal_seq, _encode_text(self.asset, 16), self.side,
+                          self.status, self.price, self.quantity, self.fee, self.execution_time_us,
+                          _encode_text(self.order_id, 32))
+
+    @classmethod
+    def unpack(cls, data: bytes) -> "FillRecord":
+        (seq, timestamp_ns, signal_seq, asset, side, status, price, quantity, fee,
+         execution_time_us, order_id) = _FILL.unpack(data)
+        return cls(_decode_text(asset), side, status, price, quantity, fee, execution_time_us,
+                   _decode_text(order_id), signal_seq, timestamp_ns, seq)
+
+def shard_ring_paths(worker_id: int, signal_path: str = SIGNAL_RING_PATH, fill_path: str = FILL_RING_PATH):
+    """A shard worker's own ring pair; the executor attaches every `<path>.<worker_id>` it finds"""
+    return f"{signal_path}.{worker_id}", f"{fill_path}.{worker_id}"
+
+class SignalBus:
+    """Trading-process end of the executor channel: publishes signals, collects fills.
+
+    A shard worker publishes on its own ring pair and passes `doorbell_path`, the unsharded signal ring,
+    so the executor parks on one doorbell for every shard."""
+
+    def __init__(self, signal_path: str = SIGNAL_RING_PATH, fill_path: str = FILL_RING_PATH,
+                 capacity: int = RING_CAPACITY, doorbell_path: Optional[str] = None):
+        self.doorbell = ShmRing(doorbell_path, SIGNAL_RECORD_SIZE, capacity) if doorbell_path else None
+        self.signals = ShmRing(signal_path, SIGNAL_RECORD_SIZE, capacity, bell=self.doorbell)
+        self.fills = ShmRing(fill_path, FILL_RECORD_SIZE, capacity)
+        self.stats = {"published": 0, "dropped": 0, "fills": 0}
+
+    def publish(self, record: SignalRecord) -> Optional[int]:
+        record.published_ns = time.time_ns()
+        seq = self.signals.try_write(record.pack())
+        if seq is None:
+            # Executor is not draining: a stale signal is worse than a missed one
+            self.stats["dropped"] += 1
+            logging.warning(f"Signal ring full, dropped {record.asset} signal")
+            return None
+        self.stats["published"] += 1
+        return seq
+
+    def publish_signal(self, signal_data: Dict) -> Optional[int]:
+        return self.publish(SignalRecord.from_signal(signal_data))
+
+    def poll_fills(self, max_records: int = 256) -> List[FillRecord]:
+        fills = [FillRecord.unpack(raw) for raw in self.fills.read_available(max_records)]
+        self.stats["fills"] += len(fills)
+        return fills
+
+    def wait_fills(self, timeout: float) -> List[FillRecord]:
+        return self.poll_fills() if self.fills.wait(timeout) else []
+
+    def close(self):
+        self.signals.close()
+        self.fills.close()
+        if self.doorbell is not None:
+            self.doorbell.close()
+
+class ExecutorEndpoint:
+    """Executor end in pure Python: the reference consumer for the ring layout, used in tests and tools.
+
+    With `shards`, also drains each shard's ring pair, parking on the unsharded ring's doorbell as the
+    Rust listener does."""
+
+    def __init__(self, signal_path: str = SIGNAL_RING_PATH, fill_path: str = FILL_RING_PATH,
+                 capacity: int = RING_CAPACITY, shards: int = 0):
+        self.signals = ShmRing(signal_path, SIGNAL_RECORD_SIZE, capacity)
+        self.fills = ShmRing(fill_path, FILL_RECORD_SIZE, capacity)
+        self.shard_rings = []
+        for worker_id in range(shards):
+            shard_signal_path, shard_fill_path = shard_ring_paths(worker_id, signal_path, fill_path)
+            self.shard_rings.append((ShmRing(shard_signal_path, SIGNAL_RECORD_SIZE, capacity),
+                                     ShmRing(shard_fill_path, FILL_RECORD_SIZE, capacity)))
+        self.signals.watched.extend(signals for signals, _ in self.shard_rings)
+
+    def poll_signals(self, max_records: int = 256) -> List[SignalRecord]:
+        records = [SignalRecord.unpack(raw) for raw in self.signals.read_available(max_records)]
+        for shard, (signals, _) in enumerate(self.shard_rings):
+            for raw in signals.read_available(max_records):
+                record = SignalRecord.unpack(raw)
+                record.shard = shard
+                records.append(record)
+        return records
+
+    def wait_signals(self, timeout: float) -> List[SignalRecord]:
+        return self.poll_signals() if self.signals.wait(timeout) else []
+
+    def publish_fill(self, fill: FillRecord, shard: Optional[int] = None) -> Optional[int]:
+        """Answer on the ring pair the signal came in on"""
+        fill.timestamp_ns = fill.timestamp_ns or time.time_ns()
+        fills = self.fills if shard is None else self.shard_rings[shard][1]
+        return fills.try_write(fill.pack())
+
+    def close(self):
+        for ring in [self.signals, self.fills] + [ring for pair in self.shard_rings for ring in pair]:
+            ring.close()
+
+# Global signal bus instance
+signal_bus = None
+
+def get_signal_bus() -> SignalBus:
+    """Get global signal bus, creating the ring files if needed"""
+    global signal_bus
+    if signal_bus is None:
+        signal_bus = SignalBus()
+    return signal_bus
@@ -1,21 +1,22 @@
 import os
-import asyncio
 import logging
 from typing import Dict, Optional
 import time
 
+from notification_service import get_notification_service
+
 class TelegramNotifier:
     def __init__(self):
         self.bot_token = os.getenv("TELEGRAM_BOT_TOKEN")
         self.chat_id = os.getenv("TELEGRAM_CHAT_ID")
-        self.bot = None
+        self.notifications = get_notification_service()
         
         if self.bot_token and self.chat_id:
             logging.info("✅ Telegram bot initialized")
         else:
             logging.warning("⚠️ Telegram credentials not configured")
     
-    async def send_signal_alert(self, signal_data: Dict):
+    def send_signal_alert(self, signal_data: Dict):
         if not self.bot_token:
             return
         
@@ -55,7 +56,8 @@ class TelegramNotifier:
             if confidence >= 0.85:
                 message = "🚨 HIGH PRIORITY 🚨\n" + message
             
-            logging.info(f"📱 Telegram alert sent for {asset} signal")
+            self.notifications.notify("telegram", message.strip(), key=f"signal:{asset}")
+            logging.info(f"📱 Telegram alert queued for {asset} signal")
             
         except Exception as e:
             logging.error(f"Telegram notification error: {e}")
@@ -63,11 +65,7 @@ class TelegramNotifier:
 telegram_notifier = TelegramNotifier()
 
 def send_signal_alert(signal_data: Dict):
-    try:
-        loop = asyncio.get_event_loop()
-        loop.run_until_complete(telegram_notifier.send_signal_alert(signal_data))
-    except RuntimeError:
-        asyncio.run(telegram_notifier.send_signal_alert(signal_data))
+    telegram_notifier.send_signal_alert(signal_data)
 
 def send_trade_notification(trade_data: Dict):
     pass
@@ -0,0 +1,62 @@
+import torch
+import torch.nn as nn
+import torch.nn.functional as F
+from typing import Dict
+
+class DeepTradingNetwork(nn.Module):
+    def __init__(self, input_dim=256, hidden_dims=[1024, 512, 256], output_dim=5):
+        super(DeepTradingNetwork, self).__init__()
+        
+        layers = []
+        prev_dim = input_dim
+        
+        for hidden_dim in hidden_dims:
+            layers.extend([
+                nn.Linear(prev_dim, hidden_dim),
+                nn.BatchNorm1d(hidden_dim),
+                nn.ReLU(inplace=True),
+                nn.Dropout(0.15)
+            ])
+            prev_dim = hidden_dim
+        
+        self.feature_extractor = nn.Sequential(*layers)
+        
+        # Separate output heads
+        self.action_head = nn.Linear(hidden_dims[-1], 3)  # buy, sell, hold
+        self.confidence_head = nn.Linear(hidden_dims[-1], 1)
+        self.return_head = nn.Linear(hidden_dims[-1], 1)
+        self.risk_head = nn.Linear(hidden_dims[-1], 1)
+        self.size_head = nn.Linear(hidden_dims[-1], 1)
+        
+        self.apply(self._init_weights)
+    
+    def _init_weights(self, module):
+        if isinstance(module, nn.Linear):
+            torch.nn.init.kaiming_normal_(module.weight, mode='fan_out', nonlinearity='relu')
+            if module.bias is not None:
+                torch.nn.init.constant_(module.bias, 0)
+    
+    def forward(self, x):
+        features = self.feature_extractor(x)
+        
+        action_logits = self.action_head(features)
+        confidence = torch.sigmoid(self.confidence_head(features))
+        predicted_return = torch.tanh(self.return_head(features)) * 10.0  # Scale to ±10x
+        risk_score = torch.sigmoid(self.risk_head(features))
+        position_size = torch.sigmoid(self.size_head(features)) * 0.5  # Max 50% position
+        
+        return {
+            'action_logits': action_logits,
+            'confidence': confidence.squeeze(),
+            'predicted_return': predicted_return.squeeze(),
+            'risk_score': risk_score.squeeze(),
+            'position_size': position_size.squeeze()
+        }
+
+def multitask_loss(outputs: Dict[str, torch.Tensor], targets: torch.Tensor) -> torch.Tensor:
+    """Sum of action, confidence, return and risk losses against [action, confidence, return, risk] targets"""
+    action_loss = F.cross_entropy(outputs['action_logits'], targets[:, 0].long())
+    confidence_loss = F.mse_loss(outputs['confidence'], targets[:, 1])
+    return_loss = F.mse_loss(outputs['predicted_return'], targets[:, 2])
+    risk_loss = F.mse_loss(outputs['risk_score'], targets[:, 3])
+    return action_loss + confidence_loss + return_loss + risk_loss
@@ -0,0 +1,208 @@
+import json
+import hashlib
+import logging
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from sklearn.preprocessing import StandardScaler
+
+FEATURE_COLUMNS = [
+    'returns', 'log_returns', 'ma_ratio_5', 'ma_ratio_10', 'ma_ratio_20',
+    'volatility_5', 'volatility_10', 'volatility_20', 'rsi', 'macd',
+    'macd_signal', 'bb_position', 'volume_ratio'
+]
+
+# mean, std, min, max, last value per column
+STATS_PER_COLUMN = 5
+WALLET_FEATURE_COUNT = 4
+FEATURE_DIM = len(FEATURE_COLUMNS) * STATS_PER_COLUMN + WALLET_FEATURE_COUNT
+
+# Bump when an indicator formula changes without changing the column names
+FEATURE_SCHEMA_VERSION = 1
+
+def feature_schema_hash(lookback_window: int = 48) -> str:
+    """Fingerprint of the feature layout a model and scaler were trained on"""
+    schema = {
+        "version": FEATURE_SCHEMA_VERSION,
+        "columns": FEATURE_COLUMNS,
+        "stats_per_column": STATS_PER_COLUMN,
+        "wallet_features": WALLET_FEATURE_COUNT,
+        "lookback_window": lookback_window
+    }
+    return hashlib.sha256(json.dumps(schema, sort_keys=True).encode()).hexdigest()[:16]
+
+class FeatureEngineer:
+    def __init__(self):
+        self.scaler = StandardScaler()
+        self.lookback_window = 48  # 48 hours
+
+    def add_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Calculate technical indicators on REAL candle data"""
+        df = df.copy()
+        df['returns'] = df['close'].pct_change()
+        df['log_returns'] = np.log(df['close'] / df['close'].shift(1))
+
+        # Moving averages
+        for window in [5, 10, 20]:
+            df[f'ma_{window}'] = df['close'].rolling(window).mean()
+            df[f'ma_ratio_{window}'] = df['close'] / df[f'ma_{window}']
+
+        # Volatility
+        for window in [5, 10, 20]:
+            df[f'volatility_{window}'] = df['returns'].rolling(window).std()
+
+        # RSI
+        delta = df['close'].diff()
+        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
+        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
+        rs = gain / loss
+        df['rsi'] = 100 - (100 / (1 + rs))
+
+        # MACD
+        exp1 = df['close'].ewm(span=12).mean()
+        exp2 = df['close'].ewm(span=26).mean()
+        df['macd'] = exp1 - exp2
+        df['macd_signal'] = df['macd'].ewm(span=9).mean()
+
+        # Bollinger Bands
+        df['bb_middle'] = df['close'].rolling(20).mean()
+        bb_std = df['close'].rolling(20).std()
+        df['bb_upper'] = df['bb_middle'] + (bb_std * 2)
+        df['bb_lower'] = df['bb_middle'] - (bb_std * 2)
+        df['bb_position'] = (df['close'] - df['bb_lower']) / (df['bb_upper'] - df['bb_lower'])
+
+        # Volume indicators
+        df['volume_sma'] = df['volume'].rolling(20).mean()
+        df['volume_ratio'] = df['volume'] / df['volume_sma']
+
+        return df
+
+    def create_features_from_real_data(self, price_data: Dict[str, pd.DataFrame],
+                                      wallet_data: pd.DataFrame,
+                                      fit_scaler: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+        """Create ML features from REAL API data only"""
+        logging.info("Engineering features from real data...")
+
+        all_features = []
+        all_targets = []
+
+        for symbol, df in price_data.items():
+            if len(df) < self.lookback_window + 1:
+                continue
+
+            df = self.add_indicators(df)
+            features, targets = self._create_symbol_features(df, wallet_data)
+
+            if len(features) > 0:
+                all_features.append(features)
+                all_targets.append(targets)
+
+        if not all_features:
+            raise RuntimeError("No valid features created from real data")
+
+        features_array = np.concatenate(all_features).astype(np.float32)
+        targets_array = np.concatenate(all_targets).astype(np.float32)
+
+        # Normalize features; retraining reuses the frozen training scale
+        if fit_scaler:
+            features_array = self.scaler.fit_transform(features_array)
+        else:
+            features_array = self.scaler.transform(features_array)
+
+        logging.info(f"Created {len(features_array)} feature vectors from real data")
+
+        return features_array, targets_array
+
+    def _create_symbol_features(self, df: pd.DataFrame,
+                                wallet_data: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """Vectorized window statistics for every sample row of one symbol"""
+        n = len(df)
+        lookback = self.lookback_window
+
+        # Sample i uses the window [i - lookback, i) and predicts i -> i + 1
+        rows = np.arange(lookback, n - 1)
+        if rows.size == 0:
+            return np.empty((0, FEATURE_DIM)), np.empty((0, 4))
+
+        # Columns-major copy so every window is contiguous and numpy reduces it
+        # with the same pairwise summation as a single 1-D slice
+        values = np.ascontiguousarray(df[FEATURE_COLUMNS].to_numpy(dtype=np.float64).T)
+        windows = sliding_window_view(values[:, :n - 2], lookback, axis=1)
+
+        stats = np.stack([
+            np.mean(windows, axis=-1),
+            np.std(windows, axis=-1),
+            np.min(windows, axis=-1),
+            np.max(windows, axis=-1),
+            windows[..., -1]
+        ], axis=-1)
+        stats[np.isnan(windows).any(axis=-1)] = 0
+
+        # (columns, samples, stats) -> (samples, columns * stats)
+        price_features = stats.transpose(1, 0, 2).reshape(rows.size, -1)
+        wallet_features = self._wallet_features_for_rows(wallet_data, df['timestamp'].iloc[rows])
+        features = np.hstack([price_features, wallet_features])
+
+        # Calculate future return as target
+        close = df['close'].to_numpy(dtype=np.float64)
+        future_return = (close[rows + 1] - close[rows]) / close[rows]
+        valid = ~np.isnan(future_return)
+        future_return = future_return[valid]
+
+        targets = np.column_stack([
+            np.where(future_return > 0.001, 1, np.where(future_return < -0.001, 2, 0)),  # Action
+            np.minimum(np.abs(future_return) * 10, 1.0),  # Confidence
+            future_return,  # Return
+            np.minimum(np.abs(future_return) * 5, 1.0)  # Risk
+        ])
+
+        return features[valid], targets
+
+    def _wallet_features_for_rows(self, wallet_data: pd.DataFrame, timestamps: pd.Series) -> np.ndarray:
+        """As-of join of wallet activity onto candle timestamps"""
+        wallet_features = np.zeros((len(timestamps), WALLET_FEATURE_COUNT))
+        if wallet_data.empty:
+            return wallet_features
+
+        tx_times = wallet_data['datetime'].to_numpy(dtype='datetime64[ns]')
+        order = np.argsort(tx_times, kind='stable')
+        sorted_times = tx_times[order]
+
+        # Each candle selects every tx at or after (candle time - 24h), which is
+        # a suffix of the time-sorted transactions; compute each suffix once
+        recent_times = (timestamps - pd.Timedelta(hours=24)).to_numpy(dtype='datetime64[ns]')
+        starts = np.searchsorted(sorted_times, recent_times, side='left')
+
+        for start in np.unique(starts):
+            if start == len(sorted_times):
+                continue
+            # Keep original row order so the sums match a boolean-mask filter
+            recent_txs = wallet_data.iloc[np.sort(order[start:])]
+            wallet_features[starts == start] = self._summarize_wallet_activity(recent_txs)
+
+        return wallet_features
+
+    def _get_wallet_features_at_time(self, wallet_data: pd.DataFrame, timestamp: pd.Timestamp) -> List[float]:
+        """Extract wallet activity features at specific time"""
+        if wallet_data.empty:
+            return [0, 0, 0, 0]  # Default values if no wallet data
+
+        # Look at wallet activity in last 24 hours
+        recent_time = timestamp - pd.Timedelta(hours=24)
+        recent_txs = wallet_data[wallet_data['datetime'] >= recent_time]
+
+        if recent_txs.empty:
+            return [0, 0, 0, 0]
+
+        return self._summarize_wallet_activity(recent_txs)
+
+    def _summarize_wallet_activity(self, recent_txs: pd.DataFrame) -> List[float]:
+        """Calculate wallet sentiment features"""
+        total_volume = recent_txs['value_eth'].sum()
+        tx_count = len(recent_txs)
+        avg_gas_price = recent_txs['gas_price'].mean()
+        error_rate = recent_txs['is_error'].mean()
+
+        return [total_volume, tx_count, avg_gas_price / 1e9, error_rate]  # Normalize gas price
@@ -0,0 +1,295 @@
+import time
+import logging
+import itertools
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+import config
+
+# OKX spot (maker, taker) rates by fee tier
+FEE_TIERS = {
+    "regular": (0.0008, 0.0010),
+    "vip1": (0.00045, 0.0005),
+    "vip2": (0.0004, 0.00045),
+    "vip3": (0.0003, 0.0004),
+    "vip4": (0.0002, 0.00035),
+    "vip5": (0.0, 0.0003)
+}
+
+Level = Tuple[float, float]  # (price, size)
+INFINITE_DEPTH = float("inf")
+BOOK_STALE_SECONDS = 1.0
+
+@dataclass
+class Fill:
+    """One execution: average price over the levels taken, fee at the tier's maker or taker rate"""
+    order_id: int
+    asset: str
+    side: str  # "buy" or "sell"
+    price: float
+    quantity: float
+    fee: float
+    maker: bool
+    timestamp: float
+    reference_price: float = 0.0
+
+    @property
+    def slippage(self) -> float:
+        """Adverse move from the reference price, as a fraction"""
+        if not self.reference_price:
+            return 0.0
+        move = (self.price - self.reference_price) / self.reference_price
+        return move if self.side == "buy" else -move
+
+@dataclass
+class Order:
+    id: int
+    asset: str
+    side: str
+    quantity: float
+    limit: Optional[float]
+    submitted: float
+    due: float
+    reference_price: float = 0.0
+    resting: bool = False
+    queue_ahead: float = 0.0
+
+class InstantFillModel:
+    """Fills at the reference price with a flat PAPER_COMMISSION_RATE - the old paper behaviour"""
+
+    def __init__(self, commission_rate: Optional[float] = None):
+        self.commission_rate = config.PAPER_COMMISSION_RATE if commission_rate is None else commission_rate
+
+    def market(self, side: str, quantity: float, bids: Sequence[Level], asks: Sequence[Level],
+               reference_price: float) -> float:
+        return reference_price
+
+    def fee(self, notional: float, maker: bool) -> float:
+        return notional * self.commission_rate
+
+class BookFillModel:
+    """Takes liquidity level by level from the book; maker and taker fees by tier"""
+
+    def __init__(self, tier: str = None):
+        tier = tier or config.PAPER_FEE_TIER
+        if tier not in FEE_TIERS:
+            raise ValueError(f"Unknown fee tier {tier}, expected one of {', '.join(FEE_TIERS)}")
+        self.tier = tier
+        self.maker_rate, self.taker_rate = FEE_TIERS[tier]
+
+    def market(self, side: str, quantity: float, bids: Sequence[Level], asks: Sequence[Level],
+               reference_price: float) -> float:
+        levels = asks if side == "buy" else bids
+        if not levels:
+            return reference_price
+        remaining = quantity
+        cost = 0.0
+        price = reference_price
+        for price, size in levels:
+            take = size if size < remaining else remaining
+            cost += take * price
+            remaining -= take
+            if remaining <= 0:
+                return cost / quantity
+        # Book exhausted: the rest fills at the worst level seen
+        return (cost + remaining * price) / quantity
+
+    def fee(self, notional: float, maker: bool) -> float:
+        return notional * (self.maker_rate if maker else self.taker_rate)
+
+class FillSimulator:
+    """Order latency, queue position and book-walking fills over recorded or live order books"""
+
+    def __init__(self, model=None, latency: float = None, spread_bps: float = None):
+        self.model = model or get_fill_model()
+        self.latency = config.PAPER_ORDER_LATENCY_MS / 1000 if latency is None else latency
+        half_spread = (config.PAPER_SPREAD_BPS if spread_bps is None else spread_bps) / 20000
+        self.bid_factor = 1 - half_spread
+        self.ask_factor = 1 + half_spread
+        self.books: Dict[str, Tuple[Sequence[Level], Sequence[Level], float, bool]] = {}
+        self.pending: Dict[str, deque] = {}
+        self.resting: Dict[str, Dict[str, Dict[float, List[Order]]]] = {}  # asset -> side -> limit price -> orders
+        self.order_ids = itertools.count(1)
+        self.stats = {"orders": 0, "fills": 0, "maker_fills": 0, "fees": 0.0, "slippage_cost": 0.0}
+
+    def on_book(self, asset: str, bids: Sequence[Level], asks: Sequence[Level], timestamp: float = None) -> List[Fill]:
+        """Record a book snapshot (best level first) and fill whatever it reaches"""
+        timestamp = time.time() if timestamp is None else timestamp
+        self.books[asset] = (bids, asks, timestamp, False)
+        if asset not in self.pending and asset not in self.resting:
+            return []
+        return self._match(asset, bids, asks, timestamp)
+
+    def on_price(self, asset: str, price: float, timestamp: float = None) -> List[Fill]:
+        """Ticker-only feeds: a synthetic one-level book of unlimited depth at PAPER_SPREAD_BPS around the last price"""
+        timestamp = time.time() if timestamp is None else timestamp
+        book = self.books.get(asset)
+        if book is not None and not book[3] and timestamp - book[2] < BOOK_STALE_SECONDS:
+            # A real book arrived recently; keep it
+            return []
+        bids = ((price * self.bid_factor, INFINITE_DEPTH),)
+        asks = ((price * self.ask_factor, INFINITE_DEPTH),)
+        self.books[asset] = (bids, asks, timestamp, True)
+        if asset not in self.pending and asset not in self.resting:
+            return []
+        return self._match(asset, bids, asks, timestamp)
+
+    def submit(self, asset: str, side: str, quantity: float, timestamp: float = None, limit: Optional[float] = None,
+               reference_price: float = 0.0) -> int:
+        """Queue an order; it reaches the book `latency` seconds later and fills on the first snapshot after that"""
+        timestamp = time.time() if timestamp is None else timestamp
+        order = Order(next(self.order_ids), asset, side, quantity, limit, timestamp, timestamp + self.latency,
+                      reference_price)
+        self.pending.setdefault(asset, deque()).append(order)
+        self.stats["orders"] += 1
+        return order.id
+
+    def cancel(self, asset: str, order_id: int) -> bool:
+        pending = self.pending.get(asset, ())
+        for order in pending:
+            if order.id == order_id:
+                pending.remove(order)
+                return True
+        for levels in self.resting.get(asset, {}).values():
+            for price, orders in levels.items():
+                for order in orders:
+                    if order.id == order_id:
+                        orders.remove(order)
+                        if not orders:
+                            del levels[price]
+                        return True
+        return False
+
+    def _match(self, asset: str, bids: Sequence[Level], asks: Sequence[Level], timestamp: float) -> List[Fill]:
+        fills = []
+
+        resting = self.resting.get(asset)
+        if resting:
+            self._match_resting(resting["buy"], "buy", bids, asks, timestamp, fills)
+            self._match_resting(resting["sell"], "sell", bids, asks, timestamp, fills)
+            if not resting["buy"] and not resting["sell"]:
+                del self.resting[asset]
+
+        # Latency is constant, so arrival order is submission order
+        pending = self.pending.get(asset)
+        while pending and pending[0].due <= timestamp:
+            order = pending.popleft()
+            fill = self._arrive(order, bids, asks, timestamp)
+            if fill is not None:
+                fills.append(fill)
+        if pending is not None and not pending:
+            del self.pending[asset]
+
+        return fills
+
+    def _arrive(self, order: Order, bids: Sequence[Level], asks: Sequence[Level], timestamp: float) -> Optional[Fill]:
+        if order.limit is None:
+            reference = order.reference_price or self._mid(bids, asks)
+            return self._fill(order, self.model.market(order.side, order.quantity, bids, asks, reference), False, timestamp)
+
+        opposite = asks if order.side == "buy" else bids
+        if opposite and ((opposite[0][0] <= order.limit) if order.side == "buy" else (opposite[0][0] >= order.limit)):
+            # Marketable on arrival: takes liquidity, never worse than the limit
+            price = self.model.market(order.side, order.quantity, bids, asks, order.limit)
+            price = min(price, order.limit) if order.side == "buy" else max(price, order.limit)
+            return self._fill(order, price, False, timestamp)
+
+        # Rest at the back of the queue at our price
+        order.resting = True
+        order.queue_ahead = self._size_at(bids if order.side == "buy" else asks, order.limit)
+        sides = self.resting.setdefault(order.asset, {"buy": {}, "sell": {}})
+        sides[order.side].setdefault(order.limit, []).append(order)
+        return None
+
+    def _match_resting(self, levels: Dict[float, List[Order]], side: str, bids: Sequence[Level],
+                       asks: Sequence[Level], timestamp: float, fills: List[Fill]):
+        """Work through resting orders by price level, so cost grows with levels rather than orders"""
+        if not levels:
+            return
+        own, opposite = (bids, asks) if side == "buy" else (asks, bids)
+
+        # Size ahead of us only shrinks: cancels and fills at the level
+        for price, size in own:
+            orders = levels.get(price)
+            if orders:
+                for order in orders:
+                    if size < order.queue_ahead:
+                        order.queue_ahead = size
+
+        if not opposite:
+            return
+        best = opposite[0][0]
+        for price in [p for p in levels if (p >= best if side == "buy" else p <= best)]:
+            orders = levels.pop(price)
+            if price != best:
+                # Traded through our price: the whole queue is gone
+                fills.extend(self._fill(order, price, True, timestamp) for order in orders)
+                continue
+            size = self._size_at(own, price)
+            waiting = []
+            for order in orders:
+                order.queue_ahead = min(order.queue_ahead, size)
+                if order.queue_ahead <= 0:
+                    fills.append(self._fill(order, price, True, timestamp))
+                else:
+                    waiting.append(order)
+            if waiting:
+                levels[price] = waiting
+
+    def _fill(self, order: Order, price: float, maker: bool, timestamp: float) -> Fill:
+        fee = self.model.fee(price * order.quantity, maker)
+        fill = Fill(order.id, order.asset, order.side, price, order.quantity, fee, maker, timestamp,
+                    order.reference_price or order.limit or price)
+        self.stats["fills"] += 1
+        self.stats["maker_fills"] += maker
+        self.stats["fees"] += fee
+        self.stats["slippage_cost"] += fill.slippage * fill.reference_price * order.quantity
+        return fill
+
+    def _mid(self, bids: Sequence[Level], asks: Sequence[Level]) -> float:
+        if bids and asks:
+            return (bids[0][0] + asks[0][0]) / 2
+        return (bids or asks)[0][0] if (bids or asks) else 0.0
+
+    def _size_at(self, levels: Sequence[Level], price: float) -> float:
+        for level_price, size in levels:
+            if level_price == price:
+                return size
+        return 0.0
+
+    def fill_market(self, asset: str, side: str, quantity: float, reference_price: float) -> Fill:
+        """Immediate market fill against the latest book for the asset, for callers that cannot wait out the latency"""
+        book = self.books.get(asset)
+        if book is None or time.time() - book[2] > BOOK_STALE_SECONDS:
+            self.on_price(asset, reference_price)
+            book = self.books[asset]
+        bids, asks, timestamp, _ = book
+        order = Order(next(self.order_ids), asset, side, quantity, None, timestamp, timestamp, reference_price)
+        self.stats["orders"] += 1
+        return self._fill(order, self.model.market(side, quantity, bids, asks, reference_price), False, time.time())
+
+    def fill_limit(self, asset: str, side: str, quantity: float, price: float) -> Fill:
+        """A resting limit order the market has reached: fills at its price as maker"""
+        order = Order(next(self.order_ids), asset, side, quantity, price, time.time(), time.time(), price)
+        self.stats["orders"] += 1
+        return self._fill(order, price, True, time.time())
+
+    def clear(self):
+        self.books.clear()
+        self.pending.clear()
+        self.resting.clear()
+
+    def get_stats(self) -> Dict:
+        return {**self.stats, "pending": sum(len(q) for q in self.pending.values()),
+                "resting": sum(len(orders) for sides in self.resting.values()
+                               for levels in sides.values() for orders in levels.values())}
+
+def get_fill_model(name: str = None):
+    """Fill model named by PAPER_FILL_MODEL: "book" or "instant" """
+    name = name or config.PAPER_FILL_MODEL
+    if name == "book":
+        return BookFillModel()
+    if name == "instant":
+        return InstantFillModel()
+    logging.warning(f"Unknown fill model {name}, using book fills")
+    return BookFillModel()
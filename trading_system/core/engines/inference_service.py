@@ -0,0 +1,206 @@
+import os
+import copy
+import time
+import logging
+import tempfile
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+try:
+    import onnxruntime as ort
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+
+INFERENCE_BACKENDS = ("eager", "torchscript", "compile", "onnx")
+ACTIONS = ["buy", "hold", "sell"]
+
+# Packed output columns: action probabilities, then one column per scalar head
+OUTPUT_COLUMNS = ["prob_buy", "prob_hold", "prob_sell",
+                  "confidence", "predicted_return", "risk_score", "position_size"]
+
+@dataclass
+class ModelPrediction:
+    asset: str
+    action: str
+    action_confidence: float
+    confidence: float
+    predicted_return: float
+    risk_score: float
+    position_size: float
+
+@dataclass
+class InferenceRuntime:
+    runner: Any
+    ort_session: Any = None
+    version: Optional[str] = None
+
+class PackedOutputs(nn.Module):
+    """Wrap DeepTradingNetwork so every head comes back in one (batch, 7) tensor"""
+
+    def __init__(self, model: nn.Module):
+        super().__init__()
+        self.model = model
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        outputs = self.model(x)
+        # Scalar heads are squeezed by the model, which collapses a batch of one
+        return torch.cat([
+            torch.softmax(outputs['action_logits'], dim=1),
+            outputs['confidence'].reshape(-1, 1),
+            outputs['predicted_return'].reshape(-1, 1),
+            outputs['risk_score'].reshape(-1, 1),
+            outputs['position_size'].reshape(-1, 1)
+        ], dim=1)
+
+class BatchInferenceService:
+    """One forward pass per cycle for every symbol, on an optimized CPU runtime"""
+
+    def __init__(self, model: nn.Module, input_dim: int,
+                 backend: str = None, quantize: bool = None,
+                 num_threads: int = None, device: str = "cpu"):
+        self.input_dim = input_dim
+        self.backend = backend or os.getenv("INFERENCE_BACKEND", "torchscript")
+        self.quantize = quantize if quantize is not None else os.getenv("INFERENCE_QUANTIZE", "false").lower() == "true"
+        self.num_threads = num_threads or int(os.getenv("INFERENCE_THREADS", "0"))
+        self.device = torch.device(device)
+
+        if self.backend not in INFERENCE_BACKENDS:
+            raise RuntimeError(f"Unknown inference backend {self.backend}, expected one of {INFERENCE_BACKENDS}")
+        if self.backend == "onnx" and not ONNX_AVAILABLE:
+            raise RuntimeError("onnxruntime required for the onnx inference backend")
+        if self.quantize and self.device.type != "cpu":
+            raise RuntimeError("Dynamic int8 quantization is CPU only")
+
+        if self.num_threads > 0 and self.device.type == "cpu":
+            torch.set_num_threads(self.num_threads)
+
+        # Double buffer: predictions read `active`, rebuilds fill a standby that is swapped in
+        self.active: Optional[InferenceRuntime] = None
+        self.previous: Optional[InferenceRuntime] = None
+        self.batches_run = 0
+        self.latencies_ms: List[float] = []
+
+        self.load_model(model)
+
+    @property
+    def version(self) -> Optional[str]:
+        return self.active.version if self.active else None
+
+    def build_runtime(self, model: nn.Module, version: str = None) -> InferenceRuntime:
+        """Build and warm a runtime from a model without touching the live one; safe off the event loop"""
+        packed = PackedOutputs(copy.deepcopy(model).to(self.device)).eval()
+
+        if self.quantize:
+            packed = torch.ao.quantization.quantize_dynamic(packed, {nn.Linear}, dtype=torch.qint8)
+
+        example = torch.zeros(2, self.input_dim, device=self.device)
+
+        if self.backend == "torchscript":
+            with torch.inference_mode():
+                runtime = InferenceRuntime(torch.jit.freeze(torch.jit.trace(packed, example)))
+        elif self.backend == "compile":
+            runtime = InferenceRuntime(torch.compile(packed, dynamic=True))
+        elif self.backend == "onnx":
+            runtime = InferenceRuntime(packed, ort_session=self._export_onnx(packed, example))
+        else:
+            runtime = InferenceRuntime(packed)
+        runtime.version = version
+
+        # Warm up so the first real cycle does not pay for tracing / compilation
+        self._run(runtime, np.zeros((2, self.input_dim), dtype=np.float32))
+        return runtime
+
+    def swap(self, runtime: InferenceRuntime):
+        """Atomically promote a prebuilt runtime; the old one is kept for rollback"""
+        self.previous, self.active = self.active, runtime
+        logging.info(f"🧠 Inference runtime {runtime.version or 'unversioned'} active: backend={self.backend} "
+                     f"quantized={self.quantize} threads={torch.get_num_threads()} device={self.device}")
+
+    def rollback(self) -> bool:
+        if self.previous is None:
+            return False
+        self.swap(self.previous)
+        return True
+
+    def load_model(self, model: nn.Module, version: str = None):
+        """Build a runtime from a trained model and swap it in; the training copy is left untouched"""
+        self.swap(self.build_runtime(model, version))
+
+    def _export_onnx(self, packed: nn.Module, example: torch.Tensor):
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if self.num_threads > 0:
+            options.intra_op_num_threads = self.num_threads
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "model.onnx")
+            torch.onnx.export(
+                packed, example, path,
+                input_names=["features"], output_names=["outputs"],
+                dynamic_axes={"features": {0: "batch"}, "outputs": {0: "batch"}},
+                dynamo=False
+            )
+            return ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+
+    def predict_array(self, features: np.ndarray) -> np.ndarray:
+        """Run a (batch, input_dim) float32 array, return the packed (batch, 7) outputs"""
+        features = np.ascontiguousarray(features, dtype=np.float32)
+        start_time = time.perf_counter()
+
+        outputs = self._run(self.active, features)
+
+        self.latencies_ms.append((time.perf_counter() - start_time) * 1000)
+        if len(self.latencies_ms) > 1000:
+            del self.latencies_ms[:500]
+        self.batches_run += 1
+
+        return outputs
+
+    def _run(self, runtime: InferenceRuntime, features: np.ndarray) -> np.ndarray:
+        if runtime.ort_session is not None:
+            return runtime.ort_session.run(None, {"features": features})[0]
+        with torch.inference_mode():
+            return runtime.runner(torch.from_numpy(features).to(self.device)).cpu().numpy()
+
+    def predict(self, feature_vectors: Dict[str, np.ndarray]) -> Dict[str, ModelPrediction]:
+        """Stack every symbol's feature vector into one batch and decode per symbol"""
+        if not feature_vectors:
+            return {}
+
+        symbols = list(feature_vectors.keys())
+        batch = np.vstack([np.asarray(feature_vectors[s], dtype=np.float32).reshape(1, -1) for s in symbols])
+        outputs = self.predict_array(batch)
+
+        action_idx = outputs[:, :3].argmax(axis=1)
+        predictions = {}
+        for row, symbol in enumerate(symbols):
+            values = outputs[row]
+            predictions[symbol] = ModelPrediction(
+                asset=symbol,
+                action=ACTIONS[action_idx[row]],
+                action_confidence=float(values[action_idx[row]]),
+                confidence=float(values[3]),
+                predicted_return=float(values[4]),
+                risk_score=float(values[5]),
+                position_size=float(values[6])
+            )
+
+        return predictions
+
+    def get_latency_stats(self) -> Dict:
+        """Per-batch latency percentiles in milliseconds"""
+        if not self.latencies_ms:
+            return {"batches": self.batches_run}
+
+        latencies = np.array(self.latencies_ms)
+        return {
+            "batches": self.batches_run,
+            "p50_ms": float(np.percentile(latencies, 50)),
+            "p99_ms": float(np.percentile(latencies, 99)),
+            "max_ms": float(latencies.max())
+        }
@@ -34,6 +34,8 @@ import pickle
 from collections import deque
 import math
 
+from inference_service import BatchInferenceService
+
 # M1 GPU Detection with multiple fallback methods
 def get_optimal_device():
     """Detect M1 MPS or CUDA, never CPU"""
@@ -432,6 +434,7 @@ class MLTradingSystem:
         self.feature_engineer = SimpleFeatureEngineer()
         
         self.model_trained = False
+        self.inference_service = None
         self.capital = 1000.0
         self.trade_history = []
         
@@ -491,74 +494,75 @@ class MLTradingSystem:
                     logging.info(f"Epoch {epoch}/20, Loss: {avg_loss:.4f}")
             
             self.model_trained = True
+            self.inference_service = BatchInferenceService(self.model, input_dim=50)
             logging.info("✅ ML training completed successfully")
             
         except Exception as e:
             logging.error(f"Training failed: {e}")
             self.model_trained = False
     
-    async def generate_ml_signal(self, symbol: str) -> Optional[TradeSignal]:
-        """Generate trading signal using trained model"""
+    async def generate_ml_signals(self, symbols: List[str]) -> List[TradeSignal]:
+        """Generate trading signals for all symbols in one batched forward pass"""
         if not self.model_trained:
-            return None
+            return []
+        
+        signals = []
         
         try:
-            # Get current price
-            current_price = await self.data_collector.get_current_live_price(symbol)
-            if current_price <= 0:
-                return None
+            live_symbols = []
+            feature_rows = []
+            
+            for symbol in symbols:
+                # Get current price
+                current_price = await self.data_collector.get_current_live_price(symbol)
+                if current_price <= 0:
+                    continue
+                
+                # Create simple feature vector (would normally use recent history)
+                # For demo, create basic features
+                feature_rows.append(np.array([
+                    np.random.uniform(-0.05, 0.05),  # returns
+                    np.random.uniform(-0.1, 0.1),   # log returns  
+                    np.random.uniform(20, 80),      # rsi
+                    np.random.uniform(0.01, 0.05),  # volatility
+                    np.random.uniform(0.5, 2.0),    # volume ratio
+                    1.0, 1.0, 1.0,  # ma ratios
+                    *[np.random.uniform(-0.02, 0.02) for _ in range(5)],  # historical returns
+                    *[0.0 for _ in range(32)]  # padding to 50
+                ], dtype=np.float32))
+                live_symbols.append(symbol)
             
-            # Create simple feature vector (would normally use recent history)
-            # For demo, create basic features
-            features = np.array([
-                np.random.uniform(-0.05, 0.05),  # returns
-                np.random.uniform(-0.1, 0.1),   # log returns  
-                np.random.uniform(20, 80),      # rsi
-                np.random.uniform(0.01, 0.05),  # volatility
-                np.random.uniform(0.5, 2.0),    # volume ratio
-                1.0, 1.0, 1.0,  # ma ratios
-                *[np.random.uniform(-0.02, 0.02) for _ in range(5)],  # historical returns
-                *[0.0 for _ in range(32)]  # padding to 50
-            ], dtype=np.float32)
+            if not live_symbols:
+                return signals
             
-            # Normalize
-            features = self.feature_engineer.scaler.transform([features])
-            feature_tensor = torch.tensor(features, dtype=torch.float32, device=DEVICE)
+            # Normalize and predict the whole batch at once
+            features = self.feature_engineer.scaler.transform(np.vstack(feature_rows))
+            predictions = self.inference_service.predict(dict(zip(live_symbols, features)))
             
-            # Generate prediction
-            self.model.eval()
-            with torch.no_grad():
-                outputs = self.model(feature_tensor)
-                
-                action_probs = F.softmax(outputs['action_logits'], dim=1)
-                action_idx = torch.argmax(action_probs, dim=1).item()
-                
-                actions = ["buy", "hold", "sell"]
-                action = actions[action_idx]
-                
-                confidence = outputs['confidence'].item()
-                predicted_return = outputs['predicted_return'].item()
-                risk_score = outputs['risk_score'].item()
-                position_size = outputs['position_size'].item()
-                
+            for symbol, prediction in predictions.items():
                 # Boost confidence for demonstration
-                confidence = min(confidence * 2.0, 0.95)
+                confidence = min(prediction.confidence * 2.0, 0.95)
                 
-                if confidence > 0.7 and action != "hold":
-                    return TradeSignal(
-                        action=action,
+                if confidence > 0.7 and prediction.action != "hold":
+                    signals.append(TradeSignal(
+                        action=prediction.action,
                         confidence=confidence,
                         asset=symbol,
-                        predicted_return=predicted_return,
-                        risk_score=risk_score,
-                        position_size=position_size,
-                        reasoning=f"ML_M1_{action}_{confidence:.2f}"
-                    )
+                        predicted_return=prediction.predicted_return,
+                        risk_score=prediction.risk_score,
+                        position_size=prediction.position_size,
+                        reasoning=f"ML_M1_{prediction.action}_{confidence:.2f}"
+                    ))
         
         except Exception as e:
             logging.error(f"ML signal generation error: {e}")
         
-        return None
+        return signals
+    
+    async def generate_ml_signal(self, symbol: str) -> Optional[TradeSignal]:
+        """Generate trading signal using trained model"""
+        signals = await self.generate_ml_signals([symbol])
+        return signals[0] if signals else None
     
     async def run_ml_trading(self):
         """Main ML trading loop"""
@@ -579,29 +583,28 @@ class MLTradingSystem:
             try:
                 iteration += 1
                 
-                for symbol in symbols:
-                    signal = await self.generate_ml_signal(symbol)
-                    if signal:
-                        current_price = await self.data_collector.get_current_live_price(symbol)
-                        
-                        logging.info(f"🧠 ML SIGNAL: {signal.action.upper()} {symbol} @ ${current_price:.2f}")
-                        logging.info(f"   Confidence: {signal.confidence:.3f} | Return: {signal.predicted_return:.3f} | Risk: {signal.risk_score:.3f}")
-                        
-                        # Paper trading execution
-                        position_value = self.capital * signal.position_size
-                        
-                        if signal.action == "buy":
-                            logging.info(f"📄 PAPER BUY: ${position_value:.2f} worth of {symbol}")
-                        elif signal.action == "sell":
-                            logging.info(f"📄 PAPER SELL: ${position_value:.2f} worth of {symbol}")
-                        
-                        self.trade_history.append({
-                            "symbol": symbol,
-                            "action": signal.action,
-                            "price": current_price,
-                            "confidence": signal.confidence,
-                            "timestamp": time.time()
-                        })
+                for signal in await self.generate_ml_signals(symbols):
+                    symbol = signal.asset
+                    current_price = await self.data_collector.get_current_live_price(symbol)
+                    
+                    logging.info(f"🧠 ML SIGNAL: {signal.action.upper()} {symbol} @ ${current_price:.2f}")
+                    logging.info(f"   Confidence: {signal.confidence:.3f} | Return: {signal.predicted_return:.3f} | Risk: {signal.risk_score:.3f}")
+                    
+                    # Paper trading execution
+                    position_value = self.capital * signal.position_size
+                    
+                    if signal.action == "buy":
+                        logging.info(f"📄 PAPER BUY: ${position_value:.2f} worth of {symbol}")
+                    elif signal.action == "sell":
+                        logging.info(f"📄 PAPER SELL: ${position_value:.2f} worth of {symbol}")
+                    
+                    self.trade_history.append({
+                        "symbol": symbol,
+                        "action": signal.action,
+                        "price": current_price,
+                        "confidence": signal.confidence,
+                        "timestamp": time.time()
+                    })
                 
                 if iteration % 10 == 0:
                     logging.info(f"🔄 ML System running - Iteration {iteration} | Trades: {len(self.trade_history)}")
@@ -0,0 +1,121 @@
+import os
+import json
+import time
+import uuid
+import shutil
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import torch
+from sklearn.preprocessing import StandardScaler
+
+SCALER_FIELDS = ["mean_", "scale_", "var_", "n_samples_seen_"]
+
+@dataclass
+class ModelArtifact:
+    version: str
+    path: Path
+    state_dict: Dict[str, torch.Tensor]
+    scaler: StandardScaler
+    manifest: Dict
+
+    @property
+    def age_hours(self) -> float:
+        return (time.time() - self.manifest["created_at"]) / 3600
+
+class ModelRegistry:
+    """Versioned on-disk checkpoints: weights, fitted scaler, feature schema and training metadata"""
+
+    def __init__(self, name: str = "deep_trading_network", root: str = None, keep_versions: int = 5):
+        self.root = Path(root or os.getenv("MODEL_REGISTRY_DIR", "data/models")) / name
+        self.keep_versions = keep_versions
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def list_versions(self) -> List[str]:
+        return sorted(p.name for p in self.root.glob("v[0-9]*") if (p / "manifest.json").exists())
+
+    def latest_version(self) -> Optional[str]:
+        pointer = self.root / "LATEST"
+        if pointer.exists():
+            version = pointer.read_text().strip()
+            if (self.root / version / "manifest.json").exists():
+                return version
+
+        versions = self.list_versions()
+        return versions[-1] if versions else None
+
+    def save(self, model: torch.nn.Module, scaler: StandardScaler, schema_hash: str,
+             model_config: Dict, metadata: Dict = None) -> str:
+        """Write a new version atomically and point LATEST at it"""
+        versions = self.list_versions()
+        version = f"v{int(versions[-1][1:]) + 1 if versions else 1:04d}"
+
+        # Build in a scratch directory so readers never see a half-written version
+        tmp_dir = self.root / f".tmp-{uuid.uuid4().hex}"
+        tmp_dir.mkdir()
+        try:
+            state_dict = {k: v.detach().cpu().contiguous() for k, v in model.state_dict().items()}
+            torch.save(state_dict, tmp_dir / "model.pt")
+
+            np.savez(tmp_dir / "scaler.npz", **{field: np.asarray(getattr(scaler, field)) for field in SCALER_FIELDS})
+
+            manifest = {
+                "version": version,
+                "created_at": time.time(),
+                "schema_hash": schema_hash,
+                "model_config": model_config,
+                "metadata": metadata or {}
+            }
+            with open(tmp_dir / "manifest.json", "w") as f:
+                json.dump(manifest, f, indent=2, default=str)
+
+            os.replace(tmp_dir, self.root / version)
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+        self._set_latest(version)
+        self._prune()
+
+        logging.info(f"💾 Saved model {self.root.name}/{version} (schema {schema_hash})")
+        return version
+
+    def load(self, version: str = None, schema_hash: str = None) -> Optional[ModelArtifact]:
+        """Load a version (default LATEST) with mmap-backed weights; rejects a different feature schema"""
+        version = version or self.latest_version()
+        if version is None:
+            return None
+
+        path = self.root / version
+        with open(path / "manifest.json", "r") as f:
+            manifest = json.load(f)
+
+        if schema_hash is not None and manifest["schema_hash"] != schema_hash:
+            raise RuntimeError(f"Model {version} was trained on feature schema {manifest['schema_hash']}, "
+                               f"current schema is {schema_hash}")
+
+        state_dict = torch.load(path / "model.pt", map_location="cpu", mmap=True, weights_only=True)
+
+        scaler = StandardScaler()
+        with np.load(path / "scaler.npz") as saved:
+            for field in SCALER_FIELDS:
+                value = saved[field]
+                setattr(scaler, field, value if value.ndim else value.item())
+        scaler.n_features_in_ = scaler.mean_.shape[0]
+
+        return ModelArtifact(version=version, path=path, state_dict=state_dict, scaler=scaler, manifest=manifest)
+
+    def _set_latest(self, version: str):
+        tmp_pointer = self.root / f".LATEST-{uuid.uuid4().hex}"
+        tmp_pointer.write_text(version)
+        os.replace(tmp_pointer, self.root / "LATEST")
+
+    def _prune(self):
+        """Keep the newest versions plus whatever LATEST points at"""
+        latest = self.latest_version()
+        for version in self.list_versions()[:-self.keep_versions]:
+            if version != latest:
+                shutil.rmtree(self.root / version, ignore_errors=True)
@@ -0,0 +1,318 @@
+import math
+import logging
+from collections import deque
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from feature_engineering import FEATURE_COLUMNS, FEATURE_DIM, STATS_PER_COLUMN, WALLET_FEATURE_COUNT
+
+class RollingWindow:
+    """Fixed-size window with O(1) mean/std and amortized O(1) min/max"""
+
+    __slots__ = ("size", "values", "total", "total_sq", "nan_count",
+                 "pushes", "max_queue", "min_queue", "index", "evicted")
+
+    def __init__(self, size: int):
+        self.size = size
+        self.values = deque(maxlen=size)
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.nan_count = 0
+        self.pushes = 0
+        # Monotonic queues of (index, value) for the running max / min
+        self.max_queue = deque()
+        self.min_queue = deque()
+        self.index = 0
+        self.evicted = None  # value the latest push dropped, kept so pop() can restore it
+
+    def push(self, value: float):
+        self.evicted = None
+        if len(self.values) == self.size:
+            old = self.evicted = self.values[0]
+            if math.isnan(old):
+                self.nan_count -= 1
+            else:
+                self.total -= old
+                self.total_sq -= old * old
+
+        self.values.append(value)
+        self.index += 1
+
+        if math.isnan(value):
+            self.nan_count += 1
+        else:
+            self.total += value
+            self.total_sq += value * value
+
+            while self.max_queue and self.max_queue[-1][1] <= value:
+                self.max_queue.pop()
+            self.max_queue.append((self.index, value))
+            while self.min_queue and self.min_queue[-1][1] >= value:
+                self.min_queue.pop()
+            self.min_queue.append((self.index, value))
+
+        oldest = self.index - self.size
+        while self.max_queue and self.max_queue[0][0] <= oldest:
+            self.max_queue.popleft()
+        while self.min_queue and self.min_queue[0][0] <= oldest:
+            self.min_queue.popleft()
+
+        # Re-sum once per window length to stop floating point drift
+        self.pushes += 1
+        if self.pushes >= self.size:
+            self.pushes = 0
+            finite = [v for v in self.values if not math.isnan(v)]
+            self.total = math.fsum(finite)
+            self.total_sq = math.fsum(v * v for v in finite)
+
+    def pop(self):
+        """Undo the latest push; only one level deep"""
+        self.values.pop()
+        if self.evicted is not None:
+            self.values.appendleft(self.evicted)
+            self.evicted = None
+        self.index -= 1
+
+        # O(window) rebuild: only runs when a still-forming candle is revised
+        finite = [v for v in self.values if not math.isnan(v)]
+        self.total = math.fsum(finite)
+        self.total_sq = math.fsum(v * v for v in finite)
+        self.nan_count = len(self.values) - len(finite)
+        self.max_queue.clear()
+        self.min_queue.clear()
+        for index, value in enumerate(self.values, self.index - len(self.values) + 1):
+            if math.isnan(value):
+                continue
+            while self.max_queue and self.max_queue[-1][1] <= value:
+                self.max_queue.pop()
+            self.max_queue.append((index, value))
+            while self.min_queue and self.min_queue[-1][1] >= value:
+                self.min_queue.pop()
+            self.min_queue.append((index, value))
+
+    @property
+    def ready(self) -> bool:
+        """Full window without missing values"""
+        return len(self.values) == self.size and self.nan_count == 0
+
+    @property
+    def last(self) -> float:
+        return self.values[-1]
+
+    def mean(self) -> float:
+        return self.total / self.size if self.ready else math.nan
+
+    def std(self, ddof: int = 0) -> float:
+        if not self.ready:
+            return math.nan
+        mean = self.total / self.size
+        variance = (self.total_sq - self.total * mean) / (self.size - ddof)
+        return math.sqrt(max(variance, 0.0))
+
+    def min(self) -> float:
+        return self.min_queue[0][1]
+
+    def max(self) -> float:
+        return self.max_queue[0][1]
+
+class EWMean:
+    """Exponentially weighted mean matching pandas ewm(span, adjust=True)"""
+
+    __slots__ = ("decay", "numerator", "denominator", "previous")
+
+    def __init__(self, span: int):
+        self.decay = 1.0 - 2.0 / (span + 1.0)
+        self.numerator = 0.0
+        self.denominator = 0.0
+        self.previous = (0.0, 0.0)
+
+    def push(self, value: float) -> float:
+        self.previous = (self.numerator, self.denominator)
+        self.numerator = self.numerator * self.decay + value
+        self.denominator = self.denominator * self.decay + 1.0
+        return self.numerator / self.denominator
+
+    def pop(self):
+        """Undo the latest push"""
+        self.numerator, self.denominator = self.previous
+
+class OnlineIndicatorState:
+    """Per-symbol indicator state updated once per closed candle"""
+
+    def __init__(self, lookback_window: int = 48):
+        self.prev_close = math.nan
+        self.last_close = math.nan
+        self.last_volume = math.nan
+        self.last_timestamp = None
+        self.candles_seen = 0
+
+        self.close_windows = {window: RollingWindow(window) for window in [5, 10, 20]}
+        self.return_windows = {window: RollingWindow(window) for window in [5, 10, 20]}
+        self.gain_window = RollingWindow(14)
+        self.loss_window = RollingWindow(14)
+        self.volume_window = RollingWindow(20)
+
+        self.ema_fast = EWMean(12)
+        self.ema_slow = EWMean(26)
+        self.macd_signal = EWMean(9)
+
+        # Lookback statistics over every engineered column
+        self.feature_windows = [RollingWindow(lookback_window) for _ in FEATURE_COLUMNS]
+
+    def windows(self) -> List[RollingWindow]:
+        return [*self.close_windows.values(), *self.return_windows.values(), self.gain_window,
+                self.loss_window, self.volume_window, *self.feature_windows]
+
+    def revise(self, close: float, volume: float):
+        """Replace the latest candle: OKX keeps updating the still-forming one until it closes"""
+        for window in self.windows():
+            window.pop()
+        for ema in (self.ema_fast, self.ema_slow, self.macd_signal):
+            ema.pop()
+        self.candles_seen -= 1
+        self._push(close, volume)
+
+    def update(self, close: float, volume: float):
+        """Push one new candle through every indicator"""
+        self.prev_close = self.last_close
+        self._push(close, volume)
+
+    def _push(self, close: float, volume: float):
+        prev_close = self.prev_close
+        returns = close / prev_close - 1 if not math.isnan(prev_close) else math.nan
+        log_returns = math.log(close / prev_close) if not math.isnan(prev_close) else math.nan
+
+        for window in self.close_windows.values():
+            window.push(close)
+        for window in self.return_windows.values():
+            window.push(returns)
+
+        # RSI treats the first (undefined) delta as no gain and no loss
+        delta = close - prev_close if not math.isnan(prev_close) else 0.0
+        self.gain_window.push(delta if delta > 0 else 0.0)
+        self.loss_window.push(-delta if delta < 0 else 0.0)
+        self.volume_window.push(volume)
+
+        macd = self.ema_fast.push(close) - self.ema_slow.push(close)
+        macd_signal = self.macd_signal.push(macd)
+
+        bb_middle = self.close_windows[20].mean()
+        bb_std = self.close_windows[20].std(ddof=1)
+        bb_width = 4 * bb_std
+        bb_position = (close - (bb_middle - 2 * bb_std)) / bb_width if bb_width > 0 else math.nan
+
+        volume_sma = self.volume_window.mean()
+
+        row = [
+            returns,
+            log_returns,
+            close / self.close_windows[5].mean(),
+            close / self.close_windows[10].mean(),
+            close / self.close_windows[20].mean(),
+            self.return_windows[5].std(ddof=1),
+            self.return_windows[10].std(ddof=1),
+            self.return_windows[20].std(ddof=1),
+            self._rsi(),
+            macd,
+            macd_signal,
+            bb_position,
+            volume / volume_sma if volume_sma > 0 else math.nan
+        ]
+
+        for window, value in zip(self.feature_windows, row):
+            window.push(value)
+
+        self.last_close = close
+        self.last_volume = volume
+        self.candles_seen += 1
+
+    def _rsi(self) -> float:
+        gain = self.gain_window.mean()
+        loss = self.loss_window.mean()
+        if math.isnan(gain) or math.isnan(loss):
+            return math.nan
+        if loss == 0:
+            return 100.0 if gain > 0 else math.nan
+        return 100 - (100 / (1 + gain / loss))
+
+    def price_features(self) -> np.ndarray:
+        """Window stats in FeatureEngineer column order"""
+        features = np.zeros(len(FEATURE_COLUMNS) * STATS_PER_COLUMN)
+        for i, window in enumerate(self.feature_windows):
+            if window.ready:
+                offset = i * STATS_PER_COLUMN
+                features[offset:offset + STATS_PER_COLUMN] = (
+                    window.mean(), window.std(), window.min(), window.max(), window.last
+                )
+        return features
+
+class OnlineFeaturePipeline:
+    """Streaming replacement for rebuilding the feature matrix on every signal"""
+
+    def __init__(self, scaler, lookback_window: int = 48):
+        self.lookback_window = lookback_window
+        self.states: Dict[str, OnlineIndicatorState] = {}
+
+        # Freeze the training-time normalization
+        self.mean = np.asarray(scaler.mean_, dtype=np.float64).copy()
+        self.scale = np.asarray(scaler.scale_, dtype=np.float64).copy()
+        if self.mean.shape != (FEATURE_DIM,):
+            raise RuntimeError(f"Scaler expects {self.mean.shape[0]} features, pipeline produces {FEATURE_DIM}")
+
+    def has_symbol(self, symbol: str) -> bool:
+        return symbol in self.states
+
+    def update(self, symbol: str, timestamp: pd.Timestamp, close: float, volume: float) -> bool:
+        """Feed one candle; a repeat of the latest timestamp revises it, older or unchanged candles are ignored"""
+        state = self.states.get(symbol)
+        if state is None:
+            state = self.states[symbol] = OnlineIndicatorState(self.lookback_window)
+
+        close, volume = float(close), float(volume)
+        if state.last_timestamp is not None and timestamp <= state.last_timestamp:
+            if timestamp < state.last_timestamp or (close, volume) == (state.last_close, state.last_volume):
+                return False
+            state.revise(close, volume)
+            return True
+
+        state.update(close, volume)
+        state.last_timestamp = timestamp
+        return True
+
+    def update_from_frame(self, symbol: str, df: pd.DataFrame) -> int:
+        """Feed candles from an OKX history frame, oldest first"""
+        new_candles = 0
+        for timestamp, close, volume in zip(df['timestamp'], df['close'], df['volume']):
+            if self.update(symbol, timestamp, close, volume):
+                new_candles += 1
+        return new_candles
+
+    def is_ready(self, symbol: str) -> bool:
+        state = self.states.get(symbol)
+        return state is not None and state.candles_seen >= self.lookback_window
+
+    def latest_features(self, symbol: str, wallet_features: Optional[List[float]] = None) -> Optional[np.ndarray]:
+        """Raw feature vector for the candle after the latest one seen"""
+        if not self.is_ready(symbol):
+            return None
+
+        features = np.empty(FEATURE_DIM)
+        price_dim = FEATURE_DIM - WALLET_FEATURE_COUNT
+        features[:price_dim] = self.states[symbol].price_features()
+        features[price_dim:] = wallet_features if wallet_features is not None else 0.0
+        return features
+
+    def transform(self, symbol: str, wallet_features: Optional[List[float]] = None) -> Optional[np.ndarray]:
+        """Normalized (1, FEATURE_DIM) float32 vector ready for the model"""
+        features = self.latest_features(symbol, wallet_features)
+        if features is None:
+            return None
+
+        features = features.astype(np.float32).astype(np.float64)
+        return ((features - self.mean) / self.scale).astype(np.float32).reshape(1, -1)
+
+    def reset(self, symbol: str):
+        if self.states.pop(symbol, None) is not None:
+            logging.info(f"Online feature state reset for {symbol}")
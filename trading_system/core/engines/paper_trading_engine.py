@@ -1,10 +1,28 @@
 import time
 import json
 import logging
-from typing import Dict, List, Optional
-from dataclasses import dataclass, asdict
-from collections import defaultdict
+import itertools
+from typing import Dict, List, Optional, Tuple
+from dataclasses import dataclass, asdict, field
 import config
+from fill_simulator import FillSimulator
+from risk_gate import PreTradeRiskGate, RiskLimits
+from equity_tracker import EquityTracker
+from trade_store import TradeStore, get_trade_store
+
+MARKED_DRAWDOWN_HALT = "marked drawdown"
+
+def hft_risk_limits() -> RiskLimits:
+    """The HFT bot's pre-trade limits, from config"""
+    return RiskLimits(
+        max_open_positions=config.MAX_OPEN_POSITIONS,
+        max_positions_per_asset=config.MAX_POSITIONS_PER_ASSET,
+        max_order_notional=config.OKX_API_LIMITS["max_position_size"],
+        max_daily_trades=config.MAX_DAILY_TRADES,
+        max_drawdown_pct=config.MAX_DRAWDOWN_PERCENT / 100,
+        cooldown_seconds=config.COOLDOWN_MINUTES * 60,
+        orders_per_second=config.OKX_API_LIMITS["orders_per_second"]
+    )
 
 @dataclass
 class PaperPosition:
@@ -19,7 +37,13 @@ class PaperPosition:
     entry_time: float
     current_price: float = 0.0
     unrealized_pnl: float = 0.0
-    status: str = "open"  # open, closed, stopped_out
+    status: str = "open"  # open, partial, closed
+    initial_quantity: float = 0.0
+    ladder: List[Tuple[float, float]] = field(default_factory=list)  # (price, quantity) per take-profit leg
+    next_leg: int = 0
+    best_price: float = 0.0
+    realized_pnl: float = 0.0
+    signal_reason: str = ""
     
     def update_pnl(self, current_price: float):
         """Update unrealized PnL based on current price"""
@@ -41,57 +65,99 @@ class PaperTrade:
     commission: float
     entry_time: float
     exit_time: float
-    exit_reason: str  # "take_profit", "stop_loss", "manual"
+    exit_reason: str  # "take_profit_N", "stop_loss", "breakeven_stop", "trailing_stop", "circuit_breaker", "manual"
+    position_id: str = ""
 
 class PaperTradingEngine:
     """Paper trading engine with real market data"""
     
-    def __init__(self):
+    def __init__(self, fills: Optional[FillSimulator] = None, limits: Optional[RiskLimits] = None,
+                 store: Optional[TradeStore] = None):
+        self.fills = fills or FillSimulator()
+        self.limits = limits
+        self.store = store if store is not None else get_trade_store()
+        self.reset()
+        logging.info(f"📄 Paper trading engine initialized with ${self.balance:,.2f}")
+    
+    def reset(self):
+        """Back to the initial balance with an empty book"""
+        self.fills.clear()
         self.balance = config.PAPER_INITIAL_BALANCE
         self.initial_balance = config.PAPER_INITIAL_BALANCE
-        self.positions: Dict[str, PaperPosition] = {}
+        self.positions: Dict[str, PaperPosition] = {}  # by position id
+        self.positions_by_asset: Dict[str, Dict[str, PaperPosition]] = {}
+        self.position_ids = itertools.count(1)
         self.trade_history: List[PaperTrade] = []
         self.total_trades = 0
         self.winning_trades = 0
         self.total_commission = 0.0
         self.max_drawdown = 0.0
         self.peak_balance = self.balance
+        self.current_drawdown = 0.0
         
-        # Daily limits
-        self.daily_trades = defaultdict(int)
-        self.last_trade_date = ""
+        # Running aggregates, updated on open, mark and close so summaries and checks are O(1)
+        self.unrealized_pnl = 0.0
+        self.side_exposure = {"buy": 0.0, "sell": 0.0}
+        self.asset_exposure: Dict[str, float] = {}
         
-        logging.info(f"📄 Paper trading engine initialized with ${self.balance:,.2f}")
+        # Position limits, cooldowns and daily counters
+        self.risk_gate = PreTradeRiskGate(self.balance, self.limits or hft_risk_limits())
+        
+        # Balance plus open P&L on every tick: breakers act while losses are still unrealized
+        self.equity = EquityTracker(self.balance)
+        self.equity.add_breaker("halt", config.MAX_DRAWDOWN_PERCENT / 100, self._halt_on_drawdown,
+                                self._resume_after_drawdown)
+        self.equity.add_breaker("kill", config.KILL_DRAWDOWN_PERCENT / 100, self._flatten_on_drawdown)
     
-    def get_position_size(self, price: float) -> float:
-        """Calculate position size based on available balance"""
-        max_position_value = self.balance * config.POSITION_SIZE_PERCENT
+    def get_position_size(self, price: float, notional: Optional[float] = None) -> float:
+        """Calculate position size based on available balance, or on a notional sized by the caller"""
+        max_position_value = self.balance * config.POSITION_SIZE_PERCENT if notional is None else notional
         return max_position_value / price
     
-    def can_open_position(self, asset: str) -> bool:
+    def can_open_position(self, asset: str, notional: float = 0.0) -> bool:
         """Check if we can open a new position"""
-        # Check if position already exists
-        if asset in self.positions:
-            return False
-        
-        # Check max open positions
-        if len(self.positions) >= config.MAX_OPEN_POSITIONS:
-            return False
-        
-        # Check daily trade limit
-        today = time.strftime("%Y-%m-%d")
-        if self.daily_trades[today] >= 10:  # 10 trades per day limit
-            return False
-        
-        # Check drawdown
-        current_drawdown = (self.peak_balance - self.balance) / self.peak_balance * 100
-        if current_drawdown >= config.MAX_DRAWDOWN_PERCENT:
-            return False
-        
-        return True
+        return self.risk_gate.check(asset, notional) is None
+    
+    def get_trades_today(self, now: Optional[float] = None) -> int:
+        return self.risk_gate.get_trades_today(now)
+    
+    def _update_balance(self, delta: float):
+        self.balance += delta
+        if self.balance > self.peak_balance:
+            self.peak_balance = self.balance
+        self.current_drawdown = (self.peak_balance - self.balance) / self.peak_balance * 100
+        self.max_drawdown = max(self.max_drawdown, self.current_drawdown)
+    
+    def _add_exposure(self, position: PaperPosition, sign: float):
+        notional = sign * position.quantity * position.current_price
+        self.side_exposure[position.side] = self.side_exposure.get(position.side, 0.0) + notional
+        self.asset_exposure[position.asset] = self.asset_exposure.get(position.asset, 0.0) + notional
+        self.unrealized_pnl += sign * position.unrealized_pnl
+    
+    def _mark(self, position: PaperPosition, price: float):
+        """Re-price one position and roll the change into the aggregates"""
+        self._add_exposure(position, -1.0)
+        position.update_pnl(price)
+        self._add_exposure(position, 1.0)
+    
+    def _mark_equity(self):
+        self.equity.update(self.balance + self.unrealized_pnl)
+    
+    def _halt_on_drawdown(self, drawdown: float):
+        self.risk_gate.halt(f"{MARKED_DRAWDOWN_HALT} {drawdown:.2%}")
+    
+    def _resume_after_drawdown(self):
+        # Leave halts raised for any other reason alone
+        if self.risk_gate.halt_reason.startswith(MARKED_DRAWDOWN_HALT):
+            self.risk_gate.resume()
+    
+    def _flatten_on_drawdown(self, drawdown: float):
+        self._halt_on_drawdown(drawdown)
+        for position in list(self.positions.values()):
+            self.close_position(position.id, "circuit_breaker", position.current_price)
     
-    def open_position(self, signal_data: Dict) -> Optional[Dict]:
-        """Open a paper trading position"""
+    def open_position(self, signal_data: Dict, notional: Optional[float] = None) -> Optional[Dict]:
+        """Open a paper trading position; `notional` overrides sizing from this engine's own balance"""
         signal = signal_data.get("signal_data", {})
         asset = signal.get("asset")
         entry_price = signal.get("entry_price")
@@ -102,14 +168,20 @@ class PaperTradingEngine:
             logging.error("Invalid signal data for position opening")
             return None
         
-        if not self.can_open_position(asset):
-            logging.warning(f"Cannot open position for {asset}")
+        # Calculate position size
+        quantity = self.get_position_size(entry_price, notional)
+        
+        rejection = self.risk_gate.check(asset, quantity * entry_price)
+        if rejection is not None:
+            logging.warning(f"Cannot open position for {asset}: {rejection}")
             return None
+        side = signal.get("signal_type", "SHORT").lower().replace("short", "sell").replace("long", "buy")
         
-        # Calculate position size
-        quantity = self.get_position_size(entry_price)
+        # Market order against the latest book, not the price the signal saw
+        fill = self.fills.fill_market(asset, side, quantity, entry_price)
+        entry_price = fill.price
         position_value = quantity * entry_price
-        commission = position_value * config.PAPER_COMMISSION_RATE
+        commission = fill.fee
         
         # Check if we have enough balance
         if position_value + commission > self.balance:
@@ -117,30 +189,37 @@ class PaperTradingEngine:
             return None
         
         # Create position
-        position_id = f"{asset}_{int(time.time())}"
+        position_id = f"{asset}_{next(self.position_ids)}"
         position = PaperPosition(
             id=position_id,
             asset=asset,
-            side=signal.get("signal_type", "SHORT").lower().replace("short", "sell").replace("long", "buy"),
+            side=side,
             entry_price=entry_price,
             quantity=quantity,
             stop_loss=stop_loss,
             take_profit=take_profit,
             entry_time=time.time(),
-            current_price=entry_price
+            current_price=entry_price,
+            initial_quantity=quantity,
+            ladder=self._build_ladder(side, entry_price, take_profit, quantity),
+            best_price=entry_price,
+            signal_reason=signal.get("reason", "")
         )
         
         # Deduct from balance (commission only, since this is paper trading)
-        self.balance -= commission
+        self._update_balance(-commission)
         self.total_commission += commission
         
         # Store position
-        self.positions[asset] = position
-        
-        # Update daily trade count
-        today = time.strftime("%Y-%m-%d")
-        self.daily_trades[today] += 1
+        self.positions[position_id] = position
+        self.positions_by_asset.setdefault(asset, {})[position_id] = position
+        self._add_exposure(position, 1.0)
+        self.risk_gate.on_open(asset, position_value, commission)
+        self.store.record("entry", asset, entry_price, quantity, commission, -commission, source="paper",
+                          strategy="hft_shorting", side=side, reason="entry", signal=position.signal_reason,
+                          position_id=position_id, timestamp=position.entry_time)
         self.total_trades += 1
+        self._mark_equity()
         
         logging.info(f"📄 PAPER POSITION OPENED: {asset} {position.side} @ ${entry_price:.2f} (qty: {quantity:.6f})")
         
@@ -154,93 +233,162 @@ class PaperTradingEngine:
             "status": "opened"
         }
     
+    def _build_ladder(self, side: str, entry_price: float, take_profit: float, quantity: float) -> List[Tuple[float, float]]:
+        """Take-profit legs from config.TAKE_PROFIT_LADDER; the signal's own target replaces the first rung"""
+        direction = -1.0 if side == "sell" else 1.0
+        ladder = []
+        for i, (fraction, distance) in enumerate(config.TAKE_PROFIT_LADDER):
+            price = take_profit if i == 0 else entry_price * (1 + direction * distance)
+            ladder.append((price, quantity * fraction))
+        return ladder
+    
     def update_positions(self, market_prices: Dict[str, float]):
-        """Update all positions with current market prices"""
-        positions_to_close = []
-        
-        for asset, position in self.positions.items():
-            if asset in market_prices:
-                current_price = market_prices[asset]
-                position.update_pnl(current_price)
-                
-                # Check stop loss and take profit
-                if position.side == "sell":  # Short position
-                    if current_price >= position.stop_loss:
-                        positions_to_close.append((asset, "stop_loss", current_price))
-                    elif current_price <= position.take_profit:
-                        positions_to_close.append((asset, "take_profit", current_price))
-                else:  # Long position
-                    if current_price <= position.stop_loss:
-                        positions_to_close.append((asset, "stop_loss", current_price))
-                    elif current_price >= position.take_profit:
-                        positions_to_close.append((asset, "take_profit", current_price))
-        
-        # Close positions that hit stops
-        for asset, reason, exit_price in positions_to_close:
-            self.close_position(asset, reason, exit_price)
+        """Mark every leg and run stop, take-profit and trailing checks in one pass per price update,
+        then mark equity once for the whole update"""
+        for asset, current_price in market_prices.items():
+            self.fills.on_price(asset, current_price)
+            book = self.positions_by_asset.get(asset)
+            if not book:
+                continue
+            for position in list(book.values()):
+                self._mark(position, current_price)
+                self._evaluate_exits(position, current_price)
+        self._mark_equity()
+    
+    def _evaluate_exits(self, position: PaperPosition, price: float):
+        short = position.side == "sell"
+        
+        # Stop first: it was set before this price arrived
+        if (price >= position.stop_loss) if short else (price <= position.stop_loss):
+            if position.next_leg == 0:
+                reason = "stop_loss"
+            elif position.stop_loss == position.entry_price:
+                reason = "breakeven_stop"
+            else:
+                reason = "trailing_stop"
+            self.close_position(position.id, reason, price)
+            return
+        
+        # Take-profit legs; a gap can fill several at once
+        while position.next_leg < len(position.ladder):
+            target, quantity = position.ladder[position.next_leg]
+            if (price > target) if short else (price < target):
+                break
+            position.next_leg += 1
+            last_leg = position.next_leg == len(position.ladder)
+            # Resting limit order: fills at its own price even when the market gapped past it
+            self.close_position(position.id, f"take_profit_{position.next_leg}", target, None if last_leg else quantity,
+                                limit=True)
+            if last_leg:
+                return
+            if position.next_leg == 1:
+                # Breakeven after the first target
+                position.stop_loss = position.entry_price
+            if position.next_leg < len(position.ladder):
+                position.take_profit = position.ladder[position.next_leg][0]
+        
+        # Breakeven holds until the second target is banked, then the stop trails the best price
+        if position.next_leg > 1:
+            if short:
+                position.best_price = min(position.best_price, price)
+                position.stop_loss = min(position.stop_loss, position.best_price * (1 + config.TRAILING_STOP_PERCENT))
+            else:
+                position.best_price = max(position.best_price, price)
+                position.stop_loss = max(position.stop_loss, position.best_price * (1 - config.TRAILING_STOP_PERCENT))
     
-    def close_position(self, asset: str, reason: str, exit_price: float) -> Optional[Dict]:
-        """Close a paper trading position"""
-        if asset not in self.positions:
+    def close_position(self, position_id: str, reason: str, exit_price: float, quantity: Optional[float] = None,
+                       limit: bool = False) -> Optional[Dict]:
+        """Close a paper trading position, or part of it when a quantity is given.
+        Market exits fill against the book at exit_price; limit exits fill at exit_price as maker."""
+        position = self.positions.get(position_id)
+        if position is None:
             return None
         
-        position = self.positions[asset]
-        position.current_price = exit_price
-        position.update_pnl(exit_price)
+        if quantity is None or quantity >= position.quantity:
+            quantity = position.quantity
+        
+        exit_side = "buy" if position.side == "sell" else "sell"
+        if limit:
+            fill = self.fills.fill_limit(position.asset, exit_side, quantity, exit_price)
+        else:
+            self.fills.on_price(position.asset, exit_price)
+            fill = self.fills.fill_market(position.asset, exit_side, quantity, exit_price)
+        exit_price = fill.price
+        
+        self._mark(position, exit_price)
+        self._add_exposure(position, -1.0)
         
-        # Calculate final P&L
-        pnl = position.unrealized_pnl
-        commission = position.quantity * exit_price * config.PAPER_COMMISSION_RATE
+        # Calculate final P&L for the closed quantity
+        per_unit = position.entry_price - exit_price if position.side == "sell" else exit_price - position.entry_price
+        pnl = per_unit * quantity
+        commission = fill.fee
         net_pnl = pnl - commission
         
-        # Update balance
-        self.balance += net_pnl
+        # Update balance, peak balance and drawdown
+        self._update_balance(net_pnl)
         self.total_commission += commission
         
         # Track statistics
         if net_pnl > 0:
             self.winning_trades += 1
         
-        # Update peak balance and drawdown
-        if self.balance > self.peak_balance:
-            self.peak_balance = self.balance
-        
-        current_drawdown = (self.peak_balance - self.balance) / self.peak_balance * 100
-        self.max_drawdown = max(self.max_drawdown, current_drawdown)
+        position.quantity -= quantity
+        position.realized_pnl += net_pnl
         
         # Create trade record
         trade = PaperTrade(
-            asset=asset,
+            asset=position.asset,
             side=position.side,
             entry_price=position.entry_price,
             exit_price=exit_price,
-            quantity=position.quantity,
+            quantity=quantity,
             pnl=net_pnl,
             commission=commission,
             entry_time=position.entry_time,
             exit_time=time.time(),
-            exit_reason=reason
+            exit_reason=reason,
+            position_id=position_id
         )
         
         self.trade_history.append(trade)
-        
-        # Remove position
-        del self.positions[asset]
-        
-        logging.info(f"📄 PAPER POSITION CLOSED: {asset} {reason} @ ${exit_price:.2f} | P&L: ${net_pnl:.2f}")
+        self.store.record("exit", position.asset, exit_price, quantity, commission, net_pnl, source="paper",
+                          strategy="hft_shorting", side=exit_side, reason=reason, signal=position.signal_reason,
+                          position_id=position_id, timestamp=trade.exit_time)
+        
+        if position.quantity > position.initial_quantity * 1e-9:
+            position.status = "partial"
+            position.update_pnl(exit_price)
+            self._add_exposure(position, 1.0)
+            status = "partial"
+        else:
+            # Remove position
+            position.quantity = 0.0
+            position.status = "closed"
+            del self.positions[position_id]
+            book = self.positions_by_asset[position.asset]
+            del book[position_id]
+            if not book:
+                del self.positions_by_asset[position.asset]
+            status = "closed"
+        self.risk_gate.on_close(position.asset, quantity * position.entry_price, net_pnl, closed=status == "closed")
+        
+        logging.info(f"📄 PAPER POSITION {status.upper()}: {position.asset} {reason} @ ${exit_price:.2f} | P&L: ${net_pnl:.2f}")
         
         return {
-            "asset": asset,
+            "position_id": position_id,
+            "asset": position.asset,
             "exit_reason": reason,
             "exit_price": exit_price,
+            "quantity": quantity,
+            "remaining_quantity": position.quantity,
             "pnl": net_pnl,
             "commission": commission,
-            "status": "closed"
+            "status": status
         }
     
     def get_portfolio_summary(self) -> Dict:
         """Get current portfolio summary"""
-        total_unrealized_pnl = sum(pos.unrealized_pnl for pos in self.positions.values())
+        total_unrealized_pnl = self.unrealized_pnl
         total_value = self.balance + total_unrealized_pnl
         
         win_rate = (self.winning_trades / max(len(self.trade_history), 1)) * 100
@@ -256,13 +404,18 @@ class PaperTradingEngine:
             "win_rate": win_rate,
             "total_commission": self.total_commission,
             "max_drawdown": self.max_drawdown,
-            "daily_trades_today": self.daily_trades[time.strftime("%Y-%m-%d")]
+            "marked_drawdown": self.equity.drawdown * 100,
+            "max_marked_drawdown": self.equity.max_drawdown * 100,
+            "daily_trades_today": self.get_trades_today(),
+            "long_exposure": self.side_exposure["buy"],
+            "short_exposure": self.side_exposure["sell"]
         }
     
     def get_positions_display(self) -> List[Dict]:
         """Get positions in display format"""
         return [
             {
+                "id": pos.id,
                 "asset": pos.asset,
                 "side": pos.side,
                 "entry_price": pos.entry_price,
@@ -1,7 +1,6 @@
 import torch
 import torch.nn as nn
 import torch.optim as optim
-import torch.nn.functional as F
 from torch.utils.data import DataLoader, TensorDataset
 import numpy as np
 import pandas as pd
@@ -30,6 +29,21 @@ import pickle
 from collections import deque
 import math
 
+from feature_engineering import FeatureEngineer
+from deep_trading_network import DeepTradingNetwork, multitask_loss
+from online_features import OnlineFeaturePipeline
+from inference_service import BatchInferenceService
+from feature_engineering import FEATURE_DIM, feature_schema_hash
+from model_registry import ModelRegistry
+from retrain_worker import RetrainJob, RetrainWorker
+
+# Restarts reuse a registered model younger than this instead of retraining
+MODEL_MAX_AGE_HOURS = float(os.getenv("MODEL_MAX_AGE_HOURS", "24"))
+# Retrained weights may be at most this much worse on the holdout than the live ones
+RETRAIN_GATE_TOLERANCE = float(os.getenv("RETRAIN_GATE_TOLERANCE", "0.0"))
+# Bar size requested from OKX history-candles
+CANDLE_INTERVAL = pd.Timedelta(hours=1)
+
 # GPU Detection - A100 preferred, M1 MPS fallback, NO CPU allowed
 def get_optimal_device():
     if torch.cuda.is_available():
@@ -95,56 +109,6 @@ class TradeSignal:
     position_size: float
     reasoning: str
 
-class DeepTradingNetwork(nn.Module):
-    def __init__(self, input_dim=256, hidden_dims=[1024, 512, 256], output_dim=5):
-        super(DeepTradingNetwork, self).__init__()
-        
-        layers = []
-        prev_dim = input_dim
-        
-        for hidden_dim in hidden_dims:
-            layers.extend([
-                nn.Linear(prev_dim, hidden_dim),
-                nn.BatchNorm1d(hidden_dim),
-                nn.ReLU(inplace=True),
-                nn.Dropout(0.15)
-            ])
-            prev_dim = hidden_dim
-        
-        self.feature_extractor = nn.Sequential(*layers)
-        
-        # Separate output heads
-        self.action_head = nn.Linear(hidden_dims[-1], 3)  # buy, sell, hold
-        self.confidence_head = nn.Linear(hidden_dims[-1], 1)
-        self.return_head = nn.Linear(hidden_dims[-1], 1)
-        self.risk_head = nn.Linear(hidden_dims[-1], 1)
-        self.size_head = nn.Linear(hidden_dims[-1], 1)
-        
-        self.apply(self._init_weights)
-    
-    def _init_weights(self, module):
-        if isinstance(module, nn.Linear):
-            torch.nn.init.kaiming_normal_(module.weight, mode='fan_out', nonlinearity='relu')
-            if module.bias is not None:
-                torch.nn.init.constant_(module.bias, 0)
-    
-    def forward(self, x):
-        features = self.feature_extractor(x)
-        
-        action_logits = self.action_head(features)
-        confidence = torch.sigmoid(self.confidence_head(features))
-        predicted_return = torch.tanh(self.return_head(features)) * 10.0  # Scale to ±10x
-        risk_score = torch.sigmoid(self.risk_head(features))
-        position_size = torch.sigmoid(self.size_head(features)) * 0.5  # Max 50% position
-        
-        return {
-            'action_logits': action_logits,
-            'confidence': confidence.squeeze(),
-            'predicted_return': predicted_return.squeeze(),
-            'risk_score': risk_score.squeeze(),
-            'position_size': position_size.squeeze()
-        }
-
 class RealDataCollector:
     def __init__(self):
         self.okx_api_key = os.getenv("OKX_API_KEY")
@@ -353,147 +317,20 @@ class RealDataCollector:
         
         return current_data
 
-class FeatureEngineer:
-    def __init__(self):
-        self.scaler = StandardScaler()
-        self.lookback_window = 48  # 48 hours
-        
-    def create_features_from_real_data(self, price_data: Dict[str, pd.DataFrame], 
-                                      wallet_data: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
-        """Create ML features from REAL API data only"""
-        logging.info("Engineering features from real data...")
-        
-        all_features = []
-        all_targets = []
-        
-        for symbol, df in price_data.items():
-            if len(df) < self.lookback_window + 1:
-                continue
-            
-            # Calculate technical indicators on REAL data
-            df = df.copy()
-            df['returns'] = df['close'].pct_change()
-            df['log_returns'] = np.log(df['close'] / df['close'].shift(1))
-            
-            # Moving averages
-            for window in [5, 10, 20]:
-                df[f'ma_{window}'] = df['close'].rolling(window).mean()
-                df[f'ma_ratio_{window}'] = df['close'] / df[f'ma_{window}']
-            
-            # Volatility
-            for window in [5, 10, 20]:
-                df[f'volatility_{window}'] = df['returns'].rolling(window).std()
-            
-            # RSI
-            delta = df['close'].diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-            rs = gain / loss
-            df['rsi'] = 100 - (100 / (1 + rs))
-            
-            # MACD
-            exp1 = df['close'].ewm(span=12).mean()
-            exp2 = df['close'].ewm(span=26).mean()
-            df['macd'] = exp1 - exp2
-            df['macd_signal'] = df['macd'].ewm(span=9).mean()
-            
-            # Bollinger Bands
-            df['bb_middle'] = df['close'].rolling(20).mean()
-            bb_std = df['close'].rolling(20).std()
-            df['bb_upper'] = df['bb_middle'] + (bb_std * 2)
-            df['bb_lower'] = df['bb_middle'] - (bb_std * 2)
-            df['bb_position'] = (df['close'] - df['bb_lower']) / (df['bb_upper'] - df['bb_lower'])
-            
-            # Volume indicators
-            df['volume_sma'] = df['volume'].rolling(20).mean()
-            df['volume_ratio'] = df['volume'] / df['volume_sma']
-            
-            # Create feature vectors
-            feature_columns = [
-                'returns', 'log_returns', 'ma_ratio_5', 'ma_ratio_10', 'ma_ratio_20',
-                'volatility_5', 'volatility_10', 'volatility_20', 'rsi', 'macd',
-                'macd_signal', 'bb_position', 'volume_ratio'
-            ]
-            
-            # Create sequences
-            for i in range(self.lookback_window, len(df) - 1):
-                features = []
-                
-                # Price-based features
-                for col in feature_columns:
-                    if col in df.columns:
-                        window_data = df[col].iloc[i-self.lookback_window:i].values
-                        if not np.isnan(window_data).any():
-                            features.extend([
-                                np.mean(window_data),
-                                np.std(window_data),
-                                np.min(window_data),
-                                np.max(window_data),
-                                window_data[-1]  # Current value
-                            ])
-                        else:
-                            features.extend([0, 0, 0, 0, 0])
-                    else:
-                        features.extend([0, 0, 0, 0, 0])
-                
-                # Add wallet sentiment if available
-                current_time = df.iloc[i]['timestamp']
-                wallet_features = self._get_wallet_features_at_time(wallet_data, current_time)
-                features.extend(wallet_features)
-                
-                # Calculate future return as target
-                future_return = (df.iloc[i+1]['close'] - df.iloc[i]['close']) / df.iloc[i]['close']
-                
-                if len(features) > 0 and not np.isnan(future_return):
-                    all_features.append(features)
-                    all_targets.append([
-                        1 if future_return > 0.001 else (2 if future_return < -0.001 else 0),  # Action
-                        min(abs(future_return) * 10, 1.0),  # Confidence
-                        future_return,  # Return
-                        min(abs(future_return) * 5, 1.0)  # Risk
-                    ])
-        
-        if not all_features:
-            raise RuntimeError("No valid features created from real data")
-        
-        features_array = np.array(all_features, dtype=np.float32)
-        targets_array = np.array(all_targets, dtype=np.float32)
-        
-        # Normalize features
-        features_array = self.scaler.fit_transform(features_array)
-        
-        logging.info(f"Created {len(features_array)} feature vectors from real data")
-        
-        return features_array, targets_array
-    
-    def _get_wallet_features_at_time(self, wallet_data: pd.DataFrame, timestamp: pd.Timestamp) -> List[float]:
-        """Extract wallet activity features at specific time"""
-        if wallet_data.empty:
-            return [0, 0, 0, 0]  # Default values if no wallet data
-        
-        # Look at wallet activity in last 24 hours
-        recent_time = timestamp - pd.Timedelta(hours=24)
-        recent_txs = wallet_data[wallet_data['datetime'] >= recent_time]
-        
-        if recent_txs.empty:
-            return [0, 0, 0, 0]
-        
-        # Calculate wallet sentiment features
-        total_volume = recent_txs['value_eth'].sum()
-        tx_count = len(recent_txs)
-        avg_gas_price = recent_txs['gas_price'].mean()
-        error_rate = recent_txs['is_error'].mean()
-        
-        return [total_volume, tx_count, avg_gas_price / 1e9, error_rate]  # Normalize gas price
-
 class MLTradingSystem:
     def __init__(self):
-        self.model = DeepTradingNetwork().to(DEVICE)
+        self.model = DeepTradingNetwork(input_dim=FEATURE_DIM).to(DEVICE)
         self.optimizer = optim.AdamW(self.model.parameters(), lr=0.001, weight_decay=0.01)
         self.scheduler = optim.lr_scheduler.CosineAnnealingLR(self.optimizer, T_max=1000)
         
         self.data_collector = RealDataCollector()
         self.feature_engineer = FeatureEngineer()
+        self.feature_pipeline = None  # Built from the frozen scaler after training
+        self.candle_frames: Dict[str, pd.DataFrame] = {}  # Latest history per symbol, refetched once per bar
+        self.inference_service = None  # CPU runtime rebuilt whenever weights change
+        self.model_registry = ModelRegistry()
+        self.model_version = None
+        self.retrain_worker = RetrainWorker()
         
         self.training_data = deque(maxlen=10000)  # Keep last 10k training samples
         self.model_trained = False
@@ -505,8 +342,45 @@ class MLTradingSystem:
         
         logging.info("ML Trading System initialized")
     
+    def _activate_model(self):
+        """Build the inference path around the current weights and scaler"""
+        self.model_trained = True
+        self.feature_pipeline = OnlineFeaturePipeline(
+            self.feature_engineer.scaler, self.feature_engineer.lookback_window
+        )
+        self.inference_service = BatchInferenceService(self.model, FEATURE_DIM)
+    
+    def _warm_start(self) -> bool:
+        """Load the latest registered model instead of retraining"""
+        if os.getenv("MODEL_WARM_START", "true").lower() != "true":
+            return False
+        
+        try:
+            artifact = self.model_registry.load(
+                schema_hash=feature_schema_hash(self.feature_engineer.lookback_window)
+            )
+            if artifact is None:
+                return False
+            if artifact.age_hours > MODEL_MAX_AGE_HOURS:
+                logging.info(f"Registered model {artifact.version} is {artifact.age_hours:.1f}h old - retraining")
+                return False
+            
+            self.model.load_state_dict(artifact.state_dict)
+            self.feature_engineer.scaler = artifact.scaler
+        except Exception as e:
+            logging.warning(f"Registered model unusable - retraining: {e}")
+            return False
+        
+        self.model_version = artifact.version
+        self._activate_model()
+        logging.info(f"♻️ Warm start from model {artifact.version} ({artifact.age_hours:.1f}h old) - training skipped")
+        return True
+    
     async def initial_training(self):
         """Perform initial training on historical data"""
+        if self._warm_start():
+            return
+        
         logging.info("Starting initial training on REAL historical data...")
         
         # Collect real historical data
@@ -549,18 +423,7 @@ class MLTradingSystem:
                 self.optimizer.zero_grad()
                 
                 # Forward pass
-                outputs = self.model(batch_features)
-                
-                # Calculate losses
-                action_loss = F.cross_entropy(
-                    outputs['action_logits'], 
-                    batch_targets[:, 0].long()
-                )
-                confidence_loss = F.mse_loss(outputs['confidence'], batch_targets[:, 1])
-                return_loss = F.mse_loss(outputs['predicted_return'], batch_targets[:, 2])
-                risk_loss = F.mse_loss(outputs['risk_score'], batch_targets[:, 3])
-                
-                total_loss_batch = action_loss + confidence_loss + return_loss + risk_loss
+                total_loss_batch = multitask_loss(self.model(batch_features), batch_targets)
                 
                 # Backward pass
                 total_loss_batch.backward()
@@ -575,77 +438,87 @@ class MLTradingSystem:
                 avg_loss = total_loss / len(dataloader)
                 logging.info(f"Epoch {epoch}/{num_epochs}, Loss: {avg_loss:.4f}")
         
-        self.model_trained = True
+        self._activate_model()
         logging.info("Initial training completed on REAL data")
         
-        # Save model
-        torch.save({
-            'model_state_dict': self.model.state_dict(),
-            'optimizer_state_dict': self.optimizer.state_dict(),
-            'scaler': self.feature_engineer.scaler
-        }, 'trained_model.pth')
+        # Register model, scaler and feature schema so restarts can skip training
+        self.model_version = self.model_registry.save(
+            self.model,
+            self.feature_engineer.scaler,
+            schema_hash=feature_schema_hash(self.feature_engineer.lookback_window),
+            model_config={"class": "DeepTradingNetwork", "input_dim": FEATURE_DIM},
+            metadata={
+                "symbols": list(price_data.keys()),
+                "samples": len(features),
+                "epochs": num_epochs,
+                "final_loss": total_loss / len(dataloader)
+            }
+        )
     
-    async def generate_trading_signal(self, symbol: str) -> Optional[TradeSignal]:
-        """Generate trading signal using trained model"""
-        if not self.model_trained:
+    async def _latest_features(self, symbol: str) -> Optional[np.ndarray]:
+        """Feed new candles for a symbol and return its normalized feature vector"""
+        # Get current market data
+        current_data = await self.data_collector.get_current_market_data([symbol])
+        if symbol not in current_data:
             return None
         
-        try:
-            # Get current market data
-            current_data = await self.data_collector.get_current_market_data([symbol])
-            if symbol not in current_data:
-                return None
-            
-            # Get recent historical data for feature engineering
-            recent_data = await self.data_collector.get_real_historical_data([symbol], days=7)
-            if symbol not in recent_data or len(recent_data[symbol]) < 48:
-                return None
-            
-            # Create features
-            df = recent_data[symbol]
-            wallet_data = pd.DataFrame()  # Could add recent wallet data here
-            
-            features, _ = self.feature_engineer.create_features_from_real_data({symbol: df}, wallet_data)
-            
-            if len(features) == 0:
-                return None
-            
-            # Use latest feature vector
-            feature_vector = torch.tensor(features[-1:], dtype=torch.float32, device=DEVICE)
-            
-            # Generate prediction
-            self.model.eval()
-            with torch.no_grad():
-                outputs = self.model(feature_vector)
-                
-                action_probs = F.softmax(outputs['action_logits'], dim=1)
-                action_idx = torch.argmax(action_probs, dim=1).item()
-                action_confidence = torch.max(action_probs, dim=1)[0].item()
-                
-                actions = ["buy", "hold", "sell"]
-                action = actions[action_idx]
-                
-                confidence = outputs['confidence'].item()
-                predicted_return = outputs['predicted_return'].item()
-                risk_score = outputs['risk_score'].item()
-                position_size = outputs['position_size'].item()
-                
-                # Only generate signals with high confidence
-                if confidence > 0.75 and action != "hold":
-                    return TradeSignal(
-                        action=action,
-                        confidence=confidence,
-                        asset=symbol,
-                        predicted_return=predicted_return,
-                        risk_score=risk_score,
-                        position_size=position_size,
-                        reasoning=f"ML_prediction_conf_{confidence:.3f}"
-                    )
+        # Fetch history to warm up, then again only once the cached frame's last bar has closed
+        frame = self.candle_frames.get(symbol)
+        now = pd.Timestamp(current_data[symbol]['timestamp'], unit='s')
+        if frame is None or not self.feature_pipeline.has_symbol(symbol) or now >= frame['timestamp'].iloc[-1] + CANDLE_INTERVAL:
+            days = 1 if self.feature_pipeline.has_symbol(symbol) else 7
+            recent_data = await self.data_collector.get_real_historical_data([symbol], days=days)
+            if symbol in recent_data:
+                self.candle_frames[symbol] = recent_data[symbol]
+                self.feature_pipeline.update_from_frame(symbol, recent_data[symbol])
+        else:
+            # Within the bar only the forming candle moves: revise its close from the ticker
+            last = frame.iloc[-1]
+            self.feature_pipeline.update(symbol, last['timestamp'], current_data[symbol]['price'], last['volume'])
         
-        except Exception as e:
-            logging.error(f"Signal generation error for {symbol}: {e}")
+        # Latest feature vector, normalized with the training-time scaler
+        return self.feature_pipeline.transform(symbol)
+    
+    async def generate_trading_signals(self, symbols: List[str]) -> List[TradeSignal]:
+        """Generate signals for every symbol with a single batched forward pass"""
+        if not self.model_trained:
+            return []
         
-        return None
+        feature_vectors = {}
+        for symbol in symbols:
+            try:
+                features = await self._latest_features(symbol)
+                if features is not None:
+                    feature_vectors[symbol] = features
+            except Exception as e:
+                logging.error(f"Feature update error for {symbol}: {e}")
+        
+        signals = []
+        try:
+            predictions = self.inference_service.predict(feature_vectors)
+        except Exception as e:
+            logging.error(f"Batch inference error: {e}")
+            return signals
+        
+        for symbol, prediction in predictions.items():
+            # Only generate signals with high confidence
+            if prediction.confidence > 0.75 and prediction.action != "hold":
+                signals.append(TradeSignal(
+                    action=prediction.action,
+                    confidence=prediction.confidence,
+                    asset=symbol,
+                    predicted_return=prediction.predicted_return,
+                    risk_score=prediction.risk_score,
+                    position_size=prediction.position_size,
+                    reasoning=f"ML_prediction_conf_{prediction.confidence:.3f}"
+                ))
+        
+        return signals
+    
+    async def generate_trading_signal(self, symbol: str) -> Optional[TradeSignal]:
+        """Generate trading signal using trained model"""
+        signals = await self.generate_trading_signals([symbol])
+        return signals[0] if signals else None
     
     async def execute_trade(self, signal: TradeSignal) -> bool:
         """Execute trade based on ML signal"""
@@ -675,7 +548,7 @@ class MLTradingSystem:
             return False
     
     async def continuous_learning(self):
-        """Continuously retrain model on new data"""
+        """Continuously retrain model on new data in a worker process"""
         while True:
             try:
                 await asyncio.sleep(3600)  # Retrain every hour
@@ -688,33 +561,46 @@ class MLTradingSystem:
                     recent_data = await self.data_collector.get_real_historical_data(symbols, days=7)
                     
                     if recent_data:
-                        # Quick retrain on recent data
-                        features, targets = self.feature_engineer.create_features_from_real_data(recent_data, pd.DataFrame())
-                        
-                        if len(features) > 0:
-                            X = torch.tensor(features, dtype=torch.float32, device=DEVICE)
-                            y = torch.tensor(targets, dtype=torch.float32, device=DEVICE)
-                            
-                            # Fine-tune model
-                            self.model.train()
-                            for _ in range(10):  # Quick fine-tuning
-                                self.optimizer.zero_grad()
-                                outputs = self.model(X)
-                                
-                                action_loss = F.cross_entropy(outputs['action_logits'], y[:, 0].long())
-                                confidence_loss = F.mse_loss(outputs['confidence'], y[:, 1])
-                                return_loss = F.mse_loss(outputs['predicted_return'], y[:, 2])
-                                risk_loss = F.mse_loss(outputs['risk_score'], y[:, 3])
-                                
-                                total_loss = action_loss + confidence_loss + return_loss + risk_loss
-                                total_loss.backward()
-                                self.optimizer.step()
-                            
-                            logging.info("Model retrained on fresh data")
+                        await self._retrain_and_promote(recent_data)
                 
             except Exception as e:
                 logging.error(f"Continuous learning error: {e}")
     
+    async def _retrain_and_promote(self, recent_data: Dict[str, pd.DataFrame]):
+        """Fine-tune a snapshot off-loop, gate it on a holdout and hot-swap it into inference"""
+        # Snapshot: the worker never sees the live model or scaler
+        job = RetrainJob(
+            state_dict={k: v.detach().cpu().clone() for k, v in self.model.state_dict().items()},
+            model_config={"input_dim": FEATURE_DIM},
+            scaler=self.feature_engineer.scaler,
+            price_data=recent_data,
+            lookback_window=self.feature_engineer.lookback_window
+        )
+        result = await self.retrain_worker.retrain(job)
+        
+        if not result.passes_gate(RETRAIN_GATE_TOLERANCE):
+            logging.warning(f"Retrained model rejected by validation gate - keeping {self.model_version}")
+            return
+        
+        # Build and warm the standby runtime off the loop, then swap it in
+        loop = asyncio.get_running_loop()
+        candidate = DeepTradingNetwork(input_dim=FEATURE_DIM)
+        candidate.load_state_dict(result.state_dict)
+        version = await loop.run_in_executor(None, lambda: self.model_registry.save(
+            candidate,
+            self.feature_engineer.scaler,
+            schema_hash=feature_schema_hash(self.feature_engineer.lookback_window),
+            model_config={"class": "DeepTradingNetwork", "input_dim": FEATURE_DIM},
+            metadata={**result.metadata, "baseline_loss": result.baseline_loss,
+                      "candidate_loss": result.candidate_loss, "parent": self.model_version}
+        ))
+        runtime = await loop.run_in_executor(None, self.inference_service.build_runtime, candidate, version)
+        
+        self.inference_service.swap(runtime)
+        self.model.load_state_dict(result.state_dict)
+        self.model_version = version
+        logging.info(f"Model retrained on fresh data - promoted {version}")
+    
     async def run_trading_system(self):
         """Main trading loop"""
         logging.info("Starting ML-based trading system...")
@@ -730,16 +616,15 @@ class MLTradingSystem:
         
         while True:
             try:
-                for symbol in symbols:
-                    signal = await self.generate_trading_signal(symbol)
-                    if signal:
-                        await self.execute_trade(signal)
+                for signal in await self.generate_trading_signals(symbols):
+                    await self.execute_trade(signal)
                 
                 await asyncio.sleep(30)  # Check every 30 seconds
                 
             except KeyboardInterrupt:
                 logging.info("Shutting down ML trading system...")
                 learning_task.cancel()
+                self.retrain_worker.shutdown()
                 break
             except Exception as e:
                 logging.error(f"Trading loop error: {e}")
@@ -0,0 +1,138 @@
+import os
+import time
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+import torch
+from sklearn.preprocessing import StandardScaler
+
+from deep_trading_network import DeepTradingNetwork, multitask_loss
+from feature_engineering import FeatureEngineer
+
+@dataclass
+class RetrainJob:
+    """Self-contained snapshot shipped to the worker process"""
+    state_dict: Dict[str, torch.Tensor]
+    model_config: Dict
+    scaler: StandardScaler
+    price_data: Dict[str, pd.DataFrame]
+    lookback_window: int = 48
+    epochs: int = 10
+    learning_rate: float = 0.001
+    holdout_fraction: float = 0.2
+    num_threads: int = 1
+
+@dataclass
+class RetrainResult:
+    state_dict: Optional[Dict[str, torch.Tensor]]
+    baseline_loss: float
+    candidate_loss: float
+    train_samples: int
+    holdout_samples: int
+    duration: float
+    metadata: Dict = field(default_factory=dict)
+
+    def passes_gate(self, tolerance: float = 0.0) -> bool:
+        """Promote only if the retrained weights are no worse on unseen candles"""
+        return (self.state_dict is not None and np.isfinite(self.candidate_loss)
+                and self.candidate_loss <= self.baseline_loss * (1 + tolerance))
+
+def _split_features(job: RetrainJob):
+    """Chronological train/holdout split per symbol, normalized with the frozen scaler"""
+    engineer = FeatureEngineer()
+    engineer.scaler = job.scaler
+    engineer.lookback_window = job.lookback_window
+
+    train_X, train_y, holdout_X, holdout_y = [], [], [], []
+    for symbol, df in job.price_data.items():
+        try:
+            features, targets = engineer.create_features_from_real_data({symbol: df}, pd.DataFrame(), fit_scaler=False)
+        except RuntimeError:
+            continue
+
+        split = int(len(features) * (1 - job.holdout_fraction))
+        train_X.append(features[:split])
+        train_y.append(targets[:split])
+        holdout_X.append(features[split:])
+        holdout_y.append(targets[split:])
+
+    if not train_X:
+        raise RuntimeError("No retraining samples in snapshot")
+
+    return (torch.from_numpy(np.concatenate(train_X)), torch.from_numpy(np.concatenate(train_y)),
+            torch.from_numpy(np.concatenate(holdout_X)), torch.from_numpy(np.concatenate(holdout_y)))
+
+def _holdout_loss(model: DeepTradingNetwork, X: torch.Tensor, y: torch.Tensor) -> float:
+    if len(X) < 2:
+        return float("nan")
+    model.eval()
+    with torch.inference_mode():
+        return float(multitask_loss(model(X), y))
+
+def run_retrain_job(job: RetrainJob) -> RetrainResult:
+    """Fine-tune a copy of the live weights on CPU; runs in the worker process"""
+    start_time = time.time()
+    torch.set_num_threads(job.num_threads)
+
+    train_X, train_y, holdout_X, holdout_y = _split_features(job)
+
+    model = DeepTradingNetwork(input_dim=job.model_config["input_dim"])
+    model.load_state_dict(job.state_dict)
+    baseline_loss = _holdout_loss(model, holdout_X, holdout_y)
+
+    optimizer = torch.optim.AdamW(model.parameters(), lr=job.learning_rate, weight_decay=0.01)
+    model.train()
+    for _ in range(job.epochs):
+        optimizer.zero_grad()
+        loss = multitask_loss(model(train_X), train_y)
+        loss.backward()
+        torch.nn.utils.clip_grad_norm_(model.parameters(), max_norm=1.0)
+        optimizer.step()
+
+    candidate_loss = _holdout_loss(model, holdout_X, holdout_y)
+
+    return RetrainResult(
+        state_dict={k: v.detach().clone() for k, v in model.state_dict().items()},
+        baseline_loss=baseline_loss,
+        candidate_loss=candidate_loss,
+        train_samples=len(train_X),
+        holdout_samples=len(holdout_X),
+        duration=time.time() - start_time,
+        metadata={"symbols": list(job.price_data.keys()), "epochs": job.epochs}
+    )
+
+class RetrainWorker:
+    """Single spawned process that retrains off the trading event loop"""
+
+    def __init__(self, num_threads: int = None):
+        self.num_threads = num_threads or int(os.getenv("RETRAIN_THREADS", "1"))
+        # spawn: never fork a process that may hold CUDA / MPS state
+        self.executor = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+        self.running = False
+
+    async def retrain(self, job: RetrainJob) -> RetrainResult:
+        """Run one job in the worker process without blocking the caller's loop"""
+        if self.running:
+            raise RuntimeError("Retrain already in progress")
+
+        job.num_threads = self.num_threads
+        self.running = True
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self.executor, run_retrain_job, job)
+        finally:
+            self.running = False
+
+        logging.info(f"🧠 Retrain finished in {result.duration:.1f}s - holdout loss "
+                     f"{result.baseline_loss:.4f} -> {result.candidate_loss:.4f} "
+                     f"({result.train_samples} train / {result.holdout_samples} holdout)")
+        return result
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -8,10 +8,9 @@ try:
 except ImportError:
     raise RuntimeError("PRODUCTION ERROR: Config module not available")
 
-# Import live market data engine
+# Import live market data engine; resolved per call so a shard worker uses its own feed
 try:
     from okx_market_data import get_okx_engine
-    feed = get_okx_engine()
     print("✅ Using OKX market data feeds")
 except ImportError:
     raise RuntimeError("PRODUCTION ERROR: OKX market data not available")
@@ -28,6 +27,8 @@ class ProductionSignalGenerator:
         
         self.signal_count += 1
         current_time = time.time()
+        asset = shared_data.get("asset", "BTC")
+        feed = get_okx_engine()
         
         # Check system health - REQUIRE live data
         health = feed.get_system_health()
@@ -38,7 +39,7 @@ class ProductionSignalGenerator:
             raise RuntimeError(f"LIVE DATA REQUIRED: System status is {system_status}, waiting for LIVE")
         
         # Generate signal using ONLY live data
-        signal = self._create_live_signal(current_time)
+        signal = self._create_live_signal(current_time, asset)
         
         if not signal:
             raise RuntimeError("PRODUCTION ERROR: Signal generation failed")
@@ -74,30 +75,31 @@ class ProductionSignalGenerator:
         else:
             raise RuntimeError(f"PRODUCTION ERROR: Signal confidence {confidence:.3f} below minimum threshold")
 
-    def _create_live_signal(self, current_time: float) -> Dict:
+    def _create_live_signal(self, current_time: float, asset: str = "BTC") -> Dict:
         """Generate signal using ONLY live market data from OKX"""
+        feed = get_okx_engine()
         
-        # Get live BTC data - NO FALLBACKS
+        # Get live asset data - NO FALLBACKS
         try:
-            btc_data = feed.get_recent_data("BTC", 50)
-            if not btc_data["valid"] or len(btc_data["prices"]) < 10:
-                raise RuntimeError("INSUFFICIENT BTC DATA: Need at least 10 price points")
+            asset_data = feed.get_recent_data(asset, 50)
+            if not asset_data["valid"] or len(asset_data["prices"]) < 10:
+                raise RuntimeError(f"INSUFFICIENT {asset} DATA: Need at least 10 price points")
             
-            current_price = btc_data["current_price"]
+            current_price = asset_data["current_price"]
             if current_price <= 0:
-                raise RuntimeError(f"INVALID BTC PRICE: {current_price}")
+                raise RuntimeError(f"INVALID {asset} PRICE: {current_price}")
             
-            prices = btc_data["prices"]
-            volumes = btc_data["volumes"]
+            prices = asset_data["prices"]
+            volumes = asset_data["volumes"]
             
-            logging.debug(f"Live BTC data: price=${current_price:.2f}, data_points={len(prices)}")
+            logging.debug(f"Live {asset} data: price=${current_price:.2f}, data_points={len(prices)}")
             
         except Exception as e:
             raise RuntimeError(f"LIVE DATA ERROR: {e}")
         
         # Calculate live RSI
         try:
-            rsi = feed.calculate_rsi("BTC", 14)
+            rsi = feed.calculate_rsi(asset, 14)
             if rsi is None or rsi <= 0:
                 raise RuntimeError("INVALID RSI CALCULATION")
         except Exception as e:
@@ -105,7 +107,7 @@ class ProductionSignalGenerator:
         
         # Calculate live VWAP
         try:
-            vwap = feed.calculate_vwap("BTC")
+            vwap = feed.calculate_vwap(asset)
             if vwap is None or vwap <= 0:
                 raise RuntimeError("INVALID VWAP CALCULATION")
         except Exception as e:
@@ -210,10 +212,10 @@ class ProductionSignalGenerator:
         # Create signal reason
         reason = f"live_{signal_type.lower()}_rsi_{rsi:.1f}_vwap_dev_{vwap_deviation:.3f}_vol_{volume_ratio:.1f}x"
         
-        logging.info(f"LIVE SIGNAL: {signal_type} BTC @ ${current_price:.2f} | RSI:{rsi:.1f} | VWAP:${vwap:.2f} | Vol:{volume_ratio:.1f}x | Conf:{confidence:.3f}")
+        logging.info(f"LIVE SIGNAL: {signal_type} {asset} @ ${current_price:.2f} | RSI:{rsi:.1f} | VWAP:${vwap:.2f} | Vol:{volume_ratio:.1f}x | Conf:{confidence:.3f}")
         
         return {
-            "asset": "BTC",
+            "asset": asset,
             "confidence": confidence,
             "entry_price": current_price,
             "stop_loss": stop_loss,
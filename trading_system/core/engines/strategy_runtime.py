@@ -0,0 +1,190 @@
+import os
+import signal
+import asyncio
+import logging
+import functools
+from dataclasses import dataclass, field, asdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+RUNTIME_EXECUTOR_WORKERS = int(os.getenv("RUNTIME_EXECUTOR_WORKERS", "4"))
+RUNTIME_MAX_BACKOFF = float(os.getenv("RUNTIME_MAX_BACKOFF", "60"))
+RUNTIME_SHUTDOWN_TIMEOUT = float(os.getenv("RUNTIME_SHUTDOWN_TIMEOUT", "10"))
+RUNTIME_LAG_WARNING_MS = float(os.getenv("RUNTIME_LAG_WARNING_MS", "250"))
+
+@dataclass
+class TaskMetrics:
+    runs: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    restarts: int = 0
+    last_error: str = ""
+    total_run_ms: float = 0.0
+    max_run_ms: float = 0.0
+    # Loop lag: how late the task woke up against its schedule
+    lag_samples: int = 0
+    last_lag_ms: float = 0.0
+    max_lag_ms: float = 0.0
+    total_lag_ms: float = 0.0
+
+@dataclass
+class SupervisedTask:
+    name: str
+    step: Callable
+    interval: Optional[float]  # seconds between runs; None for a long-running service, restarted when it exits
+    blocking: bool = False  # step is a plain function and runs on the executor
+    setup: Optional[Callable] = None  # blocking, runs on the executor before the first step and after a failed setup
+    on_stop: Optional[Callable[[], None]] = None
+    ready: bool = False
+    metrics: TaskMetrics = field(default_factory=TaskMetrics)
+    task: Optional[asyncio.Task] = None
+
+class StrategyRuntime:
+    """Runs each strategy as its own supervised asyncio task with its own cadence.
+
+    Blocking work goes to a shared thread pool so no strategy stalls the event loop for the others;
+    failed tasks restart with exponential backoff and every wake-up records loop lag."""
+
+    def __init__(self, executor_workers: int = RUNTIME_EXECUTOR_WORKERS, max_backoff: float = RUNTIME_MAX_BACKOFF):
+        self.executor = ThreadPoolExecutor(max_workers=executor_workers, thread_name_prefix="runtime")
+        self.max_backoff = max_backoff
+        self.tasks: Dict[str, SupervisedTask] = {}
+        self.stopping: Optional[asyncio.Event] = None
+        self.stopped = False
+
+    def add_task(self, name: str, step: Callable, interval: Optional[float] = None, blocking: bool = False,
+                 setup: Optional[Callable] = None, on_stop: Optional[Callable[[], None]] = None) -> SupervisedTask:
+        if name in self.tasks:
+            raise ValueError(f"Task {name} already registered")
+        task = SupervisedTask(name, step, interval, blocking, setup, on_stop, ready=setup is None)
+        self.tasks[name] = task
+        if self.stopping is not None:
+            task.task = asyncio.create_task(self._supervise(task), name=name)
+        return task
+
+    async def run_blocking(self, func: Callable, *args, **kwargs):
+        """Run a blocking call on the runtime's executor"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+
+    def start(self):
+        self.stopping = asyncio.Event()
+        for task in self.tasks.values():
+            task.task = asyncio.create_task(self._supervise(task), name=task.name)
+        logging.info(f"🧵 Runtime started: {', '.join(self.tasks)}")
+
+    async def _supervise(self, task: SupervisedTask):
+        loop = asyncio.get_running_loop()
+        metrics = task.metrics
+        next_run = loop.time()
+        while not self.stopping.is_set():
+            self._record_lag(task, loop.time() - next_run)
+            start_time = loop.time()
+            try:
+                if not task.ready:
+                    await self.run_blocking(task.setup)
+                    task.ready = True
+                if task.blocking:
+                    await self.run_blocking(task.step)
+                else:
+                    await task.step()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                metrics.failures += 1
+                metrics.consecutive_failures += 1
+                metrics.restarts += 1
+                metrics.last_error = f"{type(e).__name__}: {e}"
+                backoff = min(self.max_backoff, 2 ** metrics.consecutive_failures - 1)
+                logging.error(f"❌ Task {task.name} failed: {metrics.last_error} - restarting in {backoff:.0f}s")
+                next_run = loop.time() + backoff
+                await self._sleep_until(next_run)
+                continue
+
+            elapsed_ms = (loop.time() - start_time) * 1000
+            metrics.runs += 1
+            metrics.consecutive_failures = 0
+            metrics.total_run_ms += elapsed_ms
+            metrics.max_run_ms = max(metrics.max_run_ms, elapsed_ms)
+
+            if task.interval is None:
+                if self.stopping.is_set():
+                    break
+                # A service should not return on its own; bring it back without spinning
+                metrics.restarts += 1
+                logging.warning(f"⚠️ Task {task.name} exited, restarting")
+                next_run = loop.time() + 1.0
+            else:
+                # Fixed rate; an overrun skips the missed runs instead of bursting to catch up
+                next_run = max(next_run + task.interval, loop.time())
+            await self._sleep_until(next_run)
+
+    async def _sleep_until(self, deadline: float):
+        try:
+            await asyncio.wait_for(self.stopping.wait(), max(0.0, deadline - asyncio.get_running_loop().time()))
+        except asyncio.TimeoutError:
+            pass
+
+    def _record_lag(self, task: SupervisedTask, lag: float):
+        lag_ms = max(0.0, lag * 1000)
+        metrics = task.metrics
+        metrics.lag_samples += 1
+        metrics.last_lag_ms = lag_ms
+        metrics.total_lag_ms += lag_ms
+        if lag_ms > metrics.max_lag_ms:
+            metrics.max_lag_ms = lag_ms
+        if lag_ms > RUNTIME_LAG_WARNING_MS:
+            logging.warning(f"⏱️ Task {task.name} woke {lag_ms:.0f}ms late - something is blocking the event loop")
+
+    async def run(self):
+        """Start every task and run until SIGINT / SIGTERM or stop()"""
+        self.start()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.stopping.set)
+            except (NotImplementedError, RuntimeError):
+                pass
+        try:
+            await self.stopping.wait()
+        finally:
+            await self.stop()
+
+    async def stop(self, timeout: float = RUNTIME_SHUTDOWN_TIMEOUT):
+        """Let periodic tasks finish their current run, stop services, cancel whatever is left after `timeout`"""
+        if self.stopped:
+            return
+        self.stopped = True
+        if self.stopping is not None:
+            self.stopping.set()
+        logging.info("🛑 Runtime stopping...")
+
+        for task in self.tasks.values():
+            if task.on_stop is not None:
+                try:
+                    task.on_stop()
+                except Exception as e:
+                    logging.error(f"Task {task.name} stop error: {e}")
+
+        running = [task.task for task in self.tasks.values() if task.task is not None and not task.task.done()]
+        if running:
+            done, pending = await asyncio.wait(running, timeout=timeout)
+            for pending_task in pending:
+                logging.warning(f"⚠️ Task {pending_task.get_name()} did not stop in {timeout:.0f}s, cancelling")
+                pending_task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        # Blocking calls still in flight cannot be interrupted; do not wait on them
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        logging.info("✅ Runtime stopped")
+
+    def get_metrics(self) -> Dict[str, Dict]:
+        metrics = {}
+        for name, task in self.tasks.items():
+            task_metrics = task.metrics
+            metrics[name] = {
+                **asdict(task_metrics),
+                "running": task.task is not None and not task.task.done(),
+                "avg_run_ms": task_metrics.total_run_ms / max(task_metrics.runs, 1),
+                "avg_lag_ms": task_metrics.total_lag_ms / max(task_metrics.lag_samples, 1)
+            }
+        return metrics
@@ -0,0 +1,84 @@
+import os
+import time
+import logging
+from typing import Callable, Dict, List, Optional
+
+TICK_DEBOUNCE = float(os.getenv("TICK_DEBOUNCE_MS", "10")) / 1000
+TICK_CYCLE_BUDGET = float(os.getenv("TICK_CYCLE_BUDGET_MS", "50")) / 1000
+TICK_IDLE_TIMEOUT = float(os.getenv("TICK_IDLE_TIMEOUT", "1.0"))
+
+class TickScheduler:
+    """Wakes on new ticks and evaluates only the instruments whose data changed"""
+
+    def __init__(self, feed, on_ticks: Callable[[List[str]], None], debounce: float = TICK_DEBOUNCE,
+                 budget: float = TICK_CYCLE_BUDGET, idle_timeout: float = TICK_IDLE_TIMEOUT,
+                 on_idle: Optional[Callable[[], None]] = None):
+        self.feed = feed
+        self.on_ticks = on_ticks
+        self.on_idle = on_idle
+        self.debounce = debounce
+        self.budget = budget
+        self.idle_timeout = idle_timeout
+        self.seen: Dict[str, int] = {}
+        self.running = False
+
+        self.metrics = {"wakeups": 0, "evaluations": 0, "ticks": 0, "coalesced": 0, "idle": 0, "overruns": 0,
+                        "max_cycle_ms": 0.0, "total_cycle_ms": 0.0, "max_tick_latency_ms": 0.0,
+                        "total_tick_latency_ms": 0.0}
+
+    def run_once(self, timeout: Optional[float] = None) -> List[str]:
+        """Wait for ticks, then hand the changed instruments to the handler once"""
+        changed = self.feed.wait_for_ticks(self.seen, self.idle_timeout if timeout is None else timeout)
+        if not changed:
+            self.metrics["idle"] += 1
+            if self.on_idle:
+                self.on_idle()
+            return []
+
+        if self.debounce > 0:
+            # Let the rest of a burst land so it is evaluated in one pass
+            time.sleep(self.debounce)
+            changed.update(self.feed.wait_for_ticks(self.seen, 0))
+
+        ticks = sum(seq - self.seen.get(asset, 0) for asset, seq in changed.items())
+        self.seen.update(changed)
+        assets = sorted(changed)
+
+        start_time = time.perf_counter()
+        now = time.time()
+        for asset in assets:
+            latency_ms = (now - self.feed.last_update.get(asset, now)) * 1000
+            self.metrics["total_tick_latency_ms"] += latency_ms
+            self.metrics["max_tick_latency_ms"] = max(self.metrics["max_tick_latency_ms"], latency_ms)
+
+        self.on_ticks(assets)
+
+        cycle = time.perf_counter() - start_time
+        self.metrics["wakeups"] += 1
+        self.metrics["evaluations"] += len(assets)
+        self.metrics["ticks"] += ticks
+        self.metrics["coalesced"] += ticks - len(assets)
+        self.metrics["total_cycle_ms"] += cycle * 1000
+        self.metrics["max_cycle_ms"] = max(self.metrics["max_cycle_ms"], cycle * 1000)
+        if cycle > self.budget:
+            self.metrics["overruns"] += 1
+            logging.warning(f"⏱️ Tick cycle overran: {cycle * 1000:.1f}ms for {len(assets)} instruments "
+                            f"(budget {self.budget * 1000:.0f}ms)")
+        return assets
+
+    def run(self):
+        self.running = True
+        while self.running:
+            self.run_once()
+
+    def stop(self):
+        self.running = False
+
+    def get_metrics(self) -> Dict:
+        wakeups = max(self.metrics["wakeups"], 1)
+        evaluations = max(self.metrics["evaluations"], 1)
+        return {
+            **self.metrics,
+            "avg_cycle_ms": self.metrics["total_cycle_ms"] / wakeups,
+            "avg_tick_latency_ms": self.metrics["total_tick_latency_ms"] / evaluations
+        }
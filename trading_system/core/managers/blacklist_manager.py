@@ -0,0 +1,185 @@
+import os
+import csv
+import json
+import logging
+import threading
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+WALLET_BLACKLIST_PATH = os.getenv("WALLET_BLACKLIST_PATH", "data/state/wallet_blacklist.json")
+TOKEN_BLACKLIST_PATH = os.getenv("TOKEN_BLACKLIST_PATH", "data/blacklists/rugdex_blacklist.csv")
+BLACKLIST_RELOAD_INTERVAL = float(os.getenv("BLACKLIST_RELOAD_INTERVAL", "30"))
+
+def address_key(address: str) -> bytes:
+    """Normalise a hex address of any case to its 20 raw bytes"""
+    key = bytes.fromhex(address[2:] if address[:2] in ("0x", "0X") else address)
+    if len(key) != 20:
+        raise ValueError(f"not a 20-byte address: {address}")
+    return key
+
+class AddressIndex:
+    """Sorted 20-byte keys in a NumPy 'S20' array: 20 bytes per address and binary-search lookups"""
+
+    def __init__(self, keys: Optional[np.ndarray] = None):
+        self.keys = keys if keys is not None else np.empty(0, dtype="S20")
+
+    @classmethod
+    def from_keys(cls, keys: np.ndarray) -> "AddressIndex":
+        return cls(np.unique(keys.astype("S20")))
+
+    @classmethod
+    def from_addresses(cls, addresses: Iterable[str]) -> "AddressIndex":
+        hex_keys = []
+        for address in addresses:
+            address = address.strip()
+            if len(address) == 42 and address[:2] in ("0x", "0X"):
+                hex_keys.append(address[2:])
+
+        try:
+            raw = bytes.fromhex("".join(hex_keys))
+        except ValueError:
+            # A malformed row somewhere: fall back to per-row parsing and skip the bad ones
+            raw = b"".join(key for key in (cls._parse(h) for h in hex_keys) if key)
+        return cls.from_keys(np.frombuffer(raw, dtype="S20"))
+
+    @staticmethod
+    def _parse(hex_key: str) -> Optional[bytes]:
+        try:
+            return bytes.fromhex(hex_key)
+        except ValueError:
+            return None
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, address: str) -> bool:
+        try:
+            key = address_key(address)
+        except (ValueError, TypeError):
+            return False
+        i = int(np.searchsorted(self.keys, key))
+        # 'S20' scalars drop trailing NUL bytes; keys are fixed-width so comparing stripped values is exact
+        return i < len(self.keys) and self.keys[i] == key.rstrip(b"\x00")
+
+    def contains_many(self, addresses: Iterable[str]) -> np.ndarray:
+        """Vectorised membership for a batch of addresses"""
+        keys = [self._key_or_none(a) for a in addresses]
+        valid = np.array([key is not None for key in keys], dtype=bool)
+        query = np.array([key if key is not None else bytes(20) for key in keys], dtype="S20")
+        if not len(self.keys):
+            return np.zeros(len(query), dtype=bool)
+        positions = np.minimum(np.searchsorted(self.keys, query), len(self.keys) - 1)
+        return (self.keys[positions] == query) & valid
+
+    @staticmethod
+    def _key_or_none(address: str) -> Optional[bytes]:
+        try:
+            return address_key(address)
+        except (ValueError, TypeError):
+            return None
+
+    @property
+    def nbytes(self) -> int:
+        return self.keys.nbytes
+
+def load_wallet_blacklist(path: str) -> AddressIndex:
+    with open(path, "r") as f:
+        data = json.load(f)
+    return AddressIndex.from_addresses(data.get("blacklisted_addresses", []))
+
+def load_token_blacklist(path: str) -> AddressIndex:
+    with open(path, "r", newline="") as f:
+        return AddressIndex.from_addresses(row[0] for row in csv.reader(f) if row)
+
+class BlacklistManager:
+    """Wallet and token blacklists, reloaded atomically when their source files change"""
+
+    def __init__(self, wallet_path: str = WALLET_BLACKLIST_PATH, token_path: str = TOKEN_BLACKLIST_PATH,
+                 reload_interval: float = BLACKLIST_RELOAD_INTERVAL):
+        self.sources: Dict[str, Tuple[str, Callable[[str], AddressIndex]]] = {
+            "wallets": (wallet_path, load_wallet_blacklist),
+            "tokens": (token_path, load_token_blacklist)
+        }
+        self.reload_interval = reload_interval
+
+        # Readers only ever see a fully built index: reload swaps the reference
+        self.wallets = AddressIndex()
+        self.tokens = AddressIndex()
+        self.file_stamps: Dict[str, Tuple[float, int]] = {}
+
+        self.watcher: Optional[threading.Thread] = None
+        self.stop_event = threading.Event()
+        self.reloads = 0
+
+        self.reload()
+
+    def is_wallet_blacklisted(self, address: str) -> bool:
+        return address in self.wallets
+
+    def is_token_blacklisted(self, address: str) -> bool:
+        return address in self.tokens
+
+    def reload(self, force: bool = False) -> bool:
+        """Rebuild any index whose source file changed; returns True if anything was swapped"""
+        changed = False
+        for name, (path, loader) in self.sources.items():
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+
+            stamp = (stat.st_mtime, stat.st_size)
+            if not force and self.file_stamps.get(name) == stamp:
+                continue
+
+            try:
+                index = loader(path)
+            except Exception as e:
+                # Keep serving the previous index; a half-written file is retried next poll
+                logging.error(f"Blacklist reload failed for {path}: {e}")
+                continue
+
+            setattr(self, name, index)
+            self.file_stamps[name] = stamp
+            self.reloads += 1
+            changed = True
+            logging.info(f"🚫 Loaded {len(index):,} blacklisted {name} from {path} ({index.nbytes / 1e6:.1f}MB)")
+        return changed
+
+    def start(self):
+        """Poll the source files in a daemon thread"""
+        if self.watcher is not None and self.watcher.is_alive():
+            return
+        self.stop_event.clear()
+        self.watcher = threading.Thread(target=self._watch, name="blacklist-watcher", daemon=True)
+        self.watcher.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.watcher is not None:
+            self.watcher.join(timeout=5)
+            self.watcher = None
+
+    def _watch(self):
+        while not self.stop_event.wait(self.reload_interval):
+            self.reload()
+
+    def get_stats(self) -> Dict:
+        return {
+            "wallets": len(self.wallets),
+            "tokens": len(self.tokens),
+            "memory_bytes": self.wallets.nbytes + self.tokens.nbytes,
+            "reloads": self.reloads
+        }
+
+# Global blacklist manager instance
+blacklist_manager = None
+
+def get_blacklist_manager() -> BlacklistManager:
+    """Get global blacklist manager, watching its source files"""
+    global blacklist_manager
+    if blacklist_manager is None:
+        blacklist_manager = BlacklistManager()
+        blacklist_manager.start()
+    return blacklist_manager
@@ -6,6 +6,14 @@ from dataclasses import dataclass, asdict
 from decimal import Decimal
 import csv
 import os
+import atexit
+from collections import deque
+from equity_tracker import EquityTracker
+
+CAPITAL_STATE_PATH = os.getenv("CAPITAL_STATE_PATH", "capital_state.json")
+CAPITAL_SAVE_INTERVAL = float(os.getenv("CAPITAL_SAVE_INTERVAL", "5"))
+CAPITAL_HISTORY_LIMIT = 1000
+SHARPE_WINDOW = int(os.getenv("SHARPE_WINDOW", "100"))
 
 @dataclass
 class CapitalState:
@@ -31,9 +39,102 @@ class RiskMetrics:
     profit_factor: float
     sharpe_ratio: float
     max_consecutive_losses: int
+    rolling_sharpe_ratio: float = 0.0
+
+class TradeStats:
+    """Online accumulators over closed trades: every metric is updated once per trade and read in O(1)"""
+    
+    def __init__(self, window: int = SHARPE_WINDOW):
+        self.count = 0
+        self.wins = 0
+        self.losses = 0
+        self.total_wins = 0.0
+        self.total_losses = 0.0
+        # Welford mean / variance of pnl_pct
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.loss_streak = 0
+        self.max_loss_streak = 0
+        self.hold_time_sum = 0.0
+        self.hold_count = 0
+        # Windowed Sharpe: ring buffer of recent returns with running sums
+        self.window = deque(maxlen=window)
+        self.window_sum = 0.0
+        self.window_sumsq = 0.0
+    
+    def add(self, pnl: float, pnl_pct: float, hold_time: Optional[float] = None):
+        self.count += 1
+        if pnl > 0:
+            self.wins += 1
+            self.total_wins += pnl
+            self.loss_streak = 0
+        else:
+            if pnl < 0:
+                self.losses += 1
+                self.total_losses -= pnl
+                self.loss_streak += 1
+                self.max_loss_streak = max(self.max_loss_streak, self.loss_streak)
+            else:
+                self.loss_streak = 0
+        
+        delta = pnl_pct - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (pnl_pct - self.mean)
+        
+        if hold_time is not None:
+            self.hold_time_sum += hold_time
+            self.hold_count += 1
+        
+        if len(self.window) == self.window.maxlen:
+            evicted = self.window[0]
+            self.window_sum -= evicted
+            self.window_sumsq -= evicted * evicted
+        self.window.append(pnl_pct)
+        self.window_sum += pnl_pct
+        self.window_sumsq += pnl_pct * pnl_pct
+    
+    def sharpe_ratio(self) -> float:
+        std = (self.m2 / self.count) ** 0.5 if self.count > 1 else 0.0
+        return self.mean / std if std > 0 else 0.0
+    
+    def rolling_sharpe_ratio(self) -> float:
+        n = len(self.window)
+        if n < 2:
+            return 0.0
+        mean = self.window_sum / n
+        variance = max(self.window_sumsq / n - mean * mean, 0.0)
+        std = variance ** 0.5
+        return mean / std if std > 1e-12 else 0.0
+    
+    def to_dict(self) -> Dict:
+        state = dict(self.__dict__)
+        state["window"] = list(self.window)
+        state["window_size"] = self.window.maxlen
+        return state
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> "TradeStats":
+        stats = cls(data.pop("window_size", SHARPE_WINDOW))
+        window = data.pop("window", [])
+        stats.__dict__.update(data)
+        stats.window.extend(window)
+        return stats
+    
+    @classmethod
+    def from_trades(cls, trades: List[Dict]) -> "TradeStats":
+        stats = cls()
+        for trade in trades:
+            hold_time = trade["exit_time"] - trade["entry_time"] if trade.get("entry_time") and trade.get("exit_time") else None
+            stats.add(trade["pnl"], trade["pnl_pct"], hold_time)
+        return stats
 
 class CapitalManager:
-    def __init__(self, initial_capital: float = 1000.0):
+    def __init__(self, initial_capital: float = 1000.0, state_path: str = CAPITAL_STATE_PATH,
+                 save_interval: float = CAPITAL_SAVE_INTERVAL):
+        self.state_path = state_path
+        self.save_interval = save_interval
+        self.last_save = 0.0
+        self.dirty = False
         self.state = CapitalState(
             total_capital=initial_capital,
             available_capital=initial_capital,
@@ -53,11 +154,17 @@ class CapitalManager:
         self.max_daily_trades = 50
         self.emergency_stop_drawdown = 0.15
         
-        self.trade_history = []
+        self.trade_history = deque(maxlen=CAPITAL_HISTORY_LIMIT)
         self.positions = {}
         self.daily_stats = {}
+        self.stats = TradeStats()
         
         self._load_state()
+        
+        # Marked equity: realized capital plus the open P&L reported through mark_position
+        self.unrealized_pnl = sum(p.get("unrealized_pnl", 0.0) for p in self.positions.values())
+        self.equity = EquityTracker(self.state.total_capital + self.unrealized_pnl, self.state.peak_capital)
+        self.equity.add_breaker("emergency_stop", self.emergency_stop_drawdown, self._liquidate_on_drawdown)
     
     def allocate_capital(self, amount: float, trade_id: str, confidence: float = 0.5) -> bool:
         if not self._can_allocate(amount):
@@ -87,12 +194,25 @@ class CapitalManager:
         logging.info(f"Allocated ${adjusted_amount:.2f} for trade {trade_id}")
         return True
     
+    def mark_position(self, trade_id: str, value: float, now: Optional[float] = None) -> bool:
+        """Current market value of an open allocation; re-marks equity with only this position's change"""
+        position = self.positions.get(trade_id)
+        if position is None:
+            return False
+        
+        pnl = value - position["amount"]
+        self.unrealized_pnl += pnl - position.get("unrealized_pnl", 0.0)
+        position["unrealized_pnl"] = pnl
+        self.equity.update(self.state.total_capital + self.unrealized_pnl, now)
+        return True
+    
     def release_capital(self, trade_id: str, realized_pnl: float) -> bool:
         if trade_id not in self.positions:
             return False
         
         position = self.positions.pop(trade_id)
         original_amount = position["amount"]
+        self.unrealized_pnl -= position.get("unrealized_pnl", 0.0)
         
         self.state.deployed_capital -= original_amount
         self.state.available_capital += (original_amount + realized_pnl)
@@ -107,16 +227,21 @@ class CapitalManager:
             self.state.current_drawdown = (self.state.peak_capital - self.state.total_capital) / self.state.peak_capital
             self.state.max_drawdown = max(self.state.max_drawdown, self.state.current_drawdown)
         
+        now = time.time()
         trade_record = {
             "trade_id": trade_id,
             "amount": original_amount,
             "pnl": realized_pnl,
             "pnl_pct": (realized_pnl / original_amount) * 100,
-            "timestamp": time.time(),
+            "timestamp": now,
+            "entry_time": position["timestamp"],
+            "exit_time": now,
             "confidence": position["confidence"]
         }
         
         self.trade_history.append(trade_record)
+        self.stats.add(realized_pnl, trade_record["pnl_pct"], now - position["timestamp"])
+        self.equity.update(self.state.total_capital + self.unrealized_pnl, now)
         self._save_state()
         
         logging.info(f"Released ${original_amount:.2f} with PnL ${realized_pnl:.2f} ({(realized_pnl/original_amount)*100:.1f}%)")
@@ -129,7 +254,7 @@ class CapitalManager:
         if self.state.trades_today >= self.max_daily_trades:
             return False
         
-        if self.state.current_drawdown >= self.emergency_stop_drawdown:
+        if self.get_drawdown() >= self.emergency_stop_drawdown:
             return False
         
         future_exposure = (self.state.deployed_capital + amount) / self.state.total_capital
@@ -138,6 +263,10 @@ class CapitalManager:
         
         return True
     
+    def get_drawdown(self) -> float:
+        """The worse of realized and marked drawdown, as a fraction of peak"""
+        return max(self.state.current_drawdown, self.equity.drawdown)
+    
     def calculate_optimal_position_size(self, confidence: float, volatility: float = 0.02) -> float:
         base_size = self.state.total_capital * 0.02
         
@@ -162,90 +291,83 @@ class CapitalManager:
             "total_return_pct": (self.state.total_pnl / 1000.0) * 100,
             "current_drawdown_pct": self.state.current_drawdown * 100,
             "max_drawdown_pct": self.state.max_drawdown * 100,
+            "marked_drawdown_pct": self.equity.drawdown * 100,
+            "max_marked_drawdown_pct": self.equity.max_drawdown * 100,
             "trades_today": self.state.trades_today,
             "active_positions": len(self.positions)
         }
     
     def get_risk_metrics(self) -> RiskMetrics:
-        if not self.trade_history:
+        stats = self.stats
+        if not stats.count:
             return RiskMetrics(0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0)
         
-        winning_trades = [t for t in self.trade_history if t["pnl"] > 0]
-        losing_trades = [t for t in self.trade_history if t["pnl"] < 0]
-        
-        win_rate = len(winning_trades) / len(self.trade_history) if self.trade_history else 0
-        
-        total_wins = sum(t["pnl"] for t in winning_trades)
-        total_losses = abs(sum(t["pnl"] for t in losing_trades))
-        profit_factor = total_wins / total_losses if total_losses > 0 else float('inf')
-        
-        returns = [t["pnl_pct"] for t in self.trade_history]
-        avg_return = sum(returns) / len(returns) if returns else 0
-        std_return = (sum((r - avg_return) ** 2 for r in returns) / len(returns)) ** 0.5 if len(returns) > 1 else 0
-        sharpe_ratio = avg_return / std_return if std_return > 0 else 0
+        profit_factor = stats.total_wins / stats.total_losses if stats.total_losses > 0 else float('inf')
         
-        consecutive_losses = 0
-        max_consecutive_losses = 0
-        for trade in self.trade_history:
-            if trade["pnl"] < 0:
-                consecutive_losses += 1
-                max_consecutive_losses = max(max_consecutive_losses, consecutive_losses)
-            else:
-                consecutive_losses = 0
-        
-        position_sizes = [p["amount"] for p in self.positions.values()]
-        largest_position_pct = max(position_sizes) / self.state.total_capital * 100 if position_sizes else 0
+        largest_position = max((p["amount"] for p in self.positions.values()), default=0)
+        largest_position_pct = largest_position / self.state.total_capital * 100
         total_exposure_pct = self.state.deployed_capital / self.state.total_capital * 100
-        
-        avg_hold_time = 0.0
-        if self.trade_history:
-            hold_times = []
-            for trade in self.trade_history:
-                if trade.get("entry_time") and trade.get("exit_time"):
-                    hold_times.append(trade["exit_time"] - trade["entry_time"])
-            avg_hold_time = sum(hold_times) / len(hold_times) / 3600 if hold_times else 0
+        avg_hold_time = stats.hold_time_sum / stats.hold_count / 3600 if stats.hold_count else 0.0
         
         return RiskMetrics(
             position_count=len(self.positions),
             largest_position_pct=largest_position_pct,
             total_exposure_pct=total_exposure_pct,
             avg_hold_time=avg_hold_time,
-            win_rate=win_rate,
+            win_rate=stats.wins / stats.count,
             profit_factor=profit_factor,
-            sharpe_ratio=sharpe_ratio,
-            max_consecutive_losses=max_consecutive_losses
+            sharpe_ratio=stats.sharpe_ratio(),
+            max_consecutive_losses=stats.max_loss_streak,
+            rolling_sharpe_ratio=stats.rolling_sharpe_ratio()
         )
     
+    def _liquidate_on_drawdown(self, drawdown: float):
+        self.emergency_liquidate_all()
+    
     def emergency_liquidate_all(self) -> bool:
-        if self.state.current_drawdown >= self.emergency_stop_drawdown:
+        if self.get_drawdown() >= self.emergency_stop_drawdown:
             logging.critical("EMERGENCY LIQUIDATION TRIGGERED")
             
+            # Marked positions close at their last mark; unmarked ones assume a 5% loss
             for trade_id in list(self.positions.keys()):
-                self.release_capital(trade_id, -self.positions[trade_id]["amount"] * 0.05)
+                position = self.positions[trade_id]
+                self.release_capital(trade_id, position.get("unrealized_pnl", -position["amount"] * 0.05))
             
             self.state.available_capital = self.state.total_capital
             self.state.deployed_capital = 0.0
             self._save_state()
+            self.flush()
             return True
         return False
     
     def _save_state(self):
+        """Mark state dirty; written at most once per save_interval"""
+        self.dirty = True
+        if time.time() - self.last_save >= self.save_interval:
+            self.flush()
+    
+    def flush(self):
+        if not self.dirty:
+            return
         state_data = {
             "state": asdict(self.state),
             "positions": self.positions,
-            "trade_history": self.trade_history[-1000:],
+            "trade_history": list(self.trade_history),
+            "stats": self.stats.to_dict(),
             "last_saved": time.time()
         }
         
         try:
-            with open("capital_state.json", "w") as f:
-                json.dump(state_data, f, indent=2)
+            with open(self.state_path, "w") as f:
+                json.dump(state_data, f)
+            self.dirty = False
+            self.last_save = time.time()
         except Exception as e:
             logging.error(f"Failed to save capital state: {e}")
     
     def _load_state(self):
         try:
-            with open("capital_state.json", "r") as f:
+            with open(self.state_path, "r") as f:
                 data = json.load(f)
                 
                 if "state" in data:
@@ -255,15 +377,33 @@ class CapitalManager:
                     self.positions = data["positions"]
                 
                 if "trade_history" in data:
-                    self.trade_history = data["trade_history"]
+                    self.trade_history.extend(data["trade_history"])
+                
+                # Older state files have no accumulators: rebuild from the saved history
+                if "stats" in data:
+                    self.stats = TradeStats.from_dict(data["stats"])
+                else:
+                    self.stats = TradeStats.from_trades(self.trade_history)
                     
         except FileNotFoundError:
             pass
         except Exception as e:
             logging.error(f"Failed to load capital state: {e}")
 
+# Global capital manager instance
+capital_manager = None
+
+def get_capital_manager() -> CapitalManager:
+    """Get the global capital manager"""
+    global capital_manager
+    if capital_manager is None:
+        capital_manager = CapitalManager()
+        # Saves are throttled; write whatever is pending on the way out
+        atexit.register(capital_manager.flush)
+    return capital_manager
+
 def update_position(trade_data: Dict):
-    capital_manager = CapitalManager()
+    capital_manager = get_capital_manager()
     
     trade_id = trade_data.get("tx_hash", f"trade_{int(time.time())}")
     amount = trade_data.get("amount_in_eth", 0.0)
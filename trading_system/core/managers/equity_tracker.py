@@ -0,0 +1,148 @@
+import os
+import time
+import logging
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+import numpy as np
+
+EQUITY_BUCKET_SECONDS = float(os.getenv("EQUITY_BUCKET_SECONDS", "1"))
+EQUITY_HISTORY_BARS = int(os.getenv("EQUITY_HISTORY_BARS", "86400"))  # a day of 1-second bars
+
+INF = float("inf")
+
+# Columns of a bar in the ring buffer
+BAR_TIME, BAR_OPEN, BAR_HIGH, BAR_LOW, BAR_CLOSE = range(5)
+
+@dataclass
+class DrawdownBreaker:
+    """Fires once when marked drawdown reaches `threshold`, re-arms once it is back under `reset_below`"""
+    name: str
+    threshold: float  # fraction of peak equity
+    reset_below: float
+    on_trip: Callable[[float], None]
+    on_reset: Optional[Callable[[], None]] = None
+    tripped: bool = False
+    trips: int = 0
+
+class EquityTracker:
+    """Marked-to-market equity with a high-water mark, drawdown breakers and a ring buffer of OHLC bars.
+
+    Callers keep their own running equity (cash plus open P&L, updated per position touched) and pass it in
+    on every tick; each update here is O(1)."""
+
+    def __init__(self, equity: float, peak: Optional[float] = None, bucket_seconds: float = EQUITY_BUCKET_SECONDS,
+                 capacity: int = EQUITY_HISTORY_BARS):
+        self.equity = equity
+        self.peak = max(equity, peak or equity)
+        self.drawdown = (self.peak - equity) / self.peak if self.peak > 0 else 0.0
+        self.max_drawdown = self.drawdown
+        self.updates = 0
+
+        # Closed bars go into the ring; the open bar lives in plain floats until its bucket ends
+        self.bucket_seconds = bucket_seconds
+        self.bars = np.zeros((capacity, 5))
+        self.bar_count = 0
+        self.bar_start: Optional[float] = None
+        self.bar_open = self.bar_high = self.bar_low = self.bar_close = equity
+
+        self.breakers: List[DrawdownBreaker] = []
+        self.trip_at = INF  # lowest threshold of an armed breaker
+        self.reset_at = -INF  # highest re-arm level of a tripped breaker
+
+    def add_breaker(self, name: str, threshold: float, on_trip: Callable[[float], None],
+                    on_reset: Optional[Callable[[], None]] = None,
+                    reset_below: Optional[float] = None) -> DrawdownBreaker:
+        """Re-arms at half the threshold unless `reset_below` says otherwise"""
+        breaker = DrawdownBreaker(name, threshold, threshold / 2 if reset_below is None else reset_below,
+                                  on_trip, on_reset)
+        self.breakers.append(breaker)
+        self.breakers.sort(key=lambda b: b.threshold)
+        self._recompute_levels()
+        return breaker
+
+    def update(self, equity: float, now: Optional[float] = None) -> float:
+        """Record the latest marked equity; returns drawdown from the peak as a fraction"""
+        now = time.time() if now is None else now
+        self.equity = equity
+        self.updates += 1
+
+        start = now - now % self.bucket_seconds
+        if start != self.bar_start:
+            if self.bar_start is not None:
+                self._close_bar()
+            self.bar_start = start
+            self.bar_open = self.bar_high = self.bar_low = equity
+        elif equity > self.bar_high:
+            self.bar_high = equity
+        elif equity < self.bar_low:
+            self.bar_low = equity
+        self.bar_close = equity
+
+        if equity > self.peak:
+            self.peak = equity
+            self.drawdown = 0.0
+        else:
+            self.drawdown = (self.peak - equity) / self.peak if self.peak > 0 else 0.0
+            if self.drawdown > self.max_drawdown:
+                self.max_drawdown = self.drawdown
+
+        if self.drawdown >= self.trip_at or self.drawdown < self.reset_at:
+            self._check_breakers()
+        return self.drawdown
+
+    def _close_bar(self):
+        row = self.bars[self.bar_count % len(self.bars)]
+        row[BAR_TIME] = self.bar_start
+        row[BAR_OPEN] = self.bar_open
+        row[BAR_HIGH] = self.bar_high
+        row[BAR_LOW] = self.bar_low
+        row[BAR_CLOSE] = self.bar_close
+        self.bar_count += 1
+
+    def _check_breakers(self):
+        drawdown = self.drawdown
+        for breaker in self.breakers:
+            if not breaker.tripped and drawdown >= breaker.threshold:
+                breaker.tripped = True
+                breaker.trips += 1
+                # Levels first: the action may close positions, which updates equity again
+                self._recompute_levels()
+                logging.critical(f"🚨 Drawdown breaker {breaker.name}: marked drawdown {drawdown:.2%} "
+                                 f"(limit {breaker.threshold:.2%})")
+                breaker.on_trip(drawdown)
+            elif breaker.tripped and drawdown < breaker.reset_below:
+                breaker.tripped = False
+                self._recompute_levels()
+                logging.info(f"✅ Drawdown breaker {breaker.name} re-armed at {drawdown:.2%}")
+                if breaker.on_reset is not None:
+                    breaker.on_reset()
+
+    def _recompute_levels(self):
+        self.trip_at = min((b.threshold for b in self.breakers if not b.tripped), default=INF)
+        self.reset_at = max((b.reset_below for b in self.breakers if b.tripped), default=-INF)
+
+    def get_series(self) -> np.ndarray:
+        """Bars oldest first as rows of (bucket start, open, high, low, close), the open bar last.
+        Buckets without a tick have no row."""
+        capacity = len(self.bars)
+        if self.bar_count <= capacity:
+            closed = self.bars[:self.bar_count]
+        else:
+            split = self.bar_count % capacity
+            closed = np.concatenate((self.bars[split:], self.bars[:split]))
+        if self.bar_start is None:
+            return closed.copy()
+        current = np.array([[self.bar_start, self.bar_open, self.bar_high, self.bar_low, self.bar_close]])
+        return np.concatenate((closed, current))
+
+    def get_stats(self) -> Dict:
+        return {
+            "equity": self.equity,
+            "peak": self.peak,
+            "drawdown": self.drawdown,
+            "max_drawdown": self.max_drawdown,
+            "updates": self.updates,
+            "bars": min(self.bar_count, len(self.bars)) + (self.bar_start is not None),
+            "breakers": {b.name: {"threshold": b.threshold, "tripped": b.tripped, "trips": b.trips}
+                         for b in self.breakers}
+        }
@@ -14,6 +14,10 @@ import os
 import math
 from enum import Enum
 
+from pool_state import get_pool_state
+from trade_store import get_trade_store
+from capital_manager import get_capital_manager
+
 class ExitReason(Enum):
     TAKE_PROFIT = "take_profit"
     STOP_LOSS = "stop_loss"
@@ -41,6 +45,7 @@ class Position:
     original_wallet: str
     confidence_score: float
     is_active: bool = True
+    trade_id: str = ""  # capital manager allocation, keyed by the entry tx hash
 
 @dataclass
 class ExitExecution:
@@ -62,8 +67,14 @@ class PriceOracle:
         self.dexscreener_base = "https://api.dexscreener.com/latest"
         self.price_cache = {}
         self.cache_ttl = 5
+        self.pool_state = get_pool_state()
         
     async def get_token_price(self, token_address: str) -> Optional[float]:
+        # Mirrored pool state is updated from chain logs, so it needs no TTL or HTTP round trip
+        local_price = self.pool_state.get_price(token_address)
+        if local_price:
+            return local_price
+        
         cache_key = token_address.lower()
         current_time = time.time()
         
@@ -135,7 +146,8 @@ class PriceOracle:
         return None
     
     async def _get_uniswap_price(self, token_address: str) -> Optional[float]:
-        return None
+        await self.pool_state.track_token(token_address)
+        return self.pool_state.get_price(token_address)
 
 class TechnicalAnalyzer:
     def __init__(self):
@@ -431,6 +443,7 @@ class ExitManager:
         self.exit_strategy = ExitStrategyEngine()
         self.trailing_stop_manager = TrailingStopManager()
         self.position_tracker = PositionTracker()
+        self.capital_manager = get_capital_manager()
         
         self.okx_executor = OKXExecutor(
             os.getenv("OKX_API_KEY"),
@@ -441,6 +454,7 @@ class ExitManager:
         self.running = False
         self.monitor_interval = 2.0
         self.executor = ThreadPoolExecutor(max_workers=8)
+        self.pool_task: Optional[asyncio.Task] = None
         
     async def add_position_from_entry(self, entry_data: Dict):
         position = Position(
@@ -461,16 +475,24 @@ class ExitManager:
             trailing_stop=entry_data["entry_price"] * 0.95,
             max_price_seen=entry_data["entry_price"],
             original_wallet=entry_data.get("wallet_followed", "unknown"),
-            confidence_score=entry_data.get("confidence_score", 0.5)
+            confidence_score=entry_data.get("confidence_score", 0.5),
+            trade_id=entry_data.get("tx_hash", "")
         )
         
         self.position_tracker.add_position(position)
+        await self.price_oracle.pool_state.track_token(position.token_address)
         logging.info(f"Added position for tracking: {position.token_address}")
     
     async def monitor_positions(self):
         self.running = True
         logging.info("Starting exit manager monitoring...")
         
+        pool_state = self.price_oracle.pool_state
+        ws_url = os.getenv("ETHEREUM_WS_URL")
+        if ws_url and self.pool_task is None and not pool_state.running:
+            # Shared with the wallet mimic when both run in one process
+            self.pool_task = asyncio.create_task(pool_state.run(ws_url))
+        
         while self.running:
             try:
                 active_positions = self.position_tracker.get_active_positions()
@@ -499,6 +521,7 @@ class ExitManager:
                 return
             
             self.position_tracker.update_position(position.token_address, current_price)
+            self._mark_capital(position, current_price)
             
             volume_spike = self.technical_analyzer.detect_volume_spike(position.token_address)
             rsi = self.technical_analyzer.calculate_rsi(position.token_address)
@@ -562,6 +585,7 @@ class ExitManager:
             
             if exit_percentage >= 1.0:
                 self.position_tracker.close_position(position.token_address, exit_execution)
+                self._release_capital(position, exit_price)
                 logging.info(f"Closed position {position.token_address}: {exit_reason.value} | PnL: {realized_pnl_pct:.2f}%")
             else:
                 position.quantity -= quantity_to_sell
@@ -572,7 +596,28 @@ class ExitManager:
         except Exception as e:
             logging.error(f"Exit execution error: {e}")
     
+    def _allocated(self, position: Position) -> float:
+        allocation = self.capital_manager.positions.get(position.trade_id) if position.trade_id else None
+        return allocation["amount"] if allocation and position.entry_price > 0 else 0.0
+    
+    def _mark_capital(self, position: Position, current_price: float):
+        """Mark the allocation at the token's return so the capital breakers see open losses"""
+        allocated = self._allocated(position)
+        if allocated:
+            self.capital_manager.mark_position(position.trade_id, allocated * current_price / position.entry_price)
+    
+    def _release_capital(self, position: Position, exit_price: float):
+        allocated = self._allocated(position)
+        if allocated:
+            self.capital_manager.release_capital(position.trade_id, allocated * (exit_price / position.entry_price - 1))
+    
     def _log_exit(self, exit_execution: ExitExecution):
+        get_trade_store().record("exit", exit_execution.token_address, exit_execution.exit_price,
+                                 exit_execution.quantity_sold, pnl=exit_execution.realized_pnl, source="exit_manager",
+                                 strategy="wallet_mimic", side="sell", reason=exit_execution.exit_reason.value,
+                                 position_id=exit_execution.position_id, quote_ccy="ETH",
+                                 timestamp=exit_execution.execution_time)
+        
         log_entry = asdict(exit_execution)
         
         try:
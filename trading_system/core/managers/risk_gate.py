@@ -0,0 +1,184 @@
+import time
+import logging
+from dataclasses import dataclass, asdict
+from typing import Dict, Optional
+
+# Rejection reasons, in the order the gate checks them
+REJECT_HALTED = "halted"
+REJECT_RATE = "order_rate"
+REJECT_DAILY_TRADES = "daily_trades"
+REJECT_DRAWDOWN = "drawdown"
+REJECT_COOLDOWN = "cooldown"
+REJECT_MAX_POSITIONS = "max_positions"
+REJECT_ASSET_POSITIONS = "asset_positions"
+REJECT_ORDER_SIZE = "order_size"
+REJECT_EXPOSURE = "exposure"
+
+INF = float("inf")
+
+def trading_day(timestamp: float) -> int:
+    """UTC day number, used as the key for daily counters"""
+    return int(timestamp // 86400)
+
+@dataclass
+class RiskLimits:
+    max_open_positions: int = 1000000
+    max_positions_per_asset: int = 1000000
+    max_order_notional: float = INF
+    max_order_pct: float = 1.0  # of current capital
+    max_exposure_pct: float = INF  # of current capital, fees included; 1.0 for cash-settled spot buying
+    max_daily_trades: int = 1000000
+    max_drawdown_pct: float = 1.0  # fraction of peak capital
+    cooldown_seconds: float = 0.0  # after a position on the asset closes
+    orders_per_second: float = INF
+
+@dataclass
+class RiskRejection:
+    reason: str
+    asset: str
+    limit: float
+    value: float
+
+    def __str__(self):
+        return f"{self.reason} ({self.asset}: {self.value:g} vs limit {self.limit:g})"
+
+class PreTradeRiskGate:
+    """All pre-trade limits in one place: state updated on fills, every order checked in a few microseconds"""
+
+    __slots__ = ("limits", "capital", "peak_capital", "drawdown", "exposure", "open_positions", "assets",
+                 "day", "trades_today", "order_tokens", "token_time", "halt_reason", "order_cap", "exposure_cap",
+                 "rejections")
+
+    def __init__(self, capital: float, limits: Optional[RiskLimits] = None):
+        self.limits = limits or RiskLimits()
+        self.capital = capital
+        self.peak_capital = capital
+        self.drawdown = 0.0
+        self.exposure = 0.0
+        self.open_positions = 0
+        self.assets: Dict[str, list] = {}  # asset -> [open positions, exposure, cooldown until]
+        self.day = trading_day(time.time())
+        self.trades_today = 0
+        self.order_tokens = min(self.limits.orders_per_second, 1e9)
+        self.token_time = time.monotonic()
+        self.halt_reason = ""
+        self.rejections: Dict[str, int] = {}
+        self._recompute_caps()
+
+    def _recompute_caps(self):
+        # Capital-relative limits as absolute numbers, refreshed only when capital moves
+        self.order_cap = min(self.limits.max_order_notional, self.capital * self.limits.max_order_pct)
+        self.exposure_cap = self.capital * self.limits.max_exposure_pct
+
+    def check(self, asset: str, notional: float, now: Optional[float] = None, fee: float = 0.0) -> Optional[RiskRejection]:
+        """None when the order passes every limit, otherwise the first limit it breaks"""
+        limits = self.limits
+        if self.halt_reason:
+            return self._reject(REJECT_HALTED, asset, 0, 1)
+
+        if limits.orders_per_second != INF:
+            clock = time.monotonic()
+            self.order_tokens = min(limits.orders_per_second,
+                                    self.order_tokens + (clock - self.token_time) * limits.orders_per_second)
+            self.token_time = clock
+            if self.order_tokens < 1.0:
+                return self._reject(REJECT_RATE, asset, limits.orders_per_second, self.order_tokens)
+
+        now = time.time() if now is None else now
+        if self.get_trades_today(now) >= limits.max_daily_trades:
+            return self._reject(REJECT_DAILY_TRADES, asset, limits.max_daily_trades, self.trades_today)
+        if self.drawdown >= limits.max_drawdown_pct:
+            return self._reject(REJECT_DRAWDOWN, asset, limits.max_drawdown_pct, self.drawdown)
+
+        state = self.assets.get(asset)
+        if state is not None:
+            if now < state[2]:
+                return self._reject(REJECT_COOLDOWN, asset, state[2], now)
+            if state[0] >= limits.max_positions_per_asset:
+                return self._reject(REJECT_ASSET_POSITIONS, asset, limits.max_positions_per_asset, state[0])
+        if self.open_positions >= limits.max_open_positions:
+            return self._reject(REJECT_MAX_POSITIONS, asset, limits.max_open_positions, self.open_positions)
+        if notional > self.order_cap:
+            return self._reject(REJECT_ORDER_SIZE, asset, self.order_cap, notional)
+        if self.exposure + notional + fee > self.exposure_cap:
+            return self._reject(REJECT_EXPOSURE, asset, self.exposure_cap, self.exposure + notional + fee)
+        return None
+
+    def _reject(self, reason: str, asset: str, limit: float, value: float) -> RiskRejection:
+        self.rejections[reason] = self.rejections.get(reason, 0) + 1
+        return RiskRejection(reason, asset, limit, value)
+
+    def on_open(self, asset: str, notional: float, fee: float = 0.0, now: Optional[float] = None):
+        """An entry filled"""
+        state = self.assets.get(asset)
+        if state is None:
+            state = self.assets[asset] = [0, 0.0, 0.0]
+        state[0] += 1
+        state[1] += notional
+        self.open_positions += 1
+        self.exposure += notional
+        self.get_trades_today(time.time() if now is None else now)
+        self.trades_today += 1
+        if self.limits.orders_per_second != INF:
+            self.order_tokens -= 1.0
+        if fee:
+            self._add_pnl(-fee)
+
+    def on_cancel(self, asset: str, notional: float, now: Optional[float] = None):
+        """An entry reported through on_open never filled: undo it without the cooldown a close would start"""
+        state = self.assets.get(asset)
+        if state is not None:
+            state[0] = max(0, state[0] - 1)
+            state[1] = max(0.0, state[1] - notional)
+        self.exposure = max(0.0, self.exposure - notional)
+        self.open_positions = max(0, self.open_positions - 1)
+        self.get_trades_today(time.time() if now is None else now)
+        self.trades_today = max(0, self.trades_today - 1)
+        if self.limits.orders_per_second != INF:
+            self.order_tokens = min(self.limits.orders_per_second, self.order_tokens + 1.0)
+
+    def on_close(self, asset: str, notional: float, pnl: float, closed: bool = True, now: Optional[float] = None):
+        """An exit filled: `notional` is the entry notional it releases, `pnl` net of fees"""
+        state = self.assets.get(asset)
+        if state is not None:
+            state[1] = max(0.0, state[1] - notional)
+            if closed:
+                state[0] = max(0, state[0] - 1)
+                state[2] = (time.time() if now is None else now) + self.limits.cooldown_seconds
+        self.exposure = max(0.0, self.exposure - notional)
+        if closed:
+            self.open_positions = max(0, self.open_positions - 1)
+        self._add_pnl(pnl)
+
+    def _add_pnl(self, pnl: float):
+        self.capital += pnl
+        if self.capital > self.peak_capital:
+            self.peak_capital = self.capital
+        self.drawdown = (self.peak_capital - self.capital) / self.peak_capital if self.peak_capital > 0 else 0.0
+        self._recompute_caps()
+
+    def get_trades_today(self, now: Optional[float] = None) -> int:
+        day = trading_day(time.time() if now is None else now)
+        if day != self.day:
+            self.day = day
+            self.trades_today = 0
+        return self.trades_today
+
+    def halt(self, reason: str):
+        self.halt_reason = reason
+        logging.critical(f"🛑 Trading halted: {reason}")
+
+    def resume(self):
+        self.halt_reason = ""
+
+    def get_stats(self) -> Dict:
+        return {
+            "capital": self.capital,
+            "exposure": self.exposure,
+            "open_positions": self.open_positions,
+            "drawdown": self.drawdown,
+            "trades_today": self.get_trades_today(),
+            "halted": self.halt_reason,
+            "rejections": dict(self.rejections),
+            "limits": asdict(self.limits)
+        }
@@ -0,0 +1,211 @@
+import os
+import time
+import atexit
+import logging
+import itertools
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+except ImportError:
+    pa = None
+
+TRADE_STORE_PATH = os.getenv("TRADE_STORE_PATH", str(Path(__file__).resolve().parents[2] / "data" / "trade_store"))
+TRADE_STORE_SEGMENT_ROWS = int(os.getenv("TRADE_STORE_SEGMENT_ROWS", "65536"))
+
+NUMERIC_COLUMNS = ("timestamp", "price", "quantity", "fee", "pnl")
+TEXT_COLUMNS = ("source", "strategy", "asset", "side", "kind", "reason", "signal", "position_id", "quote_ccy")
+COLUMNS = NUMERIC_COLUMNS + TEXT_COLUMNS
+GROUP_KEYS = TEXT_COLUMNS + ("hour",)  # hour of day, UTC
+
+SEGMENT_SUFFIXES = (".arrow", ".npz")
+
+class TradeStore:
+    """Append-only columnar store of entry and exit fills from every engine.
+
+    Rows collect in an in-memory tail and are written as immutable segments (Arrow IPC with pyarrow,
+    .npz without) every `segment_rows`. Queries run as numpy group-bys over all segments plus the tail."""
+
+    def __init__(self, path: str = TRADE_STORE_PATH, segment_rows: int = TRADE_STORE_SEGMENT_ROWS,
+                 use_arrow: Optional[bool] = None):
+        self.path = Path(path)
+        self.segment_rows = segment_rows
+        self.use_arrow = pa is not None if use_arrow is None else use_arrow
+        if self.use_arrow and pa is None:
+            raise ImportError("pyarrow is required for Arrow segments")
+        self.tail: Dict[str, list] = {column: [] for column in COLUMNS}
+        self.tail_rows = 0
+        self.segment_ids = itertools.count()
+        # Segments never change once written, so loaded columns are only ever appended to
+        self.loaded: Set[Path] = set()
+        self.cache: Optional[Dict[str, np.ndarray]] = None
+
+    def record(self, kind: str, asset: str, price: float, quantity: float, fee: float = 0.0, pnl: float = 0.0,
+               source: str = "", strategy: str = "", side: str = "", reason: str = "", signal: str = "",
+               position_id: str = "", quote_ccy: str = "USD", timestamp: Optional[float] = None):
+        """One fill. `kind` is "entry" or "exit"; `pnl` is net of this fill's own fee, so an entry carries -fee.
+        Price, fee and pnl are in `quote_ccy`: sum P&L only within one currency"""
+        tail = self.tail
+        tail["timestamp"].append(time.time() if timestamp is None else timestamp)
+        tail["price"].append(price)
+        tail["quantity"].append(quantity)
+        tail["fee"].append(fee)
+        tail["pnl"].append(pnl)
+        tail["source"].append(source)
+        tail["strategy"].append(strategy)
+        tail["asset"].append(asset)
+        tail["side"].append(side)
+        tail["kind"].append(kind)
+        tail["reason"].append(reason)
+        tail["signal"].append(signal)
+        tail["position_id"].append(position_id)
+        tail["quote_ccy"].append(quote_ccy)
+        self.tail_rows += 1
+        if self.tail_rows >= self.segment_rows:
+            self.flush()
+
+    def flush(self):
+        """Write the tail as a new segment"""
+        if not self.tail_rows:
+            return
+        columns = self._tail_arrays()
+        self.path.mkdir(parents=True, exist_ok=True)
+        suffix = ".arrow" if self.use_arrow else ".npz"
+        name = f"segment_{time.time_ns()}_{os.getpid()}_{next(self.segment_ids)}{suffix}"
+        temp_path = self.path / f".{name}.tmp"
+        try:
+            if self.use_arrow:
+                table = pa.table(columns)
+                with pa.OSFile(str(temp_path), "wb") as sink, ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            else:
+                with open(temp_path, "wb") as f:
+                    np.savez(f, **columns)
+            os.replace(temp_path, self.path / name)
+        except Exception as e:
+            logging.error(f"Failed to write trade store segment: {e}")
+            return
+        self.tail = {column: [] for column in COLUMNS}
+        self.tail_rows = 0
+
+    def _tail_arrays(self) -> Dict[str, np.ndarray]:
+        columns = {column: np.asarray(self.tail[column], dtype=np.float64) for column in NUMERIC_COLUMNS}
+        columns.update({column: np.asarray(self.tail[column], dtype=str) for column in TEXT_COLUMNS})
+        return columns
+
+    def _read_segment(self, segment: Path) -> Dict[str, np.ndarray]:
+        if segment.suffix == ".arrow":
+            if pa is None:
+                raise ImportError(f"pyarrow is required to read {segment.name}")
+            with pa.memory_map(str(segment)) as source:
+                table = ipc.open_file(source).read_all()
+            columns = {column: table.column(column).to_numpy() for column in NUMERIC_COLUMNS}
+            columns.update({column: table.column(column).to_numpy(zero_copy_only=False).astype(str)
+                            for column in TEXT_COLUMNS if column in table.column_names})
+        else:
+            with np.load(segment) as data:
+                columns = {column: data[column] for column in COLUMNS if column in data.files}
+        # Segments written before a text column existed read it as empty
+        rows = len(columns["timestamp"])
+        for column in TEXT_COLUMNS:
+            if column not in columns:
+                columns[column] = np.full(rows, "")
+        return columns
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """Every row as numpy arrays: segments on disk in write order, then the tail"""
+        segments = sorted(p for p in self.path.glob("segment_*") if p.suffix in SEGMENT_SUFFIXES) \
+            if self.path.exists() else []
+        new = [p for p in segments if p not in self.loaded]
+        if new or self.cache is None:
+            parts = ([self.cache] if self.cache is not None else []) + [self._read_segment(p) for p in new]
+            self.cache = self._concat(parts)
+            self.loaded.update(new)
+        if not self.tail_rows:
+            return self.cache
+        return self._concat([self.cache, self._tail_arrays()])
+
+    def _concat(self, parts: List[Dict[str, np.ndarray]]) -> Dict[str, np.ndarray]:
+        if not parts:
+            columns = {column: np.empty(0) for column in NUMERIC_COLUMNS}
+            columns.update({column: np.empty(0, dtype=str) for column in TEXT_COLUMNS})
+            return columns
+        return {column: np.concatenate([part[column] for part in parts]) for column in COLUMNS}
+
+    def select(self, since: Optional[float] = None, until: Optional[float] = None, **filters) -> Dict[str, np.ndarray]:
+        """Rows in [since, until) whose text columns equal the given values, e.g. select(source="paper")"""
+        columns = self.columns()
+        mask = None
+        if since is not None:
+            mask = columns["timestamp"] >= since
+        if until is not None:
+            mask = (columns["timestamp"] < until) if mask is None else mask & (columns["timestamp"] < until)
+        for column, value in filters.items():
+            if column not in TEXT_COLUMNS:
+                raise ValueError(f"Cannot filter on {column}, expected one of {', '.join(TEXT_COLUMNS)}")
+            match = columns[column] == value
+            mask = match if mask is None else mask & match
+        if mask is None:
+            return columns
+        return {column: values[mask] for column, values in columns.items()}
+
+    def pnl_by(self, key: str, since: Optional[float] = None, until: Optional[float] = None,
+               **filters) -> Dict[str, Dict]:
+        """Net P&L, fees, fills, closed trades and wins per value of `key` (a text column or "hour")"""
+        if key not in GROUP_KEYS:
+            raise ValueError(f"Cannot group by {key}, expected one of {', '.join(GROUP_KEYS)}")
+        rows = self.select(since, until, **filters)
+        labels = (rows["timestamp"] // 3600 % 24).astype(np.int64) if key == "hour" else rows[key]
+        groups, inverse = np.unique(labels, return_inverse=True)
+        size = len(groups)
+
+        exits = rows["kind"] == "exit"
+        pnl = np.bincount(inverse, weights=rows["pnl"], minlength=size)
+        fees = np.bincount(inverse, weights=rows["fee"], minlength=size)
+        fills = np.bincount(inverse, minlength=size)
+        trades = np.bincount(inverse[exits], minlength=size)
+        wins = np.bincount(inverse[exits & (rows["pnl"] > 0)], minlength=size)
+
+        return {
+            (int(group) if key == "hour" else str(group)): {
+                "pnl": float(pnl[i]),
+                "fees": float(fees[i]),
+                "fills": int(fills[i]),
+                "trades": int(trades[i]),
+                "wins": int(wins[i]),
+                "win_rate": wins[i] / trades[i] if trades[i] else 0.0
+            }
+            for i, group in enumerate(groups)
+        }
+
+    def summary(self, since: Optional[float] = None, until: Optional[float] = None, **filters) -> Dict:
+        rows = self.select(since, until, **filters)
+        exits = rows["kind"] == "exit"
+        trades = int(exits.sum())
+        wins = int((exits & (rows["pnl"] > 0)).sum())
+        return {
+            "fills": len(rows["timestamp"]),
+            "trades": trades,
+            "wins": wins,
+            "win_rate": wins / trades if trades else 0.0,
+            "pnl": float(rows["pnl"].sum()),
+            "fees": float(rows["fee"].sum())
+        }
+
+    def __len__(self) -> int:
+        return len(self.columns()["timestamp"])
+
+# Global trade store instance
+trade_store = None
+
+def get_trade_store() -> TradeStore:
+    """Get the global trade store"""
+    global trade_store
+    if trade_store is None:
+        trade_store = TradeStore()
+        # The tail lives in memory; write it out on the way out
+        atexit.register(trade_store.flush)
+    return trade_store
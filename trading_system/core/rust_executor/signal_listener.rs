@@ -1,142 +1,449 @@
-use std::fs;
-use std::time::{SystemTime, UNIX_EPOCH};
-use serde_json::Value;
+use std::fs::{self, OpenOptions};
+use std::io;
+use std::path::Path;
+use std::os::unix::fs::FileExt;
+use std::os::unix::io::AsRawFd;
+use std::ptr;
+use std::sync::atomic::{AtomicU32, AtomicU64, Ordering};
+use std::time::{Duration, Instant, SystemTime, UNIX_EPOCH};
+use serde_json::{json, Value};
 
-pub struct SignalListener {
-    signal_file_path: String,
-    last_signal_timestamp: u64,
-    last_file_modified: Option<SystemTime>,
+// Ring layout shared with core/connectors/signal_bus.py
+const RING_MAGIC: u32 = 0x5254_4648;
+const RING_VERSION: u32 = 1;
+const HEADER_SIZE: usize = 256;
+const HEAD_OFFSET: usize = 64;
+const TAIL_OFFSET: usize = 128;
+const DOORBELL_OFFSET: usize = 192;
+const WAITING_OFFSET: usize = 196;
+const RECORD_SIZE: usize = 128;
+const DEFAULT_RING_CAPACITY: usize = 1024;
+const SPIN_LIMIT: u32 = 200;
+const MAX_SIGNAL_AGE_NS: u64 = 15_000_000_000;
+const SHARD_SCAN_INTERVAL: Duration = Duration::from_secs(1);
+
+pub const FILL_FILLED: u8 = 0;
+pub const FILL_PARTIAL: u8 = 1;
+pub const FILL_REJECTED: u8 = 2;
+
+struct ShmRing {
+    base: *mut u8,
+    len: usize,
+    capacity: u64,
 }
 
-impl SignalListener {
-    pub fn new() -> Self {
-        SignalListener {
-            signal_file_path: "/tmp/signal.json".to_string(),
-            last_signal_timestamp: 0,
-            last_file_modified: None,
+unsafe impl Send for ShmRing {}
+
+impl ShmRing {
+    fn open(path: &str, capacity: usize) -> io::Result<Self> {
+        let file = OpenOptions::new().read(true).write(true).create(true).open(path)?;
+        let fd = file.as_raw_fd();
+
+        // Both ends may attach at once: only one initialises the file
+        if unsafe { libc::flock(fd, libc::LOCK_EX) } != 0 {
+            return Err(io::Error::last_os_error());
         }
-    }
-    
-    pub fn check_for_signals(&mut self) -> Result<Option<Value>, Box<dyn std::error::Error>> {
-        if !fs::metadata(&self.signal_file_path).is_ok() {
-            return Ok(None);
+        let mut header = [0u8; 16];
+        let fields: Vec<u32> = if file.read_exact_at(&mut header, 0).is_ok() {
+            header.chunks_exact(4).map(|b| u32::from_le_bytes(b.try_into().unwrap())).collect()
+        } else {
+            vec![0; 4]
+        };
+        let existing = fields[3] as usize;
+        let fresh = fields[..3] != [RING_MAGIC, RING_VERSION, RECORD_SIZE as u32] || !existing.is_power_of_two();
+        let capacity = if fresh {
+            capacity
+        } else {
+            if existing != capacity {
+                // The other end sized this ring and may have it mapped: attach as is, never shrink it under them
+                log::warn!("Ring {} has capacity {}, attaching with it instead of {}", path, existing, capacity);
+            }
+            existing
+        };
+        let len = HEADER_SIZE + capacity * RECORD_SIZE;
+        let expected = [RING_MAGIC, RING_VERSION, RECORD_SIZE as u32, capacity as u32];
+        if fresh {
+            file.set_len(0)?;
+            file.set_len(len as u64)?;
+        }
+
+        let base = unsafe {
+            libc::mmap(ptr::null_mut(), len, libc::PROT_READ | libc::PROT_WRITE, libc::MAP_SHARED, fd, 0)
+        };
+        if base == libc::MAP_FAILED {
+            return Err(io::Error::last_os_error());
         }
-        
-        let file_metadata = fs::metadata(&self.signal_file_path)?;
-        let current_modified = file_metadata.modified()?;
-        
-        if let Some(last_modified) = self.last_file_modified {
-            if current_modified <= last_modified {
-                return Ok(None);
+        let base = base as *mut u8;
+        if fresh {
+            for (i, value) in expected.iter().enumerate() {
+                unsafe { ptr::copy_nonoverlapping(value.to_le_bytes().as_ptr(), base.add(i * 4), 4) };
             }
         }
-        
-        self.last_file_modified = Some(current_modified);
-        
-        let signal_content = fs::read_to_string(&self.signal_file_path)
-            .map_err(|_| "Cannot read signal file")?;
-        
-        let signal_data: Value = serde_json::from_str(&signal_content)
-            .map_err(|_| "Cannot parse signal JSON")?;
-        
-        if !self.validate_signal_structure(&signal_data) {
-            return Ok(None);
+        unsafe { libc::flock(fd, libc::LOCK_UN) };
+
+        Ok(ShmRing { base, len, capacity: capacity as u64 })
+    }
+
+    fn head(&self) -> &AtomicU64 {
+        unsafe { &*(self.base.add(HEAD_OFFSET) as *const AtomicU64) }
+    }
+
+    fn tail(&self) -> &AtomicU64 {
+        unsafe { &*(self.base.add(TAIL_OFFSET) as *const AtomicU64) }
+    }
+
+    fn doorbell(&self) -> &AtomicU32 {
+        unsafe { &*(self.base.add(DOORBELL_OFFSET) as *const AtomicU32) }
+    }
+
+    fn waiting(&self) -> &AtomicU32 {
+        unsafe { &*(self.base.add(WAITING_OFFSET) as *const AtomicU32) }
+    }
+
+    fn slot(&self, seq: u64) -> *mut u8 {
+        unsafe { self.base.add(HEADER_SIZE + (seq % self.capacity) as usize * RECORD_SIZE) }
+    }
+
+    fn has_data(&self) -> bool {
+        self.head().load(Ordering::Acquire) != self.tail().load(Ordering::Relaxed)
+    }
+
+    fn try_read(&self) -> Option<[u8; RECORD_SIZE]> {
+        let tail = self.tail().load(Ordering::Relaxed);
+        if self.head().load(Ordering::Acquire) == tail {
+            return None;
         }
-        
-        let signal_timestamp = signal_data.get("timestamp")
-            .and_then(|v| v.as_f64())
-            .ok_or("Signal missing timestamp")? as u64;
-        
-        if signal_timestamp <= self.last_signal_timestamp {
-            return Ok(None);
+        let mut record = [0u8; RECORD_SIZE];
+        unsafe { ptr::copy_nonoverlapping(self.slot(tail), record.as_mut_ptr(), RECORD_SIZE) };
+        self.tail().store(tail + 1, Ordering::Release);
+        Some(record)
+    }
+
+    fn try_write(&self, record: &mut [u8; RECORD_SIZE]) -> Option<u64> {
+        let head = self.head().load(Ordering::Relaxed);
+        if head - self.tail().load(Ordering::Acquire) >= self.capacity {
+            return None;
         }
-        
-        if !self.validate_signal_freshness(&signal_data) {
-            return Ok(None);
+        record[0..8].copy_from_slice(&head.to_le_bytes());
+        unsafe { ptr::copy_nonoverlapping(record.as_ptr(), self.slot(head), RECORD_SIZE) };
+        self.head().store(head + 1, Ordering::Release);
+        self.doorbell().fetch_add(1, Ordering::SeqCst);
+        if self.waiting().load(Ordering::SeqCst) != 0 {
+            self.futex(libc::FUTEX_WAKE, 1, None);
         }
-        
-        self.last_signal_timestamp = signal_timestamp;
-        
-        let confidence = signal_data.get("confidence")
-            .and_then(|v| v.as_f64())
-            .ok_or("Signal missing confidence")?;
-        
-        log::info!("Valid signal detected: confidence={:.3}", confidence);
-        
-        Ok(Some(signal_data))
-    }
-    
-    fn validate_signal_structure(&self, signal: &Value) -> bool {
-        if !signal.is_object() {
-            return false;
+        Some(head)
+    }
+
+    /// Spin briefly, then park on the doorbell until `ready` holds or the timeout passes
+    fn wait(&self, timeout: Duration, ready: impl Fn() -> bool) -> bool {
+        for _ in 0..SPIN_LIMIT {
+            if ready() {
+                return true;
+            }
+            std::hint::spin_loop();
         }
-        
-        let required_fields = ["confidence", "timestamp"];
-        for field in &required_fields {
-            if signal.get(field).is_none() {
-                return false;
+
+        let deadline = Instant::now() + timeout;
+        self.waiting().store(1, Ordering::SeqCst);
+        let ready = loop {
+            let bell = self.doorbell().load(Ordering::SeqCst);
+            if ready() {
+                break true;
             }
+            let now = Instant::now();
+            if now >= deadline {
+                break false;
+            }
+            // Returns at once if the doorbell moved after it was read
+            self.futex(libc::FUTEX_WAIT, bell, Some(deadline - now));
+        };
+        self.waiting().store(0, Ordering::SeqCst);
+        ready
+    }
+
+    fn futex(&self, op: libc::c_int, value: u32, timeout: Option<Duration>) {
+        let timespec = timeout.map(|t| libc::timespec {
+            tv_sec: t.as_secs() as libc::time_t,
+            tv_nsec: t.subsec_nanos() as libc::c_long,
+        });
+        let timespec_ptr = timespec.as_ref().map_or(ptr::null(), |t| t as *const libc::timespec);
+        unsafe {
+            libc::syscall(libc::SYS_futex, self.doorbell() as *const AtomicU32, op, value, timespec_ptr,
+                          ptr::null::<u32>(), 0);
         }
-        
-        let confidence = signal.get("confidence").and_then(|v| v.as_f64());
-        if confidence.is_none() || confidence.unwrap() < 0.0 || confidence.unwrap() > 1.0 {
-            return false;
+    }
+}
+
+impl Drop for ShmRing {
+    fn drop(&mut self) {
+        unsafe { libc::munmap(self.base as *mut libc::c_void, self.len) };
+    }
+}
+
+fn u64_at(record: &[u8], offset: usize) -> u64 {
+    u64::from_le_bytes(record[offset..offset + 8].try_into().unwrap())
+}
+
+fn f64_at(record: &[u8], offset: usize) -> f64 {
+    f64::from_le_bytes(record[offset..offset + 8].try_into().unwrap())
+}
+
+fn text_at(record: &[u8], offset: usize, size: usize) -> String {
+    let raw = &record[offset..offset + size];
+    let end = raw.iter().position(|&b| b == 0).unwrap_or(size);
+    String::from_utf8_lossy(&raw[..end]).into_owned()
+}
+
+fn put_text(record: &mut [u8], offset: usize, size: usize, text: &str) {
+    let bytes = text.as_bytes();
+    let n = bytes.len().min(size);
+    record[offset..offset + n].copy_from_slice(&bytes[..n]);
+}
+
+/// Same setting and default as SIGNAL_RING_CAPACITY in signal_bus.py
+fn ring_capacity() -> usize {
+    std::env::var("SIGNAL_RING_CAPACITY").ok().and_then(|v| v.parse().ok()).unwrap_or(DEFAULT_RING_CAPACITY)
+}
+
+fn now_ns() -> u64 {
+    SystemTime::now().duration_since(UNIX_EPOCH).map(|d| d.as_nanos() as u64).unwrap_or(0)
+}
+
+#[derive(Debug, Clone)]
+pub struct SignalRecord {
+    /// Ring pair the signal arrived on; its fill goes back on the same pair
+    pub channel: usize,
+    pub seq: u64,
+    pub timestamp_ns: u64,
+    pub published_ns: u64,
+    pub asset: String,
+    pub side: i8,
+    pub production_validated: bool,
+    pub confidence: f64,
+    pub entry_price: f64,
+    pub stop_loss: f64,
+    pub take_profit: f64,
+    pub quantity: f64,
+    pub rsi: f64,
+    pub vwap: f64,
+    pub volume_ratio: f64,
+}
+
+impl SignalRecord {
+    fn decode(record: &[u8; RECORD_SIZE], channel: usize) -> Self {
+        SignalRecord {
+            channel,
+            seq: u64_at(record, 0),
+            timestamp_ns: u64_at(record, 8),
+            published_ns: u64_at(record, 16),
+            asset: text_at(record, 24, 16),
+            side: record[40] as i8,
+            production_validated: record[41] & 1 != 0,
+            confidence: f64_at(record, 48),
+            entry_price: f64_at(record, 56),
+            stop_loss: f64_at(record, 64),
+            take_profit: f64_at(record, 72),
+            quantity: f64_at(record, 80),
+            rsi: f64_at(record, 88),
+            vwap: f64_at(record, 96),
+            volume_ratio: f64_at(record, 104),
         }
-        
-        if let Some(best_signal) = signal.get("best_signal") {
-            if !self.validate_best_signal_structure(best_signal) {
-                return false;
+    }
+
+    /// Same shape as the merged signal JSON the executor used to read from /tmp/signal.json
+    pub fn to_json(&self) -> Value {
+        json!({
+            "confidence": self.confidence,
+            "timestamp": self.timestamp_ns as f64 / 1e9,
+            "production_validated": self.production_validated,
+            "best_signal": {
+                "asset": self.asset,
+                "entry_price": self.entry_price,
+                "stop_loss": self.stop_loss,
+                "take_profit_1": self.take_profit,
+                "signal_type": if self.side < 0 { "SHORT" } else { "LONG" },
+                "rsi": self.rsi,
+                "vwap": self.vwap,
+                "volume_ratio": self.volume_ratio
             }
-        }
-        
-        true
+        })
     }
-    
-    fn validate_best_signal_structure(&self, best_signal: &Value) -> bool {
-        let required_fields = ["asset", "entry_price"];
-        for field in &required_fields {
-            if best_signal.get(field).is_none() {
-                return false;
+
+    fn is_valid(&self) -> bool {
+        !self.asset.is_empty() && self.entry_price > 0.0 && (0.0..=1.0).contains(&self.confidence)
+    }
+}
+
+#[derive(Debug, Clone)]
+pub struct FillRecord {
+    pub channel: usize,
+    pub signal_seq: u64,
+    pub asset: String,
+    pub side: i8,
+    pub status: u8,
+    pub price: f64,
+    pub quantity: f64,
+    pub fee: f64,
+    pub execution_time_us: u64,
+    pub order_id: String,
+}
+
+impl FillRecord {
+    fn encode(&self) -> [u8; RECORD_SIZE] {
+        let mut record = [0u8; RECORD_SIZE];
+        record[8..16].copy_from_slice(&now_ns().to_le_bytes());
+        record[16..24].copy_from_slice(&self.signal_seq.to_le_bytes());
+        put_text(&mut record, 24, 16, &self.asset);
+        record[40] = self.side as u8;
+        record[41] = self.status;
+        record[48..56].copy_from_slice(&self.price.to_le_bytes());
+        record[56..64].copy_from_slice(&self.quantity.to_le_bytes());
+        record[64..72].copy_from_slice(&self.fee.to_le_bytes());
+        record[72..80].copy_from_slice(&self.execution_time_us.to_le_bytes());
+        put_text(&mut record, 80, 32, &self.order_id);
+        record
+    }
+}
+
+/// One signal ring and its fill ring: the unsharded pair, or one shard worker's
+struct Channel {
+    name: String,
+    signals: ShmRing,
+    fills: ShmRing,
+    next_seq: u64,
+}
+
+impl Channel {
+    fn open(signal_path: &str, fill_path: &str, name: String) -> io::Result<Self> {
+        let signals = ShmRing::open(signal_path, ring_capacity())?;
+        let fills = ShmRing::open(fill_path, ring_capacity())?;
+        // Start from the live edge: anything already queued went stale while the executor was down
+        let next_seq = signals.head().load(Ordering::Acquire);
+        signals.tail().store(next_seq, Ordering::Release);
+        Ok(Channel { name, signals, fills, next_seq })
+    }
+}
+
+/// Consumer of the unsharded ring pair plus every shard's `<path>.<worker_id>` pair.
+///
+/// Shard producers ring the unsharded signal ring's doorbell, so one futex wait covers all of them.
+pub struct SignalListener {
+    signal_path: String,
+    fill_path: String,
+    channels: Vec<Channel>,
+    shard_ids: Vec<usize>,
+    next_channel: usize,
+    last_scan: Instant,
+}
+
+impl SignalListener {
+    pub fn new() -> io::Result<Self> {
+        let signal_path = std::env::var("SIGNAL_RING_PATH").unwrap_or_else(|_| "/dev/shm/hft_signals.ring".to_string());
+        let fill_path = std::env::var("FILL_RING_PATH").unwrap_or_else(|_| "/dev/shm/hft_fills.ring".to_string());
+        let primary = Channel::open(&signal_path, &fill_path, "main".to_string())?;
+        let mut listener = SignalListener {
+            signal_path,
+            fill_path,
+            channels: vec![primary],
+            shard_ids: Vec::new(),
+            next_channel: 0,
+            last_scan: Instant::now(),
+        };
+        listener.attach_shards();
+        Ok(listener)
+    }
+
+    /// Attach shard rings that appeared since the last scan; workers create theirs on first publish
+    fn attach_shards(&mut self) {
+        self.last_scan = Instant::now();
+        let path = Path::new(&self.signal_path);
+        let (Some(dir), Some(base)) = (path.parent(), path.file_name().and_then(|n| n.to_str())) else {
+            return;
+        };
+        let Ok(entries) = fs::read_dir(dir) else {
+            return;
+        };
+        let prefix = format!("{}.", base);
+        for entry in entries.flatten() {
+            let file_name = entry.file_name();
+            let Some(shard) = file_name.to_str().and_then(|n| n.strip_prefix(&prefix)).and_then(|s| s.parse::<usize>().ok())
+            else {
+                continue;
+            };
+            if self.shard_ids.contains(&shard) {
+                continue;
+            }
+            let signal_path = format!("{}.{}", self.signal_path, shard);
+            let fill_path = format!("{}.{}", self.fill_path, shard);
+            match Channel::open(&signal_path, &fill_path, format!("shard {}", shard)) {
+                Ok(channel) => {
+                    log::info!("Attached signal ring for shard {}", shard);
+                    self.channels.push(channel);
+                    self.shard_ids.push(shard);
+                }
+                Err(e) => log::warn!("Cannot attach signal ring {}: {}", signal_path, e),
             }
         }
-        
-        let asset = best_signal.get("asset").and_then(|v| v.as_str());
-        if asset.is_none() || asset.unwrap().is_empty() {
-            return false;
+    }
+
+    /// Next valid, fresh signal from any channel, taking channels in turn so no shard starves
+    pub fn check_for_signals(&mut self) -> Option<SignalRecord> {
+        if self.last_scan.elapsed() >= SHARD_SCAN_INTERVAL {
+            self.attach_shards();
         }
-        
-        let entry_price = best_signal.get("entry_price").and_then(|v| v.as_f64());
-        if entry_price.is_none() || entry_price.unwrap() <= 0.0 {
-            return false;
+        let count = self.channels.len();
+        for offset in 0..count {
+            let index = (self.next_channel + offset) % count;
+            if let Some(signal) = self.read_channel(index) {
+                self.next_channel = (index + 1) % count;
+                return Some(signal);
+            }
         }
-        
-        true
+        None
     }
-    
-    fn validate_signal_freshness(&self, signal: &Value) -> bool {
-        let signal_timestamp = signal.get("timestamp")
-            .and_then(|v| v.as_f64())
-            .ok_or("Signal missing timestamp")
-            .map(|t| t as u64);
-        
-        if signal_timestamp.is_err() {
-            return false;
+
+    fn read_channel(&mut self, index: usize) -> Option<SignalRecord> {
+        let channel = &mut self.channels[index];
+        while let Some(raw) = channel.signals.try_read() {
+            let signal = SignalRecord::decode(&raw, index);
+            if signal.seq != channel.next_seq {
+                log::warn!("Signal ring gap on {}: expected seq {}, got {}", channel.name, channel.next_seq, signal.seq);
+            }
+            channel.next_seq = signal.seq + 1;
+
+            if !signal.is_valid() {
+                log::warn!("Malformed signal dropped: seq {}", signal.seq);
+                continue;
+            }
+            let age_ns = now_ns().saturating_sub(signal.timestamp_ns);
+            if age_ns > MAX_SIGNAL_AGE_NS {
+                log::warn!("Signal too old: {} seconds", age_ns / 1_000_000_000);
+                continue;
+            }
+
+            log::info!("Valid signal detected on {}: confidence={:.3} handoff={}us", channel.name, signal.confidence,
+                       now_ns().saturating_sub(signal.published_ns) / 1000);
+            return Some(signal);
         }
-        
-        let signal_timestamp = signal_timestamp.unwrap();
-        
-        let current_time = SystemTime::now()
-            .duration_since(UNIX_EPOCH)
-            .unwrap()
-            .as_secs();
-        
-        let age_seconds = current_time.saturating_sub(signal_timestamp);
-        
-        if age_seconds > 15 {
-            log::warn!("Signal too old: {} seconds", age_seconds);
+        None
+    }
+
+    /// Block until a signal is published on any channel or the timeout passes
+    pub fn wait(&self, timeout: Duration) -> bool {
+        let channels = &self.channels;
+        channels[0].signals.wait(timeout, || channels.iter().any(|c| c.signals.has_data()))
+    }
+
+    pub fn publish_fill(&self, fill: &FillRecord) -> bool {
+        let Some(channel) = self.channels.get(fill.channel) else {
+            log::warn!("Fill for {} names unknown channel {}", fill.asset, fill.channel);
+            return false;
+        };
+        let mut record = fill.encode();
+        if channel.fills.try_write(&mut record).is_none() {
+            log::warn!("Fill ring full on {}, fill for {} not reported", channel.name, fill.asset);
             return false;
         }
-        
         true
     }
 }
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Test Async RPC - Verify JSON-RPC batching and Multicall3 token metadata against a mock node
+"""
+import sys
+import asyncio
+import unittest
+from pathlib import Path
+
+from aiohttp import web
+from eth_abi import encode, decode
+
+# Add connectors to path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "core" / "connectors"))
+
+from async_rpc import AsyncRPCClient, RPCError, MULTICALL3_ADDRESS
+
+TOKEN = "0x1111111111111111111111111111111111111111"
+LEGACY_TOKEN = "0x2222222222222222222222222222222222222222"
+
+TOKEN_RESPONSES = {
+    TOKEN: {
+        "06fdde03": encode(["string"], ["Pepe Token"]),
+        "95d89b41": encode(["string"], ["PEPE"]),
+        "313ce567": encode(["uint8"], [18]),
+        "18160ddd": encode(["uint256"], [420 * 10**30])
+    },
+    LEGACY_TOKEN: {
+        "06fdde03": b"Maker".ljust(32, b"\x00"),
+        "95d89b41": b"MKR".ljust(32, b"\x00"),
+        "313ce567": encode(["uint8"], [18]),
+        "18160ddd": encode(["uint256"], [10**24])
+    }
+}
+
+class MockRPCNode:
+    """JSON-RPC node answering eth_call for ERC-20 metadata, directly or through aggregate3"""
+
+    def __init__(self, multicall_deployed: bool = True, multicall_errors: list = None):
+        self.multicall_deployed = multicall_deployed
+        self.multicall_errors = list(multicall_errors or [])  # returned by the next aggregate3 calls
+        self.http_requests = []
+        self.runner = None
+        self.url = None
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_post("/", self._handler)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        self.url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/"
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+    def _token_call(self, to: str, data: bytes) -> bytes:
+        return TOKEN_RESPONSES.get(to.lower(), {}).get(data[:4].hex(), b"")
+
+    def _answer(self, call):
+        method, params = call["method"], call["params"]
+        if method == "eth_call":
+            to, data = params[0]["to"], bytes.fromhex(params[0]["data"][2:])
+            if to.lower() == MULTICALL3_ADDRESS.lower():
+                if not self.multicall_deployed:
+                    return {"result": "0x"}
+                if self.multicall_errors:
+                    error = self.multicall_errors.pop(0)
+                    # A string is sent back as a malformed result instead of a JSON-RPC error
+                    return {"result": error} if isinstance(error, str) else {"error": error}
+                calls = decode(["(address,bool,bytes)[]"], data[4:])[0]
+                results = []
+                for target, _, calldata in calls:
+                    output = self._token_call(target, calldata)
+                    results.append((len(output) > 0, output))
+                return {"result": "0x" + encode(["(bool,bytes)[]"], [results]).hex()}
+            return {"result": "0x" + self._token_call(to, data).hex()}
+        if method == "eth_getTransactionByHash":
+            return {"result": {"hash": params[0], "from": "0xabc", "value": "0x1"}}
+        return {"error": {"code": -32601, "message": "method not found"}}
+
+    async def _handler(self, request):
+        body = await request.json()
+        calls = body if isinstance(body, list) else [body]
+        self.http_requests.append(len(calls))
+        replies = [{"jsonrpc": "2.0", "id": call["id"], **self._answer(call)} for call in calls]
+        return web.json_response(replies if isinstance(body, list) else replies[0])
+
+def run_with_node(scenario, **node_kwargs):
+    async def wrapper():
+        node = MockRPCNode(**node_kwargs)
+        await node.start()
+        try:
+            async with AsyncRPCClient(node.url) as client:
+                result = await scenario(client)
+            return result, node
+        finally:
+            await node.stop()
+    return asyncio.run(wrapper())
+
+class TestAsyncRPCClient(unittest.TestCase):
+
+    def test_concurrent_calls_batched(self):
+        """Calls issued together share one HTTP request"""
+        print("🧪 Testing JSON-RPC batching...")
+
+        async def scenario(client):
+            return await asyncio.gather(*(client.get_transaction("0x%064x" % i) for i in range(50)))
+
+        results, node = run_with_node(scenario)
+
+        self.assertEqual(node.http_requests, [50])
+        self.assertEqual([r["hash"] for r in results], ["0x%064x" % i for i in range(50)])
+        print("✅ 50 calls in 1 HTTP request")
+
+    def test_batch_size_limit(self):
+        """Batches are split at max_batch_size"""
+        async def scenario(client):
+            client.max_batch_size = 40
+            return await asyncio.gather(*(client.get_transaction("0x%064x" % i) for i in range(100)))
+
+        _, node = run_with_node(scenario)
+        self.assertEqual(node.http_requests, [40, 40, 20])
+
+    def test_rpc_error_raised_per_call(self):
+        """An error reply fails only its own call"""
+        async def scenario(client):
+            return await client.batch([("eth_getTransactionByHash", ["0x01"]), ("eth_unknown", [])])
+
+        (tx, error), node = run_with_node(scenario)
+
+        self.assertEqual(tx["hash"], "0x01")
+        self.assertIsInstance(error, RPCError)
+        self.assertEqual(error.code, -32601)
+        self.assertEqual(node.http_requests, [2])
+
+    def test_token_info_single_round_trip(self):
+        """Name, symbol, decimals and supply come from one Multicall3 request"""
+        print("🧪 Testing Multicall3 token metadata...")
+
+        async def scenario(client):
+            return await client.get_token_infos([TOKEN, LEGACY_TOKEN])
+
+        infos, node = run_with_node(scenario)
+
+        self.assertEqual(node.http_requests, [1])
+        self.assertEqual(infos[TOKEN]["name"], "Pepe Token")
+        self.assertEqual(infos[TOKEN]["symbol"], "PEPE")
+        self.assertEqual(infos[TOKEN]["decimals"], 18)
+        self.assertEqual(infos[TOKEN]["total_supply"], 420 * 10**30)
+        self.assertEqual(infos[LEGACY_TOKEN]["symbol"], "MKR")
+        print("✅ 2 tokens x 4 fields in 1 HTTP request")
+
+    def test_token_info_without_multicall(self):
+        """Without Multicall3 the four reads still go out as one JSON-RPC batch"""
+        async def scenario(client):
+            first = await client.get_token_info(TOKEN)
+            second = await client.get_token_info(TOKEN)
+            return first, second, client.multicall_available
+
+        (first, second, multicall_available), node = run_with_node(scenario, multicall_deployed=False)
+
+        self.assertFalse(multicall_available)
+        self.assertEqual(first, second)
+        self.assertEqual(first["symbol"], "PEPE")
+        # Failed probe, fallback batch, then straight to batched eth_calls
+        self.assertEqual(node.http_requests, [1, 4, 4])
+
+    def test_transient_multicall_error_retried(self):
+        """A rate-limited aggregate3 falls back once and retries after the cooldown; a revert disables it"""
+        async def scenario(client):
+            first = await client.get_token_info(TOKEN)
+            available = client.multicall_available
+            client.multicall_retry_at = 0.0
+            second = await client.get_token_info(TOKEN)
+            third = await client.get_token_info(TOKEN)
+            return first, second, third, available, client.multicall_available
+
+        errors = [{"code": -32005, "message": "rate limited"}, {"code": 3, "message": "execution reverted"}]
+        (first, second, third, available, multicall_available), node = run_with_node(scenario, multicall_errors=errors)
+
+        self.assertTrue(available)
+        self.assertFalse(multicall_available)
+        self.assertEqual(first, second)
+        self.assertEqual(second, third)
+        # Failed probe and fallback, retried probe reverts and falls back, then batched eth_calls only
+        self.assertEqual(node.http_requests, [1, 4, 1, 4, 4])
+
+    def test_malformed_multicall_reply_falls_back(self):
+        """An undecodable aggregate3 reply falls back to batched eth_call instead of failing the lookup"""
+        async def scenario(client):
+            info = await client.get_token_info(TOKEN)
+            return info, client.multicall_available, client.multicall_retry_at
+
+        (info, available, retry_at), node = run_with_node(scenario, multicall_errors=["0x" + "ab" * 40])
+
+        self.assertEqual(info["symbol"], "PEPE")
+        self.assertTrue(available)
+        self.assertGreater(retry_at, 0.0)
+        self.assertEqual(node.http_requests, [1, 4])
+
+    def test_latency_stats(self):
+        async def scenario(client):
+            await asyncio.gather(*(client.get_transaction("0x%064x" % i) for i in range(10)))
+            await client.batch([("eth_unknown", [])])
+            return client.get_latency_stats()
+
+        stats, _ = run_with_node(scenario)
+
+        self.assertEqual(stats["eth_getTransactionByHash"]["calls"], 10)
+        self.assertGreater(stats["eth_getTransactionByHash"]["p50_ms"], 0)
+        self.assertEqual(stats["eth_unknown"]["errors"], 1)
+
+
+def run_async_rpc_tests():
+    """Run async RPC test suite"""
+    print("🔥 RUNNING ASYNC RPC TESTS")
+    print("="*60)
+
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestAsyncRPCClient)
+    result = unittest.TextTestRunner(verbosity=2).run(suite)
+
+    success = len(result.failures) == 0 and len(result.errors) == 0
+    print("\n🎉 ALL ASYNC RPC TESTS PASSED!" if success else "\n❌ SOME ASYNC RPC TESTS FAILED")
+    return success
+
+
+if __name__ == "__main__":
+    success = run_async_rpc_tests()
+    sys.exit(0 if success else 1)
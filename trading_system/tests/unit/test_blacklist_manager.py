@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Test Blacklist Manager - Verify compact address indexes, lookups and hot reload
+"""
+import os
+import sys
+import json
+import time
+import random
+import tempfile
+import unittest
+import tracemalloc
+from pathlib import Path
+
+# Add managers to path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "core" / "managers"))
+
+from blacklist_manager import AddressIndex, BlacklistManager, address_key
+
+def random_addresses(n: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    return ["0x" + rng.randbytes(20).hex() for _ in range(n)]
+
+class TestBlacklistManager(unittest.TestCase):
+
+    def setUp(self):
+        """Set up blacklist source files in a temp directory"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.wallet_path = os.path.join(self.tmpdir.name, "wallet_blacklist.json")
+        self.token_path = os.path.join(self.tmpdir.name, "rugdex_blacklist.csv")
+
+        self.write_wallets(["0x000000000000000000000000000000000000dEaD",
+                            "0x0000000000000000000000000000000000000000"])
+        self.write_tokens(["0x1234567890AbCdEf1234567890abcdef12345678", "not-an-address",
+                           "0x2345678901234567890123456789012345678901"])
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write_wallets(self, addresses: list):
+        with open(self.wallet_path, "w") as f:
+            json.dump({"blacklisted_addresses": addresses}, f)
+
+    def write_tokens(self, addresses: list):
+        with open(self.token_path, "w") as f:
+            f.write("\n".join(addresses) + "\n")
+
+    def test_lookups_case_insensitive(self):
+        """Addresses match regardless of checksum casing; wallets and tokens are separate"""
+        print("🧪 Testing blacklist lookups...")
+        manager = BlacklistManager(self.wallet_path, self.token_path)
+
+        self.assertTrue(manager.is_wallet_blacklisted("0x000000000000000000000000000000000000DEAD"))
+        self.assertTrue(manager.is_wallet_blacklisted("0x0000000000000000000000000000000000000000"))
+        self.assertTrue(manager.is_token_blacklisted("0x1234567890abcdef1234567890ABCDEF12345678"))
+        self.assertFalse(manager.is_wallet_blacklisted("0x1234567890abcdef1234567890abcdef12345678"))
+        self.assertFalse(manager.is_token_blacklisted("0x3456789012345678901234567890123456789012"))
+        self.assertFalse(manager.is_token_blacklisted("garbage"))
+        self.assertEqual(len(manager.tokens), 2)
+        print("✅ Wallet and token indexes separate, malformed rows skipped")
+
+    def test_trailing_zero_bytes(self):
+        """Keys ending in zero bytes are not confused with shorter keys"""
+        addresses = ["0x" + "12" * 19 + "00", "0x" + "12" * 20]
+        index = AddressIndex.from_addresses(addresses)
+
+        self.assertIn(addresses[0], index)
+        self.assertIn(addresses[1], index)
+        self.assertNotIn("0x" + "12" * 18 + "0000", index)
+        self.assertEqual(address_key(addresses[0])[-1], 0)
+        self.assertEqual(index.contains_many(addresses + ["0x" + "00" * 20, "bad"]).tolist(),
+                         [True, True, False, False])
+
+    def test_hot_reload(self):
+        """A changed source file is picked up by the watcher without a restart"""
+        print("🧪 Testing blacklist hot reload...")
+        manager = BlacklistManager(self.wallet_path, self.token_path, reload_interval=0.02)
+        manager.start()
+        try:
+            new_token = "0x9999999999999999999999999999999999999999"
+            self.assertFalse(manager.is_token_blacklisted(new_token))
+
+            self.write_tokens([new_token])
+            os.utime(self.token_path, (time.time() + 5, time.time() + 5))
+
+            deadline = time.time() + 2
+            while not manager.is_token_blacklisted(new_token) and time.time() < deadline:
+                time.sleep(0.01)
+
+            self.assertTrue(manager.is_token_blacklisted(new_token))
+            self.assertFalse(manager.is_token_blacklisted("0x2345678901234567890123456789012345678901"))
+            self.assertTrue(manager.is_wallet_blacklisted("0x000000000000000000000000000000000000dead"))
+        finally:
+            manager.stop()
+        print("✅ New list live after reload")
+
+    def test_failed_reload_keeps_index(self):
+        manager = BlacklistManager(self.wallet_path, self.token_path)
+
+        with open(self.wallet_path, "w") as f:
+            f.write("{ truncated")
+        os.utime(self.wallet_path, (time.time() + 5, time.time() + 5))
+
+        self.assertFalse(manager.reload())
+        self.assertTrue(manager.is_wallet_blacklisted("0x000000000000000000000000000000000000dead"))
+
+    def test_memory_and_lookup_throughput(self):
+        """Benchmark a 1M-address index against a set of strings"""
+        print("🧪 Benchmarking 1M-address blacklist...")
+        addresses = random_addresses(1_000_000)
+
+        tracemalloc.start()
+        string_set = set(a.lower() for a in addresses)
+        set_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        start_time = time.perf_counter()
+        index = AddressIndex.from_addresses(addresses)
+        build_time = time.perf_counter() - start_time
+
+        probes = addresses[:5000] + random_addresses(5000, seed=1)
+        start_time = time.perf_counter()
+        hits = sum(1 for a in probes if a in index)
+        lookup_rate = len(probes) / (time.perf_counter() - start_time)
+
+        start_time = time.perf_counter()
+        batch_hits = int(index.contains_many(probes).sum())
+        batch_rate = len(probes) / (time.perf_counter() - start_time)
+
+        print(f"✅ {len(index):,} addresses: {index.nbytes / 1e6:.0f}MB vs {set_bytes / 1e6:.0f}MB as str set | "
+              f"built in {build_time:.2f}s | {lookup_rate:,.0f} lookups/s, {batch_rate:,.0f}/s batched")
+        self.assertEqual(hits, 5000)
+        self.assertEqual(batch_hits, 5000)
+        self.assertLess(index.nbytes * 4, set_bytes)
+        self.assertGreater(lookup_rate, 50000)
+        del string_set
+
+
+def run_blacklist_manager_tests():
+    """Run blacklist manager test suite"""
+    print("🔥 RUNNING BLACKLIST MANAGER TESTS")
+    print("="*60)
+
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestBlacklistManager)
+    result = unittest.TextTestRunner(verbosity=2).run(suite)
+
+    success = len(result.failures) == 0 and len(result.errors) == 0
+    print("\n🎉 ALL BLACKLIST MANAGER TESTS PASSED!" if success else "\n❌ SOME BLACKLIST MANAGER TESTS FAILED")
+    return success
+
+
+if __name__ == "__main__":
+    success = run_blacklist_manager_tests()
+    sys.exit(0 if success else 1)
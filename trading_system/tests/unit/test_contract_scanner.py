@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Test Contract Scanner - Verify single-pass pattern matching, comment stripping and memoization
+"""
+import sys
+import json
+import time
+import random
+import unittest
+from pathlib import Path
+
+# Add wallet mimic bot to path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "bots" / "wallet_mimic"))
+
+from contract_scanner import ContractScanner, flatten_source, strip_comments_and_strings
+
+DANGEROUS = ["cooldown", "blacklist", "blacklistAddress", "pause", "mint(", "onlyOwner", "_transfer"]
+SUSPICIOUS = ["onlyOwner", "blacklist", "mint", "antiBot"]
+
+TOKEN_SOURCE = '''pragma solidity ^0.8.0;
+// Admin can pause trading in an emergency
+contract Token {
+    string public note = "no blacklist here";
+    /* mint( is disabled
+       forever */
+    function blacklistAddress(address account) external onlyOwner {
+        _blacklist[account] = true;
+    }
+}
+'''
+
+def make_source(n_lines: int, seed: int = 0) -> str:
+    """Flattened-contract-sized Solidity with comments and strings"""
+    rng = random.Random(seed)
+    lines = [
+        "uint256 balance = balances[msg.sender];",
+        "require(amount <= allowance[from][msg.sender], \"ERC20: insufficient allowance\");",
+        "// SPDX-License-Identifier: MIT",
+        "/* OpenZeppelin Contracts v4.4.1 */",
+        "emit Transfer(from, to, amount);",
+        "function totalSupply() public view override returns (uint256) {",
+        "}",
+    ]
+    return "\n".join(rng.choice(lines) for _ in range(n_lines)) + "\nfunction setCooldown() external onlyOwner {}\n"
+
+class TestContractScanner(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a scanner with mixed-case-sensitivity pattern lists"""
+        self.scanner = ContractScanner(DANGEROUS, case_sensitive=SUSPICIOUS)
+
+    def test_hits_with_locations(self):
+        """Every pattern hit is reported with its line, including overlapping prefixes"""
+        print("🧪 Testing contract pattern hits...")
+        result = self.scanner.scan(TOKEN_SOURCE)
+        found = {(hit.pattern, hit.case_sensitive, hit.line) for hit in result.hits}
+
+        self.assertIn(("blacklistAddress", False, 7), found)
+        self.assertIn(("blacklist", False, 7), found)
+        self.assertIn(("blacklist", True, 7), found)
+        self.assertIn(("onlyOwner", True, 7), found)
+        self.assertIn(("blacklist", False, 8), found)
+        self.assertIsNone(result.first_hit(["antiBot"], case_sensitive=True))
+        print(f"✅ {len(result.hits)} hits")
+
+    def test_comments_and_strings_ignored(self):
+        """Patterns only mentioned in comments or string literals are not hits"""
+        result = self.scanner.scan(TOKEN_SOURCE)
+
+        self.assertTrue(result.is_clean(["pause", "mint("]))
+        self.assertEqual(strip_comments_and_strings('a /* x\ny */ b "s//t" c // d').count("\n"), 1)
+
+    def test_case_sensitivity(self):
+        result = self.scanner.scan("function setCooldown() external { Blacklist(x); }")
+
+        self.assertFalse(result.is_clean(["cooldown"]))
+        self.assertFalse(result.is_clean(["blacklist"]))
+        self.assertTrue(result.is_clean(["blacklist"], case_sensitive=True))
+
+    def test_no_patterns(self):
+        self.assertEqual(ContractScanner().scan(TOKEN_SOURCE).hits, ())
+
+    def test_offsets_survive_unicode(self):
+        """Characters whose lowercase is longer (İ -> i̇) do not shift later matches"""
+        result = self.scanner.scan("uint İİİİ;\nfunction x() onlyOwner {}")
+
+        self.assertEqual(result.first_hit(["onlyOwner"], case_sensitive=True).line, 2)
+
+    def test_etherscan_standard_json(self):
+        """Multi-file sources are scanned by file content, not as one JSON string"""
+        standard_json = "{" + json.dumps({
+            "language": "Solidity",
+            "sources": {
+                "Token.sol": {"content": "contract Token { function mint(address to) external {} }"},
+                "Ownable.sol": {"content": "// onlyOwner\ncontract Ownable {}"}
+            }
+        }) + "}"
+
+        result = self.scanner.scan(standard_json)
+
+        self.assertIn("function mint", flatten_source(standard_json))
+        self.assertFalse(result.is_clean(["mint("]))
+        self.assertTrue(result.is_clean(["onlyOwner"]))
+
+    def test_memoized_by_source_hash(self):
+        self.scanner.scan(TOKEN_SOURCE)
+        self.scanner.scan(TOKEN_SOURCE)
+        self.scanner.scan(TOKEN_SOURCE + " ")
+
+        self.assertEqual(self.scanner.stats["scans"], 2)
+        self.assertEqual(self.scanner.stats["hits"], 1)
+
+    def test_scan_throughput(self):
+        """Benchmark repeated checks of a large flattened source against per-pattern scans"""
+        print("🧪 Benchmarking contract scanning...")
+        source = make_source(20000)
+
+        def per_pattern_checks(source_code):
+            source_lower = source_code.lower()
+            dangerous = [p for p in DANGEROUS if p.lower() in source_lower]
+            suspicious = [p for p in SUSPICIOUS if p in source_code]
+            return dangerous, suspicious
+
+        start_time = time.perf_counter()
+        for _ in range(10):
+            per_pattern_checks(source)
+        baseline = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        result = self.scanner.scan(source)
+        first_scan = time.perf_counter() - start_time
+        for _ in range(9):
+            self.scanner.scan(source)
+        scanner_total = time.perf_counter() - start_time
+
+        print(f"✅ {len(source) / 1e6:.1f}MB source x10: per-pattern {baseline * 1000:.1f}ms | "
+              f"scanner {scanner_total * 1000:.1f}ms (first scan {first_scan * 1000:.1f}ms)")
+        self.assertFalse(result.is_clean(["cooldown"]))
+        self.assertEqual(self.scanner.stats["scans"], 1)
+        self.assertLess(scanner_total, baseline)
+
+
+def run_contract_scanner_tests():
+    """Run contract scanner test suite"""
+    print("🔥 RUNNING CONTRACT SCANNER TESTS")
+    print("="*60)
+
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestContractScanner)
+    result = unittest.TextTestRunner(verbosity=2).run(suite)
+
+    success = len(result.failures) == 0 and len(result.errors) == 0
+    print("\n🎉 ALL CONTRACT SCANNER TESTS PASSED!" if success else "\n❌ SOME CONTRACT SCANNER TESTS FAILED")
+    return success
+
+
+if __name__ == "__main__":
+    success = run_contract_scanner_tests()
+    sys.exit(0 if success else 1)
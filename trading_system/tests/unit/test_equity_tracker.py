@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Test Equity Tracker - Verify marked equity bars, drawdown breakers and risk actions on unrealized losses
+"""
+import os
+import sys
+import time
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# Add config, engines and managers to path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "config"))
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "core" / "engines"))
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "core" / "managers"))
+
+import config
+from equity_tracker import EquityTracker
+from capital_manager import CapitalManager
+from paper_trading_engine import PaperTradingEngine
+from trade_store import TradeStore
+
+class TestEquitySeries(unittest.TestCase):
+
+    def test_one_second_ohlc_bars(self):
+        print("🧪 Testing equity bars...")
+        tracker = EquityTracker(1000.0)
+        ticks = [(0.1, 1000.0), (0.5, 1010.0), (0.9, 990.0), (1.2, 995.0), (3.4, 1020.0)]
+        for now, equity in ticks:
+            tracker.update(equity, now)
+
+        series = tracker.get_series()
+        self.assertEqual(series.tolist(), [[0.0, 1000.0, 1010.0, 990.0, 990.0],
+                                           [1.0, 995.0, 995.0, 995.0, 995.0],
+                                           [3.0, 1020.0, 1020.0, 1020.0, 1020.0]])
+        print(f"✅ {len(series)} bars from {len(ticks)} ticks")
+
+    def test_ring_keeps_latest_bars(self):
+        tracker = EquityTracker(100.0, capacity=4)
+        for second in range(10):
+            tracker.update(100.0 + second, second + 0.5)
+
+        series = tracker.get_series()
+        self.assertEqual(series[:, 0].tolist(), [5.0, 6.0, 7.0, 8.0, 9.0])
+        self.assertEqual(tracker.get_stats()["bars"], 5)
+
+    def test_drawdown_from_marked_peak(self):
+        tracker = EquityTracker(1000.0)
+        tracker.update(1200.0, 0.0)
+        tracker.update(1080.0, 1.0)
+        tracker.update(1150.0, 2.0)
+
+        self.assertAlmostEqual(tracker.drawdown, 50.0 / 1200.0)
+        self.assertAlmostEqual(tracker.max_drawdown, 0.1)
+
+class TestDrawdownBreakers(unittest.TestCase):
+
+    def test_trips_once_and_rearms_with_hysteresis(self):
+        print("🧪 Testing drawdown breakers...")
+        events = []
+        tracker = EquityTracker(1000.0)
+        tracker.add_breaker("halt", 0.05, lambda dd: events.append("halt"), lambda: events.append("resume"))
+        tracker.add_breaker("kill", 0.08, lambda dd: events.append("kill"))
+
+        for equity in (960.0, 949.0, 945.0, 960.0, 980.0, 949.0, 910.0, 900.0):
+            tracker.update(equity, 0.0)
+
+        self.assertEqual(events, ["halt", "resume", "halt", "kill"])
+        self.assertEqual(tracker.get_stats()["breakers"]["halt"]["trips"], 2)
+        print(f"✅ Breaker events: {events}")
+
+    def test_update_throughput(self):
+        """Benchmark a mark with two armed breakers"""
+        print("🧪 Benchmarking equity updates...")
+        tracker = EquityTracker(1e6)
+        tracker.add_breaker("halt", 0.05, lambda dd: None)
+        tracker.add_breaker("kill", 0.08, lambda dd: None)
+
+        updates = 500000
+        start_time = time.perf_counter()
+        for i in range(updates):
+            tracker.update(1e6 + (i % 100), i * 0.001)
+        per_update = (time.perf_counter() - start_time) / updates
+
+        print(f"✅ {per_update * 1e6:.2f}µs per equity update ({tracker.get_stats()['bars']} bars)")
+        self.assertLess(per_update, 5e-6)
+
+class TestUnrealizedRiskActions(unittest.TestCase):
+    """Breakers act while the loss is still open"""
+
+    def setUp(self):
+        store_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(store_dir.cleanup)
+        self.store = TradeStore(store_dir.name)
+        self.signal = {"confidence": 0.9, "signal_data": {"asset": "BTC", "entry_price": 100.0, "stop_loss": 200.0,
+                                                           "take_profit_1": 90.0, "signal_type": "SHORT"}}
+
+    @patch.object(config, "POSITION_SIZE_PERCENT", 0.5)
+    def test_paper_engine_halts_then_flattens(self):
+        print("🧪 Testing paper engine breakers on an open short...")
+        engine = PaperTradingEngine(store=self.store)
+        engine.open_position(self.signal)
+
+        engine.update_positions({"BTC": 111.0})
+        self.assertEqual(len(engine.positions), 1)
+        self.assertFalse(engine.can_open_position("ETH"))
+        self.assertEqual(engine.trade_history, [])
+        self.assertGreater(engine.get_portfolio_summary()["marked_drawdown"], config.MAX_DRAWDOWN_PERCENT)
+
+        engine.update_positions({"BTC": 117.0})
+        self.assertEqual(len(engine.positions), 0)
+        self.assertEqual(engine.trade_history[-1].exit_reason, "circuit_breaker")
+        print(f"✅ Flattened at {engine.get_portfolio_summary()['max_marked_drawdown']:.2f}% marked drawdown")
+
+    @patch.object(config, "POSITION_SIZE_PERCENT", 0.5)
+    def test_paper_engine_resumes_on_recovery(self):
+        engine = PaperTradingEngine(store=self.store)
+        engine.open_position(self.signal)
+        engine.update_positions({"BTC": 111.0})
+        engine.update_positions({"BTC": 101.0})
+
+        self.assertTrue(engine.can_open_position("ETH"))
+        self.assertEqual(len(engine.positions), 1)
+
+    def test_capital_manager_liquidates_on_marks(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            manager = CapitalManager(10000.0, state_path=os.path.join(temp_dir, "capital_state.json"))
+            manager.allocate_capital(3000.0, "t1", confidence=0.9)
+            manager.allocate_capital(500.0, "t2", confidence=0.9)
+
+            manager.mark_position("t1", 2000.0)
+            self.assertAlmostEqual(manager.get_drawdown(), 0.1)
+            self.assertEqual(manager.state.current_drawdown, 0.0)
+
+            manager.mark_position("t2", 550.0)
+            manager.mark_position("t1", 1400.0)
+            self.assertEqual(manager.positions, {})
+            self.assertAlmostEqual(manager.state.total_capital, 10000.0 - 1600.0 + 50.0)
+            self.assertFalse(manager.allocate_capital(100.0, "t3", confidence=0.9))
+
+
+def run_equity_tracker_tests():
+    """Run equity tracker test suite"""
+    print("🔥 RUNNING EQUITY TRACKER TESTS")
+    print("="*60)
+
+    suite = unittest.TestSuite()
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestEquitySeries))
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestDrawdownBreakers))
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestUnrealizedRiskActions))
+    result = unittest.TextTestRunner(verbosity=2).run(suite)
+
+    success = len(result.failures) == 0 and len(result.errors) == 0
+    print("\n🎉 ALL EQUITY TRACKER TESTS PASSED!" if success else "\n❌ SOME EQUITY TRACKER TESTS FAILED")
+    return success
+
+
+if __name__ == "__main__":
+    success = run_equity_tracker_tests()
+    sys.exit(0 if success else 1)
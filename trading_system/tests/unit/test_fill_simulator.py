@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Test Fill Simulator - Verify latency, book-walking fills, queue position, fee tiers and stop slippage
+"""
+import sys
+import time
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add config, engines and managers to path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "config"))
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "core" / "engines"))
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "core" / "managers"))
+
+import config
+from fill_simulator import FillSimulator, BookFillModel, InstantFillModel, FEE_TIERS
+from paper_trading_engine import PaperTradingEngine
+from trade_store import TradeStore
+
+BIDS = ((99.9, 1.0), (99.8, 2.0), (99.5, 5.0))
+ASKS = ((100.1, 1.0), (100.2, 2.0), (100.5, 5.0))
+
+class TestBookFills(unittest.TestCase):
+
+    def test_market_order_walks_the_book(self):
+        print("🧪 Testing book-walking market fills...")
+        model = BookFillModel("regular")
+
+        self.assertAlmostEqual(model.market("buy", 0.5, BIDS, ASKS, 100.0), 100.1)
+        self.assertAlmostEqual(model.market("buy", 2.0, BIDS, ASKS, 100.0), (100.1 + 100.2) / 2)
+        self.assertAlmostEqual(model.market("sell", 3.0, BIDS, ASKS, 100.0), (99.9 + 2 * 99.8) / 3)
+        # Beyond the visible depth the rest fills at the worst level
+        self.assertAlmostEqual(model.market("buy", 10.0, BIDS, ASKS, 100.0), (100.1 + 2 * 100.2 + 7 * 100.5) / 10)
+        print("✅ Average price reflects depth taken")
+
+    def test_fees_by_tier(self):
+        for tier, (maker, taker) in FEE_TIERS.items():
+            model = BookFillModel(tier)
+            self.assertAlmostEqual(model.fee(10000.0, True), 10000.0 * maker)
+            self.assertAlmostEqual(model.fee(10000.0, False), 10000.0 * taker)
+        self.assertRaises(ValueError, BookFillModel, "vip99")
+        self.assertAlmostEqual(InstantFillModel(0.001).fee(10000.0, True), 10.0)
+
+class TestLatencyAndQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.sim = FillSimulator(BookFillModel("regular"), latency=0.05)
+
+    def test_order_fills_on_first_book_after_latency(self):
+        print("🧪 Testing order latency...")
+        self.sim.on_book("BTC", BIDS, ASKS, 1000.0)
+        self.sim.submit("BTC", "buy", 0.5, timestamp=1000.0, reference_price=100.1)
+
+        self.assertEqual(self.sim.on_book("BTC", BIDS, ASKS, 1000.02), [])
+        moved = tuple((p + 1.0, s) for p, s in ASKS)
+        fills = self.sim.on_book("BTC", BIDS, moved, 1000.06)
+
+        self.assertEqual(len(fills), 1)
+        self.assertAlmostEqual(fills[0].price, 101.1)
+        self.assertAlmostEqual(fills[0].slippage, 1.0 / 100.1)
+        self.assertFalse(fills[0].maker)
+        print(f"✅ Filled at {fills[0].price} after the book moved ({fills[0].slippage * 1e4:.0f}bps slippage)")
+
+    def test_resting_limit_waits_for_queue(self):
+        """A bid joining 2.0 already queued fills at the touch only once that size has gone"""
+        self.sim.submit("BTC", "buy", 0.5, timestamp=0.0, limit=99.8)
+        self.assertEqual(self.sim.on_book("BTC", BIDS, ASKS, 0.1), [])
+        self.assertEqual(self.sim.get_stats()["resting"], 1)
+
+        touching = ((99.7, 1.0),)
+        self.assertEqual(self.sim.on_book("BTC", ((99.8, 1.2),), ((99.8, 0.4),) + ASKS, 0.2), [])
+        fills = self.sim.on_book("BTC", touching, ((99.8, 0.4),) + ASKS, 0.3)
+
+        self.assertEqual(len(fills), 1)
+        self.assertEqual((fills[0].price, fills[0].maker), (99.8, True))
+        self.assertAlmostEqual(fills[0].fee, 99.8 * 0.5 * FEE_TIERS["regular"][0])
+
+    def test_resting_limit_fills_when_traded_through(self):
+        self.sim.submit("BTC", "sell", 1.0, timestamp=0.0, limit=100.2)
+        self.sim.on_book("BTC", BIDS, ASKS, 0.1)
+        fills = self.sim.on_book("BTC", ((100.4, 3.0),), ((100.5, 1.0),), 0.2)
+
+        self.assertEqual([(f.price, f.maker) for f in fills], [(100.2, True)])
+
+    def test_marketable_limit_takes(self):
+        self.sim.submit("BTC", "buy", 2.0, timestamp=0.0, limit=100.3)
+        fills = self.sim.on_book("BTC", BIDS, ASKS, 0.1)
+
+        self.assertFalse(fills[0].maker)
+        self.assertAlmostEqual(fills[0].price, (100.1 + 100.2) / 2)
+
+    def test_cancel(self):
+        order_id = self.sim.submit("BTC", "buy", 1.0, timestamp=0.0)
+        self.assertTrue(self.sim.cancel("BTC", order_id))
+        self.assertEqual(self.sim.on_book("BTC", BIDS, ASKS, 1.0), [])
+
+    def test_event_throughput(self):
+        """Benchmark book events per second with a steady order flow"""
+        print("🧪 Benchmarking fill simulator throughput...")
+        events = 300000
+        books = [(tuple((p + i % 7 * 0.1, s) for p, s in BIDS), tuple((p + i % 7 * 0.1, s) for p, s in ASKS))
+                 for i in range(64)]
+
+        start_time = time.perf_counter()
+        fills = 0
+        for i in range(events):
+            timestamp = i * 0.001
+            if i % 100 == 0:
+                self.sim.submit("BTC", "buy" if i % 200 else "sell", 0.5, timestamp,
+                                limit=None if i % 300 else 99.9)
+            bids, asks = books[i & 63]
+            fills += len(self.sim.on_book("BTC", bids, asks, timestamp))
+        elapsed = time.perf_counter() - start_time
+
+        per_minute = events / elapsed * 60
+        print(f"✅ {events:,} book events in {elapsed:.2f}s ({per_minute / 1e6:.1f}M/min, {fills:,} fills)")
+        self.assertGreater(fills, 0)
+        self.assertGreater(per_minute, 2e6)
+
+class TestPaperEngineFills(unittest.TestCase):
+
+    def setUp(self):
+        store_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(store_dir.cleanup)
+        self.store = TradeStore(store_dir.name)
+        self.engine = PaperTradingEngine(FillSimulator(BookFillModel("regular"), latency=0, spread_bps=2.0),
+                                         store=self.store)
+        self.signal = {"confidence": 0.9, "signal_data": {"asset": "BTC", "entry_price": 100.0, "stop_loss": 102.0,
+                                                           "take_profit_1": 98.5, "signal_type": "SHORT"}}
+
+    def test_entry_fills_against_live_book(self):
+        """A stale signal price does not set the entry: the latest book does"""
+        self.engine.update_positions({"BTC": 101.0})
+        result = self.engine.open_position(self.signal)
+
+        self.assertAlmostEqual(result["entry_price"], 101.0 * (1 - 2.0 / 20000))
+        self.assertAlmostEqual(result["commission"], result["entry_price"] * result["quantity"] * FEE_TIERS["regular"][1])
+
+    def test_stop_marked_through_on_gap(self):
+        print("🧪 Testing stop slippage through a gap...")
+        self.engine.open_position(self.signal)
+        self.engine.update_positions({"BTC": 105.0})
+
+        trade = self.engine.trade_history[-1]
+        self.assertEqual(trade.exit_reason, "stop_loss")
+        self.assertAlmostEqual(trade.exit_price, 105.0 * (1 + 2.0 / 20000))
+        print(f"✅ Stop at $102 filled at ${trade.exit_price:.2f}")
+
+    def test_take_profit_fills_at_limit_as_maker(self):
+        self.engine.open_position(self.signal)
+        self.engine.update_positions({"BTC": 98.0})
+
+        trade = self.engine.trade_history[-1]
+        self.assertEqual((trade.exit_reason, trade.exit_price), ("take_profit_1", 98.5))
+        self.assertAlmostEqual(trade.commission, 98.5 * trade.quantity * FEE_TIERS["regular"][0])
+
+    def test_instant_model_keeps_old_fills(self):
+        engine = PaperTradingEngine(FillSimulator(InstantFillModel(), latency=0), store=self.store)
+        result = engine.open_position(self.signal)
+
+        self.assertEqual(result["entry_price"], 100.0)
+        self.assertAlmostEqual(result["commission"], 100.0 * result["quantity"] * config.PAPER_COMMISSION_RATE)
+
+
+def run_fill_simulator_tests():
+    """Run fill simulator test suite"""
+    print("🔥 RUNNING FILL SIMULATOR TESTS")
+    print("="*60)
+
+    suite = unittest.TestSuite()
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestBookFills))
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestLatencyAndQueue))
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestPaperEngineFills))
+    result = unittest.TextTestRunner(verbosity=2).run(suite)
+
+    success = len(result.failures) == 0 and len(result.errors) == 0
+    print("\n🎉 ALL FILL SIMULATOR TESTS PASSED!" if success else "\n❌ SOME FILL SIMULATOR TESTS FAILED")
+    return success
+
+
+if __name__ == "__main__":
+    success = run_fill_simulator_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Test Inference Service - Verify batched CPU inference matches the eager model
+"""
+import sys
+import time
+import unittest
+from pathlib import Path
+
+import numpy as np
+import torch
+import torch.nn as nn
+import torch.nn.functional as F
+
+# Add engines to path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "core" / "engines"))
+
+from inference_service import BatchInferenceService, ACTIONS
+
+INPUT_DIM = 69
+
+class TradingNetwork(nn.Module):
+    """Same layout and output dict as DeepTradingNetwork, without the GPU import guard"""
+
+    def __init__(self, input_dim=INPUT_DIM, hidden_dims=[1024, 512, 256]):
+        super().__init__()
+        layers = []
+        prev_dim = input_dim
+        for hidden_dim in hidden_dims:
+            layers.extend([nn.Linear(prev_dim, hidden_dim), nn.BatchNorm1d(hidden_dim),
+                           nn.ReLU(inplace=True), nn.Dropout(0.15)])
+            prev_dim = hidden_dim
+        self.feature_extractor = nn.Sequential(*layers)
+        self.action_head = nn.Linear(prev_dim, 3)
+        self.confidence_head = nn.Linear(prev_dim, 1)
+        self.return_head = nn.Linear(prev_dim, 1)
+        self.risk_head = nn.Linear(prev_dim, 1)
+        self.size_head = nn.Linear(prev_dim, 1)
+
+    def forward(self, x):
+        features = self.feature_extractor(x)
+        return {
+            'action_logits': self.action_head(features),
+            'confidence': torch.sigmoid(self.confidence_head(features)).squeeze(),
+            'predicted_return': (torch.tanh(self.return_head(features)) * 10.0).squeeze(),
+            'risk_score': torch.sigmoid(self.risk_head(features)).squeeze(),
+            'position_size': (torch.sigmoid(self.size_head(features)) * 0.5).squeeze()
+        }
+
+def make_trained_network(seed: int = 0) -> TradingNetwork:
+    """Network with non-trivial BatchNorm running stats"""
+    torch.manual_seed(seed)
+    model = TradingNetwork()
+    model.train()
+    with torch.no_grad():
+        for _ in range(5):
+            model(torch.randn(64, INPUT_DIM))
+    return model
+
+class TestBatchInferenceService(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a model and a batch of symbol features"""
+        self.model = make_trained_network()
+        rng = np.random.default_rng(3)
+        self.symbols = [f"SYM{i}" for i in range(32)]
+        self.features = {s: rng.normal(0, 1, (1, INPUT_DIM)).astype(np.float32) for s in self.symbols}
+
+    def _eager_reference(self, batch: np.ndarray) -> np.ndarray:
+        self.model.eval()
+        with torch.no_grad():
+            outputs = self.model(torch.from_numpy(batch))
+            return np.column_stack([
+                F.softmax(outputs['action_logits'], dim=1).numpy(),
+                outputs['confidence'].reshape(-1).numpy(),
+                outputs['predicted_return'].reshape(-1).numpy(),
+                outputs['risk_score'].reshape(-1).numpy(),
+                outputs['position_size'].reshape(-1).numpy()
+            ])
+
+    def test_backends_match_eager(self):
+        """Eager and TorchScript runtimes reproduce the model outputs"""
+        print("🧪 Testing inference backends against eager model...")
+
+        batch = np.vstack([self.features[s] for s in self.symbols])
+        expected = self._eager_reference(batch)
+
+        for backend in ["eager", "torchscript"]:
+            service = BatchInferenceService(self.model, INPUT_DIM, backend=backend, quantize=False)
+            np.testing.assert_allclose(service.predict_array(batch), expected, rtol=1e-4, atol=1e-5)
+
+        print("✅ Backends match eager outputs")
+
+    def test_training_model_untouched(self):
+        """Building the runtime does not switch the training model to eval"""
+        self.model.train()
+        BatchInferenceService(self.model, INPUT_DIM, backend="eager")
+        self.assertTrue(self.model.training)
+
+    def test_batch_of_one(self):
+        """A single symbol decodes to a full prediction despite the squeezed heads"""
+        service = BatchInferenceService(self.model, INPUT_DIM, backend="torchscript")
+        predictions = service.predict({"BTC": self.features["SYM0"]})
+
+        prediction = predictions["BTC"]
+        self.assertIn(prediction.action, ACTIONS)
+        self.assertTrue(0 <= prediction.confidence <= 1)
+        self.assertTrue(0 <= prediction.position_size <= 0.5)
+
+    def test_batched_matches_single(self):
+        """Batching symbols together does not change any prediction"""
+        service = BatchInferenceService(self.model, INPUT_DIM, backend="torchscript")
+        batched = service.predict(self.features)
+
+        for symbol in self.symbols[:5]:
+            single = service.predict({symbol: self.features[symbol]})[symbol]
+            self.assertEqual(single.action, batched[symbol].action)
+            self.assertAlmostEqual(single.confidence, batched[symbol].confidence, places=5)
+            self.assertAlmostEqual(single.predicted_return, batched[symbol].predicted_return, places=4)
+
+    def test_quantized_close_to_float(self):
+        """Dynamic int8 quantization stays close to the float model"""
+        batch = np.vstack([self.features[s] for s in self.symbols])
+        expected = self._eager_reference(batch)
+
+        service = BatchInferenceService(self.model, INPUT_DIM, backend="torchscript", quantize=True)
+        outputs = service.predict_array(batch)
+
+        self.assertEqual(outputs.shape, expected.shape)
+        np.testing.assert_allclose(outputs[:, :3].sum(axis=1), 1.0, rtol=1e-5)
+        self.assertLess(np.abs(outputs[:, 3] - expected[:, 3]).max(), 0.1)
+
+    def test_unknown_backend_rejected(self):
+        with self.assertRaises(RuntimeError):
+            BatchInferenceService(self.model, INPUT_DIM, backend="tensorrt")
+
+    def test_batched_throughput(self):
+        """Benchmark one batched pass against per-symbol eager calls"""
+        print("🧪 Benchmarking batched inference...")
+
+        self.model.eval()
+        iterations = 20
+
+        start_time = time.perf_counter()
+        for _ in range(iterations):
+            with torch.no_grad():
+                for symbol in self.symbols:
+                    outputs = self.model(torch.from_numpy(self.features[symbol]))
+                    torch.argmax(F.softmax(outputs['action_logits'], dim=1), dim=1).item()
+                    outputs['confidence'].item()
+                    outputs['predicted_return'].item()
+                    outputs['risk_score'].item()
+                    outputs['position_size'].item()
+        per_symbol_time = (time.perf_counter() - start_time) / iterations
+
+        service = BatchInferenceService(self.model, INPUT_DIM, backend="torchscript")
+        start_time = time.perf_counter()
+        for _ in range(iterations):
+            service.predict(self.features)
+        batched_time = (time.perf_counter() - start_time) / iterations
+
+        speedup = per_symbol_time / batched_time
+        stats = service.get_latency_stats()
+        print(f"✅ {len(self.symbols)} symbols - per-symbol: {per_symbol_time * 1000:.2f}ms | "
+              f"batched: {batched_time * 1000:.2f}ms | {speedup:.1f}x | p99 {stats['p99_ms']:.2f}ms")
+
+        self.assertEqual(stats["batches"], iterations)
+        self.assertGreater(speedup, 2.0)
+
+
+def run_inference_service_tests():
+    """Run inference service test suite"""
+    print("🔥 RUNNING INFERENCE SERVICE TESTS")
+    print("="*60)
+
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestBatchInferenceService)
+    result = unittest.TextTestRunner(verbosity=2).run(suite)
+
+    success = len(result.failures) == 0 and len(result.errors) == 0
+    print("\n🎉 ALL INFERENCE SERVICE TESTS PASSED!" if success else "\n❌ SOME INFERENCE SERVICE TESTS FAILED")
+    return success
+
+
+if __name__ == "__main__":
+    success = run_inference_service_tests()
+    sys.exit(0 if success else 1)
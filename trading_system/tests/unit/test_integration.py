@@ -19,7 +19,9 @@ import config
 import main
 import signal_engine
 import confidence_scoring
+from unittest.mock import patch
 from paper_trading_engine import get_paper_engine
+from trade_store import TradeStore
 from okx_market_data import get_okx_engine
 
 class TestSystemIntegration(unittest.TestCase):
@@ -31,11 +33,14 @@ class TestSystemIntegration(unittest.TestCase):
         config.PAPER_TRADING = True
         config.LIVE_TRADING = False
         
-        # Reset engines
+        # Reset engines, keeping test fills out of the real trade store
         self.paper_engine = get_paper_engine()
-        self.paper_engine.positions.clear()
-        self.paper_engine.trade_history.clear()
-        self.paper_engine.balance = config.PAPER_INITIAL_BALANCE
+        self.paper_engine.reset()
+        store_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(store_dir.cleanup)
+        patcher = patch.object(self.paper_engine, "store", TradeStore(store_dir.name))
+        patcher.start()
+        self.addCleanup(patcher.stop)
     
     def test_signal_to_execution_flow(self):
         """Test complete signal generation to execution flow"""
@@ -149,13 +154,13 @@ class TestSystemIntegration(unittest.TestCase):
         initial_positions = len(self.paper_engine.positions)
         
         # Simulate profitable movement
-        profitable_price = entry_price * 0.98  # 2% down for short position
+        profitable_price = entry_price * 0.99  # 1% down for short position, short of the first target
         market_prices = {asset: profitable_price}
         self.paper_engine.update_positions(market_prices)
         
         # Position should still be open but profitable
         self.assertEqual(len(self.paper_engine.positions), initial_positions)
-        position = self.paper_engine.positions[asset]
+        position = self.paper_engine.positions[result["position_id"]]
         self.assertGreater(position.unrealized_pnl, 0)
         
         # 4. Simulate stop loss trigger
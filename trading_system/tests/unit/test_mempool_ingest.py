@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Test Mempool Ingest - Verify sender filtering and throughput against a local mock node
+"""
+import sys
+import json
+import time
+import random
+import asyncio
+import unittest
+from pathlib import Path
+
+from aiohttp import web, WSMsgType
+
+# Add wallet mimic bot to path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "bots" / "wallet_mimic"))
+
+from mempool_ingest import MempoolIngestor, PendingTx
+
+def random_address(rng: random.Random) -> str:
+    return "0x" + "".join(rng.choice("0123456789abcdef") for _ in range(40))
+
+def make_pending_txs(n: int, watched: list, match_every: int = 100, seed: int = 1) -> list:
+    """Geth-style pending tx bodies; every match_every-th is sent by a watched wallet"""
+    rng = random.Random(seed)
+    txs = []
+    for i in range(n):
+        sender = watched[i % len(watched)] if i % match_every == 0 else random_address(rng)
+        txs.append({
+            "blockHash": None, "blockNumber": None,
+            "from": sender.upper().replace("0X", "0x") if i % 3 == 0 else sender,
+            "gas": "0x30d40", "gasPrice": "0x4a817c800",
+            "hash": "0x%064x" % i,
+            "input": "0x7ff36ab5" + "00" * 128,
+            "nonce": hex(i), "to": "0x7a250d5630b4cf539739df2c5dacb4c659f2488d",
+            "transactionIndex": None, "value": "0xde0b6b3a7640000",
+            "type": "0x0", "v": "0x25", "r": "0x1", "s": "0x2"
+        })
+    return txs
+
+class MockNode:
+    """Local websocket + JSON-RPC node streaming canned pending transactions"""
+
+    def __init__(self, txs: list, full_bodies: bool = True, hold: bool = False):
+        self.txs = txs
+        self.hold = hold  # keep the socket open after the canned stream, like a live node
+        self.by_hash = {tx["hash"]: tx for tx in txs}
+        self.full_bodies = full_bodies
+        self.subscriptions = []
+        self.rpc_batches = []
+        self.runner = None
+        self.port = None
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/ws", self._ws_handler)
+        app.router.add_post("/rpc", self._rpc_handler)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+    @property
+    def ws_url(self):
+        return f"ws://127.0.0.1:{self.port}/ws"
+
+    @property
+    def rpc_url(self):
+        return f"http://127.0.0.1:{self.port}/rpc"
+
+    async def _ws_handler(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+
+        async for message in ws:
+            if message.type != WSMsgType.TEXT:
+                break
+            params = json.loads(message.data)["params"]
+            self.subscriptions.append(params)
+
+            wants_full = len(params) > 1 and params[1] is True
+            if wants_full and not self.full_bodies:
+                await ws.send_str(json.dumps({"jsonrpc": "2.0", "id": 1,
+                                              "error": {"code": -32602, "message": "invalid argument 1"}}))
+                continue
+
+            await ws.send_str(json.dumps({"jsonrpc": "2.0", "id": 1, "result": "0xsub"}))
+            for tx in self.txs:
+                result = tx if wants_full else tx["hash"]
+                await ws.send_str(json.dumps({"jsonrpc": "2.0", "method": "eth_subscription",
+                                              "params": {"subscription": "0xsub", "result": result}},
+                                             separators=(",", ":")))
+            if not self.hold:
+                break
+
+        await ws.close()
+        return ws
+
+    async def _rpc_handler(self, request):
+        batch = await request.json()
+        self.rpc_batches.append(len(batch))
+        return web.json_response([
+            {"jsonrpc": "2.0", "id": call["id"], "result": self.by_hash.get(call["params"][0])}
+            for call in batch
+        ])
+
+async def ingest_all(node: MockNode, watched: set, expected_received: int, **kwargs):
+    """Run an ingestor against the node until every notification has been received"""
+    matched = []
+
+    async def on_tx(tx: PendingTx):
+        matched.append(tx)
+
+    ingestor = MempoolIngestor(node.ws_url, node.rpc_url, watched, on_tx, **kwargs)
+    task = asyncio.create_task(ingestor.run())
+
+    start_time = time.perf_counter()
+    while ingestor.stats["received"] < expected_received:
+        await asyncio.sleep(0.01)
+    elapsed = time.perf_counter() - start_time
+
+    # Let lookup batches and callbacks drain
+    for _ in range(200):
+        if ingestor.lookup_queue.empty() and not ingestor.callback_tasks:
+            break
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(0.05)
+
+    ingestor.stop()
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    return ingestor, matched, elapsed
+
+class TestMempoolIngest(unittest.TestCase):
+
+    def setUp(self):
+        """Set up watched wallets and a pending tx stream"""
+        rng = random.Random(0)
+        self.watched_list = [random_address(rng) for _ in range(20)]
+        self.watched = set(self.watched_list)
+
+    def test_full_body_filtering(self):
+        """Only watched senders reach the callback, case-insensitively"""
+        print("🧪 Testing full-body pending tx filtering...")
+        txs = make_pending_txs(2000, self.watched_list)
+
+        async def scenario():
+            node = MockNode(txs)
+            await node.start()
+            try:
+                return await ingest_all(node, self.watched, len(txs), mode="full"), node
+            finally:
+                await node.stop()
+
+        (ingestor, matched, _), node = asyncio.run(scenario())
+
+        self.assertEqual(node.subscriptions[0], ["newPendingTransactions", True])
+        self.assertEqual(len(matched), 20)
+        self.assertTrue(all(tx.from_address in self.watched for tx in matched))
+        self.assertEqual(ingestor.stats["lookups"], 0)
+        self.assertEqual(matched[0].value, 10**18)
+        print(f"✅ {len(matched)} watched txs from {len(txs)} pending, zero RPC lookups")
+
+    def test_hash_fallback_batches_lookups(self):
+        """Nodes without full bodies fall back to hashes resolved in JSON-RPC batches"""
+        print("🧪 Testing hash subscription fallback...")
+        txs = make_pending_txs(3000, self.watched_list)
+
+        async def scenario():
+            node = MockNode(txs, full_bodies=False)
+            await node.start()
+            try:
+                return await ingest_all(node, self.watched, len(txs), mode="full", batch_size=100), node
+            finally:
+                await node.stop()
+
+        (ingestor, matched, _), node = asyncio.run(scenario())
+
+        self.assertEqual(ingestor.mode, "hashes")
+        self.assertEqual(len(matched), 30)
+        self.assertEqual(ingestor.stats["lookups"], len(txs))
+        self.assertLess(len(node.rpc_batches), len(txs) / 10)
+        self.assertLessEqual(max(node.rpc_batches), 100)
+        print(f"✅ {len(txs)} hashes resolved in {len(node.rpc_batches)} batches")
+
+    def test_alchemy_subscription_params(self):
+        """Alchemy endpoints get a server-side fromAddress filter"""
+        ingestor = MempoolIngestor("wss://eth-mainnet.alchemyapi.io/v2/key", "", self.watched, None)
+        method, options = ingestor.subscription_params()
+
+        self.assertEqual(method, "alchemy_pendingTransactions")
+        self.assertEqual(set(options["fromAddress"]), self.watched)
+        self.assertFalse(options["hashesOnly"])
+
+    def test_alchemy_resubscribes_when_watched_set_changes(self):
+        """A re-ranked wallet reaches the server-side filter without waiting for a reconnect"""
+        print("🧪 Testing alchemy resubscription...")
+        watched = set(self.watched_list[:5])
+
+        async def scenario():
+            node = MockNode([], hold=True)
+            await node.start()
+            ingestor = MempoolIngestor(node.ws_url, node.rpc_url, watched, None, mode="alchemy")
+            task = asyncio.create_task(ingestor.run())
+            try:
+                while ingestor.websocket is None or not node.subscriptions:
+                    await asyncio.sleep(0.01)
+                ingestor.refresh_subscription()  # unchanged set: no-op
+                watched.add(self.watched_list[5])
+                start_time = time.perf_counter()
+                ingestor.refresh_subscription()
+                while len(node.subscriptions) < 2:
+                    await asyncio.sleep(0.01)
+                return time.perf_counter() - start_time, node.subscriptions
+            finally:
+                ingestor.stop()
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+                await node.stop()
+
+        elapsed, subscriptions = asyncio.run(asyncio.wait_for(scenario(), timeout=10))
+
+        self.assertEqual(len(subscriptions), 2)
+        self.assertEqual(set(subscriptions[1][1]["fromAddress"]), set(self.watched_list[:6]))
+        self.assertLess(elapsed, 2.0)
+        print(f"✅ Resubscribed with {len(subscriptions[1][1]['fromAddress'])} wallets in {elapsed * 1000:.0f}ms")
+
+    def test_duplicate_hashes_dispatched_once(self):
+        tx = make_pending_txs(1, self.watched_list)[0]
+        message = json.dumps({"params": {"result": tx}}, separators=(",", ":"))
+
+        async def scenario():
+            matched = []
+
+            async def on_tx(pending):
+                matched.append(pending)
+
+            ingestor = MempoolIngestor("", "", self.watched, on_tx)
+            ingestor.handle_message(message)
+            ingestor.handle_message(message)
+            await asyncio.sleep(0)
+            return matched
+
+        self.assertEqual(len(asyncio.run(scenario())), 1)
+
+    def test_ingest_throughput(self):
+        """Benchmark the filter hot path and end-to-end ingestion from the mock node"""
+        print("🧪 Benchmarking mempool ingestion...")
+        txs = make_pending_txs(50000, self.watched_list, match_every=1000)
+        messages = [json.dumps({"jsonrpc": "2.0", "method": "eth_subscription",
+                                "params": {"subscription": "0xsub", "result": tx}}, separators=(",", ":"))
+                    for tx in txs]
+
+        async def hot_path():
+            ingestor = MempoolIngestor("", "", self.watched, lambda tx: asyncio.sleep(0))
+            start_time = time.perf_counter()
+            for message in messages:
+                ingestor.handle_message(message)
+            elapsed = time.perf_counter() - start_time
+            await asyncio.gather(*ingestor.callback_tasks)
+            return ingestor, elapsed
+
+        ingestor, filter_time = asyncio.run(hot_path())
+        filter_rate = len(messages) / filter_time
+        self.assertEqual(ingestor.stats["matched"], 50)
+
+        async def end_to_end():
+            node = MockNode(txs)
+            await node.start()
+            try:
+                return await ingest_all(node, self.watched, len(txs), mode="full")
+            finally:
+                await node.stop()
+
+        ingestor, matched, elapsed = asyncio.run(end_to_end())
+        e2e_rate = len(txs) / elapsed
+
+        print(f"✅ Filter hot path: {filter_rate:,.0f} tx/s | Mock node end-to-end: {e2e_rate:,.0f} tx/s")
+        self.assertEqual(len(matched), 50)
+        self.assertGreater(filter_rate, 200000)
+        self.assertGreater(e2e_rate, 10000)
+
+
+def run_mempool_ingest_tests():
+    """Run mempool ingest test suite"""
+    print("🔥 RUNNING MEMPOOL INGEST TESTS")
+    print("="*60)
+
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestMempoolIngest)
+    result = unittest.TextTestRunner(verbosity=2).run(suite)
+
+    success = len(result.failures) == 0 and len(result.errors) == 0
+    print("\n🎉 ALL MEMPOOL INGEST TESTS PASSED!" if success else "\n❌ SOME MEMPOOL INGEST TESTS FAILED")
+    return success
+
+
+if __name__ == "__main__":
+    success = run_mempool_ingest_tests()
+    sys.exit(0 if success else 1)
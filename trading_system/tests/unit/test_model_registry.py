@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Test Model Registry - Verify versioned checkpoints round-trip weights and scaler
+"""
+import sys
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import torch
+import torch.nn as nn
+from sklearn.preprocessing import StandardScaler
+
+# Add engines to path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "core" / "engines"))
+
+from feature_engineering import FEATURE_DIM, feature_schema_hash
+from model_registry import ModelRegistry
+
+class TestModelRegistry(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a temporary registry, model and fitted scaler"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.registry = ModelRegistry(root=self.tmp_dir.name, keep_versions=3)
+
+        torch.manual_seed(0)
+        self.model = nn.Sequential(nn.Linear(FEATURE_DIM, 32), nn.BatchNorm1d(32), nn.Linear(32, 3))
+        self.scaler = StandardScaler().fit(np.random.default_rng(0).normal(5, 2, (200, FEATURE_DIM)))
+        self.schema_hash = feature_schema_hash()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _save(self, **metadata):
+        return self.registry.save(self.model, self.scaler, self.schema_hash,
+                                  model_config={"input_dim": FEATURE_DIM}, metadata=metadata)
+
+    def test_round_trip(self):
+        """Weights and scaler come back identical"""
+        print("🧪 Testing model registry round trip...")
+
+        version = self._save(samples=200)
+        artifact = self.registry.load(schema_hash=self.schema_hash)
+
+        self.assertEqual(artifact.version, version)
+        self.assertEqual(artifact.manifest["metadata"]["samples"], 200)
+        for key, value in self.model.state_dict().items():
+            self.assertTrue(torch.equal(artifact.state_dict[key], value))
+
+        restored = nn.Sequential(nn.Linear(FEATURE_DIM, 32), nn.BatchNorm1d(32), nn.Linear(32, 3))
+        restored.load_state_dict(artifact.state_dict)
+
+        sample = np.random.default_rng(1).normal(5, 2, (10, FEATURE_DIM))
+        np.testing.assert_array_equal(artifact.scaler.transform(sample), self.scaler.transform(sample))
+        print(f"✅ Model {version} restored")
+
+    def test_schema_mismatch_rejected(self):
+        """A model trained on another feature layout is never loaded"""
+        self._save()
+        with self.assertRaises(RuntimeError):
+            self.registry.load(schema_hash=feature_schema_hash(lookback_window=24))
+
+    def test_versions_and_pruning(self):
+        """Versions increase, LATEST follows the newest save and old versions are pruned"""
+        versions = [self._save(run=i) for i in range(5)]
+
+        self.assertEqual(versions, ["v0001", "v0002", "v0003", "v0004", "v0005"])
+        self.assertEqual(self.registry.latest_version(), "v0005")
+        self.assertEqual(self.registry.list_versions(), ["v0003", "v0004", "v0005"])
+        self.assertEqual(self.registry.load("v0004").manifest["metadata"]["run"], 3)
+
+    def test_incomplete_version_ignored(self):
+        """A version directory without a manifest is not considered"""
+        self._save()
+        (Path(self.tmp_dir.name) / "deep_trading_network" / "v0009").mkdir()
+
+        self.assertEqual(self.registry.latest_version(), "v0001")
+
+    def test_empty_registry(self):
+        self.assertIsNone(self.registry.load())
+
+    def test_manifest_records_schema(self):
+        version = self._save()
+        with open(Path(self.tmp_dir.name) / "deep_trading_network" / version / "manifest.json") as f:
+            manifest = json.load(f)
+
+        self.assertEqual(manifest["schema_hash"], self.schema_hash)
+        self.assertEqual(manifest["model_config"]["input_dim"], FEATURE_DIM)
+
+
+def run_model_registry_tests():
+    """Run model registry test suite"""
+    print("🔥 RUNNING MODEL REGISTRY TESTS")
+    print("="*60)
+
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestModelRegistry)
+    result = unittest.TextTestRunner(verbosity=2).run(suite)
+
+    success = len(result.failures) == 0 and len(result.errors) == 0
+    print("\n🎉 ALL MODEL REGISTRY TESTS PASSED!" if success else "\n❌ SOME MODEL REGISTRY TESTS FAILED")
+    return success
+
+
+if __name__ == "__main__":
+    success = run_model_registry_tests()
+    sys.exit(0 if success else 1)
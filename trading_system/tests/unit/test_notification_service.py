@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Test Notification Service - Verify non-blocking enqueue, burst coalescing, rate limits and overflow handling
+"""
+import sys
+import time
+import asyncio
+import unittest
+from pathlib import Path
+
+# Add connectors to path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "core" / "connectors"))
+
+from notification_service import DiscordSink, Notification, NotificationService, TelegramSink
+
+class RecordingSink:
+    """Records payloads; optionally slow or rate limited for the first few sends"""
+    name = "discord"
+    min_interval = 0.0
+
+    def __init__(self, latency: float = 0.0, rate_limited: int = 0, max_batch: int = 100):
+        self.latency = latency
+        self.rate_limited = rate_limited
+        self.max_batch = max_batch
+        self.payloads = []
+
+    def take_batch(self, pending):
+        return min(len(pending), self.max_batch)
+
+    def build_payload(self, batch):
+        return [(n.text, n.count) for n in batch]
+
+    async def send(self, session, payload):
+        await asyncio.sleep(self.latency)
+        if self.rate_limited:
+            self.rate_limited -= 1
+            return 0.05
+        self.payloads.append(payload)
+        return None
+
+class TestNotificationService(unittest.TestCase):
+
+    def test_enqueue_never_blocks(self):
+        """Callers return immediately even when the sink is slow"""
+        print("🧪 Testing non-blocking enqueue...")
+        sink = RecordingSink(latency=0.2)
+        service = NotificationService([sink], max_queue=2000, coalesce_window=0.01)
+        service.start()
+        try:
+            start_time = time.perf_counter()
+            for i in range(1000):
+                service.notify("discord", f"fill {i}")
+            per_call = (time.perf_counter() - start_time) / 1000
+        finally:
+            service.stop()
+
+        print(f"✅ {per_call * 1e6:.1f}µs per notify with a 200ms sink")
+        self.assertLess(per_call, 1e-3)
+        self.assertEqual(sum(len(p) for p in sink.payloads), 1000)
+
+    def test_burst_coalesced(self):
+        """A burst inside the window goes out as one message; same-key alerts merge"""
+        sink = RecordingSink()
+        service = NotificationService([sink], coalesce_window=0.05)
+        for _ in range(3):
+            service.notify("discord", "BTC signal", key="signal:BTC")
+        service.notify("discord", "ETH signal", key="signal:ETH")
+        time.sleep(0.2)
+        service.stop()
+
+        self.assertEqual(sink.payloads, [[("BTC signal", 3), ("ETH signal", 1)]])
+        self.assertEqual(service.stats["merged"], 2)
+        self.assertEqual(service.stats["notifications_sent"], 4)
+
+    def test_queue_full_drops_oldest(self):
+        print("🧪 Testing queue overflow...")
+        sink = RecordingSink()
+        service = NotificationService([sink], max_queue=5, coalesce_window=0.1)
+        for i in range(8):
+            service.notify("discord", f"alert {i}")
+        service.stop()
+
+        texts = [text for payload in sink.payloads for text, _ in payload]
+        self.assertEqual(texts[:5], [f"alert {i}" for i in range(3, 8)])
+        self.assertIn("3 alerts dropped", texts[-1])
+        print("✅ Newest alerts kept, gap reported")
+
+    def test_rate_limited_batch_retried(self):
+        sink = RecordingSink(rate_limited=2)
+        service = NotificationService([sink], coalesce_window=0.01)
+        service.notify("discord", "exit filled")
+        time.sleep(0.3)
+        service.stop()
+
+        self.assertEqual(sink.payloads, [[("exit filled", 1)]])
+        self.assertEqual(service.stats["rate_limited"], 2)
+
+    def test_unknown_sink_ignored(self):
+        service = NotificationService([RecordingSink()])
+        self.assertFalse(service.notify("telegram", "no chat configured"))
+        self.assertFalse(service.running)
+
+class TestSinks(unittest.TestCase):
+
+    def test_discord_batching_limits(self):
+        """At most 10 embeds per webhook message, mention added once"""
+        sink = DiscordSink("https://discord.invalid/webhook", user_id="42")
+        pending = [Notification("trade", embed={"title": str(i)}, mention=True) for i in range(15)]
+
+        n = sink.take_batch(pending)
+        payload = sink.build_payload(pending[:n])
+
+        self.assertEqual(n, 10)
+        self.assertEqual(len(payload["embeds"]), 10)
+        self.assertEqual(payload["content"].count("<@42>"), 1)
+
+    def test_telegram_message_limit(self):
+        sink = TelegramSink("token", "chat")
+        pending = [Notification("x" * 1500) for _ in range(5)]
+
+        n = sink.take_batch(pending)
+
+        self.assertEqual(n, 2)
+        self.assertLessEqual(len(sink.build_payload(pending[:n])["text"]), 4096)
+
+
+def run_notification_service_tests():
+    """Run notification service test suite"""
+    print("🔥 RUNNING NOTIFICATION SERVICE TESTS")
+    print("="*60)
+
+    suite = unittest.TestSuite()
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestNotificationService))
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestSinks))
+    result = unittest.TextTestRunner(verbosity=2).run(suite)
+
+    success = len(result.failures) == 0 and len(result.errors) == 0
+    print("\n🎉 ALL NOTIFICATION SERVICE TESTS PASSED!" if success else "\n❌ SOME NOTIFICATION SERVICE TESTS FAILED")
+    return success
+
+
+if __name__ == "__main__":
+    success = run_notification_service_tests()
+    sys.exit(0 if success else 1)
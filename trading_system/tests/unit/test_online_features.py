@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Test Online Features - Verify streaming features track the batch FeatureEngineer
+"""
+import sys
+import time
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add engines and tests to path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "core" / "engines"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from feature_engineering import FeatureEngineer, FEATURE_DIM, WALLET_FEATURE_COUNT
+from online_features import OnlineFeaturePipeline, RollingWindow
+from test_feature_engineering import make_candles
+
+class TestOnlineFeatures(unittest.TestCase):
+
+    def setUp(self):
+        """Train a scaler on batch features"""
+        self.engineer = FeatureEngineer()
+        self.candles = make_candles(300, seed=4)
+        self.batch_features, _ = self.engineer.create_features_from_real_data(
+            {"BTC": self.candles}, pd.DataFrame()
+        )
+        self.pipeline = OnlineFeaturePipeline(self.engineer.scaler, self.engineer.lookback_window)
+
+    def test_rolling_window_stats(self):
+        """Rolling stats match numpy over the last window"""
+        print("🧪 Testing rolling window statistics...")
+
+        rng = np.random.default_rng(0)
+        values = rng.normal(100, 5, 500)
+        window = RollingWindow(48)
+
+        for value in values:
+            window.push(value)
+
+        recent = values[-48:]
+        self.assertAlmostEqual(window.mean(), np.mean(recent), places=9)
+        self.assertAlmostEqual(window.std(), np.std(recent), places=9)
+        self.assertAlmostEqual(window.std(ddof=1), np.std(recent, ddof=1), places=9)
+        self.assertEqual(window.min(), np.min(recent))
+        self.assertEqual(window.max(), np.max(recent))
+
+        window.push(float("nan"))
+        self.assertFalse(window.ready)
+        print("✅ Rolling window statistics correct")
+
+    def test_streaming_matches_batch(self):
+        """Each streamed vector equals the batch row that follows it"""
+        print("🧪 Testing streaming features against batch features...")
+
+        lookback = self.engineer.lookback_window
+        streamed = []
+        for i, row in self.candles.iterrows():
+            self.pipeline.update("BTC", row["timestamp"], row["close"], row["volume"])
+            if i + 1 >= lookback and i + 2 < len(self.candles):
+                streamed.append(self.pipeline.transform("BTC")[0])
+
+        streamed = np.array(streamed)
+        self.assertEqual(streamed.shape, self.batch_features.shape)
+        np.testing.assert_allclose(streamed, self.batch_features, rtol=1e-4, atol=1e-4)
+        print(f"✅ {len(streamed)} streamed vectors match batch features")
+
+    def test_forming_candle_revised(self):
+        """Polling a still-forming candle, then its final values, ends where the batch path does"""
+        print("🧪 Testing forming candle revisions...")
+        lookback = self.engineer.lookback_window
+        streamed = []
+        for i, row in self.candles.iterrows():
+            self.pipeline.update("BTC", row["timestamp"], row["close"] * 0.99, row["volume"] * 0.3)
+            self.pipeline.update("BTC", row["timestamp"], row["close"] * 1.01, row["volume"] * 0.7)
+            self.assertTrue(self.pipeline.update("BTC", row["timestamp"], row["close"], row["volume"]))
+            if i + 1 >= lookback and i + 2 < len(self.candles):
+                streamed.append(self.pipeline.transform("BTC")[0])
+
+        np.testing.assert_allclose(np.array(streamed), self.batch_features, rtol=1e-4, atol=1e-4)
+        print(f"✅ {len(self.candles)} candles revised twice each, still matching batch features")
+
+    def test_duplicate_candles_ignored(self):
+        """Replaying an overlapping history does not double-count candles"""
+        self.pipeline.update_from_frame("BTC", self.candles.iloc[:200])
+        first = self.pipeline.latest_features("BTC")
+
+        added = self.pipeline.update_from_frame("BTC", self.candles.iloc[150:200])
+        self.assertEqual(added, 0)
+        np.testing.assert_array_equal(first, self.pipeline.latest_features("BTC"))
+
+        added = self.pipeline.update_from_frame("BTC", self.candles.iloc[180:210])
+        self.assertEqual(added, 10)
+
+    def test_not_ready_before_lookback(self):
+        """No vector until a full lookback window has been seen"""
+        self.pipeline.update_from_frame("ETH", self.candles.iloc[:self.engineer.lookback_window - 1])
+        self.assertIsNone(self.pipeline.transform("ETH"))
+
+        self.pipeline.update_from_frame("ETH", self.candles.iloc[:self.engineer.lookback_window])
+        features = self.pipeline.transform("ETH")
+        self.assertEqual(features.shape, (1, FEATURE_DIM))
+        self.assertEqual(features.dtype, np.float32)
+
+    def test_scaler_is_frozen(self):
+        """Inference never refits the training scaler"""
+        mean_before = self.engineer.scaler.mean_.copy()
+        self.pipeline.update_from_frame("BTC", self.candles)
+        self.pipeline.transform("BTC", wallet_features=[1.0] * WALLET_FEATURE_COUNT)
+        np.testing.assert_array_equal(mean_before, self.engineer.scaler.mean_)
+
+    def test_update_latency(self):
+        """Per-candle update and transform stay in the microsecond range"""
+        print("🧪 Benchmarking online feature updates...")
+
+        self.pipeline.update_from_frame("BTC", self.candles)
+        last_timestamp = self.candles["timestamp"].iloc[-1]
+
+        iterations = 2000
+        start_time = time.perf_counter()
+        for i in range(iterations):
+            self.pipeline.update("BTC", last_timestamp + pd.Timedelta(hours=i + 1), 30000.0 + i % 13, 1500.0)
+            self.pipeline.transform("BTC")
+        per_update_us = (time.perf_counter() - start_time) / iterations * 1e6
+
+        print(f"✅ Update + transform: {per_update_us:.1f}μs")
+        self.assertLess(per_update_us, 1000)
+
+
+def run_online_feature_tests():
+    """Run online feature test suite"""
+    print("🔥 RUNNING ONLINE FEATURE TESTS")
+    print("="*60)
+
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestOnlineFeatures)
+    result = unittest.TextTestRunner(verbosity=2).run(suite)
+
+    success = len(result.failures) == 0 and len(result.errors) == 0
+    print("\n🎉 ALL ONLINE FEATURE TESTS PASSED!" if success else "\n❌ SOME ONLINE FEATURE TESTS FAILED")
+    return success
+
+
+if __name__ == "__main__":
+    success = run_online_feature_tests()
+    sys.exit(0 if success else 1)
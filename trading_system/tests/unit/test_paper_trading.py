@@ -12,7 +12,22 @@ import json
 sys.path.insert(0, '.')
 
 import config
-from paper_trading_engine import get_paper_engine, PaperPosition, PaperTrade
+import random
+from unittest.mock import patch
+import trade_store
+from trade_store import TradeStore
+from paper_trading_engine import get_paper_engine, PaperPosition, PaperTrade, PaperTradingEngine
+from risk_gate import RiskLimits
+
+def use_temp_trade_store(test):
+    """Send every fill the test makes, global engine included, to a throwaway store"""
+    store_dir = tempfile.TemporaryDirectory()
+    test.addCleanup(store_dir.cleanup)
+    store = TradeStore(store_dir.name)
+    for patcher in (patch.object(trade_store, "trade_store", store), patch.object(get_paper_engine(), "store", store)):
+        patcher.start()
+        test.addCleanup(patcher.stop)
+    return store
 
 class TestPaperTradingEngine(unittest.TestCase):
     
@@ -21,14 +36,10 @@ class TestPaperTradingEngine(unittest.TestCase):
         # Reset paper trading engine
         global paper_engine
         paper_engine = get_paper_engine()
+        use_temp_trade_store(self)
         
         # Clear any existing positions
-        paper_engine.positions.clear()
-        paper_engine.trade_history.clear()
-        paper_engine.balance = config.PAPER_INITIAL_BALANCE
-        paper_engine.total_trades = 0
-        paper_engine.winning_trades = 0
-        paper_engine.total_commission = 0.0
+        paper_engine.reset()
         
         # Sample signal data
         self.sample_signal = {
@@ -75,14 +86,14 @@ class TestPaperTradingEngine(unittest.TestCase):
         
         # Check position was created
         self.assertEqual(len(engine.positions), 1)
-        self.assertIn("BTC", engine.positions)
+        self.assertIn("BTC", engine.positions_by_asset)
         
         # Check balance decreased by commission
         self.assertLess(engine.balance, initial_balance)
         
-        position = engine.positions["BTC"]
+        position = engine.positions[result["position_id"]]
         self.assertEqual(position.asset, "BTC")
-        self.assertEqual(position.entry_price, 67500.0)
+        self.assertAlmostEqual(position.entry_price, 67500.0 * (1 - config.PAPER_SPREAD_BPS / 20000))  # short sells the bid
         self.assertGreater(position.quantity, 0)
         
         print(f"✅ Position opened: {position.asset} {position.side} @ ${position.entry_price:.2f}")
@@ -158,7 +169,7 @@ class TestPaperTradingEngine(unittest.TestCase):
         result = engine.open_position(self.sample_signal)
         self.assertIsNotNone(result)
         
-        position = engine.positions["BTC"]
+        position = engine.positions[result["position_id"]]
         
         # Test profit scenario (price goes down for short position)
         profitable_price = 66000.0  # Lower than entry price
@@ -315,6 +326,171 @@ class TestPaperTradingEngine(unittest.TestCase):
         
         print(f"✅ Commission calculation correct: ${actual_commission:.6f}")
 
+class TestPortfolioAggregates(unittest.TestCase):
+    """Running totals must match a full recomputation over the open positions"""
+    
+    def setUp(self):
+        use_temp_trade_store(self)
+    
+    def make_signal(self, asset, price, side="SHORT"):
+        offset = 0.02 if side == "SHORT" else -0.02
+        return {"confidence": 0.9, "signal_data": {"asset": asset, "entry_price": price, "stop_loss": price * (1 + offset),
+                                                    "take_profit_1": price * (1 - offset), "signal_type": side}}
+    
+    def assert_aggregates_consistent(self, engine):
+        positions = list(engine.positions.values())
+        self.assertAlmostEqual(engine.unrealized_pnl, sum(p.unrealized_pnl for p in positions), places=6)
+        for side in ("buy", "sell"):
+            expected = sum(p.quantity * p.current_price for p in positions if p.side == side)
+            self.assertAlmostEqual(engine.side_exposure[side], expected, places=6)
+        for asset, exposure in engine.asset_exposure.items():
+            expected = sum(p.quantity * p.current_price for p in positions if p.asset == asset)
+            self.assertAlmostEqual(exposure, expected, places=6)
+    
+    def test_incremental_matches_recompute(self):
+        print("🧪 Testing incremental portfolio aggregates...")
+        rng = random.Random(7)
+        engine = PaperTradingEngine(limits=RiskLimits())
+        prices = {f"A{i}": rng.uniform(1, 1000) for i in range(40)}
+        
+        for step in range(300):
+            asset = rng.choice(list(prices))
+            if asset not in engine.positions_by_asset:
+                engine.open_position(self.make_signal(asset, prices[asset], rng.choice(["SHORT", "LONG"])))
+            moved = {a: p * rng.uniform(0.995, 1.005) for a, p in prices.items() if rng.random() < 0.3}
+            prices.update(moved)
+            engine.update_positions(moved)
+            if step % 50 == 0 and engine.positions:
+                victim = rng.choice(list(engine.positions.values()))
+                engine.close_position(victim.id, "manual", prices[victim.asset])
+            self.assert_aggregates_consistent(engine)
+        
+        summary = engine.get_portfolio_summary()
+        self.assertAlmostEqual(summary["total_value"], engine.balance + engine.unrealized_pnl)
+        print(f"✅ Aggregates consistent over 300 steps, {len(engine.trade_history)} closes")
+    
+    def test_daily_counter_rolls_over(self):
+        engine = PaperTradingEngine()
+        now = time.time()
+        engine.open_position(self.make_signal("BTC", 67500.0))
+        
+        self.assertEqual(engine.get_trades_today(now), 1)
+        self.assertEqual(engine.get_trades_today(now + 86400), 0)
+    
+    def test_drawdown_tracked_on_close(self):
+        engine = PaperTradingEngine()
+        engine.open_position(self.make_signal("BTC", 100.0))
+        engine.update_positions({"BTC": 103.0})  # short stopped out
+        
+        expected = (engine.peak_balance - engine.balance) / engine.peak_balance * 100
+        self.assertGreater(engine.current_drawdown, 0)
+        self.assertAlmostEqual(engine.current_drawdown, expected)
+        self.assertAlmostEqual(engine.max_drawdown, expected)
+    
+    def test_summary_cost_independent_of_positions(self):
+        """Benchmark summary and risk check against the old per-call recomputation"""
+        print("🧪 Benchmarking portfolio summary...")
+        engine = PaperTradingEngine(limits=RiskLimits())
+        for i in range(500):
+            engine.open_position(self.make_signal(f"A{i}", 100.0 + i))
+        
+        start_time = time.perf_counter()
+        for _ in range(2000):
+            engine.get_portfolio_summary()
+            engine.can_open_position("NEW")
+        per_call = (time.perf_counter() - start_time) / 2000
+        
+        start_time = time.perf_counter()
+        for _ in range(2000):
+            sum(pos.unrealized_pnl for pos in engine.positions.values())
+            time.strftime("%Y-%m-%d")
+        recompute = (time.perf_counter() - start_time) / 2000
+        
+        print(f"✅ Summary + risk check {per_call * 1e6:.1f}µs with 500 positions "
+              f"(recompute alone {recompute * 1e6:.1f}µs)")
+        self.assertLess(per_call, recompute)
+
+class TestExitLadder(unittest.TestCase):
+    """Laddered partial exits, breakeven and trailing stops over an ID-keyed book"""
+    
+    def setUp(self):
+        use_temp_trade_store(self)
+        self.engine = PaperTradingEngine()
+        self.signal = {"confidence": 0.9, "signal_data": {"asset": "BTC", "entry_price": 100.0, "stop_loss": 102.0,
+                                                           "take_profit_1": 98.5, "signal_type": "SHORT"}}
+    
+    def test_ladder_breakeven_and_trailing(self):
+        print("🧪 Testing take-profit ladder...")
+        result = self.engine.open_position(self.signal)
+        position = self.engine.positions[result["position_id"]]
+        quantity = position.quantity
+        
+        self.engine.update_positions({"BTC": 98.5})
+        self.assertEqual(self.engine.trade_history[-1].exit_reason, "take_profit_1")
+        self.assertAlmostEqual(self.engine.trade_history[-1].quantity, quantity * 0.5)
+        self.assertEqual(position.status, "partial")
+        self.assertEqual(position.stop_loss, position.entry_price)  # breakeven until TP2
+        
+        self.engine.update_positions({"BTC": 97.4})
+        self.assertEqual(self.engine.trade_history[-1].exit_reason, "take_profit_2")
+        self.assertAlmostEqual(position.quantity, quantity * 0.2)
+        self.assertAlmostEqual(position.stop_loss, 97.4 * (1 + config.TRAILING_STOP_PERCENT))
+        
+        self.engine.update_positions({"BTC": 98.6})
+        self.assertEqual(self.engine.trade_history[-1].exit_reason, "trailing_stop")
+        self.assertEqual(self.engine.positions, {})
+        self.assertEqual(self.engine.positions_by_asset, {})
+        self.assertTrue(all(t.position_id == result["position_id"] for t in self.engine.trade_history))
+        self.assertAlmostEqual(sum(t.quantity for t in self.engine.trade_history), quantity)
+        print(f"✅ Exits: {[t.exit_reason for t in self.engine.trade_history]}")
+    
+    def test_breakeven_stop(self):
+        self.engine.open_position(self.signal)
+        self.engine.update_positions({"BTC": 98.5})
+        self.engine.update_positions({"BTC": 100.0})
+        self.assertEqual(self.engine.trade_history[-1].exit_reason, "breakeven_stop")
+    
+    def test_gap_through_every_target(self):
+        self.engine.open_position(self.signal)
+        self.engine.update_positions({"BTC": 90.0})
+        
+        self.assertEqual([t.exit_reason for t in self.engine.trade_history],
+                         ["take_profit_1", "take_profit_2", "take_profit_3"])
+        self.assertEqual(self.engine.positions, {})
+    
+    @patch.object(config, "MAX_POSITIONS_PER_ASSET", 3)
+    def test_unique_ids_per_asset(self):
+        self.engine.reset()  # pick up the patched limit
+        ids = [self.engine.open_position(self.signal)["position_id"] for _ in range(3)]
+        
+        self.assertEqual(len(set(ids)), 3)
+        self.assertEqual(set(self.engine.positions_by_asset["BTC"]), set(ids))
+        self.assertIsNone(self.engine.open_position(self.signal))
+        
+        closed = self.engine.close_position(ids[1], "manual", 99.0)
+        self.assertEqual(closed["status"], "closed")
+        self.assertEqual(set(self.engine.positions_by_asset["BTC"]), {ids[0], ids[2]})
+    
+    def test_batched_evaluation_cost(self):
+        """Benchmark one price update across every open leg"""
+        print("🧪 Benchmarking batched exit evaluation...")
+        self.engine = PaperTradingEngine(limits=RiskLimits())
+        for i in range(500):
+            self.engine.open_position({"confidence": 0.9, "signal_data": {
+                "asset": f"A{i % 50}", "entry_price": 100.0, "stop_loss": 105.0,
+                "take_profit_1": 95.0, "signal_type": "SHORT"}})
+        prices = {f"A{i}": 100.0 for i in range(50)}
+        
+        start_time = time.perf_counter()
+        for step in range(200):
+            self.engine.update_positions({asset: 100.0 + (step % 5) * 0.1 for asset in prices})
+        per_update = (time.perf_counter() - start_time) / 200
+        
+        print(f"✅ {per_update * 1e3:.2f}ms per price update over {len(self.engine.positions)} legs")
+        self.assertEqual(len(self.engine.positions), 500)
+        self.assertLess(per_update, 0.05)
+
+
 
 def run_paper_trading_tests():
     """Run paper trading test suite"""
@@ -329,6 +505,8 @@ def run_paper_trading_tests():
     # Create test suite
     suite = unittest.TestSuite()
     suite.addTest(unittest.makeSuite(TestPaperTradingEngine))
+    suite.addTest(unittest.makeSuite(TestPortfolioAggregates))
+    suite.addTest(unittest.makeSuite(TestExitLadder))
     
     # Run tests
     runner = unittest.TextTestRunner(verbosity=2)
@@ -9,6 +9,7 @@ import statistics
 import threading
 import psutil
 import os
+import tempfile
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Add src to path
@@ -17,7 +18,9 @@ sys.path.insert(0, '.')
 import config
 import signal_engine
 import confidence_scoring
+from unittest.mock import patch
 from paper_trading_engine import get_paper_engine
+from trade_store import TradeStore
 from okx_market_data import get_okx_engine
 
 class TestSystemPerformance(unittest.TestCase):
@@ -31,6 +34,13 @@ class TestSystemPerformance(unittest.TestCase):
         
         self.process = psutil.Process(os.getpid())
         
+        # Keep benchmark fills out of the real trade store
+        store_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(store_dir.cleanup)
+        patcher = patch.object(get_paper_engine(), "store", TradeStore(store_dir.name))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        
     def test_signal_generation_speed(self):
         """Test signal generation speed and consistency"""
         print("🧪 Testing signal generation speed...")
@@ -140,7 +150,7 @@ class TestSystemPerformance(unittest.TestCase):
         print("🧪 Testing paper trading speed...")
         
         paper_engine = get_paper_engine()
-        paper_engine.positions.clear()
+        paper_engine.reset()
         
         iterations = 20
         times = []
@@ -346,7 +356,7 @@ class TestSystemPerformance(unittest.TestCase):
         print("🧪 Testing system throughput...")
         
         paper_engine = get_paper_engine()
-        paper_engine.positions.clear()
+        paper_engine.reset()
         
         num_signals = 100
         start_time = time.time()
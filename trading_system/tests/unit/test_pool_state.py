@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Test Pool State - Verify V2 / V3 swap maths, log-driven updates and pool discovery
+"""
+import sys
+import math
+import time
+import asyncio
+import unittest
+from pathlib import Path
+
+# Add connectors to path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "core" / "connectors"))
+
+from pool_state import (PoolStateCache, V2Pool, V3Pool, SYNC_TOPIC, V3_SWAP_TOPIC, V3_MINT_TOPIC,
+                        V3_BURN_TOPIC, WETH_ADDRESS, USDC_ADDRESS, UNISWAP_V2_FACTORY, UNISWAP_V3_FACTORY,
+                        GET_PAIR, GET_POOL, GET_RESERVES, SLOT0, LIQUIDITY, TOKEN0, TOKEN1, TICK_SPACING,
+                        TICK_BITMAP, DECIMALS)
+
+TOKEN = "0x6982508145454ce325ddbe47a25d4ec3d2311933"
+PAIR = "0x1111111111111111111111111111111111111111"
+V3_POOL = "0x2222222222222222222222222222222222222222"
+ETH_USD_POOL = "0x88e6a0c2ddd26feeb64f039a2c41296fcb3f5640"
+
+def word(value: int) -> bytes:
+    return (value % (1 << 256)).to_bytes(32, "big")
+
+def topic(value: int) -> str:
+    return "0x" + word(value).hex()
+
+def make_log(address: str, topics: list, data: bytes, block: int, index: int = 0, removed: bool = False) -> dict:
+    return {"address": address, "topics": topics, "data": "0x" + data.hex(),
+            "blockNumber": hex(block), "logIndex": hex(index), "removed": removed}
+
+def sqrt_price_x96(price: float) -> int:
+    return int(math.sqrt(price) * (1 << 96))
+
+def make_v3_pool(ticks=None) -> V3Pool:
+    # token0 = TOKEN, token1 = WETH at 0.0001 WETH per token; active range [-92400, -91800)
+    tick = math.floor(math.log(1e-4, 1.0001))
+    return V3Pool(V3_POOL, TOKEN, WETH_ADDRESS, 3000, 60, sqrt_price_x96(1e-4), 10 ** 22, tick,
+                  ticks=ticks if ticks is not None else {})
+
+class FakeRPC:
+    """Answers factory lookups and pool reads for one V2 pair plus the ETH/USD V3 pool"""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def call(self, method, params=None):
+        return "0x10"
+
+    async def eth_call(self, to: str, data: bytes) -> bytes:
+        self.calls += 1
+        to, selector = to.lower(), data[:4]
+        if to == UNISWAP_V2_FACTORY.lower() and selector == GET_PAIR:
+            return word(int(PAIR, 16))
+        if to == UNISWAP_V3_FACTORY.lower() and selector == GET_POOL:
+            fee = int.from_bytes(data[68:100], "big")
+            is_reference = data[16:36].hex() == USDC_ADDRESS[2:]
+            return word(int(ETH_USD_POOL, 16) if is_reference and fee == 500 else 0)
+        if to == PAIR:
+            return {TOKEN0: word(int(TOKEN, 16)), TOKEN1: word(int(WETH_ADDRESS, 16)),
+                    GET_RESERVES: word(10 ** 24) + word(100 * 10 ** 18) + word(0)}[selector]
+        if to == ETH_USD_POOL:
+            # 2000 USDC per WETH, token0 = USDC (6 decimals)
+            sqrt_price = sqrt_price_x96(1e18 / 2000e6)
+            return {TOKEN0: word(int(USDC_ADDRESS, 16)), TOKEN1: word(int(WETH_ADDRESS, 16)),
+                    SLOT0: word(sqrt_price) + word(math.floor(math.log(1e18 / 2000e6, 1.0001))),
+                    LIQUIDITY: word(10 ** 18), TICK_SPACING: word(10), TICK_BITMAP: word(0)}[selector]
+        if selector == DECIMALS:
+            return word(18)
+        return b""
+
+class TestSwapMaths(unittest.TestCase):
+
+    def test_v2_exact_amount_out(self):
+        """Constant-product output matches UniswapV2Library.getAmountOut"""
+        pool = V2Pool(PAIR, TOKEN, WETH_ADDRESS, 10 ** 24, 100 * 10 ** 18)
+        amount_in = 10 ** 18
+
+        expected = amount_in * 997 * 10 ** 24 // (100 * 10 ** 18 * 1000 + amount_in * 997)
+        self.assertEqual(pool.quote(False, amount_in), expected)
+        self.assertEqual(pool.quote(True, 0), 0)
+
+    def test_v3_single_range(self):
+        """With no tick data the swap stays in the active range (closed form)"""
+        pool = make_v3_pool()
+        amount_in = 10 ** 18
+        sqrt_price = pool.sqrt_price_x96 / (1 << 96)
+        effective = amount_in * (1 - 0.003)
+
+        new_sqrt_price = sqrt_price + effective / pool.liquidity
+        expected = pool.liquidity * (1 / sqrt_price - 1 / new_sqrt_price)
+        self.assertAlmostEqual(pool.quote(False, amount_in) / expected, 1.0, places=9)
+
+    def test_v3_tick_crossing(self):
+        """Crossing out of the position's range leaves less liquidity for the rest of the swap"""
+        print("🧪 Testing V3 tick walk...")
+        upper = -91800
+        ranged = make_v3_pool({-92400: 10 ** 22, upper: -(10 ** 22) + 10 ** 20})
+        unbounded = make_v3_pool()
+
+        sqrt_price = ranged.sqrt_price_x96 / (1 << 96)
+        sqrt_upper = 1.0001 ** (upper / 2)
+        to_boundary = int(ranged.liquidity * (sqrt_upper - sqrt_price) / (1 - 0.003))
+
+        # Up to the boundary both pools agree
+        self.assertAlmostEqual(ranged.quote(False, to_boundary // 2) / unbounded.quote(False, to_boundary // 2), 1.0, places=9)
+        # Past it only 1% of the liquidity remains
+        self.assertLess(ranged.quote(False, to_boundary * 2), unbounded.quote(False, to_boundary * 2))
+        expected_at_boundary = ranged.liquidity * (1 / sqrt_price - 1 / sqrt_upper)
+        self.assertAlmostEqual(ranged.quote(False, to_boundary) / expected_at_boundary, 1.0, places=6)
+        print("✅ Liquidity drops at the upper tick")
+
+    def test_quote_and_price(self):
+        cache = PoolStateCache()
+        cache.add_pool(V2Pool(PAIR, TOKEN, WETH_ADDRESS, 10 ** 24, 100 * 10 ** 18))
+
+        self.assertAlmostEqual(cache.get_price(TOKEN), 1e-4)
+        self.assertAlmostEqual(cache.get_price(WETH_ADDRESS, TOKEN), 1e4)
+
+        quote = cache.quote_swap(WETH_ADDRESS, TOKEN, 1.0)
+        expected_out = 997 * 10 ** 24 // (100 * 1000 + 997) / 1e18
+        self.assertAlmostEqual(quote.amount_out, expected_out, places=6)
+        self.assertAlmostEqual(quote.slippage, 1 - expected_out / 1e4, places=9)
+        self.assertIsNone(cache.quote_swap(WETH_ADDRESS, "0x" + "33" * 20, 1.0))
+
+class TestPoolStateCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = PoolStateCache()
+        self.cache.add_pool(V2Pool(PAIR, TOKEN, WETH_ADDRESS, 10 ** 24, 100 * 10 ** 18))
+        self.cache.add_pool(make_v3_pool())
+
+    def test_sync_updates_reserves(self):
+        print("🧪 Testing log-driven updates...")
+        log = make_log(PAIR, [SYNC_TOPIC], word(2 * 10 ** 24) + word(100 * 10 ** 18), block=100)
+
+        self.assertTrue(self.cache.apply_log(log))
+        self.assertEqual(self.cache.pools[PAIR].reserve0, 2 * 10 ** 24)
+        # Replayed or older logs are ignored
+        self.assertFalse(self.cache.apply_log(make_log(PAIR, [SYNC_TOPIC], word(1) + word(1), block=99)))
+        self.assertFalse(self.cache.apply_log(log))
+        self.assertEqual(self.cache.stats["stale"], 2)
+        print("✅ Reserves follow Sync, stale logs skipped")
+
+    def test_v3_swap_mint_burn(self):
+        pool = self.cache.pools[V3_POOL]
+        swap_data = word(-5) + word(7) + word(sqrt_price_x96(2e-4)) + word(3 * 10 ** 21) + word(-85177)
+        self.cache.apply_log(make_log(V3_POOL, [V3_SWAP_TOPIC, topic(0), topic(0)], swap_data, block=10))
+
+        self.assertEqual(pool.tick, -85177)
+        self.assertEqual(pool.liquidity, 3 * 10 ** 21)
+
+        mint_topics = [V3_MINT_TOPIC, topic(0), topic(-86400), topic(-84000)]
+        mint = make_log(V3_POOL, mint_topics, word(0) + word(10 ** 20) + word(1) + word(1), block=11)
+        self.cache.apply_log(mint)
+        self.assertEqual(pool.liquidity, 3 * 10 ** 21 + 10 ** 20)
+        self.assertEqual(pool.ticks, {-86400: 10 ** 20, -84000: -(10 ** 20)})
+
+        burn_topics = [V3_BURN_TOPIC, topic(0), topic(-86400), topic(-84000)]
+        self.cache.apply_log(make_log(V3_POOL, burn_topics, word(4 * 10 ** 19) + word(1) + word(1), block=12))
+        self.assertEqual(pool.liquidity, 3 * 10 ** 21 + 6 * 10 ** 19)
+
+        # A reorged mint is undone
+        self.cache.apply_log(dict(mint, removed=True))
+        self.assertEqual(pool.liquidity, 3 * 10 ** 21 - 4 * 10 ** 19)
+        self.assertEqual(pool.ticks, {-86400: -4 * 10 ** 19, -84000: 4 * 10 ** 19})
+        self.assertEqual(pool.sorted_ticks, [-86400, -84000])
+
+    def test_deepest_pool_prices(self):
+        """Price comes from the pool with the most WETH depth"""
+        self.cache.pools[PAIR].reserve1 = 10 ** 18
+        self.assertAlmostEqual(self.cache.get_price(TOKEN), 1e-4, places=9)
+        self.assertEqual(self.cache.best_pool(TOKEN).address, V3_POOL)
+
+    def test_track_token_discovers_pools(self):
+        """Factory lookups and pool reads bootstrap state; concurrent tracks share one discovery"""
+        print("🧪 Testing pool discovery...")
+
+        async def scenario():
+            rpc = FakeRPC()
+            cache = PoolStateCache(rpc)
+            results = await asyncio.gather(*(cache.track_token(TOKEN) for _ in range(5)))
+            return cache, rpc, results
+
+        cache, rpc, results = asyncio.run(scenario())
+
+        self.assertEqual(sorted(results[0]), sorted([PAIR, ETH_USD_POOL]))
+        self.assertTrue(all(r == results[0] for r in results))
+        self.assertEqual(cache.pools[PAIR].last_log, (16, 1 << 32))
+        self.assertAlmostEqual(cache.get_price(WETH_ADDRESS, USDC_ADDRESS), 2000, places=3)
+        self.assertAlmostEqual(cache.liquidity_usd(TOKEN), 2 * 100 * 2000, places=0)
+        print(f"✅ 2 pools loaded with {rpc.calls} eth_calls")
+
+    def test_run_streams_once(self):
+        """The wallet mimic and exit manager may both start the shared cache; only one stream runs"""
+        connects = []
+
+        async def consume(session, ws_url):
+            connects.append(ws_url)
+            await asyncio.sleep(0.05)
+            self.cache.stop()
+
+        async def scenario():
+            self.cache._consume_logs = consume
+            await asyncio.gather(self.cache.run("ws://mimic"), self.cache.run("ws://exit"))
+
+        asyncio.run(scenario())
+        self.assertEqual(connects, ["ws://mimic"])
+
+    def test_quote_latency(self):
+        """Benchmark local slippage estimates"""
+        print("🧪 Benchmarking local quotes...")
+        self.cache.pools[V3_POOL].set_ticks({t: 10 ** 18 * (-1) ** (t // 60) for t in range(-96000, -88000, 60)})
+
+        n = 20000
+        start_time = time.perf_counter()
+        for _ in range(n):
+            self.cache.quote_swap(WETH_ADDRESS, TOKEN, 1.0)
+        per_quote = (time.perf_counter() - start_time) / n
+
+        print(f"✅ {per_quote * 1e6:.1f}µs per slippage estimate")
+        self.assertLess(per_quote, 1e-3)
+
+
+def run_pool_state_tests():
+    """Run pool state test suite"""
+    print("🔥 RUNNING POOL STATE TESTS")
+    print("="*60)
+
+    suite = unittest.TestSuite()
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestSwapMaths))
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestPoolStateCache))
+    result = unittest.TextTestRunner(verbosity=2).run(suite)
+
+    success = len(result.failures) == 0 and len(result.errors) == 0
+    print("\n🎉 ALL POOL STATE TESTS PASSED!" if success else "\n❌ SOME POOL STATE TESTS FAILED")
+    return success
+
+
+if __name__ == "__main__":
+    success = run_pool_state_tests()
+    sys.exit(0 if success else 1)
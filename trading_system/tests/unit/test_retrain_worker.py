@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Test Retrain Worker - Verify off-loop retraining, the validation gate and runtime hot-swap
+"""
+import sys
+import time
+import asyncio
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import torch
+
+# Add engines and tests to path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "core" / "engines"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from deep_trading_network import DeepTradingNetwork
+from feature_engineering import FeatureEngineer, FEATURE_DIM
+from inference_service import BatchInferenceService
+from retrain_worker import RetrainJob, RetrainResult, RetrainWorker, run_retrain_job
+from test_feature_engineering import make_candles
+
+class TestRetrainWorker(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a model, fitted scaler and a price snapshot"""
+        torch.manual_seed(0)
+        self.price_data = {"BTC": make_candles(240, seed=1), "ETH": make_candles(240, seed=2)}
+
+        self.engineer = FeatureEngineer()
+        self.engineer.create_features_from_real_data(self.price_data, pd.DataFrame())
+
+        self.model = DeepTradingNetwork(input_dim=FEATURE_DIM)
+        self.model.eval()
+
+    def _job(self, **kwargs) -> RetrainJob:
+        return RetrainJob(
+            state_dict={k: v.clone() for k, v in self.model.state_dict().items()},
+            model_config={"input_dim": FEATURE_DIM},
+            scaler=self.engineer.scaler,
+            price_data=self.price_data,
+            **kwargs
+        )
+
+    def test_retrain_job(self):
+        """A job returns new weights and holdout losses for both models"""
+        print("🧪 Testing retrain job...")
+
+        result = run_retrain_job(self._job(epochs=5))
+
+        self.assertTrue(np.isfinite(result.baseline_loss))
+        self.assertTrue(np.isfinite(result.candidate_loss))
+        self.assertGreater(result.train_samples, result.holdout_samples)
+        changed = any(not torch.equal(result.state_dict[k], v) for k, v in self.model.state_dict().items())
+        self.assertTrue(changed)
+        print(f"✅ Holdout loss {result.baseline_loss:.4f} -> {result.candidate_loss:.4f}")
+
+    def test_validation_gate(self):
+        """Only candidates that do not regress on the holdout are promoted"""
+        better = RetrainResult({}, baseline_loss=1.0, candidate_loss=0.9, train_samples=1, holdout_samples=1, duration=0)
+        worse = RetrainResult({}, baseline_loss=1.0, candidate_loss=1.05, train_samples=1, holdout_samples=1, duration=0)
+        no_holdout = RetrainResult({}, baseline_loss=float("nan"), candidate_loss=float("nan"),
+                                   train_samples=1, holdout_samples=0, duration=0)
+
+        self.assertTrue(better.passes_gate())
+        self.assertFalse(worse.passes_gate())
+        self.assertTrue(worse.passes_gate(tolerance=0.1))
+        self.assertFalse(no_holdout.passes_gate())
+
+    def test_event_loop_not_blocked(self):
+        """Retraining in the worker process leaves the event loop responsive"""
+        print("🧪 Testing event loop lag during retrain...")
+
+        async def scenario():
+            worker = RetrainWorker(num_threads=1)
+            max_lag = 0.0
+            done = False
+
+            async def heartbeat():
+                nonlocal max_lag
+                while not done:
+                    expected = time.perf_counter() + 0.005
+                    await asyncio.sleep(0.005)
+                    max_lag = max(max_lag, time.perf_counter() - expected)
+
+            ticker = asyncio.create_task(heartbeat())
+            try:
+                result = await worker.retrain(self._job(epochs=20))
+            finally:
+                done = True
+                await ticker
+                worker.shutdown()
+            return result, max_lag
+
+        result, max_lag = asyncio.run(scenario())
+
+        print(f"✅ Retrain took {result.duration:.2f}s in worker | max loop lag {max_lag * 1000:.1f}ms")
+        self.assertIsNotNone(result.state_dict)
+        self.assertLess(max_lag, 0.1)
+
+    def test_runtime_hot_swap(self):
+        """A standby runtime is built without touching the live one, then swapped atomically"""
+        service = BatchInferenceService(self.model, FEATURE_DIM, backend="torchscript")
+        batch = np.random.default_rng(0).normal(0, 1, (4, FEATURE_DIM)).astype(np.float32)
+        live_outputs = service.predict_array(batch)
+
+        result = run_retrain_job(self._job(epochs=5))
+        candidate = DeepTradingNetwork(input_dim=FEATURE_DIM)
+        candidate.load_state_dict(result.state_dict)
+
+        runtime = service.build_runtime(candidate, version="v0002")
+        np.testing.assert_array_equal(service.predict_array(batch), live_outputs)
+
+        service.swap(runtime)
+        self.assertEqual(service.version, "v0002")
+        self.assertFalse(np.allclose(service.predict_array(batch), live_outputs))
+
+        self.assertTrue(service.rollback())
+        np.testing.assert_array_equal(service.predict_array(batch), live_outputs)
+
+
+def run_retrain_worker_tests():
+    """Run retrain worker test suite"""
+    print("🔥 RUNNING RETRAIN WORKER TESTS")
+    print("="*60)
+
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestRetrainWorker)
+    result = unittest.TextTestRunner(verbosity=2).run(suite)
+
+    success = len(result.failures) == 0 and len(result.errors) == 0
+    print("\n🎉 ALL RETRAIN WORKER TESTS PASSED!" if success else "\n❌ SOME RETRAIN WORKER TESTS FAILED")
+    return success
+
+
+if __name__ == "__main__":
+    success = run_retrain_worker_tests()
+    sys.exit(0 if success else 1)
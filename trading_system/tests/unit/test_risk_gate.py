@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Test Pre-Trade Risk Gate - Verify every limit, incremental fill updates, cooldowns and check latency
+"""
+import sys
+import time
+import unittest
+from pathlib import Path
+
+# Add managers to path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "core" / "managers"))
+
+from risk_gate import (PreTradeRiskGate, RiskLimits, REJECT_HALTED, REJECT_RATE, REJECT_DAILY_TRADES,
+                       REJECT_DRAWDOWN, REJECT_COOLDOWN, REJECT_MAX_POSITIONS, REJECT_ASSET_POSITIONS,
+                       REJECT_ORDER_SIZE, REJECT_EXPOSURE)
+
+NOW = 1700000000.0
+
+class TestRiskLimits(unittest.TestCase):
+
+    def reason(self, gate, asset="BTC", notional=100.0, now=NOW, fee=0.0):
+        rejection = gate.check(asset, notional, now, fee)
+        return rejection.reason if rejection else None
+
+    def test_position_limits(self):
+        print("🧪 Testing position limits...")
+        gate = PreTradeRiskGate(10000.0, RiskLimits(max_open_positions=2, max_positions_per_asset=1))
+        self.assertIsNone(self.reason(gate))
+        gate.on_open("BTC", 100.0, now=NOW)
+
+        self.assertEqual(self.reason(gate), REJECT_ASSET_POSITIONS)
+        gate.on_open("ETH", 100.0, now=NOW)
+        rejection = gate.check("SOL", 100.0, NOW)
+        self.assertEqual((rejection.reason, rejection.limit, rejection.value), (REJECT_MAX_POSITIONS, 2, 2))
+        print(f"✅ Rejected with {rejection}")
+
+    def test_order_size_and_exposure(self):
+        gate = PreTradeRiskGate(10000.0, RiskLimits(max_order_notional=5000.0, max_order_pct=0.33, max_exposure_pct=1.0))
+        self.assertEqual(self.reason(gate, notional=3400.0), REJECT_ORDER_SIZE)
+        gate.on_open("BTC", 3300.0, now=NOW)
+        gate.on_open("ETH", 3300.0, now=NOW)
+        gate.on_open("SOL", 3300.0, now=NOW)
+
+        self.assertIsNone(self.reason(gate, "ADA", 100.0))
+        self.assertEqual(self.reason(gate, "ADA", 100.0, fee=1.0), REJECT_EXPOSURE)
+
+    def test_drawdown_tracked_from_fills(self):
+        gate = PreTradeRiskGate(1000.0, RiskLimits(max_drawdown_pct=0.15))
+        gate.on_open("BTC", 300.0, now=NOW)
+        gate.on_close("BTC", 300.0, pnl=200.0, now=NOW)
+        gate.on_open("BTC", 300.0, now=NOW)
+        gate.on_close("BTC", 300.0, pnl=-190.0, now=NOW)
+
+        self.assertAlmostEqual(gate.drawdown, 190.0 / 1200.0)
+        self.assertEqual(self.reason(gate, "ETH"), REJECT_DRAWDOWN)
+        self.assertEqual((gate.open_positions, gate.exposure), (0, 0.0))
+
+    def test_cooldown_after_close(self):
+        gate = PreTradeRiskGate(10000.0, RiskLimits(cooldown_seconds=300))
+        gate.on_open("BTC", 100.0, now=NOW)
+        gate.on_close("BTC", 100.0, pnl=-5.0, now=NOW)
+
+        self.assertEqual(self.reason(gate, now=NOW + 299), REJECT_COOLDOWN)
+        self.assertIsNone(self.reason(gate, "ETH", now=NOW + 1))
+        self.assertIsNone(self.reason(gate, now=NOW + 300))
+
+    def test_cancel_undoes_open_without_cooldown(self):
+        gate = PreTradeRiskGate(10000.0, RiskLimits(max_daily_trades=1, cooldown_seconds=300, orders_per_second=1))
+        gate.on_open("BTC", 100.0, now=NOW)
+        self.assertEqual(self.reason(gate), REJECT_RATE)
+        gate.on_cancel("BTC", 100.0, now=NOW)
+
+        self.assertEqual((gate.open_positions, gate.exposure, gate.trades_today), (0, 0.0, 0))
+        self.assertIsNone(self.reason(gate, now=NOW + 1))
+        self.assertEqual(gate.capital, 10000.0)
+
+    def test_partial_close_keeps_position_open(self):
+        gate = PreTradeRiskGate(10000.0, RiskLimits(max_positions_per_asset=1, cooldown_seconds=300))
+        gate.on_open("BTC", 1000.0, now=NOW)
+        gate.on_close("BTC", 500.0, pnl=10.0, closed=False, now=NOW)
+
+        self.assertEqual((gate.open_positions, gate.exposure), (1, 500.0))
+        self.assertEqual(self.reason(gate, now=NOW + 1), REJECT_ASSET_POSITIONS)
+
+    def test_daily_trades_roll_over(self):
+        gate = PreTradeRiskGate(10000.0, RiskLimits(max_daily_trades=2))
+        for asset in ("BTC", "ETH"):
+            gate.on_open(asset, 100.0, now=NOW)
+
+        self.assertEqual(self.reason(gate, "SOL"), REJECT_DAILY_TRADES)
+        self.assertIsNone(self.reason(gate, "SOL", now=NOW + 86400))
+
+    def test_order_rate(self):
+        gate = PreTradeRiskGate(10000.0, RiskLimits(orders_per_second=5))
+        for i in range(5):
+            self.assertIsNone(self.reason(gate, f"A{i}"))
+            gate.on_open(f"A{i}", 10.0, now=NOW)
+
+        self.assertEqual(self.reason(gate, "A9"), REJECT_RATE)
+        time.sleep(0.25)
+        self.assertIsNone(self.reason(gate, "A9"))
+
+    def test_halt(self):
+        gate = PreTradeRiskGate(10000.0)
+        gate.halt("manual")
+        self.assertEqual(self.reason(gate), REJECT_HALTED)
+        gate.resume()
+        self.assertIsNone(self.reason(gate))
+        self.assertEqual(gate.get_stats()["rejections"], {REJECT_HALTED: 1})
+
+class TestRiskGateLatency(unittest.TestCase):
+
+    def test_check_latency(self):
+        """Benchmark a full check against every limit with a realistic book"""
+        print("🧪 Benchmarking pre-trade check...")
+        gate = PreTradeRiskGate(100000.0, RiskLimits(max_open_positions=500, max_positions_per_asset=3,
+                                                     max_order_notional=20000.0, max_order_pct=0.33,
+                                                     max_exposure_pct=5.0, max_daily_trades=1000,
+                                                     max_drawdown_pct=0.05, cooldown_seconds=300,
+                                                     orders_per_second=1e9))
+        for i in range(200):
+            gate.on_open(f"A{i}", 1000.0, now=NOW)
+
+        checks = 200000
+        start_time = time.perf_counter()
+        for i in range(checks):
+            gate.check("A7", 1000.0, NOW)
+        per_check = (time.perf_counter() - start_time) / checks
+
+        print(f"✅ {per_check * 1e6:.2f}µs per pre-trade check over 200 open positions")
+        self.assertIsNone(gate.check("A7", 1000.0, NOW))
+        self.assertLess(per_check, 5e-6)
+
+
+def run_risk_gate_tests():
+    """Run risk gate test suite"""
+    print("🔥 RUNNING RISK GATE TESTS")
+    print("="*60)
+
+    suite = unittest.TestSuite()
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestRiskLimits))
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestRiskGateLatency))
+    result = unittest.TextTestRunner(verbosity=2).run(suite)
+
+    success = len(result.failures) == 0 and len(result.errors) == 0
+    print("\n🎉 ALL RISK GATE TESTS PASSED!" if success else "\n❌ SOME RISK GATE TESTS FAILED")
+    return success
+
+
+if __name__ == "__main__":
+    success = run_risk_gate_tests()
+    sys.exit(0 if success else 1)
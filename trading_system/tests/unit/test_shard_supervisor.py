@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Test Shard Supervisor - Verify instrument partitioning, the shared risk book, worker restarts and throughput scaling
+"""
+import os
+import sys
+import time
+import math
+import unittest
+import multiprocessing
+from pathlib import Path
+from unittest.mock import patch
+
+# Add HFT bot to path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "bots" / "hft_shorting"))
+
+import shard_supervisor
+from shard_supervisor import SharedRiskBook, ShardSupervisor, partition_symbols
+
+UNIVERSE = [f"SYM{i:03d}" for i in range(300)]
+# Inherited by forked workers: set once the first worker 0 has taken the risk book lock
+LOCK_TAKEN = multiprocessing.get_context("fork").Value("i", 0, lock=False)
+
+def racing_worker(worker_id, book, attempts, results):
+    granted = sum(book.try_open(100.0, max_positions=25, worker_id=worker_id) for _ in range(attempts))
+    results[worker_id] = granted
+
+def capital_worker(worker_id, book, initial, attempts, results):
+    """Each worker sizes 10% of the shared capital, as a shard does"""
+    granted = 0
+    for _ in range(attempts):
+        capital = book.capital(initial)
+        granted += book.try_open(capital * 0.1, max_positions=25, max_exposure=capital)
+    results[worker_id] = granted
+
+def heartbeating_worker(worker_id, symbols, book):
+    while True:
+        book.heartbeat(worker_id, len(symbols))
+        time.sleep(0.01)
+
+def crashing_worker(worker_id, symbols, book):
+    book.heartbeat(worker_id)
+    if worker_id == 0:
+        os._exit(3)
+    heartbeating_worker(worker_id, symbols, book)
+
+def hanging_worker(worker_id, symbols, book):
+    book.heartbeat(worker_id)
+    if worker_id == 0:
+        time.sleep(60)
+    heartbeating_worker(worker_id, symbols, book)
+
+def reserving_worker(worker_id, symbols, book):
+    """Worker 0 holds two positions when it crashes, worker 1 holds one and stays up"""
+    book.heartbeat(worker_id)
+    for _ in range(2 - worker_id):
+        book.try_open(100.0, max_positions=10, worker_id=worker_id)
+    if worker_id == 0:
+        os._exit(3)
+    heartbeating_worker(worker_id, symbols, book)
+
+def lock_holding_worker(worker_id, symbols, book):
+    book.heartbeat(worker_id)
+    if worker_id == 0 and not LOCK_TAKEN.value:
+        LOCK_TAKEN.value = 1
+        book.lock.acquire()
+        time.sleep(60)
+    heartbeating_worker(worker_id, symbols, book)
+
+def indicator_worker(symbols, rounds, done):
+    """CPU-bound stand-in for per-symbol RSI/VWAP maths on every tick"""
+    prices = {symbol: [100.0 + math.sin(i) for i in range(100)] for symbol in symbols}
+    for _ in range(rounds):
+        for series in prices.values():
+            changes = [series[i] - series[i - 1] for i in range(1, len(series))]
+            gains = sum(c for c in changes[-14:] if c > 0)
+            losses = sum(-c for c in changes[-14:] if c < 0)
+            _ = 100 - 100 / (1 + gains / losses) if losses else 100.0
+    done.put(len(symbols))
+
+class TestPartitioning(unittest.TestCase):
+
+    def test_balanced_and_stable(self):
+        print("🧪 Testing instrument partitioning...")
+        shards = partition_symbols(UNIVERSE, 4)
+
+        self.assertEqual(sorted(s for shard in shards for s in shard), sorted(UNIVERSE))
+        self.assertEqual({len(shard) for shard in shards}, {75})
+        self.assertEqual(partition_symbols(list(reversed(UNIVERSE)), 4), shards)
+        self.assertEqual(len(partition_symbols(["BTC", "ETH"], 8)), 2)
+        print("✅ 300 symbols → 4 × 75")
+
+class TestSharedRiskBook(unittest.TestCase):
+
+    def test_limits_hold_across_processes(self):
+        """Workers racing for the last slots never overshoot the portfolio limit"""
+        context = multiprocessing.get_context("fork")
+        book = SharedRiskBook(4, context)
+        results = context.Array("i", 4)
+        workers = [context.Process(target=racing_worker, args=(i, book, 50, results)) for i in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        snapshot = book.snapshot()
+        self.assertEqual(sum(results), 25)
+        self.assertEqual(snapshot["open_positions"], 25)
+        self.assertAlmostEqual(snapshot["exposure"], 2500.0)
+
+    def test_release_and_loss_limit(self):
+        book = SharedRiskBook(1)
+        self.assertTrue(book.try_open(500.0, max_positions=1))
+        self.assertFalse(book.try_open(500.0, max_positions=1))
+
+        book.release(500.0, pnl=-300.0)
+
+        self.assertEqual(book.snapshot()["open_positions"], 0)
+        self.assertFalse(book.try_open(500.0, max_positions=1, max_loss=250.0))
+        self.assertTrue(book.try_open(500.0, max_positions=1, max_loss=500.0))
+        self.assertFalse(book.try_open(600.0, max_positions=5, max_exposure=1000.0))
+
+    def test_capital_shared_across_workers(self):
+        """Shards size from one portfolio: total exposure stays within starting capital plus realized P&L"""
+        context = multiprocessing.get_context("fork")
+        book = SharedRiskBook(4, context)
+        results = context.Array("i", 4)
+        workers = [context.Process(target=capital_worker, args=(i, book, 10000.0, 20, results)) for i in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        self.assertEqual(sum(results), 10)
+        self.assertLessEqual(book.snapshot()["exposure"], 10000.0)
+        book.release(1000.0, pnl=-2000.0)
+        self.assertEqual(book.capital(10000.0), 8000.0)
+        self.assertFalse(book.try_open(1000.0, max_positions=25, max_exposure=book.capital(10000.0)))
+
+class TestShardSupervisor(unittest.TestCase):
+
+    def run_supervisor(self, target, seconds):
+        supervisor = ShardSupervisor(UNIVERSE[:8], 2, target, heartbeat_timeout=0.3, startup_grace=0.3)
+        supervisor.start()
+        deadline = time.time() + seconds
+        while time.time() < deadline:
+            supervisor.check()
+            time.sleep(0.05)
+        snapshot = supervisor.risk_book.snapshot()
+        supervisor.stop()
+        return supervisor, snapshot
+
+    def test_healthy_workers_left_alone(self):
+        supervisor, snapshot = self.run_supervisor(heartbeating_worker, 0.5)
+        self.assertEqual(supervisor.restarts, 0)
+        self.assertEqual(snapshot["worker_ticks"], [4, 4])
+
+    def test_crashed_worker_restarted(self):
+        print("🧪 Testing crashed worker restart...")
+        supervisor, _ = self.run_supervisor(crashing_worker, 1.0)
+        # Backoff doubles after each crash: 0s, 1s
+        self.assertGreaterEqual(supervisor.restarts, 1)
+        self.assertGreaterEqual(supervisor.failures[0], 1)
+        self.assertEqual(supervisor.failures[1], 0)
+        print(f"✅ Worker 0 restarted {supervisor.restarts} times")
+
+    def test_hung_worker_restarted(self):
+        """A worker that stops heartbeating is killed and replaced"""
+        supervisor, _ = self.run_supervisor(hanging_worker, 1.0)
+        self.assertGreaterEqual(supervisor.restarts, 1)
+        self.assertEqual(supervisor.failures[1], 0)
+
+    def test_crashed_worker_reservations_released(self):
+        """A replacement worker starts with a fresh engine, so the dead one's reservations are dropped"""
+        print("🧪 Testing crashed worker reservations...")
+        supervisor = ShardSupervisor(UNIVERSE[:8], 2, reserving_worker, heartbeat_timeout=5.0, startup_grace=5.0)
+        supervisor.start()
+        try:
+            supervisor.processes[0].join(timeout=5)
+            while supervisor.risk_book.snapshot()["open_positions"] < 3 and supervisor.processes[1].is_alive():
+                time.sleep(0.01)
+            supervisor.check()
+            snapshot = supervisor.risk_book.snapshot()
+        finally:
+            supervisor.stop()
+
+        self.assertEqual(supervisor.failures[0], 1)
+        self.assertEqual((snapshot["open_positions"], snapshot["exposure"]), (1, 100.0))
+        print("✅ Worker 0's 2 positions released, worker 1's kept")
+
+    def test_hung_worker_lock_recovered(self):
+        """Killing a worker that holds the risk book lock does not block the other shards"""
+        LOCK_TAKEN.value = 0
+        with patch.object(shard_supervisor, "SHARD_LOCK_TIMEOUT", 0.2):
+            supervisor, _ = self.run_supervisor(lock_holding_worker, 1.0)
+            self.assertTrue(supervisor.risk_book.try_open(100.0, max_positions=5, worker_id=1))
+        self.assertGreaterEqual(supervisor.restarts, 1)
+
+class TestThroughputScaling(unittest.TestCase):
+
+    def test_sharded_indicator_throughput(self):
+        """Benchmark indicator maths over 300 symbols in one process against one process per core"""
+        print("🧪 Benchmarking sharded indicator throughput...")
+        context = multiprocessing.get_context("fork")
+        cores = min(os.cpu_count() or 1, 4)
+        rounds = 40
+
+        def timed(shards):
+            done = context.Queue()
+            start_time = time.perf_counter()
+            workers = [context.Process(target=indicator_worker, args=(shard, rounds, done)) for shard in shards]
+            for worker in workers:
+                worker.start()
+            evaluated = sum(done.get(timeout=60) for _ in workers)
+            for worker in workers:
+                worker.join()
+            return time.perf_counter() - start_time, evaluated
+
+        single_time, evaluated = timed([UNIVERSE])
+        sharded_time, sharded_evaluated = timed(partition_symbols(UNIVERSE, cores))
+        speedup = single_time / sharded_time
+
+        print(f"✅ {evaluated * rounds:,} symbol updates: 1 process {single_time:.2f}s vs {cores} shards "
+              f"{sharded_time:.2f}s ({speedup:.1f}x on {os.cpu_count()} cores)")
+        self.assertEqual(sharded_evaluated, evaluated)
+        if cores >= 4:
+            self.assertGreater(speedup, 2.5)
+
+
+def run_shard_supervisor_tests():
+    """Run shard supervisor test suite"""
+    print("🔥 RUNNING SHARD SUPERVISOR TESTS")
+    print("="*60)
+
+    suite = unittest.TestSuite()
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestPartitioning))
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestSharedRiskBook))
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestShardSupervisor))
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestThroughputScaling))
+    result = unittest.TextTestRunner(verbosity=2).run(suite)
+
+    success = len(result.failures) == 0 and len(result.errors) == 0
+    print("\n🎉 ALL SHARD SUPERVISOR TESTS PASSED!" if success else "\n❌ SOME SHARD SUPERVISOR TESTS FAILED")
+    return success
+
+
+if __name__ == "__main__":
+    success = run_shard_supervisor_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Test Strategy Runtime - Verify task isolation, executor offload, restarts, loop-lag metrics and shutdown
+"""
+import sys
+import time
+import asyncio
+import unittest
+from pathlib import Path
+
+# Add engines to path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "core" / "engines"))
+
+from strategy_runtime import StrategyRuntime
+
+async def run_for(runtime, seconds):
+    runtime.start()
+    await asyncio.sleep(seconds)
+    await runtime.stop(timeout=1.0)
+
+class TestStrategyRuntime(unittest.TestCase):
+
+    def test_blocking_strategy_does_not_stall_the_other(self):
+        print("🧪 Testing strategy isolation...")
+        runtime = StrategyRuntime()
+        fast_runs = []
+
+        async def fast():
+            fast_runs.append(time.monotonic())
+
+        runtime.add_task("slow", lambda: time.sleep(0.2), interval=0.0, blocking=True)
+        runtime.add_task("fast", fast, interval=0.01)
+        asyncio.run(run_for(runtime, 1.0))
+
+        metrics = runtime.get_metrics()
+        self.assertGreaterEqual(metrics["slow"]["runs"], 4)
+        self.assertGreater(len(fast_runs), 60)
+        self.assertLess(metrics["fast"]["max_lag_ms"], 50)
+        print(f"✅ {len(fast_runs)} fast runs beside {metrics['slow']['runs']} blocking ones, "
+              f"max lag {metrics['fast']['max_lag_ms']:.1f}ms")
+
+    def test_lag_exposes_a_blocked_loop(self):
+        runtime = StrategyRuntime()
+
+        async def hog():
+            time.sleep(0.15)  # not offloaded: holds the event loop
+
+        async def probe():
+            pass
+
+        runtime.add_task("hog", hog, interval=0.3)
+        runtime.add_task("probe", probe, interval=0.01)
+        asyncio.run(run_for(runtime, 0.5))
+
+        self.assertGreater(runtime.get_metrics()["probe"]["max_lag_ms"], 100)
+
+    def test_failed_task_restarts_with_backoff(self):
+        runtime = StrategyRuntime(max_backoff=0.05)
+        calls = []
+
+        async def flaky():
+            calls.append(time.monotonic())
+            if len(calls) <= 2:
+                raise ConnectionError("feed dropped")
+
+        runtime.add_task("flaky", flaky, interval=0.01)
+        asyncio.run(run_for(runtime, 0.3))
+
+        metrics = runtime.get_metrics()["flaky"]
+        self.assertEqual((metrics["failures"], metrics["restarts"]), (2, 2))
+        self.assertEqual(metrics["consecutive_failures"], 0)
+        self.assertGreater(metrics["runs"], 0)
+        self.assertIn("feed dropped", metrics["last_error"])
+        self.assertGreaterEqual(calls[1] - calls[0], 0.04)
+
+    def test_setup_runs_once_per_start(self):
+        runtime = StrategyRuntime(max_backoff=0.01)
+        setups = []
+
+        def setup():
+            setups.append(1)
+            if len(setups) == 1:
+                raise ImportError("feed module missing")
+
+        runtime.add_task("strategy", lambda: None, interval=0.01, blocking=True, setup=setup)
+        asyncio.run(run_for(runtime, 0.2))
+
+        self.assertEqual(len(setups), 2)
+        self.assertGreater(runtime.get_metrics()["strategy"]["runs"], 5)
+
+    def test_graceful_shutdown(self):
+        print("🧪 Testing graceful shutdown...")
+        runtime = StrategyRuntime()
+        stopped = asyncio.Event()
+        events = []
+
+        async def service():
+            await stopped.wait()
+            events.append("service returned")
+
+        async def stubborn():
+            await asyncio.sleep(3600)
+
+        async def scenario():
+            runtime.add_task("service", service, on_stop=stopped.set)
+            runtime.add_task("stubborn", stubborn)
+            runtime.start()
+            await asyncio.sleep(0.05)
+            start_time = time.monotonic()
+            await runtime.stop(timeout=0.2)
+            return time.monotonic() - start_time
+
+        elapsed = asyncio.run(scenario())
+        metrics = runtime.get_metrics()
+        self.assertEqual(events, ["service returned"])
+        self.assertFalse(metrics["service"]["running"])
+        self.assertFalse(metrics["stubborn"]["running"])
+        self.assertEqual(metrics["service"]["restarts"], 0)
+        self.assertLess(elapsed, 1.0)
+        print(f"✅ Stopped in {elapsed * 1000:.0f}ms, stubborn task cancelled")
+
+
+def run_strategy_runtime_tests():
+    """Run strategy runtime test suite"""
+    print("🔥 RUNNING STRATEGY RUNTIME TESTS")
+    print("="*60)
+
+    suite = unittest.TestSuite()
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestStrategyRuntime))
+    result = unittest.TextTestRunner(verbosity=2).run(suite)
+
+    success = len(result.failures) == 0 and len(result.errors) == 0
+    print("\n🎉 ALL STRATEGY RUNTIME TESTS PASSED!" if success else "\n❌ SOME STRATEGY RUNTIME TESTS FAILED")
+    return success
+
+
+if __name__ == "__main__":
+    success = run_strategy_runtime_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Test Swap Decoder - Verify router calldata decoding and throughput over the calldata fixture corpus
+"""
+import sys
+import json
+import time
+import unittest
+from pathlib import Path
+
+from eth_abi import decode
+
+# Add wallet mimic bot to path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "bots" / "wallet_mimic"))
+
+from swap_decoder import SWAP_SELECTORS, SwapCall, decode_swap, decode_swaps
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures" / "swap_calldata.json"
+
+def load_fixtures() -> list:
+    with open(FIXTURES) as f:
+        fixtures = json.load(f)
+    for fixture in fixtures:
+        fixture["calldata"] = bytes.fromhex(fixture["input"][2:])
+    return fixtures
+
+def as_dict(swap: SwapCall) -> dict:
+    return {
+        "protocol": swap.protocol, "method": swap.method,
+        "token_in": swap.token_in, "token_out": swap.token_out,
+        "amount_in": swap.amount_in, "amount_out": swap.amount_out,
+        "exact_input": swap.exact_input, "path": list(swap.path),
+        "recipient": swap.recipient, "fees": list(swap.fees)
+    }
+
+class TestSwapDecoder(unittest.TestCase):
+
+    def setUp(self):
+        """Load the router calldata corpus"""
+        self.fixtures = load_fixtures()
+
+    def test_fixture_corpus(self):
+        """Every fixture decodes to its expected swaps"""
+        print("🧪 Testing swap calldata corpus...")
+
+        for fixture in self.fixtures:
+            with self.subTest(fixture["name"]):
+                swaps = decode_swaps(fixture["calldata"], fixture["value"])
+                self.assertEqual([as_dict(swap) for swap in swaps], fixture["expected"])
+
+        print(f"✅ {len(self.fixtures)} fixtures decoded")
+
+    def test_matches_eth_abi(self):
+        """V2 decodes agree with the generic eth_abi decoder"""
+        for fixture in self.fixtures:
+            if fixture["input"][2:10] != "38ed1739":
+                continue
+            amount_in, amount_out_min, path, to, _ = decode(
+                ["uint256", "uint256", "address[]", "address", "uint256"], fixture["calldata"][4:])
+            swap = decode_swap(fixture["calldata"])
+            self.assertEqual(swap.amount_in, amount_in)
+            self.assertEqual(swap.amount_out, amount_out_min)
+            self.assertEqual(swap.path, tuple(address.lower() for address in path))
+            self.assertEqual(swap.recipient, to.lower())
+
+    def test_buy_detection(self):
+        """Only ETH / WETH -> token swaps count as buys"""
+        buys = {fixture["name"] for fixture in self.fixtures
+                if (swap := decode_swap(fixture["calldata"], fixture["value"])) and swap.is_buy}
+
+        self.assertIn("v2 swapExactETHForTokens", buys)
+        self.assertIn("v3 exactOutput", buys)
+        self.assertIn("universal router WRAP_ETH + V2_SWAP_EXACT_IN", buys)
+        self.assertNotIn("v2 swapExactTokensForETH", buys)
+
+    def test_rejects_non_swaps(self):
+        """Unknown selectors and malformed calldata decode to nothing"""
+        self.assertIsNone(decode_swap(b""))
+        self.assertIsNone(decode_swap(bytes.fromhex("a9059cbb") + b"\x00" * 64))
+        self.assertIsNone(decode_swap(bytes.fromhex("7ff36ab5") + b"\xff" * 128))
+        self.assertIn(bytes.fromhex("414bf389"), SWAP_SELECTORS)
+
+    def test_decode_throughput(self):
+        """Benchmark the selector registry against hex-slicing plus eth_abi on the same corpus"""
+        print("🧪 Benchmarking swap decoding...")
+        v2_fixtures = [f for f in self.fixtures if f["input"][2:10] in ("7ff36ab5", "38ed1739") and f["expected"]]
+        corpus = [(f["calldata"], f["value"]) for f in self.fixtures] * 500
+        v2_corpus = [f["input"] for f in v2_fixtures] * 500
+
+        start_time = time.perf_counter()
+        for calldata, value in corpus:
+            decode_swaps(calldata, value)
+        registry_rate = len(corpus) / (time.perf_counter() - start_time)
+
+        start_time = time.perf_counter()
+        for calldata, value in [(f["calldata"], f["value"]) for f in v2_fixtures] * 500:
+            decode_swap(calldata, value)
+        registry_v2_rate = len(v2_corpus) / (time.perf_counter() - start_time)
+
+        # Previous path: hex string slicing and a generic decode per call
+        start_time = time.perf_counter()
+        for calldata in v2_corpus:
+            if calldata[:10] == "0x7ff36ab5":
+                decode(["uint256", "address[]", "address", "uint256"], bytes.fromhex(calldata[10:]))
+            else:
+                decode(["uint256", "uint256", "address[]", "address", "uint256"], bytes.fromhex(calldata[10:]))
+        eth_abi_rate = len(v2_corpus) / (time.perf_counter() - start_time)
+
+        print(f"✅ Registry: {registry_rate:,.0f} calls/s (all routers) | "
+              f"V2: {registry_v2_rate:,.0f} vs eth_abi {eth_abi_rate:,.0f} calls/s")
+        self.assertGreater(registry_v2_rate, eth_abi_rate)
+        self.assertGreater(registry_rate, 20000)
+
+
+def run_swap_decoder_tests():
+    """Run swap decoder test suite"""
+    print("🔥 RUNNING SWAP DECODER TESTS")
+    print("="*60)
+
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestSwapDecoder)
+    result = unittest.TextTestRunner(verbosity=2).run(suite)
+
+    success = len(result.failures) == 0 and len(result.errors) == 0
+    print("\n🎉 ALL SWAP DECODER TESTS PASSED!" if success else "\n❌ SOME SWAP DECODER TESTS FAILED")
+    return success
+
+
+if __name__ == "__main__":
+    success = run_swap_decoder_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Test Token Validation - Verify verdict TTLs, single-flight validation and the bytecode-keyed source cache
+"""
+import sys
+import time
+import asyncio
+import unittest
+from pathlib import Path
+
+# Add wallet mimic bot to path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "bots" / "wallet_mimic"))
+
+from token_validation import ContractSourceCache, TokenValidationCache
+
+TOKEN = "0x6982508145454Ce325dDbE47a25d4ec3d2311933"
+CLONE = "0x1111111111111111111111111111111111111111"
+
+class FakeRPC:
+    """get_code only; the clone shares the token's bytecode"""
+
+    def __init__(self):
+        self.code = {TOKEN.lower(): "0x6080604052", CLONE.lower(): "0x6080604052"}
+        self.calls = 0
+
+    async def get_code(self, address: str) -> str:
+        self.calls += 1
+        return self.code.get(address.lower(), "0x")
+
+class TestTokenValidationCache(unittest.TestCase):
+
+    def test_single_flight(self):
+        """Concurrent validations of one token run the validator once"""
+        print("🧪 Testing single-flight validation...")
+        calls = []
+
+        async def validator(token):
+            calls.append(token)
+            await asyncio.sleep(0.05)
+            return True
+
+        async def scenario():
+            cache = TokenValidationCache()
+            results = await asyncio.gather(*(cache.validate(TOKEN, validator) for _ in range(20)))
+            return cache, results
+
+        cache, results = asyncio.run(scenario())
+
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(results))
+        self.assertEqual(cache.stats["coalesced"], 19)
+        print("✅ 20 concurrent requests, 1 validation")
+
+    def test_separate_ttls(self):
+        """Rejections expire before passes"""
+        calls = []
+
+        async def validator(token):
+            calls.append(token)
+            return token == TOKEN
+
+        async def scenario():
+            cache = TokenValidationCache(positive_ttl=10.0, negative_ttl=0.05)
+            await cache.validate(TOKEN, validator)
+            await cache.validate(CLONE, validator)
+            await asyncio.sleep(0.1)
+            await cache.validate(TOKEN, validator)
+            await cache.validate(CLONE, validator)
+            return cache
+
+        cache = asyncio.run(scenario())
+
+        self.assertEqual(calls, [TOKEN, CLONE, CLONE])
+        self.assertTrue(cache.get_cached(TOKEN.upper().replace("0X", "0x")))
+
+    def test_errors_not_cached(self):
+        """A failed validation is retried by the next caller"""
+        attempts = []
+
+        async def validator(token):
+            attempts.append(token)
+            if len(attempts) == 1:
+                raise ConnectionError("etherscan down")
+            return True
+
+        async def scenario():
+            cache = TokenValidationCache()
+            with self.assertRaises(ConnectionError):
+                await cache.validate(TOKEN, validator)
+            return await cache.validate(TOKEN, validator), cache
+
+        verdict, cache = asyncio.run(scenario())
+
+        self.assertTrue(verdict)
+        self.assertEqual(cache.stats["errors"], 1)
+        self.assertEqual(cache.inflight, {})
+
+    def test_cancelled_caller_does_not_cancel_validation(self):
+        async def validator(token):
+            await asyncio.sleep(0.05)
+            return True
+
+        async def scenario():
+            cache = TokenValidationCache()
+            first = asyncio.create_task(cache.validate(TOKEN, validator))
+            second = asyncio.create_task(cache.validate(TOKEN, validator))
+            await asyncio.sleep(0.01)
+            first.cancel()
+            return await second
+
+        self.assertTrue(asyncio.run(scenario()))
+
+class TestContractSourceCache(unittest.TestCase):
+
+    def test_source_cached_by_bytecode(self):
+        """Verified source is fetched once per bytecode, shared by clones"""
+        print("🧪 Testing bytecode-keyed source cache...")
+        fetches = []
+
+        async def fetch_source(token):
+            fetches.append(token)
+            return "contract Pepe { function transfer() {} }"
+
+        async def scenario():
+            rpc = FakeRPC()
+            cache = ContractSourceCache(rpc, fetch_source, lambda source: bool(source) and "mint(" not in source)
+            results = [await cache.check(TOKEN), await cache.check(CLONE), await cache.check(TOKEN)]
+            return results, rpc, cache
+
+        results, rpc, cache = asyncio.run(scenario())
+
+        self.assertEqual(results, [True, True, True])
+        self.assertEqual(fetches, [TOKEN])
+        self.assertEqual(rpc.calls, 2)
+        self.assertEqual(cache.stats["hits"], 2)
+        print("✅ 3 checks, 1 Etherscan fetch")
+
+    def test_unverified_source_retried(self):
+        """Unverified or failed lookups are not cached"""
+        sources = [None, "", "contract Verified {}"]
+
+        async def fetch_source(token):
+            return sources.pop(0)
+
+        async def scenario():
+            cache = ContractSourceCache(FakeRPC(), fetch_source, bool)
+            return [await cache.check(TOKEN) for _ in range(4)]
+
+        self.assertEqual(asyncio.run(scenario()), [False, False, True, True])
+        self.assertEqual(sources, [])
+
+    def test_validation_latency(self):
+        """Benchmark repeated mimic signals for one token with and without the cache"""
+        print("🧪 Benchmarking cached validation...")
+
+        async def slow_validator(token):
+            await asyncio.sleep(0.02)  # stand-in for Etherscan + OKX round trips
+            return True
+
+        async def scenario():
+            start_time = time.perf_counter()
+            for _ in range(10):
+                await slow_validator(TOKEN)
+            uncached = time.perf_counter() - start_time
+
+            cache = TokenValidationCache()
+            start_time = time.perf_counter()
+            await asyncio.gather(*(cache.validate(TOKEN, slow_validator) for _ in range(5)))
+            for _ in range(5):
+                await cache.validate(TOKEN, slow_validator)
+            cached = time.perf_counter() - start_time
+            return uncached, cached
+
+        uncached, cached = asyncio.run(scenario())
+
+        print(f"✅ 10 signals: {uncached * 1000:.0f}ms uncached vs {cached * 1000:.0f}ms cached")
+        self.assertLess(cached, uncached / 3)
+
+
+def run_token_validation_tests():
+    """Run token validation test suite"""
+    print("🔥 RUNNING TOKEN VALIDATION TESTS")
+    print("="*60)
+
+    suite = unittest.TestSuite()
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestTokenValidationCache))
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestContractSourceCache))
+    result = unittest.TextTestRunner(verbosity=2).run(suite)
+
+    success = len(result.failures) == 0 and len(result.errors) == 0
+    print("\n🎉 ALL TOKEN VALIDATION TESTS PASSED!" if success else "\n❌ SOME TOKEN VALIDATION TESTS FAILED")
+    return success
+
+
+if __name__ == "__main__":
+    success = run_token_validation_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Test Trade Store - Verify columnar segments, group-by queries and engine writes
+"""
+import sys
+import time
+import random
+import tempfile
+import unittest
+from pathlib import Path
+from collections import defaultdict
+
+import numpy as np
+
+# Add config, engines and managers to path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "config"))
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "core" / "engines"))
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "core" / "managers"))
+
+import trade_store
+from trade_store import TradeStore
+from paper_trading_engine import PaperTradingEngine
+from risk_gate import RiskLimits
+
+ASSETS = ["BTC", "ETH", "SOL", "DOGE"]
+REASONS = ["take_profit_1", "stop_loss", "trailing_stop"]
+
+def write_fills(store, count, seed=3):
+    """Random entry/exit pairs; returns the rows for a reference group-by"""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        asset = rng.choice(ASSETS)
+        timestamp = 1700000000.0 + i * 37.0
+        fee = rng.uniform(0.01, 0.1)
+        pnl = rng.gauss(0.5, 5.0)
+        reason = rng.choice(REASONS)
+        store.record("entry", asset, 100.0, 1.0, fee, -fee, source="paper", reason="entry", timestamp=timestamp)
+        store.record("exit", asset, 101.0, 1.0, fee, pnl, source="paper", reason=reason, timestamp=timestamp + 5)
+        rows.append((asset, "entry", timestamp, -fee))
+        rows.append((asset, reason, timestamp + 5, pnl))
+    return rows
+
+class TestTradeStore(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_group_by_matches_reference(self):
+        print("🧪 Testing P&L group-bys...")
+        store = TradeStore(self.temp_dir.name, segment_rows=150, use_arrow=False)
+        rows = write_fills(store, 500)
+
+        by_asset = defaultdict(float)
+        by_hour = defaultdict(float)
+        for asset, reason, timestamp, pnl in rows:
+            by_asset[asset] += pnl
+            by_hour[int(timestamp // 3600 % 24)] += pnl
+
+        groups = store.pnl_by("asset")
+        self.assertEqual(set(groups), set(ASSETS))
+        for asset, pnl in by_asset.items():
+            self.assertAlmostEqual(groups[asset]["pnl"], pnl, places=6)
+        for hour, row in store.pnl_by("hour").items():
+            self.assertAlmostEqual(row["pnl"], by_hour[hour], places=6)
+
+        reasons = store.pnl_by("reason", asset="BTC")
+        self.assertEqual(reasons["entry"]["trades"], 0)
+        self.assertEqual(sum(r["trades"] for r in reasons.values()), sum(1 for r in rows if r[0] == "BTC") // 2)
+        print(f"✅ {len(store):,} fills across {len(list(Path(self.temp_dir.name).glob('segment_*')))} segments")
+
+    def test_segments_survive_reopen(self):
+        store = TradeStore(self.temp_dir.name, segment_rows=64, use_arrow=False)
+        write_fills(store, 100)
+        before = store.pnl_by("asset")
+        store.flush()
+
+        reopened = TradeStore(self.temp_dir.name)
+        self.assertEqual(len(reopened), 200)
+        for asset, row in reopened.pnl_by("asset").items():
+            self.assertAlmostEqual(row["pnl"], before[asset]["pnl"], places=6)
+            self.assertEqual(row["trades"], before[asset]["trades"])
+
+    @unittest.skipIf(trade_store.pa is None, "pyarrow not installed")
+    def test_arrow_segments(self):
+        store = TradeStore(self.temp_dir.name, segment_rows=64, use_arrow=True)
+        write_fills(store, 100)
+        store.flush()
+
+        self.assertTrue(list(Path(self.temp_dir.name).glob("segment_*.arrow")))
+        self.assertEqual(TradeStore(self.temp_dir.name).summary()["trades"], 100)
+
+    def test_filters(self):
+        store = TradeStore(self.temp_dir.name)
+        store.record("exit", "BTC", 1.0, 1.0, pnl=5.0, source="paper", timestamp=100.0)
+        store.record("exit", "BTC", 1.0, 1.0, pnl=-2.0, source="exit_manager", timestamp=200.0)
+
+        self.assertEqual(store.summary(source="paper")["pnl"], 5.0)
+        self.assertEqual(store.summary(since=150.0)["pnl"], -2.0)
+        self.assertEqual(store.summary(until=150.0)["wins"], 1)
+        self.assertRaises(ValueError, store.pnl_by, "price")
+        self.assertRaises(ValueError, store.select, pnl=5.0)
+
+    def test_quote_currencies_kept_apart(self):
+        """USD paper fills and ETH mimic fills group separately; old segments read as unknown currency"""
+        store = TradeStore(self.temp_dir.name, use_arrow=False)
+        store.record("exit", "BTC", 1.0, 1.0, pnl=50.0, source="paper", timestamp=100.0)
+        store.record("exit", "0xtoken", 1e-6, 1000.0, pnl=0.02, source="exit_manager", quote_ccy="ETH",
+                     timestamp=200.0)
+        store.flush()
+
+        self.assertEqual(store.summary(quote_ccy="USD")["pnl"], 50.0)
+        self.assertEqual(store.summary(quote_ccy="ETH")["pnl"], 0.02)
+        self.assertEqual(set(store.pnl_by("quote_ccy")), {"USD", "ETH"})
+
+        legacy = {column: values for column, values in store.columns().items() if column != "quote_ccy"}
+        with open(Path(self.temp_dir.name) / "segment_0_legacy.npz", "wb") as f:
+            np.savez(f, **legacy)
+        self.assertEqual(TradeStore(self.temp_dir.name).summary(quote_ccy="")["fills"], 2)
+
+    def test_paper_engine_writes_fills(self):
+        store = TradeStore(self.temp_dir.name)
+        engine = PaperTradingEngine(limits=RiskLimits(), store=store)
+        signal = {"confidence": 0.9, "signal_data": {"asset": "BTC", "entry_price": 100.0, "stop_loss": 102.0,
+                                                      "take_profit_1": 98.5, "signal_type": "SHORT",
+                                                      "reason": "breakdown"}}
+        engine.open_position(signal)
+        engine.update_positions({"BTC": 98.0})
+        engine.update_positions({"BTC": 103.0})
+
+        summary = store.summary(source="paper")
+        self.assertAlmostEqual(summary["pnl"], engine.balance - engine.initial_balance, places=9)
+        self.assertAlmostEqual(summary["fees"], engine.total_commission, places=9)
+        self.assertEqual(summary["trades"], len(engine.trade_history))
+        self.assertEqual(set(store.pnl_by("reason")), {"entry", "take_profit_1", "breakeven_stop"})
+        self.assertEqual(list(store.pnl_by("signal")), ["breakdown"])
+
+    def test_query_throughput(self):
+        """Benchmark a group-by over a million fills"""
+        print("🧪 Benchmarking trade store queries...")
+        store = TradeStore(self.temp_dir.name, use_arrow=False)
+        rows = 1000000
+        rng = random.Random(5)
+        assets = [f"A{i}" for i in range(200)]
+        tail = store.tail
+        tail["timestamp"].extend(1700000000.0 + i for i in range(rows))
+        for column in ("price", "quantity", "fee"):
+            tail[column].extend([1.0] * rows)
+        tail["pnl"].extend(rng.gauss(0, 1) for _ in range(rows))
+        tail["asset"].extend(assets[i % 200] for i in range(rows))
+        tail["kind"].extend(["exit"] * rows)
+        for column in ("source", "strategy", "side", "reason", "signal", "position_id", "quote_ccy"):
+            tail[column].extend([""] * rows)
+        store.tail_rows = rows
+        store.flush()
+
+        start_time = time.perf_counter()
+        groups = store.pnl_by("asset")
+        store.pnl_by("hour")
+        elapsed = time.perf_counter() - start_time
+
+        print(f"✅ Two group-bys over {rows:,} fills in {elapsed:.2f}s")
+        self.assertEqual(len(groups), 200)
+        self.assertLess(elapsed, 5.0)
+
+
+def run_trade_store_tests():
+    """Run trade store test suite"""
+    print("🔥 RUNNING TRADE STORE TESTS")
+    print("="*60)
+
+    suite = unittest.TestSuite()
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestTradeStore))
+    result = unittest.TextTestRunner(verbosity=2).run(suite)
+
+    success = len(result.failures) == 0 and len(result.errors) == 0
+    print("\n🎉 ALL TRADE STORE TESTS PASSED!" if success else "\n❌ SOME TRADE STORE TESTS FAILED")
+    return success
+
+
+if __name__ == "__main__":
+    success = run_trade_store_tests()
+    sys.exit(0 if success else 1)
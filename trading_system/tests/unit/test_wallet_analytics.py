@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Test Wallet Analytics - Verify trade extraction, incremental metrics, the columnar store and re-ranking
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add wallet mimic bot to path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "bots" / "wallet_mimic"))
+
+from wallet_analytics import WalletAnalytics, WalletStats, WalletTrade, WalletTradeStore, extract_trades, WETH_ADDRESS
+
+WALLET = "0x8ba1f109551bd432803012645ac136c22c85b000"
+TOKEN = "0x6982508145454ce325ddbe47a25d4ec3d2311933"
+ROUTER = "0x7a250d5630b4cf539739df2c5dacb4c659f2488d"
+DAY = 86400
+
+def make_history(wallet: str, round_trips: int, win_rate: float, start: int = 1_700_000_000, seed: int = 0):
+    """Etherscan txlist / txlistinternal / tokentx rows for buy-then-sell round trips"""
+    rng = random.Random(seed)
+    txs, internal_txs, token_transfers = [], [], []
+    block = 18_000_000
+    for i in range(round_trips):
+        token = "0x" + rng.randbytes(20).hex()
+        multiplier = rng.uniform(1.5, 4.0) if rng.random() < win_rate else rng.uniform(0.2, 0.9)
+        for side in (1, -1):
+            block += 10
+            tx_hash = f"0x{wallet[2:10]}{i:04d}{side + 1}"
+            timestamp = start + (block - 18_000_000) * 12
+            eth = 10 ** 18 if side > 0 else int(10 ** 18 * multiplier)
+            txs.append({"hash": tx_hash, "from": wallet, "to": ROUTER, "value": str(eth if side > 0 else 0),
+                        "isError": "0", "timeStamp": str(timestamp), "blockNumber": str(block)})
+            if side < 0:
+                internal_txs.append({"hash": tx_hash, "from": ROUTER, "to": wallet, "value": str(eth),
+                                     "isError": "0", "blockNumber": str(block)})
+            token_transfers.append({"hash": tx_hash, "contractAddress": token, "tokenDecimal": "9",
+                                    "value": str(5 * 10 ** 15), "blockNumber": str(block),
+                                    "from": ROUTER if side > 0 else wallet, "to": wallet if side > 0 else ROUTER})
+    return txs, internal_txs, token_transfers
+
+class FakeEtherscanAnalytics(WalletAnalytics):
+    """Serves generated histories with a fixed per-request latency instead of calling Etherscan"""
+
+    def __init__(self, histories, latency=0.0, **kwargs):
+        super().__init__(api_key="test", **kwargs)
+        self.histories = histories
+        self.latency = latency
+
+    async def _etherscan(self, action, address, start_block):
+        await self.pacer.wait()
+        self.counters["requests"] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        index = {"txlist": 0, "txlistinternal": 1, "tokentx": 2}[action]
+        rows = self.histories.get(address, ([], [], []))[index]
+        return [row for row in rows if int(row["blockNumber"]) >= start_block]
+
+class TestTradeExtraction(unittest.TestCase):
+
+    def test_buy_and_sell_from_flows(self):
+        """ETH out + token in is a buy; token out + ETH (or WETH) in is a sell"""
+        print("🧪 Testing trade extraction...")
+        txs, internal_txs, token_transfers = make_history(WALLET, 1, 1.0)
+        # Airdrop to the wallet, not sent by it: ignored
+        token_transfers.append({"hash": "0xairdrop", "contractAddress": TOKEN, "value": "1", "from": ROUTER,
+                                "to": WALLET, "blockNumber": "1"})
+
+        trades = extract_trades(WALLET, txs, internal_txs, token_transfers)
+
+        self.assertEqual([t.side for t in trades], [1, -1])
+        self.assertAlmostEqual(trades[0].eth_amount, 1.0)
+        self.assertAlmostEqual(trades[0].token_amount, 5e6)
+        self.assertGreater(trades[1].eth_amount, 1.0)
+        print("✅ Round trip recovered")
+
+    def test_weth_and_multi_token_transactions(self):
+        tx = {"hash": "0x1", "from": WALLET, "value": "0", "isError": "0", "timeStamp": "1", "blockNumber": "5"}
+        weth_sell = [
+            {"hash": "0x1", "contractAddress": TOKEN, "value": "100", "tokenDecimal": "0", "from": WALLET, "to": ROUTER},
+            {"hash": "0x1", "contractAddress": WETH_ADDRESS, "value": str(2 * 10 ** 18), "tokenDecimal": "18", "from": ROUTER, "to": WALLET}
+        ]
+        trades = extract_trades(WALLET, [tx], [], weth_sell)
+        self.assertEqual(trades, [WalletTrade(1, 5, TOKEN, -1, 2.0, 100.0)])
+
+        # Two tokens moved: liquidity add or multi-hop to a non-ETH asset, not a trade
+        lp_add = weth_sell + [{"hash": "0x1", "contractAddress": "0x" + "22" * 20, "value": "1", "tokenDecimal": "0",
+                               "from": WALLET, "to": ROUTER}]
+        self.assertEqual(extract_trades(WALLET, [tx], [], lp_add), [])
+
+class TestWalletStats(unittest.TestCase):
+
+    def test_round_trip_metrics(self):
+        stats = WalletStats(WALLET, window=30 * DAY)
+        stats.apply(0, TOKEN, 1, 1.0, 1000.0)
+        stats.apply(100, TOKEN, -1, 1.5, 500.0)   # half out at 3x
+        stats.apply(300, TOKEN, -1, 0.25, 500.0)  # rest at 0.5x
+
+        self.assertEqual(stats.round_trip_count, 2)
+        self.assertAlmostEqual(stats.avg_multiplier, 1.75)
+        self.assertAlmostEqual(stats.success_rate, 0.5)
+        self.assertEqual(stats.avg_hold_time, 200)
+        self.assertNotIn(TOKEN, stats.positions)
+
+        # Sells of tokens bought before the ingested history have no cost basis
+        stats.apply(400, "0x" + "11" * 20, -1, 1.0, 10.0)
+        self.assertEqual(stats.round_trip_count, 2)
+
+    def test_rolling_window(self):
+        """Old round trips leave the window without recomputing from history"""
+        stats = WalletStats(WALLET, window=10 * DAY)
+        for day in range(20):
+            token = f"0x{day:040x}"
+            stats.apply(day * DAY, token, 1, 1.0, 1.0)
+            stats.apply(day * DAY + 60, token, -1, 2.0 if day >= 10 else 0.5, 1.0)
+
+        stats.expire(20 * DAY)
+
+        self.assertEqual(stats.round_trip_count, 10)
+        self.assertAlmostEqual(stats.success_rate, 1.0)
+        self.assertAlmostEqual(stats.avg_multiplier, 2.0)
+        self.assertAlmostEqual(stats.trades_per_day(20 * DAY), 2.0)
+
+class TestWalletAnalytics(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.store_path = os.path.join(self.tmpdir.name, "wallet_trades.npz")
+        self.alpha_path = os.path.join(self.tmpdir.name, "alpha_wallets.json")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def make_analytics(self, histories, **kwargs):
+        return FakeEtherscanAnalytics(histories, store_path=self.store_path, alpha_wallets_path=self.alpha_path,
+                                      rate=0, window_days=10000, **kwargs)
+
+    def test_rerank_publishes_followed_set(self):
+        """Winning wallets are ranked, written out and pushed to listeners"""
+        print("🧪 Testing wallet re-ranking...")
+        wallets = {f"0x{i:040x}": (20, 0.9 if i < 3 else 0.3) for i in range(10)}
+        histories = {w: make_history(w, n, rate, seed=i) for i, (w, (n, rate)) in enumerate(wallets.items())}
+        analytics = self.make_analytics(histories, top_n=2)
+        analytics.add_candidates(wallets)
+        followed = []
+        analytics.on_rerank(lambda ranked: followed.append({w["address"] for w in ranked}))
+
+        asyncio.run(analytics.refresh())
+        ranked = analytics.rank(now=1_800_000_000)
+        analytics.publish(ranked)
+
+        self.assertEqual(len(ranked), 2)
+        self.assertTrue(all(int(w["address"], 16) < 3 for w in ranked))
+        self.assertGreaterEqual(ranked[0]["score"], ranked[1]["score"])
+        self.assertEqual(followed, [set(analytics.followed)])
+        with open(self.alpha_path) as f:
+            self.assertEqual(json.load(f)["wallets"], ranked)
+        print(f"✅ Following {len(ranked)} of {len(wallets)} wallets")
+
+    def test_incremental_refresh(self):
+        """A second refresh only fetches blocks after each wallet's cursor"""
+        full = make_history(WALLET, 10, 1.0)
+        first_half = tuple(rows[:len(rows) // 2] for rows in full)
+        histories = {WALLET: first_half}
+        analytics = self.make_analytics(histories)
+        analytics.add_candidates([WALLET])
+
+        asyncio.run(analytics.refresh())
+        trades_after_first = len(analytics.store)
+        histories[WALLET] = full
+        asyncio.run(analytics.refresh())
+
+        self.assertEqual(trades_after_first, 10)
+        self.assertEqual(len(analytics.store), 20)
+        self.assertEqual(analytics.stats[WALLET].round_trip_count, 10)
+
+    def test_store_round_trip(self):
+        """Metrics rebuilt from the saved store match the incrementally maintained ones"""
+        histories = {f"0x{i:040x}": make_history(f"0x{i:040x}", 15, 0.7, seed=i) for i in range(5)}
+        analytics = self.make_analytics(histories)
+        analytics.add_candidates(histories)
+        asyncio.run(analytics.refresh())
+        analytics.store.save(self.store_path)
+
+        reloaded = self.make_analytics({})
+
+        self.assertEqual(len(reloaded.store), len(analytics.store))
+        self.assertEqual(reloaded.store.cursors, analytics.store.cursors)
+        self.assertEqual(reloaded.rank(now=1_800_000_000), analytics.rank(now=1_800_000_000))
+        self.assertEqual(reloaded.candidates, set(histories))
+
+    def test_concurrent_ingestion(self):
+        """Benchmark ingesting many wallets through the worker pool against one at a time"""
+        print("🧪 Benchmarking concurrent wallet ingestion...")
+        histories = {f"0x{i:040x}": make_history(f"0x{i:040x}", 5, 0.6, seed=i) for i in range(300)}
+        latency = 0.005
+
+        async def sequential():
+            analytics = self.make_analytics(histories, latency=latency, workers=1)
+            start_time = time.perf_counter()
+            await analytics.refresh(list(histories)[:30])
+            return (time.perf_counter() - start_time) * 10
+
+        async def concurrent():
+            analytics = self.make_analytics(histories, latency=latency, workers=50)
+            analytics.add_candidates(histories)
+            start_time = time.perf_counter()
+            await analytics.refresh()
+            return time.perf_counter() - start_time, analytics
+
+        sequential_time = asyncio.run(sequential())
+        concurrent_time, analytics = asyncio.run(concurrent())
+
+        start_time = time.perf_counter()
+        analytics.rank(now=1_800_000_000)
+        rank_time = time.perf_counter() - start_time
+
+        print(f"✅ 300 wallets: ~{sequential_time:.2f}s sequential vs {concurrent_time:.2f}s concurrent | "
+              f"{len(analytics.store):,} trades | re-rank {rank_time * 1000:.1f}ms")
+        self.assertEqual(analytics.counters["wallets_refreshed"], 300)
+        self.assertLess(concurrent_time, sequential_time / 5)
+
+
+def run_wallet_analytics_tests():
+    """Run wallet analytics test suite"""
+    print("🔥 RUNNING WALLET ANALYTICS TESTS")
+    print("="*60)
+
+    suite = unittest.TestSuite()
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestTradeExtraction))
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestWalletStats))
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestWalletAnalytics))
+    result = unittest.TextTestRunner(verbosity=2).run(suite)
+
+    success = len(result.failures) == 0 and len(result.errors) == 0
+    print("\n🎉 ALL WALLET ANALYTICS TESTS PASSED!" if success else "\n❌ SOME WALLET ANALYTICS TESTS FAILED")
+    return success
+
+
+if __name__ == "__main__":
+    success = run_wallet_analytics_tests()
+    sys.exit(0 if success else 1)
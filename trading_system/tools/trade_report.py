@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Trade Report - P&L from the columnar trade store, grouped by asset, strategy, hour or signal reason
+"""
+import sys
+import time
+from pathlib import Path
+
+# Add managers to path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "core" / "managers"))
+
+from trade_store import TradeStore, TRADE_STORE_PATH, GROUP_KEYS, TEXT_COLUMNS
+
+
+def format_amount(amount: float, currency: str) -> str:
+    if currency == "USD":
+        return f"${amount:,.2f}"
+    return f"{amount:,.6f} {currency or '?'}"
+
+
+def main():
+    """Print P&L per group for the stored fills"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Trade store P&L report')
+    parser.add_argument('--path', default=TRADE_STORE_PATH, help='Trade store directory')
+    parser.add_argument('--by', default='asset', choices=GROUP_KEYS, help='Group key')
+    parser.add_argument('--hours', type=float, default=0, help='Only the last N hours')
+    for column in TEXT_COLUMNS:
+        parser.add_argument(f'--{column.replace("_", "-")}', dest=column, help=f'Only rows with this {column}')
+
+    args = parser.parse_args()
+    filters = {column: getattr(args, column) for column in TEXT_COLUMNS if getattr(args, column)}
+    since = time.time() - args.hours * 3600 if args.hours else None
+
+    store = TradeStore(args.path)
+    start_time = time.perf_counter()
+    # P&L never adds across quote currencies: one table per currency (empty = written before the column existed)
+    currencies = [filters["quote_ccy"]] if "quote_ccy" in filters else \
+        sorted(set(store.select(since=since, **filters)["quote_ccy"].tolist()))
+    reports = []
+    for currency in currencies:
+        currency_filters = {**filters, "quote_ccy": currency}
+        reports.append((currency, store.pnl_by(args.by, since=since, **currency_filters),
+                        store.summary(since=since, **currency_filters)))
+    elapsed = time.perf_counter() - start_time
+
+    for currency, groups, summary in reports:
+        label = currency or "unknown"
+        print(f"📊 P&L BY {args.by.upper()} IN {label} ({summary['fills']:,} fills, {elapsed:.2f}s)")
+        print("="*60)
+        for group, row in sorted(groups.items(), key=lambda item: item[1]["pnl"]):
+            print(f"   {str(group):<24} {format_amount(row['pnl'], currency):>14}  {row['trades']:>7,} trades  "
+                  f"{row['win_rate']:>6.1%} won  {format_amount(row['fees'], currency)} fees")
+        print("="*60)
+        print(f"   {'TOTAL':<24} {format_amount(summary['pnl'], currency):>14}  {summary['trades']:>7,} trades  "
+              f"{summary['win_rate']:>6.1%} won  {format_amount(summary['fees'], currency)} fees")
+        print()
+
+
+if __name__ == "__main__":
+    main()
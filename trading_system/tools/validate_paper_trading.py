@@ -32,9 +32,7 @@ class PaperTradingValidator:
         self.paper_engine = get_paper_engine()
         
         # Reset paper trading state
-        self.paper_engine.positions.clear()
-        self.paper_engine.trade_history.clear()
-        self.paper_engine.balance = config.PAPER_INITIAL_BALANCE
+        self.paper_engine.reset()
         
         print("🔥 PAPER TRADING VALIDATION SYSTEM")
         print("="*60)
@@ -144,7 +142,7 @@ class PaperTradingValidator:
         try:
             # Get current live prices
             live_prices = {}
-            for asset in self.paper_engine.positions.keys():
+            for asset in self.paper_engine.positions_by_asset.keys():
                 price_data = self.market_engine.get_live_price(asset)
                 if price_data and price_data.get('price', 0) > 0:
                     live_prices[asset] = price_data['price']
@@ -153,8 +151,8 @@ class PaperTradingValidator:
                 print(f"   Updating positions with live prices...")
                 
                 # Show before
-                for asset, position in self.paper_engine.positions.items():
-                    print(f"   {asset}: Entry ${position.entry_price:,.2f} -> Current ${position.current_price:,.2f}")
+                for position in self.paper_engine.positions.values():
+                    print(f"   {position.id}: Entry ${position.entry_price:,.2f} -> Current ${position.current_price:,.2f}")
                     print(f"         P&L: ${position.unrealized_pnl:+.2f}")
                 
                 # Update with live prices
@@ -162,10 +160,10 @@ class PaperTradingValidator:
                 
                 # Show after
                 print(f"   After live price update:")
-                for asset, position in self.paper_engine.positions.items():
-                    if asset in live_prices:
-                        current_price = live_prices[asset]
-                        print(f"   {asset}: Entry ${position.entry_price:,.2f} -> Live ${current_price:,.2f}")
+                for position in self.paper_engine.positions.values():
+                    if position.asset in live_prices:
+                        current_price = live_prices[position.asset]
+                        print(f"   {position.id}: Entry ${position.entry_price:,.2f} -> Live ${current_price:,.2f}")
                         print(f"         P&L: ${position.unrealized_pnl:+.2f}")
                 
                 print("   ✅ Live P&L tracking working")
@@ -370,7 +368,7 @@ class PaperTradingValidator:
                     # Update existing positions with live prices
                     if self.paper_engine.positions:
                         live_prices = {}
-                        for asset in self.paper_engine.positions.keys():
+                        for asset in self.paper_engine.positions_by_asset.keys():
                             try:
                                 price_data = self.market_engine.get_live_price("BTC")  # Use BTC as proxy
                                 if price_data:
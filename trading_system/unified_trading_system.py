@@ -10,122 +10,199 @@ import time
 from pathlib import Path
 
 # Add paths
-sys.path.append(str(Path(__file__).parent / "core"))
-sys.path.append(str(Path(__file__).parent / "config"))
+ROOT = Path(__file__).parent
+for path in ("config", "core/engines", "core/managers", "core/connectors", "bots/wallet_mimic"):
+    sys.path.append(str(ROOT / path))
+
+import config
+from strategy_runtime import StrategyRuntime
+from paper_trading_engine import get_paper_engine
+from capital_manager import get_capital_manager
+from trade_store import get_trade_store
+
+RISK_SYNC_INTERVAL = float(os.getenv("RISK_SYNC_INTERVAL", "1.0"))
+STATUS_INTERVAL = float(os.getenv("STATUS_INTERVAL", "60"))
+SHARED_HALT = "shared"
+
+MIMIC_REQUIRED_ENV = [
+    "OKX_API_KEY", "OKX_SECRET_KEY", "OKX_PASSPHRASE",
+    "ETHEREUM_RPC_URL", "ETHEREUM_WS_URL", "ETHERSCAN_API_KEY",
+    "ETHEREUM_WALLET_ADDRESS"
+]
+
+class SharedServices:
+    """Market data, the paper book with its risk gate, capital and the trade store, shared by both strategies"""
+
+    def __init__(self, mode: str):
+        self.mode = mode
+        self.paper_engine = get_paper_engine()
+        self.capital_manager = get_capital_manager()
+        self.trade_store = get_trade_store()
+        self.feed = None
+
+    def get_feed(self):
+        """The OKX feed; connects on first use, from a strategy's setup on the executor"""
+        if self.feed is None:
+            from okx_market_data import get_okx_engine
+            self.feed = get_okx_engine(config.ASSETS)
+        return self.feed
+
+    def get_live_prices(self, assets) -> dict:
+        prices = {}
+        for asset in assets:
+            price_data = self.get_feed().get_live_price(asset)
+            if price_data and price_data.get("price", 0) > 0:
+                prices[asset] = price_data["price"]
+        return prices
+
+    def halt_reason(self) -> str:
+        """Why new entries should stop everywhere: the paper book's own halt or the capital drawdown stop"""
+        reason = self.paper_engine.risk_gate.halt_reason
+        if reason and not reason.startswith(SHARED_HALT):
+            return f"hft {reason}"
+        if self.capital_manager.get_drawdown() >= self.capital_manager.emergency_stop_drawdown:
+            return f"capital drawdown {self.capital_manager.get_drawdown():.2%}"
+        return ""
+
+class HFTShortingStrategy:
+    """Signals for the assets that ticked, paper entries and position marks; runs on the executor"""
+
+    def __init__(self, services: SharedServices):
+        self.services = services
+        self.scheduler = None
+        self.signal_engine = None
+        self.confidence_scoring = None
+        self.iteration = 0
+
+    def setup(self):
+        """Imports and the feed connection, once per (re)start rather than every cycle"""
+        import signal_engine
+        import confidence_scoring
+        from tick_scheduler import TickScheduler
+        self.signal_engine = signal_engine
+        self.confidence_scoring = confidence_scoring
+        self.scheduler = TickScheduler(self.services.get_feed(), self.process_ticks)
+
+    def step(self):
+        """Block until the next burst of ticks and evaluate it"""
+        self.scheduler.run_once()
+
+    def process_ticks(self, assets):
+        self.iteration += 1
+        signals = []
+        for asset in assets:
+            shared_data = {
+                "timestamp": time.time(),
+                "mode": self.services.mode,
+                "iteration": self.iteration,
+                "strategy": "hft_short",
+                "asset": asset
+            }
+            try:
+                signal = self.signal_engine.generate_signal(shared_data)
+            except RuntimeError as e:
+                # The generator raises for weak signals and missing live data
+                logging.debug(f"HFT {asset}: {e}")
+                continue
+            if signal and signal.get("confidence", 0) >= config.SIGNAL_CONFIDENCE_THRESHOLD:
+                signals.append(signal)
+
+        paper_engine = self.services.paper_engine
+        if signals and self.services.mode == "paper":
+            merged = self.confidence_scoring.merge_signals(signals)
+            result = paper_engine.open_position(merged)
+            if result:
+                logging.info(f"📉 HFT SHORT: {result['asset']} @ ${result['entry_price']:.2f}")
+
+        prices = self.services.get_live_prices(assets)
+        if prices:
+            paper_engine.update_positions(prices)
+
+class WalletMimicStrategy:
+    """The wallet mimic monitor as a long-running service"""
+
+    def __init__(self, services: SharedServices):
+        self.services = services
+        self.system = None
+
+    def setup(self):
+        missing = [var for var in MIMIC_REQUIRED_ENV if not os.getenv(var)]
+        if missing:
+            raise RuntimeError(f"Required environment variables not set: {', '.join(missing)}")
+        from wallet_mimic import WalletMimicSystem
+        self.system = WalletMimicSystem()
+
+    async def run(self):
+        await self.system.start_monitoring()
+
+    def stop(self):
+        if self.system is not None:
+            self.system.stop_monitoring()
+
+    def get_risk_gate(self):
+        return self.system.capital_manager.risk_gate if self.system is not None else None
 
 class UnifiedTradingSystem:
     def __init__(self, mode="paper"):
         self.mode = mode
-        self.running = False
-        self.iteration = 0
-        
+        self.services = SharedServices(mode)
+        self.runtime = StrategyRuntime()
+        self.hft = HFTShortingStrategy(self.services)
+        self.mimic = WalletMimicStrategy(self.services)
+
+        # Each strategy on its own task: the HFT loop is tick-driven on the executor, the mimic monitor is async
+        self.runtime.add_task("hft_shorting", self.hft.step, interval=0.0, blocking=True, setup=self.hft.setup)
+        self.runtime.add_task("wallet_mimic", self.mimic.run, setup=self.mimic.setup, on_stop=self.mimic.stop)
+        self.runtime.add_task("risk_sync", self.sync_risk, interval=RISK_SYNC_INTERVAL)
+        self.runtime.add_task("status", self.log_status, interval=STATUS_INTERVAL)
+
         logging.info(f"🔥 Unified Trading System - Mode: {mode}")
         logging.info("📈 HFT Shorting: Active")
         logging.info("👁️  Wallet Mimic: Active")
-    
+
     async def run(self):
-        """Main unified loop"""
-        self.running = True
-        
-        while self.running:
-            try:
-                self.iteration += 1
-                
-                # HFT Shorting
-                await self.hft_shorting_cycle()
-                
-                # Wallet Mimic
-                await self.wallet_mimic_cycle()
-                
-                # Status
-                if self.iteration % 20 == 0:
-                    logging.info(f"🔄 Unified system running - Cycle {self.iteration}")
-                
-                await asyncio.sleep(3)
-                
-            except KeyboardInterrupt:
-                logging.info("👋 Shutting down...")
-                break
-            except Exception as e:
-                logging.error(f"System error: {e}")
-                await asyncio.sleep(5)
-        
-        self.running = False
-    
-    async def hft_shorting_cycle(self):
-        """HFT shorting strategy"""
+        """Run both strategies until interrupted, then shut down cleanly"""
         try:
-            # Try to import and use signal engine
-            if Path("core/engines/signal_engine.py").exists():
-                from engines import signal_engine
-                from engines import confidence_scoring
-                
-                shared_data = {
-                    "timestamp": time.time(),
-                    "mode": self.mode,
-                    "iteration": self.iteration,
-                    "strategy": "hft_short"
-                }
-                
-                signal = signal_engine.generate_signal(shared_data)
-                
-                if signal and signal.get('confidence', 0) >= 0.75:
-                    merged = confidence_scoring.merge_signals([signal])
-                    
-                    if self.mode == "paper":
-                        # Try paper trading
-                        try:
-                            from engines.paper_trading_engine import get_paper_engine
-                            paper_engine = get_paper_engine()
-                            result = paper_engine.open_position(merged)
-                            
-                            if result:
-                                asset = result.get('asset', 'UNKNOWN')
-                                price = result.get('entry_price', 0)
-                                logging.info(f"📉 HFT SHORT: {asset} @ ${price:.2f}")
-                        except Exception as e:
-                            logging.debug(f"Paper trading error: {e}")
-            else:
-                # Simulate HFT signal
-                if self.iteration % 15 == 0:  # Every 15 cycles
-                    logging.info(f"📈 HFT: Monitoring short opportunities...")
-                    
-        except Exception as e:
-            logging.debug(f"HFT error: {e}")
-    
-    async def wallet_mimic_cycle(self):
-        """Wallet mimic strategy"""
-        try:
-            # Simulate wallet monitoring
-            if self.iteration % 25 == 0:  # Every 25 cycles
-                logging.info(f"👁️  MIMIC: Monitoring alpha wallets...")
-                
-            # In real implementation, this would:
-            # 1. Monitor blockchain transactions
-            # 2. Identify alpha wallet trades
-            # 3. Validate tokens
-            # 4. Execute mimic trades
-            
-        except Exception as e:
-            logging.debug(f"Mimic error: {e}")
+            await self.runtime.run()
+        finally:
+            self.services.paper_engine.save_state()
+            self.services.capital_manager.flush()
+            self.services.trade_store.flush()
+
+    async def sync_risk(self):
+        """One halt for both books: an HFT halt or the capital drawdown stop blocks new entries in both strategies"""
+        reason = self.services.halt_reason()
+        for gate in (self.services.paper_engine.risk_gate, self.mimic.get_risk_gate()):
+            if gate is None:
+                continue
+            if reason and not gate.halt_reason:
+                gate.halt(f"{SHARED_HALT}: {reason}")
+            elif not reason and gate.halt_reason.startswith(SHARED_HALT):
+                gate.resume()
+
+    async def log_status(self):
+        summary = self.services.paper_engine.get_portfolio_summary()
+        tasks = " | ".join(f"{name}: {m['runs']} runs, lag {m['avg_lag_ms']:.1f}/{m['max_lag_ms']:.0f}ms, "
+                           f"{m['restarts']} restarts" for name, m in self.runtime.get_metrics().items())
+        logging.info(f"🔄 Paper ${summary['total_value']:,.2f} ({summary['open_positions']} open) | {tasks}")
 
 async def main():
     logging.basicConfig(
         level=logging.INFO,
         format='%(asctime)s - %(levelname)s - %(message)s'
     )
-    
+
     import argparse
     parser = argparse.ArgumentParser()
     parser.add_argument('--mode', choices=['paper', 'live'], default='paper')
     args = parser.parse_args()
-    
+
     if args.mode == 'live':
         response = input("⚠️  Live trading uses real money! Continue? (yes/no): ")
         if response.lower() != 'yes':
             print("Aborted.")
             return
-    
+
     system = UnifiedTradingSystem(mode=args.mode)
     await system.run()
 